@@ -8,8 +8,10 @@ from django.contrib import messages
 from django.db.models import Count, Q
 from django import forms
 from datetime import timedelta
+from .authentication import invalidate_cached_users
 from .models.users import UserModel
 from .models import UserDevices, UserSession, UserBankAccount, CustomerNote, AdminAuditLog
+from .models import WalletProvisioningJob, WalletProvisioningItem
 
 
 class WalletIssueFilter(admin.SimpleListFilter):
@@ -156,9 +158,12 @@ class UserAdmin(BaseUserAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(support_note_count=Count('support_notes'))
+
     # Custom display methods
     def support_notes_count(self, obj):
-        count = obj.support_notes.count()
+        count = obj.support_note_count
         if count > 0:
             url = reverse('admin:account_customernote_changelist') + f'?user__id__exact={obj.id}'
             return format_html('<a href="{}">{} notes</a>', url, count)
@@ -193,22 +198,30 @@ class UserAdmin(BaseUserAdmin):
     # Custom actions
     @admin.action(description='✅ Verify selected users')
     def verify_users(self, request, queryset):
+        user_ids = list(queryset.values_list('id', flat=True))
         updated = queryset.update(is_verified=True, verification_status='verified')
+        invalidate_cached_users(user_ids)
         self.message_user(request, f'{updated} users marked as verified.', messages.SUCCESS)
 
     @admin.action(description='❌ Unverify selected users')
     def unverify_users(self, request, queryset):
+        user_ids = list(queryset.values_list('id', flat=True))
         updated = queryset.update(is_verified=False, verification_status='pending')
+        invalidate_cached_users(user_ids)
         self.message_user(request, f'{updated} users marked as unverified.', messages.WARNING)
 
     @admin.action(description='🟢 Activate selected users')
     def activate_users(self, request, queryset):
+        user_ids = list(queryset.values_list('id', flat=True))
         updated = queryset.update(is_active=True)
+        invalidate_cached_users(user_ids)
         self.message_user(request, f'{updated} users activated.', messages.SUCCESS)
 
     @admin.action(description='🔴 Deactivate selected users')
     def deactivate_users(self, request, queryset):
+        user_ids = list(queryset.values_list('id', flat=True))
         updated = queryset.update(is_active=False)
+        invalidate_cached_users(user_ids)
         self.message_user(request, f'{updated} users deactivated.', messages.WARNING)
 
     @admin.action(description='🔑 Reset transaction PINs')
@@ -277,308 +290,33 @@ class UserAdmin(BaseUserAdmin):
     @admin.action(description='🔄 Retry wallet creation (for users with BVN)')
     def retry_wallet_creation(self, request, queryset):
         """
-        Retry wallet creation for users who have verified BVN but wallet creation failed
+        Retry 9PSB wallet creation for users who have verified BVN but wallet creation failed.
+        Runs as a background provisioning job.
         """
-        from wallet.models import Wallet
-        from providers.helpers.psb9 import PSB9Client
-        from datetime import datetime
-        import uuid
-
-        psb9_client = PSB9Client()
-        success_count = 0
-        failed_count = 0
-        skipped_count = 0
-        errors = []
-
-        for user in queryset:
-            # Check if user has BVN
-            if not user.has_bvn or not user.bvn:
-                skipped_count += 1
-                errors.append(f"{user.email}: No BVN verified")
-                continue
-
-            # Check if wallet already has account number
-            try:
-                wallet = user.wallet
-                if wallet.psb9_account_number:
-                    skipped_count += 1
-                    errors.append(f"{user.email}: Wallet already exists")
-                    continue
-            except Wallet.DoesNotExist:
-                # Create wallet record
-                wallet = Wallet.objects.create(user=user)
-
-            # Prepare customer data for 9PSB wallet creation
-            try:
-                # Gender conversion
-                gender_int = 1  # Default to Male
-                if user.bvn_gender:
-                    gender_str = str(user.bvn_gender).strip().upper()
-                    if gender_str in ["FEMALE", "F", "2"]:
-                        gender_int = 2
-                    elif gender_str in ["MALE", "M", "1"]:
-                        gender_int = 1
-
-                # Date formatting
-                dob = user.bvn_dob if user.bvn_dob else user.dob
-                if isinstance(dob, str):
-                    try:
-                        from dateutil import parser
-                        dob_obj = parser.parse(dob)
-                        formatted_dob = dob_obj.strftime('%d/%m/%Y')
-                    except:
-                        try:
-                            dob_obj = datetime.strptime(dob, '%Y-%m-%d')
-                            formatted_dob = dob_obj.strftime('%d/%m/%Y')
-                        except:
-                            formatted_dob = dob
-                elif hasattr(dob, 'strftime'):
-                    formatted_dob = dob.strftime('%d/%m/%Y')
-                else:
-                    formatted_dob = str(dob) if dob else ""
-
-                # Names
-                first_name = user.bvn_first_name or user.first_name or ""
-                middle_name = getattr(user, 'bvn_middle_name', '') or getattr(user, 'middle_name', '') or ""
-                other_names_parts = [name.strip() for name in [first_name, middle_name] if name and name.strip()]
-                other_names = " ".join(other_names_parts) if other_names_parts else " "
-
-                tracking_ref = f"GIDINEST_ADMIN_RETRY_{user.id}_{uuid.uuid4().hex[:8].upper()}"
-
-                customer_data = {
-                    "firstName": first_name,
-                    "lastName": user.bvn_last_name or user.last_name,
-                    "otherNames": other_names,
-                    "phoneNo": user.bvn_phone or user.phone,
-                    "email": user.email,
-                    "bvn": user.bvn,
-                    "gender": gender_int,
-                    "dateOfBirth": formatted_dob,
-                    "address": user.bvn_residential_address or user.address or "Not Provided",
-                    "transactionTrackingRef": tracking_ref
-                }
-
-                # Create wallet with 9PSB
-                result = psb9_client.open_wallet(customer_data)
-
-                if result.get("status") == "success":
-                    wallet_data = result.get("data", {})
-
-                    # Update wallet
-                    wallet.provider_version = "v2"
-                    wallet.psb9_customer_id = wallet_data.get("customerID") or wallet_data.get("customerId")
-                    wallet.psb9_account_number = wallet_data.get("accountNumber")
-                    wallet.psb9_wallet_id = wallet_data.get("orderRef") or wallet_data.get("walletId")
-                    wallet.account_number = wallet_data.get("accountNumber")
-                    wallet.account_name = wallet_data.get("fullName") or wallet_data.get("accountName")
-                    wallet.bank = "9PSB"
-                    wallet.bank_code = "120001"
-                    wallet.save()
-
-                    # Update user flag
-                    user.has_virtual_wallet = True
-                    user.save()
-
-                    success_count += 1
-                else:
-                    error_msg = result.get("message", "Unknown error")
-                    failed_count += 1
-                    errors.append(f"{user.email}: {error_msg}")
-
-            except Exception as e:
-                failed_count += 1
-                errors.append(f"{user.email}: {str(e)}")
-
-        # Build result message
-        message_parts = []
-        if success_count > 0:
-            message_parts.append(f"✅ {success_count} wallet(s) created successfully")
-        if failed_count > 0:
-            message_parts.append(f"❌ {failed_count} failed")
-        if skipped_count > 0:
-            message_parts.append(f"⏭️ {skipped_count} skipped")
-
-        result_message = ". ".join(message_parts)
-
-        if errors:
-            result_message += f"\n\nDetails:\n" + "\n".join(errors[:10])  # Show first 10 errors
-            if len(errors) > 10:
-                result_message += f"\n... and {len(errors) - 10} more"
-
-        if success_count > 0:
-            self.message_user(request, result_message, messages.SUCCESS)
-        elif failed_count > 0:
-            self.message_user(request, result_message, messages.ERROR)
-        else:
-            self.message_user(request, result_message, messages.INFO)
+        return self._start_provisioning_job(request, queryset, 'psb9')
 
     @admin.action(description='💳 Create Embedly wallets (for Prembly verified users)')
     def create_embedly_wallets(self, request, queryset):
         """
         Create Embedly wallets for users who have completed Prembly BVN/NIN verification.
-        This is for temporary use until 9PSB goes live.
+        This is for temporary use until 9PSB goes live. Runs as a background provisioning job.
         """
-        from wallet.models import Wallet
-        from providers.helpers.embedly import EmbedlyClient
-        from datetime import datetime
-
-        embedly_client = EmbedlyClient()
-        success_count = 0
-        failed_count = 0
-        skipped_count = 0
-        errors = []
-
-        for user in queryset:
-            # Check if user has completed Prembly verification (BVN or NIN)
-            if not user.has_bvn and not user.has_nin:
-                skipped_count += 1
-                errors.append(f"{user.email}: No Prembly verification (BVN/NIN required)")
-                continue
+        return self._start_provisioning_job(request, queryset, 'embedly')
 
-            # Check if wallet already has Embedly account
-            try:
-                wallet = user.wallet
-                if wallet.embedly_wallet_id and wallet.account_number:
-                    skipped_count += 1
-                    errors.append(f"{user.email}: Embedly wallet already exists ({wallet.account_number})")
-                    continue
-            except Wallet.DoesNotExist:
-                # Create wallet record
-                wallet = Wallet.objects.create(user=user)
+    def _start_provisioning_job(self, request, queryset, provider):
+        from django.http import HttpResponseRedirect
+        from account.services.wallet_provisioning import create_job
+        from account.tasks import run_wallet_provisioning_job
 
-            # Create Embedly customer and wallet
-            try:
-                # Get required user fields
-                first_name = user.bvn_first_name or user.first_name or ""
-                last_name = user.bvn_last_name or user.last_name or ""
-                phone = user.bvn_phone or user.phone or ""
-
-                # Validate required fields
-                if not first_name or not last_name:
-                    failed_count += 1
-                    errors.append(f"{user.email}: Missing first name or last name (required by Embedly)")
-                    continue
-
-                if not phone:
-                    failed_count += 1
-                    errors.append(f"{user.email}: Missing phone number (required by Embedly)")
-                    continue
-
-                # Step 1: Get or create Embedly customer
-                if user.embedly_customer_id:
-                    # User already has Embedly customer, use existing ID
-                    customer_id = user.embedly_customer_id
-                else:
-                    # Create new Embedly customer
-                    customer_payload = {
-                        "firstName": first_name,
-                        "lastName": last_name,
-                        "emailAddress": user.email,
-                        "mobileNumber": phone,
-                    }
-
-                    # Add optional fields if available
-                    if user.dob:
-                        customer_payload["dob"] = str(user.dob) if hasattr(user.dob, 'strftime') else user.dob
-
-                    if user.address:
-                        customer_payload["address"] = user.address
-
-                    if user.state:
-                        customer_payload["city"] = user.state
-
-                    if user.country:
-                        customer_payload["country"] = user.country
-
-                    # Create customer (pass dict directly, not as named parameter)
-                    customer_result = embedly_client.create_customer(customer_payload)
-
-                    if not customer_result.get("success"):
-                        error_msg = customer_result.get("message", "Failed to create customer")
-
-                        # Check if customer already exists
-                        if "already exist" in error_msg.lower():
-                            skipped_count += 1
-                            errors.append(f"{user.email}: Embedly customer already exists but customer_id not in database. Please manually retrieve customer_id from Embedly and update user.embedly_customer_id")
-                            continue
-
-                        failed_count += 1
-                        errors.append(f"{user.email}: {error_msg}")
-                        continue
-
-                    customer_id = customer_result["data"]["id"]
-
-                    # Save customer_id to user
-                    user.embedly_customer_id = customer_id
-                    user.save(update_fields=['embedly_customer_id'])
-
-                # Step 2: Upgrade KYC with BVN (if available)
-                if user.bvn:
-                    kyc_result = embedly_client.upgrade_kyc(customer_id=customer_id, bvn=user.bvn)
-                    if not kyc_result.get("success"):
-                        # KYC upgrade failed, but we can still create wallet
-                        errors.append(f"{user.email}: Warning - KYC upgrade failed but continuing with wallet creation")
-
-                # Step 3: Create wallet
-                wallet_name = f"{first_name} {last_name}".strip() or user.email
-                wallet_result = embedly_client.create_wallet(
-                    customer_id=customer_id,
-                    name=wallet_name,
-                    phone=phone
-                )
+        job = create_job(provider, queryset, created_by=request.user)
+        run_wallet_provisioning_job.delay(job.pk)
 
-                if not wallet_result.get("success"):
-                    error_msg = wallet_result.get("message", "Failed to create wallet")
-                    failed_count += 1
-                    errors.append(f"{user.email}: {error_msg}")
-                    continue
-
-                wallet_data = wallet_result["data"]
-
-                # Step 4: Update wallet record
-                wallet.provider_version = "v1"  # Embedly is v1
-                wallet.embedly_customer_id = customer_id
-                wallet.embedly_wallet_id = wallet_data.get("id")
-                wallet.account_number = wallet_data.get("accountNumber")
-                wallet.account_name = wallet_data.get("name")
-                wallet.bank = wallet_data.get("bankName", "Embedly")
-                wallet.bank_code = wallet_data.get("bankCode", "")
-                wallet.save()
-
-                # Update user flags
-                user.embedly_customer_id = customer_id
-                user.embedly_wallet_id = wallet_data.get("id")
-                user.has_virtual_wallet = True
-                user.save()
-
-                success_count += 1
-
-            except Exception as e:
-                failed_count += 1
-                errors.append(f"{user.email}: {str(e)}")
-
-        # Build result message
-        message_parts = []
-        if success_count > 0:
-            message_parts.append(f"✅ {success_count} Embedly wallet(s) created successfully")
-        if failed_count > 0:
-            message_parts.append(f"❌ {failed_count} failed")
-        if skipped_count > 0:
-            message_parts.append(f"⏭️ {skipped_count} skipped")
-
-        result_message = ". ".join(message_parts)
-
-        if errors:
-            result_message += f"\n\nDetails:\n" + "\n".join(errors[:10])
-            if len(errors) > 10:
-                result_message += f"\n... and {len(errors) - 10} more"
-
-        if success_count > 0:
-            self.message_user(request, result_message, messages.SUCCESS)
-        elif failed_count > 0:
-            self.message_user(request, result_message, messages.ERROR)
-        else:
-            self.message_user(request, result_message, messages.INFO)
+        self.message_user(
+            request,
+            f"Queued {job.items.count()} user(s) on {job.get_provider_display()} provisioning job #{job.pk}.",
+            messages.SUCCESS
+        )
+        return HttpResponseRedirect(reverse('admin:account_walletprovisioningjob_progress', args=[job.pk]))
 
     def save_model(self, request, obj, form, change):
         """
@@ -608,14 +346,17 @@ class UserAdmin(BaseUserAdmin):
     def changelist_view(self, request, extra_context=None):
         extra_context = extra_context or {}
 
-        # Basic stats
+        # Basic stats, from the support metrics snapshot
+        from account.services.support_metrics import get_support_metrics
+
+        metrics = get_support_metrics()
         extra_context['stats'] = {
-            'total_users': UserModel.objects.count(),
-            'verified_users': UserModel.objects.filter(is_verified=True).count(),
-            'unverified_users': UserModel.objects.filter(is_verified=False).count(),
-            'active_users': UserModel.objects.filter(is_active=True).count(),
-            'inactive_users': UserModel.objects.filter(is_active=False).count(),
-            'tiers': UserModel.objects.values('account_tier').annotate(count=Count('id')),
+            'total_users': metrics['total_users'],
+            'verified_users': metrics['verified_users'],
+            'unverified_users': metrics['unverified_users'],
+            'active_users': metrics['active_users'],
+            'inactive_users': metrics['inactive_users'],
+            'tiers': metrics['user_tiers'],
         }
         return super().changelist_view(request, extra_context=extra_context)
 
@@ -955,3 +696,107 @@ class AdminAuditLogAdmin(admin.ModelAdmin):
         }
 
         return super().changelist_view(request, extra_context=extra_context)
+
+
+@admin.register(WalletProvisioningJob)
+class WalletProvisioningJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'provider', 'status', 'progress_display', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('provider', 'status', 'created_at')
+    readonly_fields = ('provider', 'status', 'created_by', 'created_at', 'started_at', 'finished_at', 'progress_link')
+    actions = ['retry_failed_items', 'cancel_jobs']
+
+    def get_urls(self):
+        from django.urls import path
+
+        custom_urls = [
+            path(
+                '<int:job_id>/progress/',
+                self.admin_site.admin_view(self.progress_view),
+                name='account_walletprovisioningjob_progress',
+            ),
+            path(
+                '<int:job_id>/progress.json',
+                self.admin_site.admin_view(self.progress_json_view),
+                name='account_walletprovisioningjob_progress_json',
+            ),
+        ]
+        return custom_urls + super().get_urls()
+
+    def progress_view(self, request, job_id):
+        from django.shortcuts import get_object_or_404, render
+        from account.services.wallet_provisioning import job_progress
+
+        job = get_object_or_404(WalletProvisioningJob, pk=job_id)
+        context = {
+            **self.admin_site.each_context(request),
+            'title': f'{job.get_provider_display()} wallet provisioning #{job.pk}',
+            'opts': self.model._meta,
+            'job': job,
+            'progress': job_progress(job),
+            'progress_url': reverse('admin:account_walletprovisioningjob_progress_json', args=[job.pk]),
+        }
+        return render(request, 'admin/account/walletprovisioningjob/progress.html', context)
+
+    def progress_json_view(self, request, job_id):
+        from django.http import JsonResponse
+        from django.shortcuts import get_object_or_404
+        from account.services.wallet_provisioning import job_progress
+
+        job = get_object_or_404(WalletProvisioningJob, pk=job_id)
+        return JsonResponse(job_progress(job))
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('created_by').annotate(
+            item_count=Count('items'),
+            done_count=Count('items', filter=Q(items__status__in=['success', 'failed', 'skipped'])),
+        )
+
+    def progress_display(self, obj):
+        return f"{obj.done_count}/{obj.item_count}"
+    progress_display.short_description = 'Progress'
+
+    def progress_link(self, obj):
+        url = reverse('admin:account_walletprovisioningjob_progress', args=[obj.pk])
+        return format_html('<a href="{}">View live progress →</a>', url)
+    progress_link.short_description = 'Progress'
+
+    @admin.action(description='🔁 Retry failed users')
+    def retry_failed_items(self, request, queryset):
+        from account.services.wallet_provisioning import retry_failed
+        from account.tasks import run_wallet_provisioning_job
+
+        requeued = 0
+        for job in queryset:
+            count = retry_failed(job)
+            if count:
+                run_wallet_provisioning_job.delay(job.pk)
+                requeued += count
+        self.message_user(request, f'{requeued} failed user(s) requeued.', messages.SUCCESS)
+
+    @admin.action(description='⏹️ Cancel jobs')
+    def cancel_jobs(self, request, queryset):
+        updated = queryset.filter(status__in=['pending', 'running']).update(
+            status='cancelled', finished_at=timezone.now()
+        )
+        self.message_user(request, f'{updated} job(s) cancelled.', messages.SUCCESS)
+
+    def has_add_permission(self, request):
+        # Jobs are started from the user admin actions
+        return False
+
+
+@admin.register(WalletProvisioningItem)
+class WalletProvisioningItemAdmin(admin.ModelAdmin):
+    list_display = ('job', 'user_email', 'status', 'message', 'attempts', 'finished_at')
+    list_select_related = ('job', 'user')
+    list_filter = ('status', 'job__provider')
+    search_fields = ('user__email', 'message')
+    raw_id_fields = ('job', 'user')
+    readonly_fields = ('job', 'user', 'status', 'message', 'attempts', 'updated_at', 'finished_at')
+
+    def user_email(self, obj):
+        return obj.user.email
+    user_email.short_description = 'User'
+
+    def has_add_permission(self, request):
+        return False
@@ -7,6 +7,7 @@ from rest_framework.response import Response
 from rest_framework import status, permissions
 from django.db import transaction
 from django.db.models import Q
+from account.authentication import invalidate_cached_users
 from account.models import UserModel
 from wallet.models import Wallet
 import logging
@@ -100,10 +101,11 @@ class AdminWalletFixView(APIView):
                         wallet__account_number__isnull=False
                     )
 
-                    count = users_to_fix.count()
+                    user_ids = list(users_to_fix.values_list('id', flat=True))
 
-                    # Update the flag
-                    updated = users_to_fix.update(has_virtual_wallet=True)
+                    # Update the flag (update() skips the post_save cache invalidation)
+                    updated = UserModel.objects.filter(id__in=user_ids).update(has_virtual_wallet=True)
+                    transaction.on_commit(lambda: invalidate_cached_users(user_ids))
 
                     logger.info(f"Admin {request.user.email} fixed has_virtual_wallet flag for {updated} users")
 
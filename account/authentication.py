@@ -0,0 +1,116 @@
+"""
+Authentication classes for the API.
+
+Authenticated users are cached in Redis for a short TTL under a per-user
+version stamp. Bumping the version (on save/delete, or explicitly after
+queryset updates) makes every cached copy unreachable at once. Credential
+hashes are left out of the cached copy.
+"""
+import copy
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+logger = logging.getLogger(__name__)
+
+
+# Never written to the cache; a cached user loads them from the DB on first
+# access, like any other deferred field
+CREDENTIAL_FIELDS = ('password', 'transaction_pin', 'passcode_hash')
+
+
+def _version_key(user_id):
+    return f'auth_user_version:{user_id}'
+
+
+def _user_key(user_id, version):
+    return f'auth_user:{user_id}:{version}'
+
+
+def _without_credentials(user):
+    cached = copy.copy(user)
+    for field in CREDENTIAL_FIELDS:
+        cached.__dict__.pop(field, None)
+    return cached
+
+
+def invalidate_cached_user(user_id):
+    """Bump the user's cache version so the next request reloads it from the DB."""
+    key = _version_key(user_id)
+    try:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate cached user {user_id}: {e}")
+
+
+def invalidate_cached_users(user_ids):
+    """Invalidate several users, e.g. after a queryset.update() that bypasses signals."""
+    for user_id in user_ids:
+        invalidate_cached_user(user_id)
+
+
+class GidiJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the user through UserModel.objects.for_auth(),
+    so every authenticated request loads only the hot columns of the user row.
+    The loaded user is cached for AUTH_USER_CACHE_TTL seconds; a cache hit
+    authenticates the request without touching the database.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        # Read the version before the DB so a concurrent invalidation can't be
+        # overwritten by a stale row cached under the new version
+        version, user = self._get_cached_user(user_id)
+        if user is None:
+            try:
+                user = self.user_model.objects.for_auth().get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            self._cache_user(user_id, version, user)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+    def _get_cached_user(self, user_id):
+        try:
+            version = cache.get(_version_key(user_id), 0)
+            return version, cache.get(_user_key(user_id, version))
+        except Exception as e:
+            logger.warning(f"Auth user cache read failed for {user_id}: {e}")
+            return None, None
+
+    def _cache_user(self, user_id, version, user):
+        if version is None:
+            return
+        try:
+            cache.set(
+                _user_key(user_id, version), _without_credentials(user), getattr(settings, 'AUTH_USER_CACHE_TTL', 60),
+            )
+        except Exception as e:
+            logger.warning(f"Auth user cache write failed for {user_id}: {e}")
+
+
+class GidiJWTScheme(SimpleJWTScheme):
+    """OpenAPI security scheme for GidiJWTAuthentication (same as plain SimpleJWT)."""
+    target_class = 'account.authentication.GidiJWTAuthentication'
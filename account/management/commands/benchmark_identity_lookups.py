@@ -0,0 +1,75 @@
+"""
+Benchmark identity lookups (login and KYC duplicate checks) against the users table.
+
+Samples real phone/BVN/NIN/Google ID values, times the exact queries used by
+LoginView, RegisterSerializer and the KYC verify views, and prints the query
+plan for each so index usage can be confirmed.
+
+Usage:
+    python manage.py benchmark_identity_lookups
+    python manage.py benchmark_identity_lookups --iterations 2000 --no-explain
+"""
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from account.models.users import UserModel
+
+
+class Command(BaseCommand):
+    help = 'Time phone/BVN/NIN/OAuth lookups and show their query plans'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=500,
+            help='Lookups to time per query (default: 500)',
+        )
+        parser.add_argument(
+            '--no-explain',
+            action='store_true',
+            help='Skip printing query plans',
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        total_users = UserModel.objects.count()
+        self.stdout.write(self.style.SUCCESS(f'Identity lookup benchmark ({total_users} users)'))
+
+        lookups = [
+            ('login by phone', 'phone', lambda v: UserModel.objects.filter(phone=v).first()),
+            ('google login', 'google_id', lambda v: UserModel.objects.filter(google_id=v).first()),
+            ('bvn duplicate check', 'bvn', lambda v: UserModel.objects.filter(bvn=v).exists()),
+            ('nin duplicate check', 'nin', lambda v: UserModel.objects.filter(nin=v).exists()),
+        ]
+
+        for label, field, run in lookups:
+            values = list(
+                UserModel.objects
+                .exclude(**{f'{field}__isnull': True})
+                .exclude(**{field: ''})
+                .values_list(field, flat=True)[:1000]
+            )
+            if not values:
+                self.stdout.write(self.style.WARNING(f'  {label}: no {field} values to sample, skipped'))
+                continue
+
+            timings = []
+            for _ in range(iterations):
+                value = random.choice(values)
+                start = time.perf_counter()
+                run(value)
+                timings.append((time.perf_counter() - start) * 1000)
+
+            timings.sort()
+            p50 = statistics.median(timings)
+            p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+            style = self.style.SUCCESS if p50 < 1 else self.style.WARNING
+            self.stdout.write(style(f'  {label:<22} p50={p50:.3f}ms p99={p99:.3f}ms'))
+
+            if not options['no_explain']:
+                plan = UserModel.objects.filter(**{field: values[0]}).explain()
+                for line in plan.splitlines():
+                    self.stdout.write(f'      {line}')
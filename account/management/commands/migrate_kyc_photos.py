@@ -0,0 +1,61 @@
+"""
+Move inline BVN/NIN photo payloads from users.image to S3.
+
+Existing rows store the base64 photo returned by Prembly directly in the users
+table. This uploads each payload to private object storage and replaces it
+with an s3:// reference, served to clients as a presigned URL.
+
+Usage:
+    python manage.py migrate_kyc_photos
+    python manage.py migrate_kyc_photos --limit 500 --dry-run
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from account.models.users import UserModel
+from core.helpers.base64_s3 import KYC_PHOTO_SCHEME, upload_kyc_photo
+
+
+class Command(BaseCommand):
+    help = 'Upload inline KYC photos (users.image) to S3 and store a reference instead'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Maximum number of users to migrate',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show how many photos would be migrated without uploading',
+        )
+
+    def handle(self, *args, **options):
+        users = (
+            UserModel.objects
+            .exclude(
+                Q(image__isnull=True) | Q(image='') | Q(image__startswith='http')
+                | Q(image__startswith=KYC_PHOTO_SCHEME)
+            )
+            .only('id', 'email', 'image')
+            .order_by('id')
+        )
+        if options['limit']:
+            users = users[:options['limit']]
+
+        if options['dry_run']:
+            self.stdout.write(f'{users.count()} inline KYC photos would be migrated')
+            return
+
+        migrated = 0
+        failed = 0
+        for user in users.iterator(chunk_size=100):
+            url = upload_kyc_photo(user.image)
+            if url == user.image:
+                failed += 1
+                self.stdout.write(self.style.WARNING(f'  Failed: {user.email}'))
+                continue
+            UserModel.objects.filter(id=user.id).update(image=url)
+            migrated += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Migrated: {migrated}, Failed: {failed}'))
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.4 on 2026-10-19 05:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0026_usermodel_nudge_wallet_setup_sent_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CampaignDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('campaign', models.CharField(help_text='Campaign identifier (e.g. wallet_setup_nudge)', max_length=100)),
+                ('run_id', models.UUIDField(help_text='Campaign run that claimed this delivery')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent')], default='pending', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='campaign_deliveries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Campaign Delivery',
+                'verbose_name_plural': 'Campaign Deliveries',
+                'db_table': 'campaign_deliveries',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['campaign', 'run_id'], name='campaign_de_campaig_08ec22_idx')],
+                'constraints': [models.UniqueConstraint(fields=('campaign', 'user'), name='unique_campaign_delivery_per_user')],
+            },
+        ),
+    ]
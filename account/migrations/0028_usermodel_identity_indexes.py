@@ -0,0 +1,37 @@
+# Generated by Django 5.1.4 on 2026-10-19 05:17
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build indexes without locking the users table for writes
+    atomic = False
+
+    dependencies = [
+        ('account', '0027_campaigndelivery'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='usermodel',
+            index=models.Index(fields=['phone'], name='users_phone_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='usermodel',
+            index=models.Index(fields=['bvn'], name='users_bvn_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='usermodel',
+            index=models.Index(fields=['nin'], name='users_nin_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='usermodel',
+            index=models.Index(fields=['google_id'], name='users_google_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='usermodel',
+            index=models.Index(fields=['apple_id'], name='users_apple_id_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.4 on 2026-10-19 05:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0028_usermodel_identity_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WalletProvisioningJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(choices=[('embedly', 'Embedly'), ('psb9', '9PSB')], max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], db_index=True, default='pending', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, help_text='Staff member who started the job', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='wallet_provisioning_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Wallet Provisioning Job',
+                'verbose_name_plural': 'Wallet Provisioning Jobs',
+                'db_table': 'wallet_provisioning_jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='WalletProvisioningItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('success', 'Success'), ('failed', 'Failed'), ('skipped', 'Skipped')], default='pending', max_length=20)),
+                ('message', models.TextField(blank=True, default='', help_text='Outcome or error from the provider')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='wallet_provisioning_items', to=settings.AUTH_USER_MODEL)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='account.walletprovisioningjob')),
+            ],
+            options={
+                'verbose_name': 'Wallet Provisioning Item',
+                'verbose_name_plural': 'Wallet Provisioning Items',
+                'db_table': 'wallet_provisioning_items',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['job', 'status'], name='wallet_prov_job_id_fd0987_idx')],
+                'constraints': [models.UniqueConstraint(fields=('job', 'user'), name='unique_wallet_provisioning_item_per_job')],
+            },
+        ),
+    ]
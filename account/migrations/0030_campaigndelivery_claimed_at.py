@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-19 06:18
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0029_wallet_provisioning_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaigndelivery',
+            name='claimed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='When the current run claimed it'),
+        ),
+    ]
@@ -4,5 +4,8 @@ from .sessions import UserSession
 from .bank_accounts import UserBankAccount
 from .customer_notes import CustomerNote
 from .admin_audit_log import AdminAuditLog
+from .campaign_deliveries import CampaignDelivery
+from .wallet_provisioning import WalletProvisioningJob, WalletProvisioningItem
 
-__all__ = ['UserModel', 'UserDevices', 'UserSession', 'UserBankAccount', 'CustomerNote', 'AdminAuditLog']
\ No newline at end of file
+__all__ = ['UserModel', 'UserDevices', 'UserSession', 'UserBankAccount', 'CustomerNote', 'AdminAuditLog', 'CampaignDelivery',
+           'WalletProvisioningJob', 'WalletProvisioningItem']
\ No newline at end of file
@@ -0,0 +1,48 @@
+from django.db import models
+from django.conf import settings
+from django.utils import timezone
+
+
+class CampaignDelivery(models.Model):
+    """
+    Idempotency record for lifecycle campaign messages.
+
+    One row per (campaign, user). A run claims a user by inserting a
+    'pending' row tagged with its run_id; the unique constraint guarantees
+    that overlapping runs can never both claim (and message) the same user.
+    A pending claim older than the campaign's lease belongs to a run that
+    died before finishing and may be taken over by a later run.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+    ]
+
+    campaign = models.CharField(max_length=100, help_text='Campaign identifier (e.g. wallet_setup_nudge)')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='campaign_deliveries',
+    )
+    run_id = models.UUIDField(help_text='Campaign run that claimed this delivery')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(default=timezone.now, help_text='When the current run claimed it')
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'campaign_deliveries'
+        ordering = ['-created_at']
+        verbose_name = 'Campaign Delivery'
+        verbose_name_plural = 'Campaign Deliveries'
+        constraints = [
+            models.UniqueConstraint(fields=['campaign', 'user'], name='unique_campaign_delivery_per_user'),
+        ]
+        indexes = [
+            models.Index(fields=['campaign', 'run_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.campaign} -> {self.user_id} ({self.status})"
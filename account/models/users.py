@@ -26,15 +26,20 @@ class UserManager(BaseUserManager):
 
         return self.create_user(email,password,**extra_fields)    
 
+    def for_auth(self):
+        """
+        Queryset for per-request user resolution.
+
+        Defers the KYC profile strings and the BVN/NIN photo payload, which are
+        only needed by KYC/profile views and are loaded lazily on first access.
+        """
+        return self.get_queryset().defer(*self.model.KYC_PROFILE_FIELDS)
+
 class UserModel(BaseModel, AbstractBaseUser,PermissionsMixin):
     """
         User model for user management and access restrictions
     """
 
-    class Meta:
-        db_table = 'users'
- 
-
     username = models.CharField(null=True, blank=True, max_length=200)
     first_name = models.CharField(null=True, blank=True, max_length=200)
     last_name = models.CharField(null=True, blank=True, max_length=200)
@@ -127,12 +132,19 @@ class UserModel(BaseModel, AbstractBaseUser,PermissionsMixin):
     last_login_at = models.DateTimeField(null=True, blank=True, help_text="Last login timestamp (more precise than last_login)")
  
 
-    indexes = [
-        models.Index(fields=["email"])
-    ]
-  
     USERNAME_FIELD = "email"
 
+    # Heavy identity columns that the auth hot path never needs. image holds the
+    # inline base64 BVN/NIN photo until migrate_kyc_photos has moved it to S3.
+    KYC_PROFILE_FIELDS = (
+        'bvn_first_name', 'bvn_last_name', 'bvn_phone', 'bvn_dob', 'bvn_gender',
+        'bvn_marital_status', 'bvn_nationality', 'bvn_residential_address',
+        'bvn_state_of_residence', 'bvn_watch_listed', 'bvn_enrollment_bank',
+        'nin_first_name', 'nin_last_name', 'nin_phone', 'nin_dob', 'nin_gender',
+        'nin_marital_status', 'nin_nationality', 'nin_residential_address',
+        'nin_state_of_residence', 'image',
+    )
+
     objects = UserManager()
 
 
@@ -140,6 +152,14 @@ class UserModel(BaseModel, AbstractBaseUser,PermissionsMixin):
         verbose_name = "User"
         verbose_name_plural = "Users"
         ordering = ['-created_at']
+        indexes = [
+            # Identity lookups: login by phone/OAuth id, KYC duplicate checks
+            models.Index(fields=['phone'], name='users_phone_idx'),
+            models.Index(fields=['bvn'], name='users_bvn_idx'),
+            models.Index(fields=['nin'], name='users_nin_idx'),
+            models.Index(fields=['google_id'], name='users_google_id_idx'),
+            models.Index(fields=['apple_id'], name='users_apple_id_idx'),
+        ]
 
  
  
@@ -259,6 +279,10 @@ class UserModel(BaseModel, AbstractBaseUser,PermissionsMixin):
             return self.restricted_limit or 1000000  # ₦10,000 default
         return self.daily_limit
     
+    def get_full_name(self):
+        """Profile name, falling back to the email address"""
+        return f"{self.first_name or ''} {self.last_name or ''}".strip() or self.email
+
     def get_verified_name(self):
         """Get user's verified name from BVN or NIN"""
         # Prefer BVN name if available, then NIN, then fallback to profile name
@@ -0,0 +1,90 @@
+from django.db import models
+from django.conf import settings
+
+
+class WalletProvisioningJob(models.Model):
+    """
+    A bulk wallet provisioning run started from the user admin.
+
+    Users are queued as WalletProvisioningItem rows and processed in the
+    background by account.tasks.run_wallet_provisioning_job; progress is
+    derived from the item statuses.
+    """
+
+    PROVIDER_CHOICES = [
+        ('embedly', 'Embedly'),
+        ('psb9', '9PSB'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('cancelled', 'Cancelled'),
+    ]
+
+    provider = models.CharField(max_length=20, choices=PROVIDER_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', db_index=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='wallet_provisioning_jobs',
+        help_text='Staff member who started the job'
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'wallet_provisioning_jobs'
+        ordering = ['-created_at']
+        verbose_name = 'Wallet Provisioning Job'
+        verbose_name_plural = 'Wallet Provisioning Jobs'
+
+    def __str__(self):
+        return f"{self.get_provider_display()} provisioning #{self.pk} ({self.status})"
+
+
+class WalletProvisioningItem(models.Model):
+    """
+    One user in a WalletProvisioningJob, with the outcome of provisioning them.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('success', 'Success'),
+        ('failed', 'Failed'),
+        ('skipped', 'Skipped'),
+    ]
+
+    job = models.ForeignKey(WalletProvisioningJob, on_delete=models.CASCADE, related_name='items')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='wallet_provisioning_items',
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    message = models.TextField(blank=True, default='', help_text='Outcome or error from the provider')
+    attempts = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'wallet_provisioning_items'
+        ordering = ['id']
+        verbose_name = 'Wallet Provisioning Item'
+        verbose_name_plural = 'Wallet Provisioning Items'
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'user'], name='unique_wallet_provisioning_item_per_job'),
+        ]
+        indexes = [
+            models.Index(fields=['job', 'status']),
+        ]
+
+    def __str__(self):
+        return f"Job #{self.job_id} -> {self.user_id} ({self.status})"
@@ -1,9 +1,20 @@
 from rest_framework import serializers
 from account.models.users import UserModel
 from account.models.sessions import UserSession
+from core.helpers.base64_s3 import kyc_photo_url
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class KYCPhotoMixin:
+    """Serve a private KYC photo stored in `image` as a presigned URL."""
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if 'image' in data:
+            data['image'] = kyc_photo_url(data['image'])
+        return data
+
+
+class UserProfileSerializer(KYCPhotoMixin, serializers.ModelSerializer):
     class Meta:
         model = UserModel
         fields = [
@@ -16,7 +27,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
                            'phone', 'has_virtual_wallet',]
 
 
-class UpdateUserProfileSerializer(serializers.ModelSerializer):
+class UpdateUserProfileSerializer(KYCPhotoMixin, serializers.ModelSerializer):
     class Meta:
         model = UserModel
         fields = ['first_name', 'last_name', 'phone', 'address', 'country', 'state','image',]
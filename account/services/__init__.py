@@ -2,5 +2,6 @@
 Account services module
 """
 from .sync_embedly import EmbedlySyncService
+from .campaigns import LifecycleCampaign, WalletSetupNudgeCampaign
 
-__all__ = ['EmbedlySyncService']
+__all__ = ['EmbedlySyncService', 'LifecycleCampaign', 'WalletSetupNudgeCampaign']
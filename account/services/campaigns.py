@@ -0,0 +1,224 @@
+"""
+Lifecycle campaign runner.
+
+Streams an audience queryset in keyset-paginated batches, claims each batch
+idempotently via CampaignDelivery rows, delivers messages in a bounded,
+rate-limited thread pool and applies per-user side effects with bulk writes.
+Claims left pending by a run that crashed expire after the campaign's
+claim_lease and are taken over by the next run.
+"""
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Iterable, List
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from account.models.campaign_deliveries import CampaignDelivery
+from account.models.users import UserModel
+from providers.helpers.resilience import bulk_calls
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls at most `rate_per_second` apart.
+    """
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second else 0
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class LifecycleCampaign:
+    """
+    Base class for lifecycle messaging campaigns.
+
+    Subclasses define:
+        name            -- unique campaign identifier used for idempotency
+        get_audience()  -- UserModel queryset of eligible users
+        deliver(user)   -- send the message; return True on success.
+                           Runs in a worker thread, so it must not touch the DB.
+        on_delivered()  -- bulk side effects for users delivered in a batch.
+                           Runs inside the batch's transaction; defer
+                           notifications and other fan-out with
+                           transaction.on_commit.
+    """
+
+    name: str = ''
+    only_fields = ('id', 'email', 'first_name', 'last_name')
+    chunk_size = 500
+    max_workers = 8
+    rate_per_second = 10
+    # Longer than a batch takes to deliver (chunk_size / rate_per_second)
+    claim_lease = timedelta(minutes=15)
+
+    def get_audience(self):
+        raise NotImplementedError
+
+    def deliver(self, user) -> bool:
+        raise NotImplementedError
+
+    def on_delivered(self, users: List[UserModel]):
+        pass
+
+    def run(self) -> Dict[str, int]:
+        run_id = uuid.uuid4()
+        limiter = RateLimiter(self.rate_per_second)
+        stats = {'sent': 0, 'failed': 0, 'skipped': 0}
+
+        # Users already messaged, or claimed by a run that may still be going
+        taken = CampaignDelivery.objects.filter(campaign=self.name, user_id=OuterRef('pk')).filter(
+            Q(status='sent') | Q(claimed_at__gte=timezone.now() - self.claim_lease)
+        )
+        audience = (
+            self.get_audience()
+            .filter(~Exists(taken))
+            .only(*self.only_fields)
+            .order_by('id')
+        )
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for batch in self._keyset_batches(audience):
+                claimed = self._claim(run_id, batch)
+                stats['skipped'] += len(batch) - len(claimed)
+                if not claimed:
+                    continue
+
+                results = list(pool.map(lambda u: self._deliver_one(limiter, u), claimed))
+                sent = [user for user, ok in zip(claimed, results) if ok]
+                failed_ids = [user.id for user, ok in zip(claimed, results) if not ok]
+
+                self._finalize(run_id, sent, failed_ids)
+                stats['sent'] += len(sent)
+                stats['failed'] += len(failed_ids)
+
+        logger.info(
+            f"Campaign '{self.name}' run {run_id} completed. "
+            f"Sent: {stats['sent']}, Failed: {stats['failed']}, Skipped: {stats['skipped']}"
+        )
+        return stats
+
+    def _keyset_batches(self, queryset) -> Iterable[List[UserModel]]:
+        last_id = None
+        while True:
+            page = queryset if last_id is None else queryset.filter(id__gt=last_id)
+            batch = list(page[:self.chunk_size])
+            if not batch:
+                return
+            yield batch
+            if len(batch) < self.chunk_size:
+                return
+            last_id = batch[-1].id
+
+    def _claim(self, run_id, batch: List[UserModel]) -> List[UserModel]:
+        """
+        Insert pending delivery rows for the batch, take over pending rows
+        whose lease has expired, and return the users this run actually owns.
+        Rows already claimed by another run are skipped by the unique
+        (campaign, user) constraint; a lapsed claim goes to whichever run's
+        conditional UPDATE gets it first.
+        """
+        now = timezone.now()
+        user_ids = [user.id for user in batch]
+        CampaignDelivery.objects.bulk_create(
+            [CampaignDelivery(campaign=self.name, user_id=user_id, run_id=run_id, claimed_at=now) for user_id in user_ids],
+            ignore_conflicts=True,
+        )
+        CampaignDelivery.objects.filter(
+            campaign=self.name, user_id__in=user_ids, status='pending', claimed_at__lt=now - self.claim_lease,
+        ).update(run_id=run_id, claimed_at=now)
+        owned = set(
+            CampaignDelivery.objects
+            .filter(campaign=self.name, run_id=run_id, user_id__in=user_ids)
+            .values_list('user_id', flat=True)
+        )
+        return [user for user in batch if user.id in owned]
+
+    def _deliver_one(self, limiter: RateLimiter, user) -> bool:
+        limiter.wait()
+        try:
+            # Provider calls go through the bulk bulkhead, leaving the
+            # regular one to transactional traffic
+            with bulk_calls():
+                return bool(self.deliver(user))
+        except Exception:
+            logger.exception(f"Campaign '{self.name}' delivery failed for {user.email}")
+            return False
+
+    def _finalize(self, run_id, sent: List[UserModel], failed_ids: list):
+        with transaction.atomic():
+            if sent:
+                CampaignDelivery.objects.filter(
+                    campaign=self.name, run_id=run_id, user_id__in=[user.id for user in sent]
+                ).update(status='sent', sent_at=timezone.now())
+                self.on_delivered(sent)
+            if failed_ids:
+                # Release the claim so a later run can retry the user
+                CampaignDelivery.objects.filter(
+                    campaign=self.name, run_id=run_id, user_id__in=failed_ids
+                ).delete()
+
+
+class WalletSetupNudgeCampaign(LifecycleCampaign):
+    """
+    Nudge users who signed up at least 24 hours ago and still have no wallet.
+    The audience reaches back two days so users whose delivery failed or
+    whose claim was left by a crashed run are picked up by a later hourly run;
+    nudge_wallet_setup_sent keeps it to one nudge per user.
+    """
+
+    name = 'wallet_setup_nudge'
+
+    def __init__(self, now=None):
+        from notification.helper.email import MailClient
+
+        self.now = now or timezone.now()
+        self.mail_client = MailClient()
+
+    def get_audience(self):
+        from wallet.models import Wallet
+
+        return UserModel.objects.filter(
+            created_at__gte=self.now - timedelta(hours=48),
+            created_at__lte=self.now - timedelta(hours=24),
+            nudge_wallet_setup_sent=False,
+            is_active=True,
+        ).filter(~Exists(Wallet.objects.filter(user_id=OuterRef('pk'))))
+
+    def deliver(self, user) -> bool:
+        result = self.mail_client.send_email(
+            to_email=user.email,
+            subject="Your Gidinest wallet is waiting for you!",
+            template_name='emails/wallet_setup_nudge.html',
+            context={
+                'first_name': user.first_name or "there",
+                'year': self.now.year,
+            },
+            to_name=user.get_full_name(),
+        )
+        return result.get('status') == 'success'
+
+    def on_delivered(self, users: List[UserModel]):
+        from notification.helper.notifications import notify_wallet_setup_nudge_bulk
+
+        UserModel.objects.filter(id__in=[user.id for user in users]).update(nudge_wallet_setup_sent=True)
+        transaction.on_commit(lambda: notify_wallet_setup_nudge_bulk(users))
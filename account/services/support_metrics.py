@@ -0,0 +1,124 @@
+"""
+Support dashboard metrics snapshot.
+
+The support dashboard and the user admin changelist used to run ~30
+separate COUNT/SUM queries per page load. The KPIs are now computed with
+one conditional aggregate per table (plus the two top-5 breakdowns) by
+account.tasks.refresh_support_metrics on a one-minute beat, and stored as
+a single cache entry. Pages read the snapshot; it is only computed inline
+when the cache is cold.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'support_dashboard:metrics'
+
+
+def _ttl():
+    return getattr(settings, 'SUPPORT_METRICS_TTL', 300)
+
+
+def compute_support_metrics(now=None):
+    """
+    Compute every support dashboard KPI.
+
+    Returns:
+        dict: metric name -> value, plus computed_at
+    """
+    from account.models import UserModel, CustomerNote, UserSession
+    from core.models import ServerLog
+    from savings.models import SavingsGoalModel
+    from wallet.models import Wallet, WalletTransaction, WithdrawalRequest
+
+    now = now or timezone.now()
+    last_24h = now - timedelta(hours=24)
+    last_7d = now - timedelta(days=7)
+    open_statuses = ['open', 'in_progress']
+
+    metrics = UserModel.objects.aggregate(
+        total_users=Count('id'),
+        active_users=Count('id', filter=Q(is_active=True)),
+        inactive_users=Count('id', filter=Q(is_active=False)),
+        verified_users=Count('id', filter=Q(is_verified=True)),
+        unverified_users=Count('id', filter=Q(is_verified=False)),
+        new_users_24h=Count('id', filter=Q(created_at__gte=last_24h)),
+        new_users_7d=Count('id', filter=Q(created_at__gte=last_7d)),
+        unverified_with_bvn=Count('id', filter=Q(is_verified=False, has_bvn=True)),
+    )
+    metrics['user_tiers'] = list(UserModel.objects.values('account_tier').annotate(count=Count('id')))
+
+    metrics.update(Wallet.objects.aggregate(total_wallets=Count('id'), total_balance=Sum('balance')))
+    metrics['transactions_24h'] = WalletTransaction.objects.filter(created_at__gte=last_24h).count()
+    metrics.update(WithdrawalRequest.objects.aggregate(
+        pending_withdrawals=Count('id', filter=Q(status='pending')),
+        failed_withdrawals_24h=Count('id', filter=Q(status='failed', created_at__gte=last_24h)),
+    ))
+
+    metrics.update(SavingsGoalModel.objects.filter(status='active').aggregate(
+        active_savings_goals=Count('id'),
+        total_savings=Sum('amount'),
+    ))
+
+    metrics.update(CustomerNote.objects.aggregate(
+        open_notes=Count('id', filter=Q(status='open')),
+        in_progress_notes=Count('id', filter=Q(status='in_progress')),
+        flagged_notes=Count('id', filter=Q(flagged=True, status__in=open_statuses)),
+        urgent_notes=Count('id', filter=Q(priority='urgent', status__in=open_statuses)),
+        notes_created_24h=Count('id', filter=Q(created_at__gte=last_24h)),
+        notes_resolved_24h=Count('id', filter=Q(status__in=['resolved', 'closed'], resolved_at__gte=last_24h)),
+    ))
+    metrics['notes_by_category'] = list(
+        CustomerNote.objects.filter(status__in=open_statuses)
+        .values('category').annotate(count=Count('id')).order_by('-count')[:5]
+    )
+
+    metrics.update(UserSession.objects.aggregate(
+        active_sessions=Count('id', filter=Q(is_active=True)),
+        new_sessions_24h=Count('id', filter=Q(created_at__gte=last_24h)),
+    ))
+
+    errors = ServerLog.objects.filter(level__in=['ERROR', 'CRITICAL'], timestamp__gte=last_24h)
+    metrics['errors_24h'] = errors.count()
+    metrics['recent_error_paths'] = list(
+        errors.values('request_path').annotate(count=Count('id')).order_by('-count')[:5]
+    )
+
+    metrics['total_balance'] = metrics['total_balance'] or 0
+    metrics['total_savings'] = metrics['total_savings'] or 0
+    metrics['computed_at'] = now
+    return metrics
+
+
+def refresh_support_metrics():
+    """Recompute the snapshot and store it in the cache."""
+    metrics = compute_support_metrics()
+    cache.set(CACHE_KEY, metrics, timeout=_ttl())
+    return metrics
+
+
+def get_support_metrics():
+    """
+    The cached snapshot, computed inline if the cache is cold or unavailable.
+    Errors from computing the metrics themselves propagate.
+    """
+    try:
+        metrics = cache.get(CACHE_KEY)
+    except Exception as e:
+        logger.warning(f"Support metrics cache unavailable: {e}")
+        return compute_support_metrics()
+    if metrics is not None:
+        return metrics
+
+    metrics = compute_support_metrics()
+    try:
+        cache.set(CACHE_KEY, metrics, timeout=_ttl())
+    except Exception as e:
+        logger.warning(f"Failed to cache support metrics: {e}")
+    return metrics
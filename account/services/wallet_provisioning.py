@@ -0,0 +1,388 @@
+"""
+Bulk wallet provisioning.
+
+The user admin's wallet actions queue the selected users on a
+WalletProvisioningJob instead of calling the provider inside the admin
+request. account.tasks.run_wallet_provisioning_job then works through the
+job a chunk at a time: it claims pending items, runs the provider calls in a
+bounded, rate-limited thread pool and records each user's outcome, so the
+admin progress page can follow along and a worker restart only loses the
+chunk in flight.
+
+Provider calls run in worker threads, through each provider's bulk bulkhead
+(providers/helpers/resilience.bulk_calls) so a job can't take the slots
+user-facing calls need. Provisioners return the user/wallet field updates,
+which are applied on the task's own thread, but the calls themselves still
+write to the DB (the provider clients' ProviderRequestLog,
+DatabaseLogHandler's ServerLog), so each worker closes its thread's
+connections after every user rather than leaking one per pool thread.
+"""
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from account.models.wallet_provisioning import WalletProvisioningItem, WalletProvisioningJob
+from account.services.campaigns import RateLimiter
+from providers.helpers.resilience import bulk_calls
+
+logger = logging.getLogger(__name__)
+
+# Items left 'running' this long belong to a worker that died mid-chunk
+STALE_RUNNING_AFTER = timedelta(minutes=15)
+
+
+@dataclass
+class ProvisioningResult:
+    status: str  # 'success', 'failed' or 'skipped'
+    message: str = ''
+    user_updates: dict = field(default_factory=dict)
+    wallet_updates: dict = field(default_factory=dict)
+
+
+def _wallet_of(user):
+    from wallet.models import Wallet
+
+    try:
+        return user.wallet
+    except Wallet.DoesNotExist:
+        return None
+
+
+# ==========================================
+# Provisioners (run in worker threads; return their user/wallet updates
+# for the task's thread to apply)
+# ==========================================
+
+def provision_embedly_wallet(user, client):
+    """
+    Create the Embedly customer (if needed), upgrade KYC with the BVN and
+    create the wallet, for a user with Prembly BVN/NIN verification.
+    """
+    if not user.has_bvn and not user.has_nin:
+        return ProvisioningResult('skipped', "No Prembly verification (BVN/NIN required)")
+
+    wallet = _wallet_of(user)
+    if wallet and wallet.embedly_wallet_id and wallet.account_number:
+        return ProvisioningResult('skipped', f"Embedly wallet already exists ({wallet.account_number})")
+
+    first_name = user.bvn_first_name or user.first_name or ""
+    last_name = user.bvn_last_name or user.last_name or ""
+    phone = user.bvn_phone or user.phone or ""
+
+    if not first_name or not last_name:
+        return ProvisioningResult('failed', "Missing first name or last name (required by Embedly)")
+    if not phone:
+        return ProvisioningResult('failed', "Missing phone number (required by Embedly)")
+
+    result = ProvisioningResult('failed')
+    notes = []
+
+    # Step 1: Get or create Embedly customer
+    customer_id = user.embedly_customer_id
+    if not customer_id:
+        customer_payload = {
+            "firstName": first_name,
+            "lastName": last_name,
+            "emailAddress": user.email,
+            "mobileNumber": phone,
+        }
+        if user.dob:
+            customer_payload["dob"] = str(user.dob) if hasattr(user.dob, 'strftime') else user.dob
+        if user.address:
+            customer_payload["address"] = user.address
+        if user.state:
+            customer_payload["city"] = user.state
+        if user.country:
+            customer_payload["country"] = user.country
+
+        customer_result = client.create_customer(customer_payload)
+        if not customer_result.get("success"):
+            error_msg = customer_result.get("message", "Failed to create customer")
+            if "already exist" in error_msg.lower():
+                return ProvisioningResult(
+                    'skipped',
+                    "Embedly customer already exists but customer_id not in database. Please manually "
+                    "retrieve customer_id from Embedly and update user.embedly_customer_id"
+                )
+            result.message = error_msg
+            return result
+
+        customer_id = customer_result["data"]["id"]
+        # Saved even if wallet creation fails below, so a retry reuses the customer
+        result.user_updates['embedly_customer_id'] = customer_id
+
+    # Step 2: Upgrade KYC with BVN (if available)
+    if user.bvn:
+        kyc_result = client.upgrade_kyc(customer_id=customer_id, bvn=user.bvn)
+        if not kyc_result.get("success"):
+            notes.append("Warning - KYC upgrade failed but continuing with wallet creation")
+
+    # Step 3: Create wallet
+    wallet_result = client.create_wallet(
+        customer_id=customer_id,
+        name=f"{first_name} {last_name}".strip() or user.email,
+        phone=phone
+    )
+    if not wallet_result.get("success"):
+        result.message = "; ".join(notes + [wallet_result.get("message", "Failed to create wallet")])
+        return result
+
+    wallet_data = wallet_result["data"]
+    result.status = 'success'
+    result.message = "; ".join(notes + [f"Created {wallet_data.get('accountNumber')}"])
+    result.wallet_updates = {
+        'provider_version': "v1",  # Embedly is v1
+        'embedly_wallet_id': wallet_data.get("id"),
+        'account_number': wallet_data.get("accountNumber"),
+        'account_name': wallet_data.get("name"),
+        'bank': wallet_data.get("bankName", "Embedly"),
+        'bank_code': wallet_data.get("bankCode", ""),
+    }
+    result.user_updates.update({
+        'embedly_customer_id': customer_id,
+        'embedly_wallet_id': wallet_data.get("id"),
+        'has_virtual_wallet': True,
+    })
+    return result
+
+
+def _psb9_date_of_birth(dob):
+    if isinstance(dob, str):
+        try:
+            from dateutil import parser
+            return parser.parse(dob).strftime('%d/%m/%Y')
+        except Exception:
+            try:
+                return datetime.strptime(dob, '%Y-%m-%d').strftime('%d/%m/%Y')
+            except ValueError:
+                return dob
+    if hasattr(dob, 'strftime'):
+        return dob.strftime('%d/%m/%Y')
+    return str(dob) if dob else ""
+
+
+def provision_psb9_wallet(user, client):
+    """Open a 9PSB wallet for a user with a verified BVN."""
+    if not user.has_bvn or not user.bvn:
+        return ProvisioningResult('skipped', "No BVN verified")
+
+    wallet = _wallet_of(user)
+    if wallet and wallet.psb9_account_number:
+        return ProvisioningResult('skipped', "Wallet already exists")
+
+    gender_int = 1  # Default to Male
+    if user.bvn_gender:
+        gender_str = str(user.bvn_gender).strip().upper()
+        if gender_str in ["FEMALE", "F", "2"]:
+            gender_int = 2
+
+    first_name = user.bvn_first_name or user.first_name or ""
+    middle_name = getattr(user, 'bvn_middle_name', '') or getattr(user, 'middle_name', '') or ""
+    other_names_parts = [name.strip() for name in [first_name, middle_name] if name and name.strip()]
+
+    customer_data = {
+        "firstName": first_name,
+        "lastName": user.bvn_last_name or user.last_name,
+        "otherNames": " ".join(other_names_parts) if other_names_parts else " ",
+        "phoneNo": user.bvn_phone or user.phone,
+        "email": user.email,
+        "bvn": user.bvn,
+        "gender": gender_int,
+        "dateOfBirth": _psb9_date_of_birth(user.bvn_dob if user.bvn_dob else user.dob),
+        "address": user.bvn_residential_address or user.address or "Not Provided",
+        "transactionTrackingRef": f"GIDINEST_ADMIN_RETRY_{user.id}_{uuid.uuid4().hex[:8].upper()}"
+    }
+
+    result = client.open_wallet(customer_data)
+    if result.get("status") != "success":
+        return ProvisioningResult('failed', result.get("message", "Unknown error"))
+
+    wallet_data = result.get("data", {})
+    return ProvisioningResult(
+        'success',
+        f"Created {wallet_data.get('accountNumber')}",
+        user_updates={'has_virtual_wallet': True},
+        wallet_updates={
+            'provider_version': "v2",
+            'psb9_customer_id': wallet_data.get("customerID") or wallet_data.get("customerId"),
+            'psb9_account_number': wallet_data.get("accountNumber"),
+            'psb9_wallet_id': wallet_data.get("orderRef") or wallet_data.get("walletId"),
+            'account_number': wallet_data.get("accountNumber"),
+            'account_name': wallet_data.get("fullName") or wallet_data.get("accountName"),
+            'bank': "9PSB",
+            'bank_code': "120001",
+        },
+    )
+
+
+def _embedly_client():
+    from providers.helpers.embedly import EmbedlyClient
+    return EmbedlyClient()
+
+
+def _psb9_client():
+    from providers.helpers.psb9 import PSB9Client
+    return PSB9Client()
+
+
+PROVISIONERS = {
+    'embedly': (provision_embedly_wallet, _embedly_client),
+    'psb9': (provision_psb9_wallet, _psb9_client),
+}
+
+
+# ==========================================
+# Jobs
+# ==========================================
+
+def create_job(provider, user_queryset, created_by=None, batch_size=1000):
+    """
+    Queue every user in the queryset on a new provisioning job.
+
+    Returns:
+        WalletProvisioningJob
+    """
+    job = WalletProvisioningJob.objects.create(provider=provider, created_by=created_by)
+    batch = []
+    for user_id in user_queryset.order_by().values_list('id', flat=True).iterator(chunk_size=batch_size):
+        batch.append(WalletProvisioningItem(job=job, user_id=user_id))
+        if len(batch) >= batch_size:
+            WalletProvisioningItem.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        WalletProvisioningItem.objects.bulk_create(batch, ignore_conflicts=True)
+    return job
+
+
+def retry_failed(job):
+    """Requeue a job's failed items. Returns the number requeued."""
+    requeued = job.items.filter(status='failed').update(status='pending', finished_at=None)
+    if requeued:
+        WalletProvisioningJob.objects.filter(pk=job.pk).update(status='pending', finished_at=None)
+    return requeued
+
+
+def job_progress(job):
+    """Item counts by status plus totals, for the admin progress page."""
+    counts = {status: 0 for status, _ in WalletProvisioningItem.STATUS_CHOICES}
+    for row in job.items.values('status').annotate(count=Count('id')):
+        counts[row['status']] = row['count']
+    total = sum(counts.values())
+    done = counts['success'] + counts['failed'] + counts['skipped']
+    return {
+        'job_id': job.pk,
+        'provider': job.provider,
+        'status': job.status,
+        'total': total,
+        'done': done,
+        'percent': round(done * 100 / total, 1) if total else 100.0,
+        'counts': counts,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'recent_failures': [
+            {'email': email, 'message': message}
+            for email, message in job.items.filter(status='failed')
+            .order_by('-finished_at').values_list('user__email', 'message')[:20]
+        ],
+    }
+
+
+def _claim_chunk(job, size):
+    now = timezone.now()
+    # Requeue items orphaned by a worker that died mid-chunk
+    job.items.filter(status='running', updated_at__lt=now - STALE_RUNNING_AFTER).update(status='pending')
+
+    with transaction.atomic():
+        ids = list(
+            job.items.filter(status='pending')
+            .select_for_update(skip_locked=True)
+            .values_list('id', flat=True)[:size]
+        )
+        if ids:
+            WalletProvisioningItem.objects.filter(id__in=ids).update(status='running', updated_at=now)
+    return list(
+        WalletProvisioningItem.objects.filter(id__in=ids).select_related('user', 'user__wallet').order_by('id')
+    )
+
+
+def _apply(item, result):
+    from wallet.models import Wallet
+
+    user = item.user
+    with transaction.atomic():
+        if result.wallet_updates:
+            Wallet.objects.update_or_create(user=user, defaults=result.wallet_updates)
+        if result.user_updates:
+            for name, value in result.user_updates.items():
+                setattr(user, name, value)
+            user.save(update_fields=list(result.user_updates))
+
+        item.status = result.status
+        item.message = result.message
+        item.attempts += 1
+        item.finished_at = timezone.now()
+        item.save(update_fields=['status', 'message', 'attempts', 'finished_at', 'updated_at'])
+
+
+def run_job_chunk(job_id):
+    """
+    Provision one chunk of a job's pending users.
+
+    Returns:
+        int or None: seconds until the job should run again, or None when it is done
+    """
+    job = WalletProvisioningJob.objects.filter(pk=job_id).first()
+    if job is None or job.status in ('completed', 'cancelled'):
+        return None
+
+    if job.status == 'pending':
+        WalletProvisioningJob.objects.filter(pk=job.pk).update(
+            status='running', started_at=job.started_at or timezone.now()
+        )
+
+    provision, make_client = PROVISIONERS[job.provider]
+    client = make_client()
+    limiter = RateLimiter(getattr(settings, 'WALLET_PROVISIONING_RATE', 5))
+
+    def run(item):
+        limiter.wait()
+        try:
+            with bulk_calls():
+                return provision(item.user, client)
+        except Exception as e:
+            logger.exception(f"Wallet provisioning failed for {item.user.email} (job {job.pk})")
+            return ProvisioningResult('failed', str(e))
+        finally:
+            connections.close_all()
+
+    items = _claim_chunk(job, getattr(settings, 'WALLET_PROVISIONING_CHUNK_SIZE', 100))
+    if items:
+        with ThreadPoolExecutor(max_workers=getattr(settings, 'WALLET_PROVISIONING_CONCURRENCY', 2)) as pool:
+            for item, result in zip(items, pool.map(run, items)):
+                try:
+                    _apply(item, result)
+                except Exception as e:
+                    logger.error(f"Failed to record provisioning result for {item.user.email}: {e}", exc_info=True)
+                    WalletProvisioningItem.objects.filter(pk=item.pk).update(
+                        status='failed', message=f"{result.message} (not saved: {e})", finished_at=timezone.now()
+                    )
+
+    if job.items.filter(status='pending').exists():
+        return 0
+    if job.items.filter(status='running').exists():
+        # Another chunk is in flight (or orphaned; reclaimed after STALE_RUNNING_AFTER)
+        return 60
+
+    WalletProvisioningJob.objects.filter(pk=job.pk, status='running').update(
+        status='completed', finished_at=timezone.now()
+    )
+    progress = job_progress(job)
+    logger.info(f"Wallet provisioning job {job.pk} finished: {progress['counts']}")
+    return None
@@ -1,46 +1,47 @@
 # users/signals.py
-from django.db.models.signals import post_save
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from wallet.models import Wallet
 from .models import UserModel
-from providers.helpers.embedly import EmbedlyClient 
+from .authentication import invalidate_cached_user
+
+logger = logging.getLogger(__name__)
  
 
+@receiver(post_save, sender=UserModel)
+@receiver(post_delete, sender=UserModel)
+def invalidate_auth_user_cache(sender, instance, **kwargs):
+    """
+    Drop the cached authenticated user whenever the row changes (profile edits,
+    PIN/passcode changes, restrictions, deactivation). Deferred to commit so a
+    concurrent request can't re-cache the pre-commit row.
+    """
+    user_id = instance.pk
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
+
+
 @receiver(post_save, sender=UserModel)
 def create_embedly_customer(sender, instance, created, **kwargs):
     """
-    Signal receiver to create an Embedly customer when a new UserModel instance is created.
+    Signal receiver to provision an Embedly customer when a new UserModel instance is created.
     NOTE: Wallet creation now happens AFTER BVN/NIN verification, not on registration.
+
+    The Embedly call runs in a Celery task once the signup transaction commits,
+    so registration latency never includes the provider round trip.
     """
     if created and not instance.embedly_customer_id:
+        from .tasks import provision_embedly_customer
 
-        # Wallet creation removed - now happens after BVN/NIN verification
-        # try:
-        #     Wallet.objects.create(user=instance)
-        # except Exception as e:
-        #     pass  # Wallet creation failure is logged in DB
-            
- 
-        client = EmbedlyClient()
-        
-        customer_data = {
-            "firstName": instance.first_name,
-            "lastName": instance.last_name,
-            "emailAddress": instance.email,
-            "mobileNumber": instance.phone,
-            "dob": instance.dob,
-            "address": instance.address,
-            "city": instance.state,
-            "country": instance.country,
-        }
-
-        # Call the Embedly API
-        try:
-            response = client.create_customer(customer_data)
-            if response.get("success"):
-                embedly_customer_id = response['data']['id']
-                instance.embedly_customer_id = embedly_customer_id
-                instance.save(update_fields=['embedly_customer_id'])
-        except Exception as e:
-            pass  # Errors are logged in ProviderRequestLog
\ No newline at end of file
+        user_id = instance.pk
+
+        def enqueue():
+            try:
+                provision_embedly_customer.delay(str(user_id))
+            except Exception:
+                # KYC verification creates the customer on demand if this never runs
+                logger.exception(f"Failed to enqueue Embedly provisioning for user {user_id}")
+
+        transaction.on_commit(enqueue)
@@ -95,68 +95,113 @@ def nudge_users_without_wallet():
     Send them a friendly email + in-app notification to complete KYC.
 
     Runs hourly via Celery beat. The 24-25 hour window ensures each user
-    is only caught once, and the nudge_wallet_setup_sent flag prevents duplicates.
+    is only caught once; CampaignDelivery claims and the nudge_wallet_setup_sent
+    flag prevent duplicates even when runs overlap.
     """
-    from datetime import timedelta
-    from django.utils import timezone
-    from account.models.users import UserModel
-    from wallet.models import Wallet
-    from notification.helper.notifications import notify_wallet_setup_nudge
-    from notification.helper.email import MailClient
-
-    now = timezone.now()
-    window_start = now - timedelta(hours=25)
-    window_end = now - timedelta(hours=24)
-
-    # Users who signed up 24-25 hours ago, haven't been nudged, and have no wallet
-    users = (
-        UserModel.objects
-        .filter(
-            created_at__gte=window_start,
-            created_at__lte=window_end,
-            nudge_wallet_setup_sent=False,
-            is_active=True,
-        )
-        .exclude(
-            id__in=Wallet.objects.values_list('user_id', flat=True)
-        )
+    from account.services.campaigns import WalletSetupNudgeCampaign
+
+    stats = WalletSetupNudgeCampaign().run()
+
+    logger.info(
+        f"Wallet setup nudge task completed. "
+        f"Nudged: {stats['sent']}, Failed: {stats['failed']}"
     )
 
-    nudged_count = 0
-    failed_count = 0
-    mail_client = MailClient()
+    return {'nudged': stats['sent'], 'failed': stats['failed']}
+
+
+@shared_task(
+    name='account.tasks.provision_embedly_customer',
+    bind=True,
+    max_retries=5,
+    acks_late=True,
+)
+def provision_embedly_customer(self, user_id):
+    """
+    Create the Embedly customer for a newly registered user.
+
+    Idempotent: a short cache lock keeps concurrent deliveries from creating
+    duplicate customers, and users that already have an embedly_customer_id
+    are skipped. Provider failures are retried with exponential backoff.
+
+    Args:
+        user_id (str): The user ID to provision
+
+    Returns:
+        dict: Provisioning result
+    """
+    from django.core.cache import cache
+    from account.models.users import UserModel
+    from providers.helpers.embedly import EmbedlyClient
+
+    lock_key = f'embedly_provision:{user_id}'
+    if not cache.add(lock_key, self.request.id or 'local', 120):
+        logger.info(f"Embedly provisioning already in progress for user {user_id}")
+        return {"success": False, "message": "Provisioning already in progress"}
+
+    try:
+        try:
+            user = UserModel.objects.get(id=user_id)
+        except UserModel.DoesNotExist:
+            logger.error(f"User with ID {user_id} not found for Embedly provisioning")
+            return {"success": False, "message": "User not found"}
+
+        if user.embedly_customer_id:
+            return {"success": True, "customer_id": user.embedly_customer_id, "created": False}
+
+        customer_data = {
+            "firstName": user.first_name,
+            "lastName": user.last_name,
+            "emailAddress": user.email,
+            "mobileNumber": user.phone,
+            "dob": user.dob,
+            "address": user.address,
+            "city": user.state,
+            "country": user.country,
+        }
 
-    for user in users:
         try:
-            first_name = user.first_name or "there"
-
-            # Send email
-            mail_client.send_email(
-                to_email=user.email,
-                subject="Your Gidinest wallet is waiting for you!",
-                template_name='emails/wallet_setup_nudge.html',
-                context={
-                    'first_name': first_name,
-                    'year': now.year,
-                },
-                to_name=user.get_full_name() or user.email,
+            response = EmbedlyClient().create_customer(customer_data)
+        except Exception as e:
+            response = {"success": False, "message": str(e)}
+
+        if not response.get("success"):
+            logger.warning(
+                f"Embedly customer creation failed for {user.email} "
+                f"(attempt {self.request.retries + 1}): {response.get('message')}"
             )
+            raise self.retry(countdown=60 * (2 ** self.request.retries))
 
-            # Create in-app notification
-            notify_wallet_setup_nudge(user)
+        user.embedly_customer_id = response['data']['id']
+        user.save(update_fields=['embedly_customer_id'])
+        logger.info(f"Embedly customer provisioned for {user.email}: {user.embedly_customer_id}")
+        return {"success": True, "customer_id": user.embedly_customer_id, "created": True}
+    finally:
+        cache.delete(lock_key)
 
-            # Mark as nudged
-            user.nudge_wallet_setup_sent = True
-            user.save(update_fields=['nudge_wallet_setup_sent'])
 
-            nudged_count += 1
-        except Exception:
-            failed_count += 1
-            logger.exception(f"Failed to send wallet setup nudge to {user.email}")
+@shared_task(name='account.tasks.refresh_support_metrics', ignore_result=True)
+def refresh_support_metrics():
+    """
+    Recompute the support dashboard metrics snapshot (runs every minute).
+    """
+    from account.services.support_metrics import refresh_support_metrics as refresh
 
-    logger.info(
-        f"Wallet setup nudge task completed. "
-        f"Nudged: {nudged_count}, Failed: {failed_count}"
-    )
+    refresh()
+
+
+@shared_task(name='account.tasks.run_wallet_provisioning_job')
+def run_wallet_provisioning_job(job_id):
+    """
+    Provision the next chunk of a bulk wallet provisioning job started from
+    the user admin, then re-enqueue itself until the job is done.
+
+    Args:
+        job_id (int): WalletProvisioningJob ID
+    """
+    from account.services.wallet_provisioning import run_job_chunk
 
-    return {'nudged': nudged_count, 'failed': failed_count}
+    countdown = run_job_chunk(job_id)
+    if countdown is not None:
+        run_wallet_provisioning_job.apply_async(args=[job_id], countdown=countdown)
+    return {'job_id': job_id, 'continuing': countdown is not None}
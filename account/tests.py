@@ -1,3 +1,350 @@
-from django.test import TestCase
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from celery.exceptions import Retry
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from account.models import CustomerNote, UserModel
+from account.models.campaign_deliveries import CampaignDelivery
+from account.models.wallet_provisioning import WalletProvisioningItem
+from account import authentication, tasks
+from account.services import campaigns, support_metrics, wallet_provisioning
+from notification.models import Notification
+from providers.helpers import resilience
+from savings.models import SavingsGoalModel
+from wallet.models import Wallet
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class UserProfileTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserModel.objects.create_user(email='profile@example.com', password='pass1234', first_name='Ada')
+        self.auth = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def test_cached_auth_user_defers_the_photo(self):
+        UserModel.objects.filter(pk=self.user.pk).update(image='s3://kyc-bucket/kyc/photo.jpg')
+        boto3 = mock.patch('core.helpers.base64_s3.boto3').start()
+        self.addCleanup(mock.patch.stopall)
+        boto3.client.return_value.generate_presigned_url.return_value = 'https://signed.example.com/photo.jpg'
+        self.client.get('/api/v1/account/profile', HTTP_AUTHORIZATION=self.auth)
+        boto3.reset_mock()
+
+        # Only the deferred image column is loaded for the profile
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/account/profile', HTTP_AUTHORIZATION=self.auth)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['first_name'], 'Ada')
+        self.assertEqual(response.json()['image'], 'https://signed.example.com/photo.jpg')
+        boto3.client.return_value.generate_presigned_url.assert_called_once_with(
+            'get_object', Params={'Bucket': 'kyc-bucket', 'Key': 'kyc/photo.jpg'}, ExpiresIn=15 * 60,
+        )
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class AuthUserCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserModel.objects.create_user(email='cached@example.com', password='pass1234', first_name='Ada')
+        self.user.set_transaction_pin('1234')
+        self.auth = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def _profile(self):
+        return self.client.get('/api/v1/account/profile', HTTP_AUTHORIZATION=self.auth)
+
+    def _cached_user(self):
+        version = cache.get(f'auth_user_version:{self.user.id}', 0)
+        return cache.get(f'auth_user:{self.user.id}:{version}')
+
+    def test_credential_hashes_are_not_cached(self):
+        self._profile()
+
+        cached = self._cached_user()
+        self.assertEqual(cached.first_name, 'Ada')
+        self.assertTrue(set(authentication.CREDENTIAL_FIELDS).isdisjoint(vars(cached)))
+
+        # A cached user still verifies the PIN, loading the hash from the DB
+        response = self.client.post(
+            '/api/v1/wallet/transaction-pin/verify', {'pin': '1234'}, HTTP_AUTHORIZATION=self.auth,
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def test_save_invalidates_the_cached_user(self):
+        self._profile()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = 'Bola'
+            self.user.save()
+
+        self.assertIsNone(self._cached_user())
+        self.assertEqual(self._profile().json()['first_name'], 'Bola')
+
+    def test_admin_action_invalidates_the_cached_user(self):
+        self._profile()
+        admin = UserModel.objects.create_superuser(email='admin@example.com', password='pass1234')
+        self.client.force_login(admin)
+
+        self.client.post('/internal-admin/account/usermodel/', {
+            'action': 'deactivate_users', '_selected_action': [self.user.pk],
+        })
+        self.client.logout()
+
+        self.assertEqual(self._profile().status_code, 401)
+
+    def test_fix_flags_invalidates_the_cached_users(self):
+        Wallet.objects.create(user=self.user, account_number='1000000009')
+        self._profile()
+        admin = UserModel.objects.create_superuser(email='admin@example.com', password='pass1234')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/internal-admin/wallet/fix', {'operation': 'fix_flags'},
+                HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(admin)}',
+            )
+
+        self.assertEqual(response.json()['data']['users_fixed'], 1)
+        self.assertIsNone(self._cached_user())
+        self.assertTrue(self._profile().json()['has_virtual_wallet'])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class EmbedlyCustomerProvisioningTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        embedly = mock.patch('providers.helpers.embedly.EmbedlyClient')
+        self.create_customer = embedly.start().return_value.create_customer
+        self.create_customer.return_value = {'success': True, 'data': {'id': 'cust-1'}}
+        self.addCleanup(embedly.stop)
+
+    def _signup(self):
+        with mock.patch('account.tasks.provision_embedly_customer.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                user = UserModel.objects.create_user(email='signup@example.com', password='pass1234')
+                # Registration itself never calls the provider
+                delay.assert_not_called()
+        delay.assert_called_once_with(str(user.id))
+        return user
+
+    def test_signup_enqueues_provisioning_after_commit(self):
+        self._signup()
+
+        self.create_customer.assert_not_called()
+
+    def test_task_creates_the_customer_once(self):
+        user = self._signup()
+
+        tasks.provision_embedly_customer.apply(args=[str(user.id)])
+        tasks.provision_embedly_customer.apply(args=[str(user.id)])
+
+        user.refresh_from_db()
+        self.assertEqual(user.embedly_customer_id, 'cust-1')
+        self.create_customer.assert_called_once()
+
+    def test_provider_failure_is_retried(self):
+        user = self._signup()
+        self.create_customer.return_value = {'success': False, 'message': 'provider down'}
+
+        with mock.patch.object(tasks.provision_embedly_customer, 'retry', side_effect=Retry()) as retry:
+            result = tasks.provision_embedly_customer.apply(args=[str(user.id)])
+
+        self.assertEqual(result.state, 'RETRY')
+        retry.assert_called_once_with(countdown=60)
+        user.refresh_from_db()
+        self.assertFalse(user.embedly_customer_id)
+        # The lock is released so the retry can run
+        self.assertIsNone(cache.get(f'embedly_provision:{user.id}'))
+
+    def test_concurrent_delivery_is_skipped(self):
+        user = self._signup()
+        cache.add(f'embedly_provision:{user.id}', 'other-worker', 120)
+
+        result = tasks.provision_embedly_customer.apply(args=[str(user.id)]).get()
+
+        self.assertEqual(result['message'], 'Provisioning already in progress')
+        self.create_customer.assert_not_called()
+
+
+class SupportMetricsTests(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(email='support-metrics@example.com', password='pass1234')
+        SavingsGoalModel.objects.filter(user=self.user).delete()
+        SavingsGoalModel.objects.create(user=self.user, name='Rent', amount=Decimal('1500.00'), target_amount=5000)
+        SavingsGoalModel.objects.create(user=self.user, name='Car', amount=Decimal('250.50'), target_amount=5000)
+        SavingsGoalModel.objects.create(
+            user=self.user, name='Old', amount=Decimal('999.00'), target_amount=5000, status='cancelled',
+        )
+
+    def test_compute_support_metrics(self):
+        metrics = support_metrics.compute_support_metrics()
+
+        self.assertEqual(metrics['total_users'], 1)
+        self.assertEqual(metrics['active_savings_goals'], 2)
+        self.assertEqual(metrics['total_savings'], Decimal('1750.50'))
+        self.assertEqual(metrics['total_balance'], 0)
+        self.assertIn('computed_at', metrics)
+
+    def test_cold_cache_computes_once_and_stores(self):
+        with mock.patch.object(support_metrics, 'cache') as cache:
+            cache.get.return_value = None
+            metrics = support_metrics.get_support_metrics()
+
+        self.assertEqual(metrics['total_savings'], Decimal('1750.50'))
+        cache.set.assert_called_once()
+
+    def test_compute_errors_are_not_retried(self):
+        with mock.patch.object(support_metrics, 'cache') as cache, \
+                mock.patch.object(support_metrics, 'compute_support_metrics', side_effect=RuntimeError) as compute:
+            cache.get.return_value = None
+            with self.assertRaises(RuntimeError):
+                support_metrics.get_support_metrics()
+
+        compute.assert_called_once()
+        cache.set.assert_not_called()
+
+    def test_user_admin_changelist(self):
+        admin = UserModel.objects.create_superuser(email='admin@example.com', password='pass1234')
+        self.client.force_login(admin)
+        for i in range(6):
+            user = UserModel.objects.create_user(email=f'customer{i}@example.com', password='pass1234')
+            CustomerNote.objects.create(user=user, created_by=admin, subject='Call back', note='Asked about limits')
+
+        # QueryBudgetTestRunner fails this on a per-row query (N+1)
+        with mock.patch.object(support_metrics, 'cache') as metrics_cache:
+            metrics_cache.get.return_value = None
+            response = self.client.get('/internal-admin/account/usermodel/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '1 notes', count=6)
+
+
+class WalletProvisioningTests(TestCase):
+    def setUp(self):
+        self.users = [
+            UserModel.objects.create_user(email=f'provision{i}@example.com', password='pass1234') for i in range(3)
+        ]
+        self.job = wallet_provisioning.create_job('embedly', UserModel.objects.filter(id__in=[u.id for u in self.users]))
+
+    def _provision(self, user, client):
+        if user.email == 'provision1@example.com':
+            raise RuntimeError('provider down')
+        return wallet_provisioning.ProvisioningResult('success', 'created', user_updates={'embedly_customer_id': 'c1'})
+
+    def test_chunk_records_outcomes_and_closes_worker_connections(self):
+        provisioners = {'embedly': (self._provision, lambda: None)}
+        with mock.patch.dict(wallet_provisioning.PROVISIONERS, provisioners), \
+                mock.patch.object(wallet_provisioning.connections, 'close_all') as close_all:
+            self.assertIsNone(wallet_provisioning.run_job_chunk(self.job.pk))
+
+        statuses = dict(WalletProvisioningItem.objects.filter(job=self.job).values_list('user__email', 'status'))
+        self.assertEqual(statuses, {
+            'provision0@example.com': 'success',
+            'provision1@example.com': 'failed',
+            'provision2@example.com': 'success',
+        })
+        self.assertEqual(close_all.call_count, 3)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'completed')
+
+    def test_provider_calls_use_the_bulk_bulkhead(self):
+        lanes = []
+
+        def provision(user, client):
+            lanes.append(resilience._bulk.get())
+            return wallet_provisioning.ProvisioningResult('skipped')
+
+        with mock.patch.dict(wallet_provisioning.PROVISIONERS, {'embedly': (provision, lambda: None)}):
+            wallet_provisioning.run_job_chunk(self.job.pk)
+
+        self.assertEqual(lanes, [True, True, True])
+
+    def test_item_changelist(self):
+        admin = UserModel.objects.create_superuser(email='admin@example.com', password='pass1234')
+        self.client.force_login(admin)
+        for i in range(3, 10):
+            UserModel.objects.create_user(email=f'provision{i}@example.com', password='pass1234')
+        wallet_provisioning.create_job('embedly', UserModel.objects.filter(email__startswith='provision'))
+
+        # QueryBudgetTestRunner fails this on a per-row query (N+1)
+        response = self.client.get('/internal-admin/account/walletprovisioningitem/')
+
+        self.assertEqual(response.status_code, 200)
+
+
+class WalletSetupNudgeCampaignTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.users = [
+            UserModel.objects.create_user(email=f'nudge{i}@example.com', password='pass1234', first_name=f'N{i}')
+            for i in range(3)
+        ]
+        UserModel.objects.filter(id__in=[u.id for u in self.users]).update(created_at=self.now - timedelta(hours=30))
+        mail_client = mock.patch('notification.helper.email.MailClient')
+        mail_client.start().return_value.send_email.return_value = {'status': 'success'}
+        self.addCleanup(mail_client.stop)
+
+    def _campaign(self):
+        campaign = campaigns.WalletSetupNudgeCampaign(now=self.now)
+        campaign.rate_per_second = 0
+        return campaign
+
+    def _pending(self, user, claimed_at):
+        CampaignDelivery.objects.create(
+            campaign='wallet_setup_nudge', user=user, run_id=uuid.uuid4(), claimed_at=claimed_at,
+        )
+
+    def test_stale_claims_are_taken_over_and_fresh_ones_skipped(self):
+        stale, fresh, new = self.users
+        self._pending(stale, self.now - timedelta(hours=1))
+        self._pending(fresh, self.now - timedelta(minutes=1))
+
+        with mock.patch('notification.signals.publish_user_event'):
+            stats = self._campaign().run()
+
+        self.assertEqual(stats['sent'], 2)
+        self.assertEqual(
+            set(CampaignDelivery.objects.filter(status='sent').values_list('user_id', flat=True)),
+            {stale.id, new.id},
+        )
+        self.assertEqual(CampaignDelivery.objects.get(user=fresh).status, 'pending')
+
+    def test_emails_are_sent_through_the_bulk_bulkhead(self):
+        campaign = self._campaign()
+        lanes = []
+
+        def send_email(**kwargs):
+            lanes.append(resilience._bulk.get())
+            return {'status': 'success'}
+
+        campaign.mail_client.send_email.side_effect = send_email
+
+        with mock.patch('notification.signals.publish_user_event'):
+            campaign.run()
+
+        self.assertEqual(lanes, [True, True, True])
+
+    def test_on_delivered_creates_notifications_with_their_side_effects(self):
+        with mock.patch('notification.signals.publish_user_event') as publish:
+            with self.captureOnCommitCallbacks() as callbacks:
+                stats = self._campaign().run()
+            # Notifications fan out only once the batch has committed
+            self.assertFalse(Notification.objects.exists())
+            for callback in callbacks:
+                callback()
+
+        self.assertEqual(stats['sent'], 3)
+        self.assertFalse(UserModel.objects.filter(id__in=[u.id for u in self.users], nudge_wallet_setup_sent=False).exists())
+        notifications = Notification.objects.filter(notification_type='wallet_setup_nudge')
+        self.assertEqual(notifications.count(), 3)
+        self.assertEqual(notifications.get(user=self.users[0]).message.split(',')[0], 'Hey N0')
+        self.assertEqual(
+            sorted(call.args[0] for call in publish.call_args_list if call.args[1] == 'notification.created'),
+            sorted(u.id for u in self.users),
+        )
+        # A second run finds nobody left to nudge
+        self.assertEqual(self._campaign().run()['sent'], 0)
@@ -4,7 +4,10 @@ V2 URLs for Mobile App - KYC Verification
 Two-step BVN and NIN verification flow with Prembly integration
 """
 
+from django.conf import settings
 from django.urls import path
+
+from account import views_async_kyc
 from account.views_v2_kyc import (
     V2BVNVerifyView,
     V2BVNConfirmView,
@@ -14,12 +17,15 @@ from account.views_v2_kyc import (
     V2WalletSyncView
 )
 
+# Prembly calls run as native async views when served under ASGI
+ASYNC_VIEWS = settings.ASYNC_PROVIDER_VIEWS
+
 urlpatterns = [
     # ==========================================
     # BVN VERIFICATION (Two-Step - Prembly)
     # ==========================================
     # Step 1: Verify BVN with Prembly and return details for review
-    path('bvn/verify', V2BVNVerifyView.as_view(), name='v2-kyc-bvn-verify'),
+    path('bvn/verify', views_async_kyc.bvn_verify if ASYNC_VIEWS else V2BVNVerifyView.as_view(), name='v2-kyc-bvn-verify'),
 
     # Step 2: Confirm BVN details and save to database
     path('bvn/confirm', V2BVNConfirmView.as_view(), name='v2-kyc-bvn-confirm'),
@@ -28,7 +34,7 @@ urlpatterns = [
     # NIN VERIFICATION (Two-Step - Prembly)
     # ==========================================
     # Step 1: Verify NIN with Prembly and return details for review
-    path('nin/verify', V2NINVerifyView.as_view(), name='v2-kyc-nin-verify'),
+    path('nin/verify', views_async_kyc.nin_verify if ASYNC_VIEWS else V2NINVerifyView.as_view(), name='v2-kyc-nin-verify'),
 
     # Step 2: Confirm NIN details and save to database
     path('nin/confirm', V2NINConfirmView.as_view(), name='v2-kyc-nin-confirm'),
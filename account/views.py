@@ -5,6 +5,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 from account.models.users import UserModel
 from account.serializers import UpdateUserBVNSerializer, UpdateUserNINSerializer, UpdateUserProfileSerializer, UserProfileSerializer
+from core.helpers.base64_s3 import upload_kyc_photo
 from core.helpers.response import error_response, success_response, validation_error_response
 from providers.helpers.embedly import EmbedlyClient
 from wallet.models import Wallet
@@ -153,7 +154,7 @@ class UpdateBVNView(APIView):
         user.bvn_last_name = bvn_data.get("lastname")
         user.bvn_gender = bvn_data.get("gender")
         user.bvn_phone = bvn_data.get("phone")
-        user.image = bvn_data.get("photo")
+        user.image = upload_kyc_photo(bvn_data.get("photo"))
         user.bvn_dob = bvn_data.get("birthdate")
         user.bvn_marital_status = bvn_data.get("marital_status")
         user.bvn_nationality = bvn_data.get("nationality")
@@ -342,7 +343,7 @@ class UpdateNINView(APIView):
         user.nin_last_name = nin_data.get("lastname")
         user.nin_gender = nin_data.get("gender")
         user.nin_phone = nin_data.get("phone")
-        user.image = nin_data.get("photo")
+        user.image = upload_kyc_photo(nin_data.get("photo"))
         user.nin_dob = nin_data.get("birthdate")
         user.nin_marital_status = nin_data.get("marital_status")
         user.nin_nationality = nin_data.get("nationality")
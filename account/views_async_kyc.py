@@ -0,0 +1,75 @@
+"""
+Async (ASGI) versions of the KYC verify endpoints (step 1 of the BVN / NIN flow).
+
+Local checks and caching are shared with views_v2_kyc.py and run in a thread;
+only the Prembly call is awaited on the event loop. Enabled with
+settings.ASYNC_PROVIDER_VIEWS.
+"""
+import logging
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework import status
+
+from account.views_v2_kyc import (
+    _bvn_verify_precheck,
+    _bvn_verified_body,
+    _extract_verification_data,
+    _kyc_provider_error,
+    _nin_verify_precheck,
+    _nin_verified_body,
+)
+from core.helpers.async_views import async_api_view, json_body
+from providers.helpers.async_clients import averify_bvn, averify_nin
+
+logger = logging.getLogger(__name__)
+
+
+@async_api_view(['POST'])
+async def bvn_verify(request):
+    user = request.user
+
+    error, bvn, verification_data = await sync_to_async(_bvn_verify_precheck)(user, json_body(request))
+    if error:
+        return JsonResponse(error, status=status.HTTP_400_BAD_REQUEST)
+
+    if verification_data is None:
+        logger.info(f"Verifying BVN for user {user.email} via Prembly")
+        prembly_response = await averify_bvn(bvn)
+
+        if prembly_response.get("status") != "success":
+            logger.error(f"Prembly BVN verification failed for {user.email}: {prembly_response.get('message')}")
+            return JsonResponse(
+                _kyc_provider_error("KYC_BVN_INVALID", prembly_response, "BVN verification failed"),
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        verification_data = _extract_verification_data(prembly_response)
+
+    body = await sync_to_async(_bvn_verified_body)(user, bvn, verification_data)
+    return JsonResponse(body, status=status.HTTP_200_OK)
+
+
+@async_api_view(['POST'])
+async def nin_verify(request):
+    user = request.user
+
+    error, data = await sync_to_async(_nin_verify_precheck)(user, json_body(request))
+    if error:
+        return JsonResponse(error, status=status.HTTP_400_BAD_REQUEST)
+
+    nin = data['nin']
+
+    logger.info(f"Verifying NIN for user {user.email} via Prembly")
+    prembly_response = await averify_nin(nin, data.get('first_name'), data.get('last_name'), data.get('dob'))
+
+    if prembly_response.get("status") != "success":
+        logger.error(f"Prembly NIN verification failed for {user.email}: {prembly_response.get('message')}")
+        return JsonResponse(
+            _kyc_provider_error("KYC_NIN_INVALID", prembly_response, "NIN verification failed"),
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    verification_data = _extract_verification_data(prembly_response)
+    body = await sync_to_async(_nin_verified_body)(user, nin, verification_data)
+    return JsonResponse(body, status=status.HTTP_200_OK)
@@ -19,6 +19,7 @@ from account.serializers import (
     V2NINVerifySerializer,
     V2NINConfirmSerializer
 )
+from core.helpers.base64_s3 import upload_kyc_photo
 from providers.helpers.prembly import verify_bvn, verify_nin
 from providers.helpers.psb9 import psb9_client
 from wallet.models import Wallet
@@ -26,6 +27,142 @@ from wallet.models import Wallet
 logger = logging.getLogger(__name__)
 
 
+def _extract_verification_data(prembly_response):
+    """Handle the different Prembly response structures."""
+    prembly_data = prembly_response.get("data", {})
+    return prembly_data.get("data") or prembly_data.get("verification") or prembly_data
+
+
+def _kyc_provider_error(code, prembly_response, default_message):
+    return {
+        "success": False,
+        "error": {
+            "code": code,
+            "message": prembly_response.get("message", default_message),
+            "data": prembly_response.get("details")
+        }
+    }
+
+
+def _bvn_verify_precheck(user, data):
+    """
+    Validate input and run the local checks that precede the Prembly call.
+    Shared by the sync view and its async counterpart.
+
+    Returns:
+        tuple: (error_body, bvn, stored_verification_data). error_body is set when
+        the request should be rejected; stored_verification_data is set when the
+        BVN was already verified and Prembly need not be called again.
+    """
+    serializer = V2BVNVerifySerializer(data=data)
+
+    if not serializer.is_valid():
+        return {
+            "success": False,
+            "error": {
+                "code": "VALIDATION_ERROR",
+                "message": "Invalid input data",
+                "data": serializer.errors
+            }
+        }, None, None
+
+    bvn = serializer.validated_data['bvn']
+
+    # Check if BVN is already verified for this user
+    # Allow retry if wallet doesn't exist (wallet creation may have failed previously)
+    if user.has_bvn:
+        # Check if wallet exists
+        try:
+            wallet = user.wallet
+            # Wallet exists, check if it has 9PSB account number
+            if wallet.psb9_account_number:
+                return {
+                    "success": False,
+                    "error": {
+                        "code": "KYC_BVN_ALREADY_VERIFIED",
+                        "message": "BVN has already been verified and wallet created for this account"
+                    }
+                }, bvn, None
+            else:
+                # Wallet exists but no 9PSB account - allow retry
+                logger.info(f"User {user.email} has BVN but no 9PSB account, allowing retry")
+        except Wallet.DoesNotExist:
+            # No wallet exists - allow retry to create wallet
+            logger.info(f"User {user.email} has BVN but no wallet, allowing retry for wallet creation")
+
+    # Check if BVN is used by another account
+    # Skip duplicate check in TEST_MODE for testing
+    if not settings.TEST_MODE:
+        if UserModel.objects.filter(bvn=bvn).exclude(id=user.id).exists():
+            return {
+                "success": False,
+                "error": {
+                    "code": "KYC_BVN_DUPLICATE",
+                    "message": "This BVN has already been used for another account"
+                }
+            }, bvn, None
+    else:
+        # In TEST_MODE, allow duplicate BVNs but log a warning
+        if UserModel.objects.filter(bvn=bvn).exclude(id=user.id).exists():
+            logger.warning(f"TEST MODE: Allowing duplicate BVN {bvn} for user {user.email}")
+
+    # If user already has BVN verified, use stored data instead of calling Prembly
+    if user.has_bvn and user.bvn == bvn:
+        logger.info(f"Using stored BVN data for user {user.email} (retry for wallet creation)")
+
+        # Reconstruct verification data from user model
+        return None, bvn, {
+            'firstName': user.bvn_first_name,
+            'lastName': user.bvn_last_name,
+            'dateOfBirth': user.bvn_dob,
+            'phoneNumber': user.bvn_phone,
+            'gender': user.bvn_gender,
+            'stateOfResidence': user.bvn_state_of_residence,
+            'enrollmentBank': user.bvn_enrollment_bank,
+            'watchListed': user.bvn_watch_listed,
+            'residentialAddress': user.bvn_residential_address,
+        }
+
+    return None, bvn, None
+
+
+def _bvn_verified_body(user, bvn, verification_data):
+    """Cache the verification result for the confirm step and build the review payload."""
+    # Store verification result in cache for 10 minutes
+    cache_key = f"bvn_verification_{user.id}"
+    cache_data = {
+        "bvn": bvn,
+        "verification_data": verification_data,
+        "timestamp": datetime.now().isoformat()
+    }
+    cache.set(cache_key, cache_data, timeout=600)  # 10 minutes
+
+    logger.info(f"BVN verification successful for {user.email}, data cached")
+
+    # Transform Prembly's camelCase fields to snake_case for frontend
+    bvn_details = {
+        'first_name': verification_data.get('firstName') or verification_data.get('firstname') or verification_data.get('first_name'),
+        'last_name': verification_data.get('lastName') or verification_data.get('lastname') or verification_data.get('last_name'),
+        'middle_name': verification_data.get('middleName') or verification_data.get('middlename') or verification_data.get('middle_name'),
+        'date_of_birth': verification_data.get('dateOfBirth') or verification_data.get('birthdate') or verification_data.get('date_of_birth') or verification_data.get('dob'),
+        'phone_number': verification_data.get('phoneNumber') or verification_data.get('phone') or verification_data.get('phone_number'),
+        'email': verification_data.get('email'),
+        'gender': verification_data.get('gender'),
+        'state_of_residence': verification_data.get('stateOfResidence') or verification_data.get('state_of_residence') or verification_data.get('state'),
+        'enrollment_bank': verification_data.get('enrollmentBank') or verification_data.get('enrollment_bank'),
+        'watch_listed': verification_data.get('watchListed') or verification_data.get('watch_listed') or verification_data.get('watchlisted'),
+    }
+
+    # Return BVN details for user to review
+    return {
+        "success": True,
+        "data": {
+            "details": bvn_details,
+            "message": "BVN verified successfully"
+        }
+    }
+
+
 class V2BVNVerifyView(APIView):
     """
     Step 1: Verify BVN with Prembly
@@ -35,131 +172,23 @@ class V2BVNVerifyView(APIView):
 
     def post(self, request):
         user = request.user
-        serializer = V2BVNVerifySerializer(data=request.data)
 
-        if not serializer.is_valid():
-            return Response({
-                "success": False,
-                "error": {
-                    "code": "VALIDATION_ERROR",
-                    "message": "Invalid input data",
-                    "data": serializer.errors
-                }
-            }, status=status.HTTP_400_BAD_REQUEST)
+        error, bvn, verification_data = _bvn_verify_precheck(user, request.data)
+        if error:
+            return Response(error, status=status.HTTP_400_BAD_REQUEST)
 
-        bvn = serializer.validated_data['bvn']
-
-        # Check if BVN is already verified for this user
-        # Allow retry if wallet doesn't exist (wallet creation may have failed previously)
-        if user.has_bvn:
-            # Check if wallet exists
-            try:
-                wallet = user.wallet
-                # Wallet exists, check if it has 9PSB account number
-                if wallet.psb9_account_number:
-                    return Response({
-                        "success": False,
-                        "error": {
-                            "code": "KYC_BVN_ALREADY_VERIFIED",
-                            "message": "BVN has already been verified and wallet created for this account"
-                        }
-                    }, status=status.HTTP_400_BAD_REQUEST)
-                else:
-                    # Wallet exists but no 9PSB account - allow retry
-                    logger.info(f"User {user.email} has BVN but no 9PSB account, allowing retry")
-            except Wallet.DoesNotExist:
-                # No wallet exists - allow retry to create wallet
-                logger.info(f"User {user.email} has BVN but no wallet, allowing retry for wallet creation")
-
-        # Check if BVN is used by another account
-        # Skip duplicate check in TEST_MODE for testing
-        if not settings.TEST_MODE:
-            if UserModel.objects.filter(bvn=bvn).exclude(id=user.id).exists():
-                return Response({
-                    "success": False,
-                    "error": {
-                        "code": "KYC_BVN_DUPLICATE",
-                        "message": "This BVN has already been used for another account"
-                    }
-                }, status=status.HTTP_400_BAD_REQUEST)
-        else:
-            # In TEST_MODE, allow duplicate BVNs but log a warning
-            if UserModel.objects.filter(bvn=bvn).exclude(id=user.id).exists():
-                logger.warning(f"TEST MODE: Allowing duplicate BVN {bvn} for user {user.email}")
-
-        # If user already has BVN verified, use stored data instead of calling Prembly
-        if user.has_bvn and user.bvn == bvn:
-            logger.info(f"Using stored BVN data for user {user.email} (retry for wallet creation)")
-
-            # Reconstruct verification data from user model
-            verification_data = {
-                'firstName': user.bvn_first_name,
-                'lastName': user.bvn_last_name,
-                'dateOfBirth': user.bvn_dob,
-                'phoneNumber': user.bvn_phone,
-                'gender': user.bvn_gender,
-                'stateOfResidence': user.bvn_state_of_residence,
-                'enrollmentBank': user.bvn_enrollment_bank,
-                'watchListed': user.bvn_watch_listed,
-                'residentialAddress': user.bvn_residential_address,
-            }
-        else:
+        if verification_data is None:
             # Call Prembly API to verify BVN
             logger.info(f"Verifying BVN for user {user.email} via Prembly")
             prembly_response = verify_bvn(bvn)
 
             if prembly_response.get("status") != "success":
-                error_message = prembly_response.get("message", "BVN verification failed")
-                logger.error(f"Prembly BVN verification failed for {user.email}: {error_message}")
-
-                return Response({
-                    "success": False,
-                    "error": {
-                        "code": "KYC_BVN_INVALID",
-                        "message": error_message,
-                        "data": prembly_response.get("details")
-                    }
-                }, status=status.HTTP_400_BAD_REQUEST)
+                logger.error(f"Prembly BVN verification failed for {user.email}: {prembly_response.get('message')}")
+                return Response(_kyc_provider_error("KYC_BVN_INVALID", prembly_response, "BVN verification failed"), status=status.HTTP_400_BAD_REQUEST)
 
-            # Extract BVN data from Prembly response
-            prembly_data = prembly_response.get("data", {})
+            verification_data = _extract_verification_data(prembly_response)
 
-            # Handle different Prembly response structures
-            verification_data = prembly_data.get("data") or prembly_data.get("verification") or prembly_data
-
-        # Store verification result in cache for 10 minutes
-        cache_key = f"bvn_verification_{user.id}"
-        cache_data = {
-            "bvn": bvn,
-            "verification_data": verification_data,
-            "timestamp": datetime.now().isoformat()
-        }
-        cache.set(cache_key, cache_data, timeout=600)  # 10 minutes
-
-        logger.info(f"BVN verification successful for {user.email}, data cached")
-
-        # Transform Prembly's camelCase fields to snake_case for frontend
-        bvn_details = {
-            'first_name': verification_data.get('firstName') or verification_data.get('firstname') or verification_data.get('first_name'),
-            'last_name': verification_data.get('lastName') or verification_data.get('lastname') or verification_data.get('last_name'),
-            'middle_name': verification_data.get('middleName') or verification_data.get('middlename') or verification_data.get('middle_name'),
-            'date_of_birth': verification_data.get('dateOfBirth') or verification_data.get('birthdate') or verification_data.get('date_of_birth') or verification_data.get('dob'),
-            'phone_number': verification_data.get('phoneNumber') or verification_data.get('phone') or verification_data.get('phone_number'),
-            'email': verification_data.get('email'),
-            'gender': verification_data.get('gender'),
-            'state_of_residence': verification_data.get('stateOfResidence') or verification_data.get('state_of_residence') or verification_data.get('state'),
-            'enrollment_bank': verification_data.get('enrollmentBank') or verification_data.get('enrollment_bank'),
-            'watch_listed': verification_data.get('watchListed') or verification_data.get('watch_listed') or verification_data.get('watchlisted'),
-        }
-
-        # Return BVN details for user to review
-        return Response({
-            "success": True,
-            "data": {
-                "details": bvn_details,
-                "message": "BVN verified successfully"
-            }
-        }, status=status.HTTP_200_OK)
+        return Response(_bvn_verified_body(user, bvn, verification_data), status=status.HTTP_200_OK)
 
 
 class V2BVNConfirmView(APIView):
@@ -230,7 +259,7 @@ class V2BVNConfirmView(APIView):
                 # Store photo if available
                 photo_url = verification_data.get("photo") or verification_data.get("image")
                 if photo_url and not user.image:
-                    user.image = photo_url
+                    user.image = upload_kyc_photo(photo_url)
 
                 user.has_bvn = True
 
@@ -396,6 +425,92 @@ class V2BVNConfirmView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def _nin_verify_precheck(user, data):
+    """
+    Validate input and run the local checks that precede the Prembly call.
+
+    Returns:
+        tuple: (error_body, validated_data)
+    """
+    serializer = V2NINVerifySerializer(data=data)
+
+    if not serializer.is_valid():
+        return {
+            "success": False,
+            "error": {
+                "code": "VALIDATION_ERROR",
+                "message": "Invalid input data",
+                "data": serializer.errors
+            }
+        }, None
+
+    nin = serializer.validated_data['nin']
+
+    # Check if NIN is already verified for this user
+    if user.has_nin:
+        return {
+            "success": False,
+            "error": {
+                "code": "KYC_NIN_ALREADY_VERIFIED",
+                "message": "NIN has already been verified for this account"
+            }
+        }, None
+
+    # Check if NIN is used by another account
+    # Skip duplicate check in TEST_MODE for testing
+    if not settings.TEST_MODE:
+        if UserModel.objects.filter(nin=nin).exclude(id=user.id).exists():
+            return {
+                "success": False,
+                "error": {
+                    "code": "KYC_NIN_DUPLICATE",
+                    "message": "This NIN has already been used for another account"
+                }
+            }, None
+    else:
+        # In TEST_MODE, allow duplicate NINs but log a warning
+        if UserModel.objects.filter(nin=nin).exclude(id=user.id).exists():
+            logger.warning(f"TEST MODE: Allowing duplicate NIN {nin} for user {user.email}")
+
+    return None, serializer.validated_data
+
+
+def _nin_verified_body(user, nin, verification_data):
+    """Cache the verification result for the confirm step and build the review payload."""
+    # Store verification result in cache for 10 minutes
+    cache_key = f"nin_verification_{user.id}"
+    cache_data = {
+        "nin": nin,
+        "verification_data": verification_data,
+        "timestamp": datetime.now().isoformat()
+    }
+    cache.set(cache_key, cache_data, timeout=600)  # 10 minutes
+
+    logger.info(f"NIN verification successful for {user.email}, data cached")
+
+    # Transform Prembly's camelCase fields to snake_case for frontend
+    nin_details = {
+        'first_name': verification_data.get('firstName') or verification_data.get('firstname') or verification_data.get('first_name'),
+        'last_name': verification_data.get('lastName') or verification_data.get('lastname') or verification_data.get('last_name'),
+        'middle_name': verification_data.get('middleName') or verification_data.get('middlename') or verification_data.get('middle_name'),
+        'date_of_birth': verification_data.get('dateOfBirth') or verification_data.get('birthdate') or verification_data.get('date_of_birth') or verification_data.get('dob'),
+        'gender': verification_data.get('gender'),
+        'state_of_origin': verification_data.get('stateOfOrigin') or verification_data.get('state_of_origin') or verification_data.get('state'),
+        'lga': verification_data.get('lga') or verification_data.get('localGovernment') or verification_data.get('local_government'),
+        'address': verification_data.get('residentialAddress') or verification_data.get('address') or verification_data.get('residential_address'),
+        'phone': verification_data.get('phoneNumber') or verification_data.get('phone') or verification_data.get('phone_number'),
+    }
+
+    # Return NIN details for user to review
+    return {
+        "success": True,
+        "data": {
+            "details": nin_details,
+            "message": "NIN verified successfully"
+        }
+    }
+
+
 class V2NINVerifyView(APIView):
     """
     Step 1: Verify NIN with Prembly
@@ -405,104 +520,23 @@ class V2NINVerifyView(APIView):
 
     def post(self, request):
         user = request.user
-        serializer = V2NINVerifySerializer(data=request.data)
 
-        if not serializer.is_valid():
-            return Response({
-                "success": False,
-                "error": {
-                    "code": "VALIDATION_ERROR",
-                    "message": "Invalid input data",
-                    "data": serializer.errors
-                }
-            }, status=status.HTTP_400_BAD_REQUEST)
-
-        nin = serializer.validated_data['nin']
-        first_name = serializer.validated_data.get('first_name')
-        last_name = serializer.validated_data.get('last_name')
-        dob = serializer.validated_data.get('dob')
-
-        # Check if NIN is already verified for this user
-        if user.has_nin:
-            return Response({
-                "success": False,
-                "error": {
-                    "code": "KYC_NIN_ALREADY_VERIFIED",
-                    "message": "NIN has already been verified for this account"
-                }
-            }, status=status.HTTP_400_BAD_REQUEST)
+        error, data = _nin_verify_precheck(user, request.data)
+        if error:
+            return Response(error, status=status.HTTP_400_BAD_REQUEST)
 
-        # Check if NIN is used by another account
-        # Skip duplicate check in TEST_MODE for testing
-        if not settings.TEST_MODE:
-            if UserModel.objects.filter(nin=nin).exclude(id=user.id).exists():
-                return Response({
-                    "success": False,
-                    "error": {
-                        "code": "KYC_NIN_DUPLICATE",
-                        "message": "This NIN has already been used for another account"
-                    }
-                }, status=status.HTTP_400_BAD_REQUEST)
-        else:
-            # In TEST_MODE, allow duplicate NINs but log a warning
-            if UserModel.objects.filter(nin=nin).exclude(id=user.id).exists():
-                logger.warning(f"TEST MODE: Allowing duplicate NIN {nin} for user {user.email}")
+        nin = data['nin']
 
         # Call Prembly API to verify NIN
         logger.info(f"Verifying NIN for user {user.email} via Prembly")
-        prembly_response = verify_nin(nin, first_name, last_name, dob)
+        prembly_response = verify_nin(nin, data.get('first_name'), data.get('last_name'), data.get('dob'))
 
         if prembly_response.get("status") != "success":
-            error_message = prembly_response.get("message", "NIN verification failed")
-            logger.error(f"Prembly NIN verification failed for {user.email}: {error_message}")
+            logger.error(f"Prembly NIN verification failed for {user.email}: {prembly_response.get('message')}")
+            return Response(_kyc_provider_error("KYC_NIN_INVALID", prembly_response, "NIN verification failed"), status=status.HTTP_400_BAD_REQUEST)
 
-            return Response({
-                "success": False,
-                "error": {
-                    "code": "KYC_NIN_INVALID",
-                    "message": error_message,
-                    "data": prembly_response.get("details")
-                }
-            }, status=status.HTTP_400_BAD_REQUEST)
-
-        # Extract NIN data from Prembly response
-        prembly_data = prembly_response.get("data", {})
-
-        # Handle different Prembly response structures
-        verification_data = prembly_data.get("data") or prembly_data.get("verification") or prembly_data
-
-        # Store verification result in cache for 10 minutes
-        cache_key = f"nin_verification_{user.id}"
-        cache_data = {
-            "nin": nin,
-            "verification_data": verification_data,
-            "timestamp": datetime.now().isoformat()
-        }
-        cache.set(cache_key, cache_data, timeout=600)  # 10 minutes
-
-        logger.info(f"NIN verification successful for {user.email}, data cached")
-
-        # Transform Prembly's camelCase fields to snake_case for frontend
-        nin_details = {
-            'first_name': verification_data.get('firstName') or verification_data.get('firstname') or verification_data.get('first_name'),
-            'last_name': verification_data.get('lastName') or verification_data.get('lastname') or verification_data.get('last_name'),
-            'middle_name': verification_data.get('middleName') or verification_data.get('middlename') or verification_data.get('middle_name'),
-            'date_of_birth': verification_data.get('dateOfBirth') or verification_data.get('birthdate') or verification_data.get('date_of_birth') or verification_data.get('dob'),
-            'gender': verification_data.get('gender'),
-            'state_of_origin': verification_data.get('stateOfOrigin') or verification_data.get('state_of_origin') or verification_data.get('state'),
-            'lga': verification_data.get('lga') or verification_data.get('localGovernment') or verification_data.get('local_government'),
-            'address': verification_data.get('residentialAddress') or verification_data.get('address') or verification_data.get('residential_address'),
-            'phone': verification_data.get('phoneNumber') or verification_data.get('phone') or verification_data.get('phone_number'),
-        }
-
-        # Return NIN details for user to review
-        return Response({
-            "success": True,
-            "data": {
-                "details": nin_details,
-                "message": "NIN verified successfully"
-            }
-        }, status=status.HTTP_200_OK)
+        verification_data = _extract_verification_data(prembly_response)
+        return Response(_nin_verified_body(user, nin, verification_data), status=status.HTTP_200_OK)
 
 
 class V2NINConfirmView(APIView):
@@ -31,6 +31,9 @@ class CommunityGroupAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_stats()
+
     def member_count_display(self, obj):
         try:
             return obj.member_count
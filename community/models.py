@@ -2,7 +2,51 @@
 from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models import Sum
+from django.db.models import DecimalField, F, Func, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def _subquery_aggregate(queryset, function, field, output_field):
+    """SELECT <function>(<field>) over a correlated queryset, 0 when it matches no rows."""
+    aggregate = queryset.order_by().annotate(result=Func(F(field), function=function)).values('result')[:1]
+    return Coalesce(Subquery(aggregate, output_field=output_field), Value(0), output_field=output_field)
+
+
+def _active_savings(**filters):
+    from savings.models import SavingsGoalModel
+
+    return _subquery_aggregate(
+        SavingsGoalModel.objects.filter(status='active', **filters), 'SUM', 'amount',
+        DecimalField(max_digits=15, decimal_places=2),
+    )
+
+
+class CommunityGroupQuerySet(models.QuerySet):
+    def with_stats(self, user=None):
+        """
+        Annotate member_count and total_savings (and, given a user, that
+        user's active membership role) so listing groups doesn't run those
+        queries per group.
+        """
+        queryset = self.annotate(
+            active_member_count=_subquery_aggregate(
+                GroupMembership.objects.filter(group=OuterRef('pk'), is_active=True), 'COUNT', 'id', IntegerField(),
+            ),
+            savings_total=_active_savings(
+                user__group_memberships__group=OuterRef('pk'), user__group_memberships__is_active=True,
+            ),
+        )
+        if user is not None:
+            queryset = queryset.annotate(membership_role=Subquery(
+                GroupMembership.objects.filter(group=OuterRef('pk'), user=user, is_active=True).values('role')[:1]
+            ))
+        return queryset
+
+
+class GroupMembershipQuerySet(models.QuerySet):
+    def with_savings(self):
+        """Annotate user_savings for each membership."""
+        return self.annotate(savings_total=_active_savings(user=OuterRef('user_id')))
 
 
 class CommunityGroup(models.Model):
@@ -52,6 +96,8 @@ class CommunityGroup(models.Model):
 
     is_active = models.BooleanField(default=True, help_text="Whether the group is active.")
 
+    objects = CommunityGroupQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Community Group"
         verbose_name_plural = "Community Groups"
@@ -63,17 +109,21 @@ class CommunityGroup(models.Model):
     @property
     def member_count(self):
         """Returns the total number of members in the group."""
+        if hasattr(self, 'active_member_count'):
+            return self.active_member_count
         return self.memberships.filter(is_active=True).count()
 
     @property
     def total_savings(self):
         """Returns the total savings of all members in the group."""
+        if hasattr(self, 'savings_total'):
+            return self.savings_total
         from savings.models import SavingsGoalModel
         member_ids = self.memberships.filter(is_active=True).values_list('user_id', flat=True)
         total = SavingsGoalModel.objects.filter(
             user_id__in=member_ids,
             status='active'
-        ).aggregate(total=Sum('current_amount'))['total']
+        ).aggregate(total=Sum('amount'))['total']
         return total or 0
 
 
@@ -103,6 +153,8 @@ class GroupMembership(models.Model):
     joined_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True, help_text="Whether the membership is active.")
 
+    objects = GroupMembershipQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Group Membership"
         verbose_name_plural = "Group Memberships"
@@ -115,11 +167,13 @@ class GroupMembership(models.Model):
     @property
     def user_savings(self):
         """Returns the user's total savings."""
+        if hasattr(self, 'savings_total'):
+            return self.savings_total
         from savings.models import SavingsGoalModel
         total = SavingsGoalModel.objects.filter(
-            user=self.user,
+            user_id=self.user_id,
             status='active'
-        ).aggregate(total=Sum('current_amount'))['total']
+        ).aggregate(total=Sum('amount'))['total']
         return total or 0
 
 
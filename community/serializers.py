@@ -48,12 +48,16 @@ class CommunityGroupListSerializer(serializers.ModelSerializer):
         return None
 
     def get_is_member(self, obj):
+        if hasattr(obj, 'membership_role'):
+            return obj.membership_role is not None
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.memberships.filter(user=request.user, is_active=True).exists()
         return False
 
     def get_user_role(self, obj):
+        if hasattr(obj, 'membership_role'):
+            return obj.membership_role
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             membership = obj.memberships.filter(user=request.user, is_active=True).first()
@@ -88,12 +92,16 @@ class CommunityGroupDetailSerializer(serializers.ModelSerializer):
         return None
 
     def get_is_member(self, obj):
+        if hasattr(obj, 'membership_role'):
+            return obj.membership_role is not None
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.memberships.filter(user=request.user, is_active=True).exists()
         return False
 
     def get_user_role(self, obj):
+        if hasattr(obj, 'membership_role'):
+            return obj.membership_role
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             membership = obj.memberships.filter(user=request.user, is_active=True).first()
@@ -102,7 +110,10 @@ class CommunityGroupDetailSerializer(serializers.ModelSerializer):
         return None
 
     def get_admins(self, obj):
-        admin_memberships = obj.memberships.filter(role__in=['admin', 'moderator'], is_active=True)
+        # Filtered in Python so a prefetched memberships list is reused
+        admin_memberships = [
+            m for m in obj.memberships.all() if m.role in ('admin', 'moderator') and m.is_active
+        ]
         return [{
             'user_id': m.user.id,
             'user_name': f"{m.user.first_name} {m.user.last_name}".strip() or m.user.email,
@@ -1,3 +1,70 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from account.models import UserModel
+from community.models import CommunityGroup, GroupMembership
+from core.testing import QueryBudgetMixin
+from savings.models import SavingsGoalModel
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CommunityGroupQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserModel.objects.create_user(email='member@example.com', password='pass1234')
+        self.auth = f'Bearer {AccessToken.for_user(self.user)}'
+        self.members = [
+            UserModel.objects.create_user(
+                email=f'member{i}@example.com', password='pass1234', first_name=f'M{i}', last_name='Saver',
+            )
+            for i in range(6)
+        ]
+        for member in self.members:
+            SavingsGoalModel.objects.create(user=member, name='Nest', target_amount=5000, amount=Decimal('100.00'))
+        self.groups = [
+            CommunityGroup.objects.create(name=f'Group {i}', description='Savers', created_by=self.members[0])
+            for i in range(6)
+        ]
+        for group in self.groups:
+            for member in self.members:
+                role = 'admin' if member == self.members[0] else 'member'
+                GroupMembership.objects.create(group=group, user=member, role=role)
+        GroupMembership.objects.create(group=self.groups[0], user=self.user, role='moderator')
+        # Warm the auth user cache so the budgets below count the view alone
+        self.client.get('/api/v2/community/groups', HTTP_AUTHORIZATION=self.auth)
+
+    def test_group_list(self):
+        with self.assertQueryBudget(4):
+            response = self.client.get('/api/v2/community/groups', HTTP_AUTHORIZATION=self.auth)
+
+        self.assertEqual(response.status_code, 200)
+        groups = {group['id']: group for group in response.json()['data']}
+        self.assertEqual(len(groups), 6)
+        first, other = groups[self.groups[0].id], groups[self.groups[1].id]
+        self.assertEqual((first['member_count'], first['is_member'], first['user_role']), (7, True, 'moderator'))
+        self.assertEqual((other['member_count'], other['is_member'], other['user_role']), (6, False, None))
+        self.assertEqual(Decimal(str(first['total_savings'])), Decimal('600.00'))
+        self.assertEqual(first['created_by_name'], 'M0 Saver')
+
+    def test_group_detail(self):
+        with self.assertQueryBudget(6):
+            response = self.client.get(f'/api/v2/community/groups/{self.groups[0].id}', HTTP_AUTHORIZATION=self.auth)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['data']
+        self.assertEqual(len(data['members']), 7)
+        self.assertEqual(Decimal(str(data['members'][-1]['user_savings'])), Decimal('100.00'))
+        self.assertEqual(data['member_count'], 7)
+        self.assertEqual({admin['role'] for admin in data['admins']}, {'admin', 'moderator'})
+
+    def test_group_admin_changelist(self):
+        admin = UserModel.objects.create_superuser(email='admin@example.com', password='pass1234')
+        self.client.force_login(admin)
+
+        response = self.client.get('/internal-admin/community/communitygroup/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '₦600.00')
@@ -6,7 +6,7 @@ from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Prefetch, Q
 
 from core.helpers.response import success_response, validation_error_response, error_response
 from .models import (
@@ -55,7 +55,7 @@ class CommunityGroupListCreateAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
-        groups = CommunityGroup.objects.filter(is_active=True)
+        groups = CommunityGroup.objects.filter(is_active=True).with_stats(request.user).select_related('created_by')
 
         # Filter by category
         category = request.query_params.get('category')
@@ -100,8 +100,8 @@ class CommunityGroupDetailAPIView(APIView):
     """
     permission_classes = [IsAuthenticated]
 
-    def get_object(self, pk, request):
-        group = get_object_or_404(CommunityGroup, pk=pk, is_active=True)
+    def get_object(self, pk, request, queryset=CommunityGroup.objects):
+        group = get_object_or_404(queryset, pk=pk, is_active=True)
 
         # Check if user can view private groups
         if group.privacy == 'private':
@@ -111,7 +111,10 @@ class CommunityGroupDetailAPIView(APIView):
         return group
 
     def get(self, request, pk, *args, **kwargs):
-        group = self.get_object(pk, request)
+        queryset = CommunityGroup.objects.with_stats(request.user).select_related('created_by').prefetch_related(
+            Prefetch('memberships', queryset=GroupMembership.objects.select_related('user').with_savings()),
+        )
+        group = self.get_object(pk, request, queryset)
         if not group:
             return error_response(message="Group not found or you don't have access.", status_code=status.HTTP_404_NOT_FOUND)
 
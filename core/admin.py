@@ -4,7 +4,7 @@ from django.utils.html import format_html
 from django.db.models import Count, Q
 from django.utils import timezone
 from datetime import timedelta
-from .models import ServerLog
+from .models import IdempotencyRecord, ServerLog, SlowRequestSample
 
 
 # Update admin site branding
@@ -172,4 +172,43 @@ class ServerLogAdmin(admin.ModelAdmin):
             'level_counts': {item['level']: item['count'] for item in level_counts},
         }
 
-        return super().changelist_view(request, extra_context=extra_context)
\ No newline at end of file
+        return super().changelist_view(request, extra_context=extra_context)
+
+
+@admin.register(IdempotencyRecord)
+class IdempotencyRecordAdmin(admin.ModelAdmin):
+    """
+    Read-only view of persisted idempotent responses, for support to check
+    whether a retried transfer or withdrawal was executed once.
+    """
+    list_display = ('created_at', 'route_name', 'user_id', 'idempotency_key', 'response_status', 'expires_at')
+    list_filter = ('route_name', 'response_status')
+    search_fields = ('user_id', 'idempotency_key')
+    readonly_fields = ('user_id', 'route_name', 'idempotency_key', 'request_fingerprint',
+                       'response_status', 'response_content_type', 'created_at', 'expires_at')
+    exclude = ('response_body',)
+    ordering = ('-created_at',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(SlowRequestSample)
+class SlowRequestSampleAdmin(admin.ModelAdmin):
+    """Sampled slow requests with the EXPLAIN plans of their slowest queries."""
+    list_display = ('created_at', 'method', 'view_name', 'status_code', 'duration_ms', 'query_count', 'db_time_ms')
+    list_filter = ('view_name', 'method')
+    search_fields = ('view_name', 'path')
+    readonly_fields = ('view_name', 'path', 'method', 'status_code', 'duration_ms',
+                       'query_count', 'db_time_ms', 'queries', 'created_at')
+    ordering = ('-created_at',)
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from .metrics import install_query_instrumentation
+        from .query_budget import install_query_tracking
+
+        connection_created.connect(install_query_instrumentation, dispatch_uid='core.metrics.query_instrumentation')
+        connection_created.connect(install_query_tracking, dispatch_uid='core.query_budget.query_tracking')
@@ -0,0 +1,16 @@
+"""
+Benchmark suite for the money-movement hot paths.
+
+- dataset.py    seeds a reproducible dataset of benchmark users (wallets,
+                transaction history, goals, community groups and posts,
+                payment links) and removes it again
+- scenarios.py  the requests benchmarked: webhook deposits, withdrawals,
+                goal funding, dashboard, /transactions, community feed and
+                public payment-link pages
+- stubs.py      in-process provider stubs, so nothing leaves the machine
+- runner.py     runs scenarios through the full middleware stack and reports
+                throughput, latency percentiles and queries per request, and
+                compares results with a saved baseline
+
+Driven by the seed_benchmark_data and benchmark management commands.
+"""
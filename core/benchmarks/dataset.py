@@ -0,0 +1,230 @@
+"""
+Reproducible benchmark dataset.
+
+Benchmark users are numbered (bench0000042@bench.gidinest.invalid) and every
+row derived from a user - wallet, account numbers, goals, memberships,
+payment-link token - is a function of that number, so scenarios can address
+any user without extra lookups and two machines seeded with the same
+arguments hold the same data. Seeding is additive: seeding 100k users on top
+of an existing 10k only creates the missing 90k.
+
+Rows are written with bulk_create in batches, which skips model signals (no
+welcome notifications, no provider wallet creation); the shapes are the ones
+the hot paths read.
+"""
+import random
+import uuid
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+BENCH_EMAIL_DOMAIN = 'bench.gidinest.invalid'
+BENCH_GROUP_PREFIX = 'Bench group'
+BENCH_PASSWORD = 'bench-password'
+BENCH_PIN = '1234'
+BENCH_WALLET_BALANCE = Decimal('10000000.00')
+
+GROUP_SIZE = 1000       # users per community group
+POST_EVERY = 20         # every Nth user has an approved post in their group
+LINK_EVERY = 10         # every Nth user has a wallet payment link
+
+
+def email_for(index):
+    return f'bench{index:07d}@{BENCH_EMAIL_DOMAIN}'
+
+
+def account_number_for(index):
+    """Embedly (v1) virtual account number."""
+    return f'8{index:09d}'
+
+
+def psb9_account_number_for(index):
+    return f'7{index:09d}'
+
+
+def link_token_for(index):
+    return f'bench-{index:07d}'
+
+
+def group_name_for(index):
+    return f'{BENCH_GROUP_PREFIX} {index // GROUP_SIZE:04d}'
+
+
+def bench_users():
+    from account.models.users import UserModel
+
+    return UserModel.objects.filter(email__endswith=f'@{BENCH_EMAIL_DOMAIN}')
+
+
+def seeded_count():
+    return bench_users().count()
+
+
+def seed(users, transactions_per_user=10, goals_per_user=2, batch_size=2000, seed_value=42, progress=None):
+    """
+    Grow the benchmark dataset to `users` users. Returns the number created.
+
+    `progress`, if given, is called with the number of users seeded so far
+    after each batch.
+    """
+    start = seeded_count()
+    if start >= users:
+        return 0
+
+    # Hashing is deliberately slow; every benchmark user shares one hash
+    hashes = {'password': make_password(BENCH_PASSWORD), 'pin': make_password(BENCH_PIN)}
+    for batch_start in range(start, users, batch_size):
+        batch_end = min(batch_start + batch_size, users)
+        rng = random.Random(f'{seed_value}:{batch_start}')
+        with transaction.atomic():
+            _seed_batch(range(batch_start, batch_end), rng, hashes, transactions_per_user, goals_per_user)
+        if progress:
+            progress(batch_end)
+    return users - start
+
+
+def _seed_batch(indexes, rng, hashes, transactions_per_user, goals_per_user):
+    from account.models.users import UserModel
+    from community.models import CommunityGroup, CommunityPost, GroupMembership
+    from savings.models import SavingsGoalModel
+    from wallet.models import PaymentLink, Wallet, WalletTransaction
+
+    users = UserModel.objects.bulk_create([
+        UserModel(
+            id=uuid.UUID(int=rng.getrandbits(128), version=4),
+            email=email_for(index),
+            username=f'bench{index:07d}',
+            first_name='Bench',
+            last_name=f'User{index}',
+            phone=f'+23480{index:08d}',
+            password=hashes['password'],
+            transaction_pin=hashes['pin'],
+            transaction_pin_set=True,
+            is_verified=True,
+            email_verified=True,
+            has_virtual_wallet=True,
+        )
+        for index in indexes
+    ])
+
+    wallets = Wallet.objects.bulk_create([
+        Wallet(
+            user=user,
+            balance=BENCH_WALLET_BALANCE,
+            account_number=account_number_for(index),
+            psb9_account_number=psb9_account_number_for(index),
+            account_name=f'Bench User{index}',
+        )
+        for index, user in zip(indexes, users)
+    ])
+
+    WalletTransaction.objects.bulk_create([
+        WalletTransaction(
+            wallet=wallet,
+            transaction_type='credit' if n % 3 else 'debit',
+            amount=Decimal(rng.randint(100, 500000)),
+            description='Benchmark history',
+            external_reference=f'BENCH-SEED-{index}-{n}',
+        )
+        for index, wallet in zip(indexes, wallets)
+        for n in range(transactions_per_user)
+    ], batch_size=5000)
+
+    SavingsGoalModel.objects.bulk_create([
+        SavingsGoalModel(
+            user=user,
+            name=f'Bench goal {n}',
+            amount=Decimal(rng.randint(0, 200000)),
+            target_amount=Decimal(rng.randint(200000, 2000000)),
+        )
+        for user in users
+        for n in range(goals_per_user)
+    ], batch_size=5000)
+
+    group_names = sorted({group_name_for(index) for index in indexes})
+    groups = {group.name: group for group in CommunityGroup.objects.filter(name__in=group_names)}
+    missing = [name for name in group_names if name not in groups]
+    if missing:
+        for group in CommunityGroup.objects.bulk_create([
+            CommunityGroup(name=name, description='Benchmark community group') for name in missing
+        ]):
+            groups[group.name] = group
+
+    GroupMembership.objects.bulk_create([
+        GroupMembership(group=groups[group_name_for(index)], user=user)
+        for index, user in zip(indexes, users)
+    ])
+    CommunityPost.objects.bulk_create([
+        CommunityPost(
+            group=groups[group_name_for(index)],
+            author=user,
+            title=f'Bench post {index}',
+            content='Benchmark community post. ' * rng.randint(1, 20),
+            status='approved',
+        )
+        for index, user in zip(indexes, users)
+        if index % POST_EVERY == 0
+    ])
+    PaymentLink.objects.bulk_create([
+        PaymentLink(
+            user=user,
+            token=link_token_for(index),
+            link_type='wallet',
+            description='Benchmark payment link',
+        )
+        for index, user in zip(indexes, users)
+        if index % LINK_EVERY == 0
+    ])
+
+
+def clear(batch_size=2000, progress=None):
+    """Delete every benchmark user (and, by cascade, their rows). Returns the count."""
+    from community.models import CommunityGroup
+
+    CommunityGroup.objects.filter(name__startswith=BENCH_GROUP_PREFIX).delete()
+    deleted = 0
+    while True:
+        ids = list(bench_users().values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            bench_users().filter(id__in=ids).delete()
+        deleted += len(ids)
+        if progress:
+            progress(deleted)
+
+
+def sample_actors(count, seed_value=42):
+    """
+    `count` benchmark users spread across the dataset, each as a dict with
+    everything a scenario needs (user, account numbers, a goal, a payment-link
+    token from a nearby user).
+    """
+    from savings.models import SavingsGoalModel
+
+    total = seeded_count()
+    if not total:
+        return []
+    rng = random.Random(seed_value)
+    indexes = sorted(rng.sample(range(total), min(count, total)))
+    users = {user.email: user for user in bench_users().filter(email__in=[email_for(i) for i in indexes])}
+
+    goals = {}
+    for user_id, goal_id in SavingsGoalModel.objects.filter(user__in=users.values()).values_list('user_id', 'id'):
+        goals.setdefault(user_id, goal_id)
+
+    actors = []
+    for index in indexes:
+        user = users.get(email_for(index))
+        if user is None:
+            continue
+        actors.append({
+            'index': index,
+            'user': user,
+            'account_number': account_number_for(index),
+            'psb9_account_number': psb9_account_number_for(index),
+            'goal_id': goals.get(user.id),
+            'link_token': link_token_for(index - index % LINK_EVERY),
+        })
+    return actors
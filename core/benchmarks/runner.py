@@ -0,0 +1,166 @@
+"""
+Runs benchmark scenarios and compares results with a baseline.
+
+Requests go through Django's test client, i.e. the full middleware stack,
+authentication, views and the real database and Redis, but no network or
+gunicorn in front; the numbers isolate application cost and are comparable
+across commits on the same machine. Use the loadtest command for
+end-to-end measurements against a running server.
+"""
+import itertools
+import json
+import statistics
+import subprocess
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.db import connections
+from django.test import Client
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import query_budget
+
+# Metrics compared with the baseline: name -> True if higher is better
+COMPARED = {
+    'throughput': True,
+    'p50_ms': False,
+    'p99_ms': False,
+    'queries_max': False,
+}
+
+
+def _percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def _auth_headers(actors):
+    return {actor['index']: f"Bearer {AccessToken.for_user(actor['user'])}" for actor in actors}
+
+
+def run_scenario(scenario, actors, requests=200, concurrency=4, warmup=10):
+    """
+    Issue `requests` requests (after `warmup` unmeasured ones) from
+    `concurrency` threads, cycling through the actors. Returns a result dict.
+    """
+    tokens = _auth_headers(actors) if scenario.authenticated else {}
+    run_id = uuid.uuid4().hex[:8]
+    sequence = itertools.count()
+    lock = threading.Lock()
+    latencies, query_counts, statuses = [], [], Counter()
+
+    def issue(client, measure):
+        n = next(sequence)
+        actor = actors[n % len(actors)]
+        request = scenario.build(actor, f'BENCH-{run_id}-{n}')
+        extra = {f"HTTP_{name.upper().replace('-', '_')}": value for name, value in request.headers.items()}
+        if scenario.authenticated:
+            extra['HTTP_AUTHORIZATION'] = tokens[actor['index']]
+
+        with query_budget.tracking() as tracker:
+            started = time.perf_counter()
+            response = client.generic(
+                request.method, request.path, request.body, content_type='application/json', **extra,
+            )
+            elapsed = (time.perf_counter() - started) * 1000
+        if measure:
+            with lock:
+                latencies.append(elapsed)
+                query_counts.append(tracker.count)
+                statuses[response.status_code] += 1
+
+    def worker(count, measure):
+        client = Client(raise_request_exception=False)
+        try:
+            for _ in range(count):
+                issue(client, measure)
+        finally:
+            connections.close_all()
+
+    def run_threads(total, measure):
+        shares = [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+        threads = [threading.Thread(target=worker, args=(share, measure)) for share in shares if share]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    run_threads(warmup, measure=False)
+    started = time.perf_counter()
+    run_threads(requests, measure=True)
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    query_counts.sort()
+    errors = sum(count for code, count in statuses.items() if code >= 400)
+    return {
+        'description': scenario.description,
+        'requests': len(latencies),
+        'errors': errors,
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+        'throughput': round(len(latencies) / wall, 1) if wall else 0.0,
+        'p50_ms': round(statistics.median(latencies), 2) if latencies else 0.0,
+        'p95_ms': round(_percentile(latencies, 0.95), 2) if latencies else 0.0,
+        'p99_ms': round(_percentile(latencies, 0.99), 2) if latencies else 0.0,
+        'queries_p50': statistics.median(query_counts) if query_counts else 0,
+        'queries_max': query_counts[-1] if query_counts else 0,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def build_report(results, options):
+    return {
+        'meta': {
+            'revision': git_revision(),
+            'recorded_at': timezone.now().isoformat(),
+            **options,
+        },
+        'scenarios': results,
+    }
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_report(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def compare(report, baseline, tolerance=0.2):
+    """
+    Differences between two reports' scenarios, as (scenario, metric, old,
+    new, change, regressed) rows. Throughput and latency regress when they
+    move more than `tolerance` the wrong way; any extra query is a regression.
+    """
+    rows = []
+    for name, result in report['scenarios'].items():
+        old_result = baseline.get('scenarios', {}).get(name)
+        if not old_result:
+            continue
+        for metric, higher_is_better in COMPARED.items():
+            old, new = old_result.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            if metric == 'queries_max':
+                regressed = new > old
+            elif higher_is_better:
+                regressed = change < -tolerance
+            else:
+                regressed = change > tolerance
+            rows.append((name, metric, old, new, change, regressed))
+    return rows
@@ -0,0 +1,92 @@
+"""
+Benchmarked requests.
+
+Each scenario turns an actor (a seeded benchmark user, see
+dataset.sample_actors) and a sequence number into one request. Webhooks are
+built by providers/simulator/webhooks.py and signed with the secret the
+benchmark command installs for the run; every deposit or withdrawal
+reference is unique per run so nothing is rejected as a duplicate.
+"""
+import json
+from dataclasses import dataclass, field
+
+from core.benchmarks.dataset import BENCH_PIN
+from providers.simulator import webhooks
+
+BENCH_WEBHOOK_SECRET = 'bench-webhook-secret'
+
+
+@dataclass
+class BenchRequest:
+    method: str
+    path: str
+    body: bytes = b''
+    headers: dict = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    description: str
+    build: object           # (actor, reference) -> BenchRequest
+    authenticated: bool = True
+
+
+def _json(payload):
+    return json.dumps(payload).encode()
+
+
+def embedly_webhook(actor, reference):
+    path, body, headers = webhooks.embedly_deposit(actor['account_number'], 5000, reference)
+    return BenchRequest('POST', path, body, headers)
+
+
+def psb9_webhook(actor, reference):
+    path, body, headers = webhooks.psb9_deposit(actor['psb9_account_number'], 5000, reference)
+    return BenchRequest('POST', path, body, headers)
+
+
+def withdrawal(actor, reference):
+    return BenchRequest('POST', '/api/v2/wallet/withdraw', _json({
+        'amount': 100,
+        'bank_name': 'Bench Bank',
+        'account_number': '0000000000',
+        'account_name': 'Bench User',
+        'bank_code': '999',
+        'transaction_pin': BENCH_PIN,
+    }))
+
+
+def goal_fund(actor, reference):
+    return BenchRequest('POST', f"/api/v2/savings/goals/{actor['goal_id']}/fund", _json({
+        'amount': 100,
+        'description': 'Benchmark funding',
+    }))
+
+
+def dashboard(actor, reference):
+    return BenchRequest('GET', '/api/v2/dashboard/')
+
+
+def transactions(actor, reference):
+    return BenchRequest('GET', '/api/v2/transactions/?page_size=20')
+
+
+def community_feed(actor, reference):
+    return BenchRequest('GET', '/api/v2/community/posts?my_groups=true')
+
+
+def payment_link_page(actor, reference):
+    return BenchRequest('GET', f"/api/v2/wallet/payment-links/{actor['link_token']}/")
+
+
+SCENARIOS = {scenario.name: scenario for scenario in [
+    Scenario('embedly_webhook', 'Embedly NIP deposit webhook', embedly_webhook, authenticated=False),
+    Scenario('psb9_webhook', '9PSB transfer.credit deposit webhook', psb9_webhook, authenticated=False),
+    Scenario('withdrawal', 'Wallet withdrawal request (PIN check, limits, debit)', withdrawal),
+    Scenario('goal_fund', 'Fund a savings goal from the wallet', goal_fund),
+    Scenario('dashboard', 'Mobile dashboard', dashboard),
+    Scenario('transactions', 'Transaction history, first page', transactions),
+    Scenario('community_feed', "Posts from the user's groups", community_feed),
+    Scenario('payment_link_page', 'Public payment-link page', payment_link_page, authenticated=False),
+]}
@@ -0,0 +1,61 @@
+"""
+In-process provider stubs for benchmarks.
+
+Every outbound HTTP call made while stub_providers() is active - requests
+(provider_request, and anything else using requests) and httpx
+(async_provider_request) - is answered locally after a fixed latency with a
+generic success envelope, so the pipeline runs end to end without touching a
+live provider or real money.
+"""
+import asyncio
+import json
+import time
+from contextlib import contextmanager
+from unittest import mock
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+
+STUB_BODY = {
+    'status': 'success',
+    'success': True,
+    'code': '00',
+    'responseCode': '00',
+    'message': 'Stubbed by the benchmark suite',
+    'data': {},
+}
+
+# Hosts whose clients only accept a different success status
+STUB_STATUS = {'api.zeptomail.com': 201}
+
+
+def _status_for(url):
+    return STUB_STATUS.get(urlsplit(str(url)).hostname, 200)
+
+
+def _requests_response(method, url):
+    response = requests.Response()
+    response.status_code = _status_for(url)
+    response.url = url
+    response.headers['Content-Type'] = 'application/json'
+    response._content = json.dumps(STUB_BODY).encode()
+    response.request = requests.Request(method, url).prepare()
+    return response
+
+
+@contextmanager
+def stub_providers(latency=0.05):
+    """Answer every outbound HTTP call locally after `latency` seconds."""
+
+    def fake_request(session, method, url, *args, **kwargs):
+        time.sleep(latency)
+        return _requests_response(method, url)
+
+    async def fake_send(client, request, *args, **kwargs):
+        await asyncio.sleep(latency)
+        return httpx.Response(_status_for(request.url), json=STUB_BODY, request=request)
+
+    with mock.patch.object(requests.Session, 'request', fake_request), \
+            mock.patch.object(httpx.AsyncClient, 'send', fake_send):
+        yield
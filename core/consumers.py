@@ -0,0 +1,91 @@
+"""
+WebSocket consumer for the per-user real-time event stream.
+
+Clients connect to /ws/v2/events/ with their access token, either as an
+`Authorization: Bearer <token>` header or a `?token=<token>` query parameter
+(for clients that can't set headers on the upgrade request). Each message is
+{"event": <name>, "data": {...}}; see core/helpers/realtime.py for publishing.
+
+Events:
+    wallet.transaction     a wallet credit/debit was recorded (includes the new balance)
+    withdrawal.updated     a withdrawal request changed status
+    notification.created   a new in-app notification
+    goal.milestone         a savings goal crossed 25/50/75/100%
+
+The stream carries no history: on (re)connect clients should refetch the
+dashboard once, then rely on events.
+"""
+import logging
+import time
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from rest_framework.exceptions import AuthenticationFailed
+
+from account.authentication import GidiJWTAuthentication
+from core.helpers.realtime import user_group
+
+logger = logging.getLogger(__name__)
+
+# Close codes in the 4000-4999 application range
+CLOSE_UNAUTHENTICATED = 4401
+
+
+class UserEventsConsumer(AsyncJsonWebsocketConsumer):
+
+    async def connect(self):
+        self.group = None
+        user, token = await self._authenticate()
+        if user is None:
+            await self.close(code=CLOSE_UNAUTHENTICATED)
+            return
+
+        self.user_id = user.pk
+        self.expires_at = token.get('exp')
+        self.group = user_group(user.pk)
+        await self.channel_layer.group_add(self.group, self.channel_name)
+        await self.accept()
+        await self.send_json({'event': 'connected', 'data': {}})
+
+    async def disconnect(self, code):
+        if self.group:
+            await self.channel_layer.group_discard(self.group, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        # The stream is server-to-client; only answer keepalive pings
+        if isinstance(content, dict) and content.get('type') == 'ping':
+            await self.send_json({'event': 'pong', 'data': {}})
+
+    async def user_event(self, message):
+        if self.expires_at and time.time() > self.expires_at:
+            # The access token has expired; the client reconnects with a fresh one
+            await self.close(code=CLOSE_UNAUTHENTICATED)
+            return
+        await self.send_json({'event': message['event'], 'data': message['data']})
+
+    def _raw_token(self):
+        headers = dict(self.scope.get('headers', []))
+        header = headers.get(b'authorization')
+        if header:
+            parts = header.split()
+            if len(parts) == 2 and parts[0].lower() == b'bearer':
+                return parts[1]
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        token = query.get('token', [None])[0]
+        return token.encode() if token else None
+
+    @database_sync_to_async
+    def _authenticate(self):
+        raw_token = self._raw_token()
+        if raw_token is None:
+            return None, None
+        authentication = GidiJWTAuthentication()
+        try:
+            token = authentication.get_validated_token(raw_token)
+            return authentication.get_user(token), token
+        except AuthenticationFailed:
+            return None, None
+        except Exception:
+            logger.exception("Failed to authenticate event stream connection")
+            return None, None
@@ -0,0 +1,57 @@
+"""
+Helpers for native async (ASGI) API views.
+
+DRF's APIView is sync-only, so provider-bound endpoints that should not hold
+a worker while waiting on a bank or KYC provider are written as plain async
+Django views. `async_api_view` gives them the same JWT authentication and
+JSON error shape as the DRF views they replace.
+"""
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+
+from account.authentication import GidiJWTAuthentication
+
+
+def async_api_view(methods):
+    """
+    Decorate an async view: restrict HTTP methods, authenticate the bearer
+    token (sets request.user / request.auth) and exempt it from CSRF like DRF.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                result = await sync_to_async(GidiJWTAuthentication().authenticate)(request)
+            except AuthenticationFailed as e:
+                detail = e.detail if isinstance(e.detail, dict) else {'detail': e.detail}
+                return JsonResponse(detail, status=status.HTTP_401_UNAUTHORIZED)
+
+            if result is None:
+                return JsonResponse(
+                    {'detail': 'Authentication credentials were not provided.'},
+                    status=status.HTTP_401_UNAUTHORIZED,
+                )
+
+            request.user, request.auth = result
+            return await view(request, *args, **kwargs)
+
+        return csrf_exempt(require_http_methods(methods)(wrapper))
+    return decorator
+
+
+def json_body(request):
+    """Parse a JSON request body (the async equivalent of request.data)."""
+    if not request.body:
+        return {}
+    try:
+        data = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
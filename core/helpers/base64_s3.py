@@ -5,6 +5,9 @@ import six
 import uuid
 import imghdr
 import io
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 def get_file_extension(file_name, decoded_file):
@@ -56,4 +59,54 @@ def upload_base64_file(base64_file, folder_name="profile"):
         file_path
     )
     
-    return f"https://{bucket_name}.s3.amazonaws.com/{file_path}"
\ No newline at end of file
+    return f"https://{bucket_name}.s3.amazonaws.com/{file_path}"
+
+# KYC photos are stored as s3://<bucket>/<key> references to private objects
+# and served through short-lived presigned URLs (kyc_photo_url)
+KYC_PHOTO_SCHEME = "s3://"
+KYC_PHOTO_URL_TTL = 15 * 60
+
+
+def _kyc_bucket():
+    # A bucket without public access; defaults to the media bucket, whose kyc/
+    # prefix must then not be public
+    return config('AWS_KYC_BUCKET_NAME', default=None) or config('AWS_STORAGE_BUCKET_NAME')
+
+
+def upload_kyc_photo(photo):
+    """
+    Move a BVN/NIN photo payload out of the users table and into private object storage.
+
+    Returns an s3:// reference on success. URLs and references are returned unchanged,
+    and if the upload fails the original payload is returned so no identity data is lost.
+    """
+    if not photo or str(photo).startswith(("http://", "https://", KYC_PHOTO_SCHEME)):
+        return photo
+
+    try:
+        bucket_name = _kyc_bucket()
+        file, file_name = decode_base64_file(photo)
+        file_path = f"kyc/{file_name}"
+        boto3.client('s3').upload_fileobj(file, bucket_name, file_path, ExtraArgs={'ServerSideEncryption': 'AES256'})
+        return f"{KYC_PHOTO_SCHEME}{bucket_name}/{file_path}"
+    except Exception:
+        logger.exception("Failed to upload KYC photo to S3; storing inline payload")
+        return photo
+
+
+def kyc_photo_url(image, expires_in=KYC_PHOTO_URL_TTL):
+    """
+    A presigned URL for an s3:// KYC photo reference, valid for `expires_in`
+    seconds. Other values (profile picture URLs, empty) are returned unchanged.
+    """
+    if not image or not str(image).startswith(KYC_PHOTO_SCHEME):
+        return image
+
+    bucket_name, _, file_path = image[len(KYC_PHOTO_SCHEME):].partition('/')
+    try:
+        return boto3.client('s3').generate_presigned_url(
+            'get_object', Params={'Bucket': bucket_name, 'Key': file_path}, ExpiresIn=expires_in,
+        )
+    except Exception:
+        logger.exception("Failed to presign KYC photo URL")
+        return None
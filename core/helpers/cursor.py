@@ -0,0 +1,39 @@
+"""
+Opaque keyset-pagination cursors.
+
+A cursor encodes the (timestamp, pk) of the last row on a page; the next page
+is everything strictly before it in (-timestamp, -pk) order. Unlike page
+numbers this needs no COUNT and stays stable while new rows are inserted.
+"""
+import base64
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(timestamp, pk):
+    value = f"{timestamp.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Returns:
+        tuple: (datetime, pk string)
+
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    try:
+        timestamp_part, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    timestamp = parse_datetime(timestamp_part)
+    if timestamp is None or not pk:
+        raise ValueError("Invalid cursor")
+    return timestamp, pk
+
+
+def before_cursor_q(timestamp_field, timestamp, pk):
+    """Filter for rows after the cursor in (-timestamp_field, -id) order."""
+    return Q(**{f'{timestamp_field}__lt': timestamp}) | Q(**{timestamp_field: timestamp, 'id__lt': pk})
@@ -0,0 +1,59 @@
+"""
+Publishing to the per-user real-time event stream.
+
+Every authenticated WebSocket connection (core/consumers.py) joins its user's
+channel group; publish_user_event() sends an event to all of that user's
+open connections through the Redis channel layer. Clients use the events to
+update balances, withdrawal status and the notification badge instead of
+polling the REST endpoints.
+
+Events are sent after the surrounding transaction commits, and publishing
+never raises: a missed event only means the client refetches later.
+"""
+import json
+import logging
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def realtime_enabled():
+    return getattr(settings, 'REALTIME_EVENTS', False)
+
+
+def user_group(user_id):
+    return f"user_events.{user_id}"
+
+
+def send_user_event(user_id, event, data):
+    """Send `event` to the user's open connections now. Never raises."""
+    from channels.layers import get_channel_layer
+
+    if not realtime_enabled() or user_id is None:
+        return
+    try:
+        layer = get_channel_layer()
+        if layer is None:
+            return
+        async_to_sync(layer.group_send)(user_group(user_id), {
+            'type': 'user.event',
+            'event': event,
+            'data': json.loads(json.dumps(data, cls=DjangoJSONEncoder)),
+        })
+    except Exception as e:
+        logger.warning(f"Failed to publish {event} event for user {user_id}: {e}")
+
+
+def publish_user_event(user_id, event, data):
+    """
+    Send `event` with a `data` dict (Decimals, datetimes and UUIDs are
+    converted to JSON types) to the user's open connections once the current
+    transaction commits.
+    """
+    if not realtime_enabled() or user_id is None:
+        return
+    transaction.on_commit(lambda: send_user_event(user_id, event, data))
@@ -0,0 +1,256 @@
+"""
+Idempotency-Key support for financial POST endpoints.
+
+A client retrying a debit, transfer or withdrawal sends the same
+Idempotency-Key header; the request is executed once and every retry gets
+the stored response. IdempotencyKeyMiddleware (core/middleware.py) drives
+the flow below; this module holds the registry and the store.
+
+1. The route is looked up by URL name in IDEMPOTENT_ROUTES.
+2. An "in progress" entry is reserved with an atomic cache add (SET NX) and a
+   lease longer than the worker timeout, so only one request per key runs.
+3. A duplicate that arrives while the first is running waits up to
+   IDEMPOTENCY_WAIT_SECONDS for it to finish and replays its response, or
+   gets a 409 with Retry-After.
+4. A 2xx response is stored byte for byte (status, content type, body) and
+   replayed to later retries; other responses release the reservation so the
+   client can retry.
+5. Routes registered with persist=True also store the response in
+   IdempotencyRecord, which survives cache eviction until
+   IDEMPOTENCY_RECORD_TTL.
+
+Keys are scoped per user and route, and tied to a fingerprint of the request
+path and body: reusing a key for a different body, or for the same body on
+a different resource of the route (another goal id), is rejected with a 422.
+"""
+import hashlib
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+from rest_framework import status
+from rest_framework_simplejwt.settings import api_settings
+
+from core.helpers.response import error_response
+
+logger = logging.getLogger(__name__)
+
+# URL name -> whether completed responses are also persisted to the database
+IDEMPOTENT_ROUTES = {
+    'wallet-debit': True,               # /api/v2/wallet/9psb/debit
+    'wallet-credit': True,              # /api/v2/wallet/9psb/credit
+    'other-banks-transfer': True,       # /api/v2/wallet/9psb/transfer/banks
+    'v2-wallet-withdraw': True,         # /api/v2/wallet/withdraw
+    'wallet_withdraw_request': True,    # /api/v1/wallet/withdraw/request
+    'v2-goal-fund': False,              # /api/v2/savings/goals/<id>/fund
+    'v2-goal-withdraw': False,          # /api/v2/savings/goals/<id>/withdraw
+}
+
+IN_PROGRESS = 'in_progress'
+COMPLETED = 'completed'
+MAX_KEY_LENGTH = 255
+
+
+def register(route_name, persist=False):
+    """Make POSTs to the named route honour Idempotency-Key."""
+    IDEMPOTENT_ROUTES[route_name] = persist
+
+
+def cache_ttl():
+    return getattr(settings, 'IDEMPOTENCY_TTL', 3600)
+
+
+def lease_seconds():
+    return getattr(settings, 'IDEMPOTENCY_LEASE_SECONDS', 120)
+
+
+def wait_seconds():
+    return getattr(settings, 'IDEMPOTENCY_WAIT_SECONDS', 5)
+
+
+def poll_delays():
+    """Back-off schedule for waiting on an in-flight duplicate."""
+    remaining = wait_seconds()
+    delay = 0.05
+    while remaining > 0:
+        step = min(delay, remaining)
+        yield step
+        remaining -= step
+        delay = min(delay * 2, 0.5)
+
+
+@dataclass(frozen=True)
+class IdempotentRequest:
+    route_name: str
+    persist: bool
+    user_id: str
+    key: str
+    fingerprint: str
+
+    @property
+    def cache_key(self):
+        return f'idempotency:{self.user_id}:{self.route_name}:{self.key}'
+
+
+def route_for(request):
+    """
+    The registered route name for an idempotent POST carrying the header, or
+    None. URL resolution only runs for POSTs that send the header.
+    """
+    if request.method != 'POST' or not request.headers.get('Idempotency-Key'):
+        return None
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return None
+    return match.url_name if match.url_name in IDEMPOTENT_ROUTES else None
+
+
+def token_user_id(request):
+    """
+    The user id from a valid bearer token, without loading the user. API
+    clients authenticate in the view (DRF), after this middleware runs.
+    """
+    from account.authentication import GidiJWTAuthentication
+
+    authentication = GidiJWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    raw_token = authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        return str(authentication.get_validated_token(raw_token)[api_settings.USER_ID_CLAIM])
+    except Exception:
+        return None
+
+
+def build_request(request, route_name, user_id):
+    return IdempotentRequest(
+        route_name=route_name,
+        persist=IDEMPOTENT_ROUTES[route_name],
+        user_id=str(user_id or 'anon'),
+        key=request.headers['Idempotency-Key'],
+        fingerprint=hashlib.sha256(request.path_info.encode() + b'\n' + request.body).hexdigest(),
+    )
+
+
+def reservation(idem):
+    return {'state': IN_PROGRESS, 'fingerprint': idem.fingerprint, 'owner': uuid.uuid4().hex}
+
+
+def completed_entry(idem, response):
+    """The entry to store for a response, or None if it must not be replayed."""
+    if not 200 <= response.status_code < 300 or response.streaming:
+        return None
+    return {
+        'state': COMPLETED,
+        'fingerprint': idem.fingerprint,
+        'status': response.status_code,
+        'content_type': response.get('Content-Type', 'application/json'),
+        'body': bytes(response.content),
+    }
+
+
+def replay_response(entry, idem):
+    logger.info(f"Idempotent replay: route={idem.route_name}, key={idem.key}, user={idem.user_id}")
+    response = HttpResponse(entry['body'], status=entry['status'], content_type=entry['content_type'])
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def invalid_key_response():
+    return error_response(
+        message=f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters",
+        status_code=status.HTTP_400_BAD_REQUEST,
+    )
+
+
+def mismatch_response():
+    return error_response(
+        message="Idempotency-Key has already been used for a different request",
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+    )
+
+
+def in_progress_response():
+    response = error_response(
+        message="A request with this Idempotency-Key is still being processed. Retry shortly.",
+        status_code=status.HTTP_409_CONFLICT,
+    )
+    response['Retry-After'] = '1'
+    return response
+
+
+def resolve_existing(entry, idem):
+    """
+    Response for a request whose key already has an entry: a replay, a 422
+    for a different body, or None if the entry is still in progress.
+    """
+    if entry['fingerprint'] != idem.fingerprint:
+        return mismatch_response()
+    if entry['state'] == COMPLETED:
+        return replay_response(entry, idem)
+    return None
+
+
+# ==========================================
+# Durable records (persist=True routes)
+# ==========================================
+
+def load_record(idem):
+    """A completed entry from IdempotencyRecord, or None."""
+    from core.models import IdempotencyRecord
+
+    record = IdempotencyRecord.objects.filter(
+        user_id=idem.user_id,
+        route_name=idem.route_name,
+        idempotency_key=idem.key,
+        expires_at__gt=timezone.now(),
+    ).first()
+    if record is None:
+        return None
+    return {
+        'state': COMPLETED,
+        'fingerprint': record.request_fingerprint,
+        'status': record.response_status,
+        'content_type': record.response_content_type,
+        'body': bytes(record.response_body),
+    }
+
+
+def save_record(idem, entry):
+    from core.models import IdempotencyRecord
+
+    try:
+        # update_or_create: a key may be reused once its old record has expired
+        IdempotencyRecord.objects.update_or_create(
+            user_id=idem.user_id,
+            route_name=idem.route_name,
+            idempotency_key=idem.key,
+            defaults={
+                'request_fingerprint': entry['fingerprint'],
+                'response_status': entry['status'],
+                'response_content_type': entry['content_type'],
+                'response_body': entry['body'],
+                'expires_at': timezone.now() + timedelta(
+                    seconds=getattr(settings, 'IDEMPOTENCY_RECORD_TTL', 24 * 60 * 60)
+                ),
+            },
+        )
+    except Exception as e:
+        logger.error(f"Failed to persist idempotency record {idem.route_name}/{idem.key}: {e}")
+
+
+def purge_expired_records():
+    """Delete IdempotencyRecord rows past their expiry. Returns the count."""
+    from core.models import IdempotencyRecord
+
+    deleted, _ = IdempotencyRecord.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
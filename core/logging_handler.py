@@ -1,6 +1,30 @@
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections
 from django.utils import timezone
 
+# Under ASGI the ORM can't be used from the event loop; writes go through this thread
+_async_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-log-writer')
+
+
+def _save_log(fields):
+    from core.models import ServerLog
+    try:
+        ServerLog.objects.create(**fields)
+    except Exception as e:
+        import sys
+        print(f"Error saving log to database: {e}", file=sys.stderr)
+
+
+def _save_log_from_writer(fields):
+    # The writer thread's connection outlives any request, so recycle it here.
+    # Never on the caller's thread: inside transaction.atomic() that closes the
+    # connection and rolls the transaction back.
+    close_old_connections()
+    _save_log(fields)
+
 
 class DatabaseLogHandler(logging.Handler):
     """
@@ -12,9 +36,6 @@ class DatabaseLogHandler(logging.Handler):
         Save the log record to the database.
         """
         try:
-            # Import here to avoid circular imports
-            from core.models import ServerLog
-
             # Extract exception info if available
             exception_text = None
             if record.exc_info:
@@ -32,8 +53,12 @@ class DatabaseLogHandler(logging.Handler):
                 request_method = getattr(request, 'method', None)
 
                 # Get user info if authenticated
-                if hasattr(request, 'user') and request.user.is_authenticated:
-                    user_email = getattr(request.user, 'email', None)
+                # (a lazy session user can't be resolved from async code; skip it there)
+                try:
+                    if hasattr(request, 'user') and request.user.is_authenticated:
+                        user_email = getattr(request.user, 'email', None)
+                except Exception:
+                    pass
 
                 # Get IP address - only if META attribute exists (not a socket object)
                 if hasattr(request, 'META'):
@@ -44,7 +69,7 @@ class DatabaseLogHandler(logging.Handler):
                         ip_address = request.META.get('REMOTE_ADDR')
 
             # Create log entry
-            ServerLog.objects.create(
+            fields = dict(
                 level=record.levelname,
                 logger_name=record.name,
                 message=record.getMessage(),
@@ -58,6 +83,12 @@ class DatabaseLogHandler(logging.Handler):
                 ip_address=ip_address,
                 timestamp=timezone.now()
             )
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                _save_log(fields)
+            else:
+                _async_writer.submit(_save_log_from_writer, fields)
         except Exception as e:
             # Don't let logging errors break the application
             # Fall back to printing to stderr
@@ -0,0 +1,148 @@
+"""
+Benchmark the money-movement hot paths against the seeded dataset.
+
+Runs each scenario (webhook deposits, withdrawals, goal funding, dashboard,
+/transactions, community feed, public payment-link pages; see
+core/benchmarks/scenarios.py) in-process through the full middleware stack
+with providers stubbed in process (or served by the provider simulator, see
+run_provider_simulator, with --simulator-url), and reports throughput, p50/p99 latency and queries
+per request. Results can be saved as a baseline and later runs compared with
+it; a regression beyond --tolerance (or any extra query) fails the command.
+
+Needs a local Postgres and Redis, a dataset from seed_benchmark_data, and
+DEBUG=True (or --force): webhook and withdrawal scenarios move money.
+
+Usage:
+    python manage.py seed_benchmark_data --users 10000
+    python manage.py benchmark --save-baseline
+    python manage.py benchmark --scenario dashboard --scenario transactions --requests 500
+    python manage.py benchmark --baseline benchmarks/baseline.json --output benchmarks/latest.json
+    python manage.py benchmark --simulator-url http://127.0.0.1:8090
+"""
+import logging
+import os
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from core.benchmarks import dataset, runner
+from core.benchmarks.scenarios import BENCH_WEBHOOK_SECRET, SCENARIOS
+from core.benchmarks.stubs import stub_providers
+
+DEFAULT_BASELINE = os.path.join('benchmarks', 'baseline.json')
+
+
+class Command(BaseCommand):
+    help = 'Measure throughput, latency and query counts of the hot paths and compare with a baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            dest='scenarios',
+            choices=sorted(SCENARIOS),
+            help='Scenario to run (repeat for several; default: all)',
+        )
+        parser.add_argument('--requests', type=int, default=200, help='Measured requests per scenario (default: 200)')
+        parser.add_argument('--warmup', type=int, default=20, help='Unmeasured requests per scenario (default: 20)')
+        parser.add_argument('--concurrency', type=int, default=4, help='Concurrent threads (default: 4)')
+        parser.add_argument('--actors', type=int, default=200, help='Benchmark users to spread requests over')
+        parser.add_argument(
+            '--provider-latency', type=float, default=50, help='Stubbed provider response time in ms (default: 50)',
+        )
+        parser.add_argument(
+            '--simulator-url', help='Send provider calls to this provider simulator instead of in-process stubs',
+        )
+        parser.add_argument('--baseline', default=DEFAULT_BASELINE, help=f'Baseline file (default: {DEFAULT_BASELINE})')
+        parser.add_argument('--save-baseline', action='store_true', help='Write the results to the baseline file')
+        parser.add_argument('--output', help='Also write the results to this file')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2, help='Allowed throughput/latency change (default: 0.2 = 20%%)',
+        )
+        parser.add_argument('--force', action='store_true', help='Run even with DEBUG=False')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('Refusing to move benchmark money with DEBUG=False; use a local database or --force')
+        if options['simulator_url'] and not settings.DEBUG:
+            # simulated_url() ignores the simulator without DEBUG; don't fall through to the real providers
+            raise CommandError('--simulator-url needs DEBUG=True')
+
+        users = dataset.seeded_count()
+        if not users:
+            raise CommandError('No benchmark data; run seed_benchmark_data first')
+        actors = dataset.sample_actors(options['actors'])
+        names = options['scenarios'] or list(SCENARIOS)
+
+        # Per-request logging would dominate the timings
+        logging.disable(logging.WARNING)
+        try:
+            providers = (
+                nullcontext() if options['simulator_url']
+                else stub_providers(latency=options['provider_latency'] / 1000)
+            )
+            with providers, override_settings(
+                PROVIDER_SIMULATOR_URL=options['simulator_url'] or '',
+                EMBEDLY_API_KEY_PRODUCTION=BENCH_WEBHOOK_SECRET,
+                PSB9_CLIENT_SECRET=BENCH_WEBHOOK_SECRET,
+                QUERY_BUDGET_ENABLED=False,     # the runner counts queries itself
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            ):
+                self.stdout.write(self.style.SUCCESS(
+                    f"Benchmarking {len(names)} scenarios: {users} users, {options['requests']} requests, "
+                    f"concurrency {options['concurrency']}"
+                ))
+                results = {}
+                for name in names:
+                    results[name] = runner.run_scenario(
+                        SCENARIOS[name], actors,
+                        requests=options['requests'],
+                        concurrency=options['concurrency'],
+                        warmup=options['warmup'],
+                    )
+                    self._report(name, results[name])
+        finally:
+            logging.disable(logging.NOTSET)
+
+        report = runner.build_report(results, {
+            'users': users,
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'providers': options['simulator_url'] or f"stubbed ({options['provider_latency']:g}ms)",
+        })
+        if options['output']:
+            runner.save_report(report, options['output'])
+
+        baseline_path = options['baseline']
+        if options['save_baseline']:
+            os.makedirs(os.path.dirname(baseline_path) or '.', exist_ok=True)
+            runner.save_report(report, baseline_path)
+            self.stdout.write(self.style.SUCCESS(f'Baseline written to {baseline_path}'))
+        elif os.path.exists(baseline_path):
+            self._compare(report, runner.load_report(baseline_path), options['tolerance'])
+
+    def _report(self, name, result):
+        style = self.style.SUCCESS if not result['errors'] else self.style.WARNING
+        statuses = ' '.join(f'{code}:{count}' for code, count in result['statuses'].items())
+        self.stdout.write(style(
+            f"{name:<18} {result['throughput']:8.1f} req/s  p50={result['p50_ms']:.1f}ms "
+            f"p99={result['p99_ms']:.1f}ms  queries p50={result['queries_p50']:g} max={result['queries_max']}  "
+            f"errors={result['errors']}  [{statuses}]"
+        ))
+
+    def _compare(self, report, baseline, tolerance):
+        meta = baseline.get('meta', {})
+        self.stdout.write(
+            f"\nCompared with baseline {meta.get('revision') or '?'} ({meta.get('users', '?')} users):"
+        )
+        regressions = 0
+        for name, metric, old, new, change, regressed in runner.compare(report, baseline, tolerance):
+            regressions += regressed
+            style = self.style.ERROR if regressed else self.style.SUCCESS
+            self.stdout.write(style(f"  {name:<18} {metric:<12} {old:>10} -> {new:<10} ({change:+.0%})"))
+        if meta.get('users') != report['meta']['users']:
+            self.stdout.write(self.style.WARNING('  Dataset sizes differ; timings are not directly comparable'))
+        if regressions:
+            raise CommandError(f'{regressions} regression(s) against the baseline')
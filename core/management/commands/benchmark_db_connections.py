@@ -0,0 +1,76 @@
+"""
+Benchmark per-request database connection cost.
+
+Compares opening a fresh (SSL) connection for every request, which is what
+CONN_MAX_AGE=0 without a pool does, against the configured connection
+handling (persistent, psycopg pool or PgBouncer; see DB_POOL_MODE). Each
+iteration simulates a request: request_started, one short query, request_finished.
+
+Usage:
+    python manage.py benchmark_db_connections
+    DB_POOL_MODE=pool python manage.py benchmark_db_connections --iterations 500
+"""
+import statistics
+import time
+
+from django.conf import settings
+from django.core import signals
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = 'Measure per-request DB latency with fresh connections vs the configured pooling'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=200,
+            help='Simulated requests per mode (default: 200)',
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        db = settings.DATABASES['default']
+        self.stdout.write(self.style.SUCCESS(
+            f"DB connection benchmark: mode={settings.DB_POOL_MODE} "
+            f"CONN_MAX_AGE={db.get('CONN_MAX_AGE')} sslmode={db.get('OPTIONS', {}).get('sslmode', 'prefer')}"
+        ))
+
+        self._report('fresh connection', self._time(iterations, self._fresh_connection_request))
+        self._report(f'configured ({settings.DB_POOL_MODE})', self._time(iterations, self._configured_request))
+
+    def _time(self, iterations, run):
+        run()  # warm up (pool open, first connection)
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    def _fresh_connection_request(self):
+        params = connection.get_connection_params()
+        params.pop('pool', None)
+        conn = connection.Database.connect(**params)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        finally:
+            conn.close()
+
+    def _configured_request(self):
+        signals.request_started.send(sender=self.__class__)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        signals.request_finished.send(sender=self.__class__)
+
+    def _report(self, label, timings):
+        timings.sort()
+        mean = statistics.mean(timings)
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"  {label:<24} p50={statistics.median(timings):.2f}ms p95={p95:.2f}ms "
+            f"~{1000 / mean:.0f} req/s per thread"
+        )
@@ -0,0 +1,100 @@
+"""
+Closed-loop HTTP load test for picking worker/thread counts.
+
+Runs `--concurrency` virtual users that each issue requests back-to-back for
+`--duration` seconds against one or more paths, then reports throughput and
+latency percentiles per path. Run it against a staging instance with each
+gunicorn profile (GUNICORN_PROFILE / WEB_CONCURRENCY / GUNICORN_THREADS) and
+keep the smallest configuration that holds p99 under target.
+
+Usage:
+    python manage.py loadtest --base-url https://staging.gidinest.com \
+        --token <jwt> --path /api/v2/wallet/9psb/banks --path /api/v2/dashboard/ \
+        --concurrency 50 --duration 60
+"""
+import asyncio
+import logging
+import statistics
+import time
+from collections import defaultdict
+
+import httpx
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Measure requests/sec and latency percentiles for API paths under concurrent load'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://localhost:8080', help='Server to test')
+        parser.add_argument(
+            '--path',
+            action='append',
+            dest='paths',
+            help='GET path to request (repeat for a mix; requests rotate through them)',
+        )
+        parser.add_argument('--token', help='JWT access token sent as a Bearer header')
+        parser.add_argument('--concurrency', type=int, default=20, help='Concurrent virtual users (default: 20)')
+        parser.add_argument('--duration', type=int, default=30, help='Seconds to run (default: 30)')
+        parser.add_argument('--timeout', type=float, default=60, help='Per-request timeout in seconds')
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or ['/health/']
+        # httpx logs every request at INFO
+        logging.getLogger('httpx').setLevel(logging.WARNING)
+        results = asyncio.run(self._run(options, paths))
+        self._report(results, options['duration'])
+
+    async def _run(self, options, paths):
+        headers = {'Accept': 'application/json'}
+        if options['token']:
+            headers['Authorization'] = f"Bearer {options['token']}"
+
+        results = defaultdict(lambda: {'latencies': [], 'errors': 0, 'statuses': defaultdict(int)})
+        deadline = time.monotonic() + options['duration']
+        limits = httpx.Limits(max_connections=options['concurrency'])
+
+        async with httpx.AsyncClient(
+            base_url=options['base_url'], headers=headers, timeout=options['timeout'], limits=limits,
+        ) as client:
+
+            async def user(index):
+                i = index
+                while time.monotonic() < deadline:
+                    path = paths[i % len(paths)]
+                    i += 1
+                    start = time.perf_counter()
+                    try:
+                        response = await client.get(path)
+                        results[path]['statuses'][response.status_code] += 1
+                        if response.status_code >= 500:
+                            results[path]['errors'] += 1
+                    except httpx.HTTPError:
+                        results[path]['errors'] += 1
+                        results[path]['statuses']['exc'] += 1
+                    results[path]['latencies'].append((time.perf_counter() - start) * 1000)
+
+            self.stdout.write(
+                f"Running {options['concurrency']} users for {options['duration']}s against {options['base_url']}"
+            )
+            await asyncio.gather(*(user(i) for i in range(options['concurrency'])))
+
+        return results
+
+    def _report(self, results, duration):
+        total = 0
+        for path, data in results.items():
+            latencies = sorted(data['latencies'])
+            if not latencies:
+                continue
+            total += len(latencies)
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            statuses = ' '.join(f'{k}:{v}' for k, v in sorted(data['statuses'].items(), key=str))
+            style = self.style.SUCCESS if not data['errors'] else self.style.WARNING
+            self.stdout.write(style(
+                f"{path:<40} {len(latencies) / duration:8.1f} req/s  "
+                f"p50={statistics.median(latencies):.0f}ms p95={p95:.0f}ms p99={p99:.0f}ms  "
+                f"errors={data['errors']}  [{statuses}]"
+            ))
+        self.stdout.write(self.style.SUCCESS(f"Total: {total / duration:.1f} req/s"))
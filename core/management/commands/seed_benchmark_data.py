@@ -0,0 +1,66 @@
+"""
+Seed (or remove) the benchmark dataset used by the benchmark command.
+
+Creates numbered benchmark users with wallets, transaction history, savings
+goals, community memberships and posts, and payment links (see
+core/benchmarks/dataset.py). Seeding is additive, so the dataset can be grown
+step by step to compare 10k, 100k and 1M users.
+
+Only runs with DEBUG=True (or --force): point it at a local database.
+
+Usage:
+    python manage.py seed_benchmark_data --users 10000
+    python manage.py seed_benchmark_data --users 1000000 --transactions-per-user 20
+    python manage.py seed_benchmark_data --clear
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import dataset
+
+
+class Command(BaseCommand):
+    help = 'Seed the benchmark dataset (users, wallets, history, goals, community, payment links)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000, help='Total benchmark users (default: 10000)')
+        parser.add_argument(
+            '--transactions-per-user', type=int, default=10, help='Wallet history rows per user (default: 10)',
+        )
+        parser.add_argument('--goals-per-user', type=int, default=2, help='Savings goals per user (default: 2)')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Users per transaction (default: 2000)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+        parser.add_argument('--clear', action='store_true', help='Delete all benchmark data instead')
+        parser.add_argument('--force', action='store_true', help='Run even with DEBUG=False')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('Refusing to write benchmark data with DEBUG=False; use a local database or --force')
+
+        started = time.monotonic()
+        if options['clear']:
+            deleted = dataset.clear(
+                batch_size=options['batch_size'],
+                progress=lambda n: self.stdout.write(f'  deleted {n} users'),
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'Deleted {deleted} benchmark users in {time.monotonic() - started:.0f}s'
+            ))
+            return
+
+        existing = dataset.seeded_count()
+        self.stdout.write(f"Seeding benchmark users {existing} -> {options['users']}")
+        created = dataset.seed(
+            options['users'],
+            transactions_per_user=options['transactions_per_user'],
+            goals_per_user=options['goals_per_user'],
+            batch_size=options['batch_size'],
+            seed_value=options['seed'],
+            progress=lambda n: self.stdout.write(f'  {n} users'),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created} benchmark users in {time.monotonic() - started:.0f}s '
+            f'({dataset.seeded_count()} total)'
+        ))
@@ -0,0 +1,404 @@
+"""
+Performance instrumentation exported in Prometheus text format.
+
+Metrics are aggregated in Redis hashes (metrics:<name>) so that every web and
+Celery process contributes to the same series; GET /metrics renders them.
+Each request or task gets a Recorder (a context variable, so it follows
+sync_to_async into worker threads) that collects its observations in memory
+and writes them in one pipeline when it finishes:
+
+- http_request_duration_seconds   per view (URL name), method and status class
+- http_request_db_queries         queries per request, via a DB execute wrapper
+- http_request_db_seconds         time spent in those queries
+- cache_requests_total            cache hits/misses per key prefix, ids
+                                  stripped (InstrumentedRedisClient)
+- provider_request_duration_seconds  outbound provider calls per provider
+                                  and outcome (providers/helpers/resilience.py)
+- celery_task_duration_seconds    per task and final state
+
+Requests slower than SLOW_REQUEST_THRESHOLD keep their slowest queries; one
+per view every SLOW_REQUEST_SAMPLE_INTERVAL is stored as a SlowRequestSample
+with EXPLAIN plans (core.tasks.record_slow_request). Queries are kept as
+parameterised SQL: parameter values (emails, BVNs, hashes) never leave the
+request.
+"""
+import contextvars
+import heapq
+import logging
+import re
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django_redis.client import DefaultClient
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'metrics:'
+
+REQUEST_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+DB_TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+PROVIDER_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TASK_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 300, 900)
+
+# name -> (type, help, histogram buckets)
+FAMILIES = {
+    'http_request_duration_seconds': (
+        'histogram', 'Request latency by view, method and status class.', REQUEST_BUCKETS),
+    'http_request_db_queries': (
+        'histogram', 'Database queries executed per request, by view.', QUERY_COUNT_BUCKETS),
+    'http_request_db_seconds': (
+        'histogram', 'Time spent in database queries per request, by view.', DB_TIME_BUCKETS),
+    'cache_requests_total': (
+        'counter', 'Cache reads by key prefix and result (hit/miss).', None),
+    'provider_request_duration_seconds': (
+        'histogram', 'Outbound provider call latency by provider and outcome.', PROVIDER_BUCKETS),
+    'celery_task_duration_seconds': (
+        'histogram', 'Celery task run time by task and final state.', TASK_BUCKETS),
+}
+
+_current = contextvars.ContextVar('metrics_recorder', default=None)
+
+# Cache keys are split into segments on ':' and '_' to find their prefix
+_KEY_SEGMENT = re.compile(r'([^:_]+)([:_]?)')
+_PREFIX_MAX_SEGMENTS = 4
+
+
+def _redis():
+    from django_redis import get_redis_connection
+    return get_redis_connection("default")
+
+
+def _number(value):
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    return ','.join(f'{key}="{_escape(value)}"' for key, value in sorted(labels.items()))
+
+
+def _histogram_fields(labels, value, buckets):
+    label_str = _labels(labels)
+    bucket = next((le for le in buckets if value <= le), None)
+    fields = [(f'{label_str}|sum', value), (f'{label_str}|count', 1)]
+    if bucket is not None:
+        fields.append((f'{label_str}|le={bucket}', 1))
+    return fields
+
+
+class Recorder:
+    """Observations for one request or task, flushed to Redis in one pipeline."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.ops = []
+        self.query_count = 0
+        self.query_seconds = 0.0
+        self.slowest_queries = []
+        self.cache_counts = {}
+
+    def inc(self, name, labels, amount=1):
+        self.ops.append((name, _labels(labels), amount))
+
+    def observe(self, name, labels, value, buckets):
+        self.ops.extend((name, field, amount) for field, amount in _histogram_fields(labels, value, buckets))
+
+    def record_query(self, duration, sql):
+        self.query_count += 1
+        self.query_seconds += duration
+        slots = getattr(settings, 'SLOW_REQUEST_QUERY_SLOTS', 5)
+        if len(self.slowest_queries) < slots or duration > self.slowest_queries[0][0]:
+            entry = (duration, self.query_count, sql)
+            if len(self.slowest_queries) < slots:
+                heapq.heappush(self.slowest_queries, entry)
+            else:
+                heapq.heapreplace(self.slowest_queries, entry)
+
+    def record_cache(self, key, hits, misses):
+        prefix = cache_key_prefix(key)
+        counts = self.cache_counts.setdefault(prefix, [0, 0])
+        counts[0] += hits
+        counts[1] += misses
+
+    def flush(self):
+        for prefix, (hits, misses) in self.cache_counts.items():
+            if hits:
+                self.inc('cache_requests_total', {'prefix': prefix, 'result': 'hit'}, hits)
+            if misses:
+                self.inc('cache_requests_total', {'prefix': prefix, 'result': 'miss'}, misses)
+        if not self.ops:
+            return
+        try:
+            pipe = _redis().pipeline(transaction=False)
+            for name, field, amount in self.ops:
+                if isinstance(amount, float):
+                    pipe.hincrbyfloat(KEY_PREFIX + name, field, amount)
+                else:
+                    pipe.hincrby(KEY_PREFIX + name, field, amount)
+            pipe.execute()
+        except Exception as e:
+            logger.debug(f"Failed to flush metrics: {e}")
+
+
+def start():
+    """Begin recording for a request or task. Returns (recorder, token)."""
+    recorder = Recorder()
+    return recorder, _current.set(recorder)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+def observe(name, labels, value, buckets):
+    """Record an observation on the active recorder, or write it straight away."""
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.observe(name, labels, value, buckets)
+        return
+    recorder = Recorder()
+    recorder.observe(name, labels, value, buckets)
+    recorder.flush()
+
+
+def _is_identifier(segment):
+    # User/wallet ids, UUIDs, hashes, dates; short names such as psb9 are kept
+    return segment.isdigit() or (len(segment) >= 8 and any(c.isdigit() for c in segment))
+
+
+def cache_key_prefix(key):
+    """
+    The metric label for a cache key: its leading segments up to the first
+    identifier, e.g. dashboard_42 -> dashboard, auth_user:42:3 -> auth_user,
+    notif:unread:42 -> notif:unread, psb9_auth_token -> psb9_auth_token.
+    """
+    prefix = ''
+    for count, match in enumerate(_KEY_SEGMENT.finditer(str(key))):
+        segment, separator = match.groups()
+        if count == _PREFIX_MAX_SEGMENTS or _is_identifier(segment):
+            break
+        prefix += segment + separator
+    return prefix.rstrip(':_')[:40] or 'other'
+
+
+def record_cache(key, hits, misses):
+    # Only inside a request or task; stray reads aren't worth a Redis write each
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.record_cache(key, hits, misses)
+
+
+# ==========================================
+# Hooks
+# ==========================================
+
+def instrument_query(execute, sql, params, many, context):
+    """Database execute wrapper, installed on every connection by core.apps."""
+    recorder = _current.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        recorder.record_query(time.perf_counter() - started, sql)
+
+
+def install_query_instrumentation(sender, connection, **kwargs):
+    """connection_created receiver."""
+    if instrument_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(instrument_query)
+
+
+_MISSING = object()
+
+
+class InstrumentedRedisClient(DefaultClient):
+    """django-redis client that counts cache hits and misses (CACHES CLIENT_CLASS)."""
+
+    def get(self, key, default=None, version=None, client=None):
+        value = super().get(key, default=_MISSING, version=version, client=client)
+        if value is _MISSING:
+            record_cache(key, 0, 1)
+            return default
+        record_cache(key, 1, 0)
+        return value
+
+    def get_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        found = super().get_many(keys, version=version, client=client)
+        if keys:
+            record_cache(keys[0], len(found), len(keys) - len(found))
+        return found
+
+
+def finish_request(recorder, request, response):
+    """Record a finished request's metrics and sample it if it was slow."""
+    match = getattr(request, 'resolver_match', None)
+    view = (match.view_name if match else None) or 'unmatched'
+    duration = time.perf_counter() - recorder.started
+
+    recorder.observe('http_request_duration_seconds', {
+        'view': view,
+        'method': request.method,
+        'status': f'{response.status_code // 100}xx',
+    }, duration, REQUEST_BUCKETS)
+    recorder.observe('http_request_db_queries', {'view': view}, recorder.query_count, QUERY_COUNT_BUCKETS)
+    recorder.observe('http_request_db_seconds', {'view': view}, recorder.query_seconds, DB_TIME_BUCKETS)
+    recorder.flush()
+
+    if duration >= getattr(settings, 'SLOW_REQUEST_THRESHOLD', 1.0) and match is not None:
+        _sample_slow_request(recorder, request, response, view, duration)
+
+
+def finish_task(recorder, task_name, state):
+    recorder.observe('celery_task_duration_seconds', {'task': task_name, 'state': state or 'UNKNOWN'},
+                     time.perf_counter() - recorder.started, TASK_BUCKETS)
+    recorder.flush()
+
+
+def _sample_slow_request(recorder, request, response, view, duration):
+    interval = getattr(settings, 'SLOW_REQUEST_SAMPLE_INTERVAL', 300)
+    try:
+        if not cache.add(f'slow_request_sample:{view}', 1, interval):
+            return
+        from core.tasks import record_slow_request
+
+        record_slow_request.delay({
+            'view_name': view,
+            'path': request.path[:500],
+            'method': request.method,
+            'status_code': response.status_code,
+            'duration_ms': round(duration * 1000, 1),
+            'query_count': recorder.query_count,
+            'db_time_ms': round(recorder.query_seconds * 1000, 1),
+            'queries': [
+                {'position': position, 'duration_ms': round(query_duration * 1000, 1), 'sql': str(sql)[:10000]}
+                for query_duration, position, sql in sorted(recorder.slowest_queries, reverse=True)
+            ],
+        })
+    except Exception as e:
+        logger.warning(f"Failed to sample slow request {view}: {e}")
+
+
+def _numbered_placeholders(sql):
+    """Django's %s placeholders as $1, $2...; returns the SQL and the parameter count."""
+    count = 0
+
+    def number(match):
+        nonlocal count
+        if match.group() == '%%':
+            return '%'
+        count += 1
+        return f'${count}'
+
+    return re.sub(r'%%|%s', number, sql), count
+
+
+def explain(sql):
+    """
+    EXPLAIN (not ANALYZE) plan for a captured parameterised SELECT, or None.
+
+    The parameters were never captured, so the statement is prepared with
+    placeholders and explained as a generic plan, which shows $1, $2...
+    where the values go.
+    """
+    from django.db import connection, transaction
+
+    statement = sql.strip().rstrip(';')
+    if connection.vendor != 'postgresql' or not statement.upper().startswith('SELECT') or ';' in statement:
+        return None
+    statement, param_count = _numbered_placeholders(statement)
+    name = f'slow_request_{uuid.uuid4().hex}'
+    args = f"({', '.join(['NULL'] * param_count)})" if param_count else ''
+    try:
+        # One transaction, so the statements share a server connection behind PgBouncer
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('SET LOCAL plan_cache_mode = force_generic_plan')
+            cursor.execute(f'PREPARE {name} AS {statement}')
+            cursor.execute(f'EXPLAIN (FORMAT JSON) EXECUTE {name}{args}')
+            plan = cursor.fetchone()[0]
+            cursor.execute(f'DEALLOCATE {name}')
+            return plan
+    except Exception as e:
+        return {'error': str(e)}
+
+
+# ==========================================
+# Prometheus exposition
+# ==========================================
+
+def _render_histogram(name, fields, buckets):
+    series = {}
+    for field, value in fields.items():
+        label_str, _, suffix = field.rpartition('|')
+        series.setdefault(label_str, {})[suffix] = float(value)
+
+    lines = []
+    for label_str, values in sorted(series.items()):
+        prefix = f'{label_str},' if label_str else ''
+        # Buckets are stored non-cumulatively; every bound is emitted so series aggregate cleanly
+        cumulative = 0
+        for le in buckets:
+            cumulative += values.get(f'le={le}', 0)
+            lines.append(f'{name}_bucket{{{prefix}le="{le:g}"}} {_number(cumulative)}')
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {_number(values.get("count", 0))}')
+        lines.append(f'{name}_sum{{{label_str}}} {_number(values.get("sum", 0))}')
+        lines.append(f'{name}_count{{{label_str}}} {_number(values.get("count", 0))}')
+    return lines
+
+
+def _render_provider_states():
+    from providers.helpers.resilience import provider_states
+
+    lines = [
+        '# HELP provider_circuit_state Circuit breaker state per provider (1 for the current state).',
+        '# TYPE provider_circuit_state gauge',
+    ]
+    inflight = ['# HELP provider_inflight_requests In-flight calls per provider.', '# TYPE provider_inflight_requests gauge']
+    bulk_inflight = ['# HELP provider_bulk_inflight_requests In-flight bulk calls per provider.',
+                     '# TYPE provider_bulk_inflight_requests gauge']
+    events = ['# HELP provider_guard_events_total Circuit breaker and bulkhead events per provider.',
+              '# TYPE provider_guard_events_total counter']
+    for snapshot in provider_states():
+        provider = _escape(snapshot['provider'])
+        for state in ('closed', 'open', 'half_open'):
+            lines.append(f'provider_circuit_state{{provider="{provider}",state="{state}"}} '
+                         f'{int(snapshot["state"] == state)}')
+        inflight.append(f'provider_inflight_requests{{provider="{provider}"}} {snapshot["inflight"]}')
+        bulk_inflight.append(f'provider_bulk_inflight_requests{{provider="{provider}"}} {snapshot["bulk_inflight"]}')
+        for event, count in sorted(snapshot['metrics'].items()):
+            events.append(f'provider_guard_events_total{{provider="{provider}",event="{_escape(event)}"}} {count}')
+    return lines + inflight + bulk_inflight + events
+
+
+def render():
+    """All metrics in Prometheus text exposition format."""
+    r = _redis()
+    pipe = r.pipeline(transaction=False)
+    for name in FAMILIES:
+        pipe.hgetall(KEY_PREFIX + name)
+    results = pipe.execute()
+
+    lines = []
+    for (name, (kind, help_text, buckets)), raw in zip(FAMILIES.items(), results):
+        fields = {field.decode(): value.decode() for field, value in raw.items()}
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'histogram':
+            lines.extend(_render_histogram(name, fields, buckets))
+        else:
+            lines.extend(f'{name}{{{label_str}}} {_number(value)}' for label_str, value in sorted(fields.items()))
+
+    try:
+        lines.extend(_render_provider_states())
+    except Exception as e:
+        logger.warning(f"Failed to export provider states: {e}")
+    return '\n'.join(lines) + '\n'
@@ -1,77 +1,243 @@
-import json
+import asyncio
 import logging
+import time
+from itertools import chain
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.core.cache import cache
-from django.http import JsonResponse
+from django.core.exceptions import MiddlewareNotUsed
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from core import idempotency, metrics, query_budget
 
 logger = logging.getLogger(__name__)
 
-# Financial endpoints that support Idempotency-Key
-IDEMPOTENT_PATHS = [
-    '/api/v2/wallet/9psb/debit',
-    '/api/v2/wallet/9psb/credit',
-    '/api/v2/wallet/9psb/transfer/banks',
-    '/api/v2/wallet/withdraw',
-    '/api/v1/wallet/withdraw/request',
-]
+class RequestMetricsMiddleware:
+    """
+    Records per-request latency, DB query count/time and cache hit rates
+    (core/metrics.py). Listed first in MIDDLEWARE so the timing covers the
+    whole stack. Sync and async capable.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(self.get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        recorder, token = metrics.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.stop(token)
+        metrics.finish_request(recorder, request, response)
+        return response
+
+    async def __acall__(self, request):
+        recorder, token = metrics.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.stop(token)
+        await sync_to_async(metrics.finish_request, thread_sensitive=False)(recorder, request, response)
+        return response
+
+
+class QueryBudgetMiddleware:
+    """
+    Checks each request against its view's query budget and for repeated
+    (N+1) query shapes (core/query_budget.py), and reports the query count in
+    an X-Query-Count header. Only loaded when QUERY_BUDGET_ENABLED; production
+    pays nothing for it. Sync and async capable.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not query_budget.enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(self.get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
 
-CACHE_TTL = 3600  # 1 hour
+        with query_budget.tracking() as tracker:
+            response = self.get_response(request)
+        query_budget.check_request(tracker, request, response)
+        return response
+
+    async def __acall__(self, request):
+        with query_budget.tracking() as tracker:
+            response = await self.get_response(request)
+        query_budget.check_request(tracker, request, response)
+        return response
 
 
 class IdempotencyKeyMiddleware:
     """
-    Middleware that caches successful responses for financial POST endpoints
-    when an Idempotency-Key header is provided.
+    Executes financial POSTs carrying an Idempotency-Key at most once per
+    user, route and key; retries replay the stored response. See
+    core/idempotency.py for the registry and store.
 
     - Backward-compatible: requests without the header are unaffected.
-    - Cache key is scoped per authenticated user to prevent cross-user collisions.
-    - Only 2xx responses are cached; errors are never cached so the client can retry.
+    - Concurrent duplicates are serialised by an atomic reservation; the
+      later one waits for the first and replays it, or gets a 409.
+    - Only 2xx responses are stored; errors release the key so the client can retry.
+    - Sync and async capable, so it doesn't force a thread hop under ASGI.
     """
+    sync_capable = True
+    async_capable = True
 
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(self.get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        # Only intercept POST requests to financial endpoints
-        if request.method != 'POST':
-            return self.get_response(request)
+        if self.async_mode:
+            return self.__acall__(request)
 
-        # Check if path matches any idempotent endpoint
-        path = request.path.rstrip('/')
-        if not any(path == p.rstrip('/') for p in IDEMPOTENT_PATHS):
+        route_name = idempotency.route_for(request)
+        if route_name is None:
             return self.get_response(request)
-
-        # No header → proceed normally (backward-compatible)
-        idempotency_key = request.headers.get('Idempotency-Key')
-        if not idempotency_key:
+        if len(request.headers['Idempotency-Key']) > idempotency.MAX_KEY_LENGTH:
+            return idempotency.invalid_key_response()
+
+        # API clients authenticate with a bearer token in the view; session
+        # users (admin) are already resolved by AuthenticationMiddleware
+        user_id = idempotency.token_user_id(request)
+        if user_id is None and hasattr(request, 'user'):
+            user_id = getattr(request.user, 'id', None)
+        idem = idempotency.build_request(request, route_name, user_id)
+        reserved = idempotency.reservation(idem)
+
+        try:
+            for delay in chain([0], idempotency.poll_delays()):
+                if delay:
+                    time.sleep(delay)
+                entry = cache.get(idem.cache_key)
+                if entry is None and idem.persist:
+                    entry = idempotency.load_record(idem)
+                    if entry is not None:
+                        cache.set(idem.cache_key, entry, idempotency.cache_ttl())
+                if entry is None:
+                    if cache.add(idem.cache_key, reserved, idempotency.lease_seconds()):
+                        break
+                    continue  # another request reserved the key first; look again
+                response = idempotency.resolve_existing(entry, idem)
+                if response is not None:
+                    return response
+            else:
+                return idempotency.in_progress_response()
+        except Exception as e:
+            logger.warning(f"Idempotency store unavailable, processing {route_name} unguarded: {e}")
             return self.get_response(request)
 
-        # Build user-scoped cache key (user_id available after AuthenticationMiddleware)
-        user_id = getattr(request.user, 'id', 'anon') if hasattr(request, 'user') else 'anon'
-        cache_key = f'idempotency:{user_id}:{idempotency_key}'
-
-        # Check cache for previous response
-        cached = cache.get(cache_key)
-        if cached is not None:
-            logger.info(f"Idempotency cache hit: key={idempotency_key}, user={user_id}")
-            return JsonResponse(
-                cached['body'],
-                status=cached['status'],
-                safe=False,
-            )
-
-        # Process the request
         response = self.get_response(request)
+        entry = idempotency.completed_entry(idem, response)
+        try:
+            if entry is None:
+                if cache.get(idem.cache_key) == reserved:
+                    cache.delete(idem.cache_key)
+            else:
+                cache.set(idem.cache_key, entry, idempotency.cache_ttl())
+                if idem.persist:
+                    idempotency.save_record(idem, entry)
+        except Exception as e:
+            logger.error(f"Failed to store idempotent response {route_name}/{idem.key}: {e}")
+        return response
 
-        # Cache only successful (2xx) responses
-        if 200 <= response.status_code < 300:
-            try:
-                body = json.loads(response.content)
-                cache.set(cache_key, {
-                    'status': response.status_code,
-                    'body': body,
-                }, CACHE_TTL)
-            except (json.JSONDecodeError, TypeError):
-                pass  # Non-JSON response, skip caching
-
+    async def __acall__(self, request):
+        route_name = idempotency.route_for(request)
+        if route_name is None:
+            return await self.get_response(request)
+        if len(request.headers['Idempotency-Key']) > idempotency.MAX_KEY_LENGTH:
+            return idempotency.invalid_key_response()
+
+        user_id = idempotency.token_user_id(request)
+        if user_id is None and hasattr(request, 'auser'):
+            user_id = getattr(await request.auser(), 'id', None)
+        idem = idempotency.build_request(request, route_name, user_id)
+        reserved = idempotency.reservation(idem)
+
+        try:
+            for delay in chain([0], idempotency.poll_delays()):
+                if delay:
+                    await asyncio.sleep(delay)
+                entry = await cache.aget(idem.cache_key)
+                if entry is None and idem.persist:
+                    entry = await sync_to_async(idempotency.load_record)(idem)
+                    if entry is not None:
+                        await cache.aset(idem.cache_key, entry, idempotency.cache_ttl())
+                if entry is None:
+                    if await cache.aadd(idem.cache_key, reserved, idempotency.lease_seconds()):
+                        break
+                    continue
+                response = idempotency.resolve_existing(entry, idem)
+                if response is not None:
+                    return response
+            else:
+                return idempotency.in_progress_response()
+        except Exception as e:
+            logger.warning(f"Idempotency store unavailable, processing {route_name} unguarded: {e}")
+            return await self.get_response(request)
+
+        response = await self.get_response(request)
+        entry = idempotency.completed_entry(idem, response)
+        try:
+            if entry is None:
+                if await cache.aget(idem.cache_key) == reserved:
+                    await cache.adelete(idem.cache_key)
+            else:
+                await cache.aset(idem.cache_key, entry, idempotency.cache_ttl())
+                if idem.persist:
+                    await sync_to_async(idempotency.save_record)(idem, entry)
+        except Exception as e:
+            logger.error(f"Failed to store idempotent response {route_name}/{idem.key}: {e}")
         return response
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise middleware that is also async capable.
+
+    Stock WhiteNoiseMiddleware is sync-only, which makes Django run every ASGI
+    request through a thread. Here only static file hits are served from a
+    thread; everything else passes straight through on the event loop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=None):
+        if settings is None:
+            super().__init__(get_response)
+        else:
+            super().__init__(get_response, settings)
+        self.async_mode = iscoroutinefunction(self.get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file, thread_sensitive=False)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        return await self.get_response(request)
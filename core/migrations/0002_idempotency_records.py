@@ -0,0 +1,33 @@
+# Generated by Django 5.1.4 on 2026-10-19 05:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.CharField(help_text="Authenticated user id, or 'anon'", max_length=64)),
+                ('route_name', models.CharField(help_text='URL name of the idempotent route', max_length=100)),
+                ('idempotency_key', models.CharField(max_length=255)),
+                ('request_fingerprint', models.CharField(help_text='SHA-256 of the request body', max_length=64)),
+                ('response_status', models.PositiveSmallIntegerField()),
+                ('response_content_type', models.CharField(max_length=100)),
+                ('response_body', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Idempotency Record',
+                'verbose_name_plural': 'Idempotency Records',
+                'constraints': [models.UniqueConstraint(fields=('user_id', 'route_name', 'idempotency_key'), name='idempotency_record_unique_key')],
+            },
+        ),
+    ]
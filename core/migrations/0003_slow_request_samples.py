@@ -0,0 +1,33 @@
+# Generated by Django 5.1.4 on 2026-10-19 05:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_idempotency_records'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowRequestSample',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view_name', models.CharField(db_index=True, help_text='URL name of the view', max_length=255)),
+                ('path', models.CharField(max_length=500)),
+                ('method', models.CharField(max_length=10)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('duration_ms', models.FloatField()),
+                ('query_count', models.PositiveIntegerField()),
+                ('db_time_ms', models.FloatField()),
+                ('queries', models.JSONField(default=list, help_text='Slowest queries: position, duration_ms, sql, plan')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Slow Request Sample',
+                'verbose_name_plural': 'Slow Request Samples',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+def purge_samples(apps, schema_editor):
+    # Samples recorded so far hold SQL with its parameter values bound in
+    apps.get_model('core', 'SlowRequestSample').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_slow_request_samples'),
+    ]
+
+    operations = [
+        migrations.RunPython(purge_samples, migrations.RunPython.noop),
+    ]
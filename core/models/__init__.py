@@ -1,3 +1,5 @@
+from .idempotency import IdempotencyRecord
 from .server_log import ServerLog
+from .slow_request import SlowRequestSample
 
-__all__ = ['ServerLog']
+__all__ = ['IdempotencyRecord', 'ServerLog', 'SlowRequestSample']
@@ -0,0 +1,31 @@
+from django.db import models
+
+
+class IdempotencyRecord(models.Model):
+    """
+    Durable copy of a completed idempotent request, for routes registered
+    with persist=True (core/idempotency.py). The cache holds the hot copy;
+    this one survives cache eviction and restarts until expires_at.
+    """
+    user_id = models.CharField(max_length=64, help_text="Authenticated user id, or 'anon'")
+    route_name = models.CharField(max_length=100, help_text="URL name of the idempotent route")
+    idempotency_key = models.CharField(max_length=255)
+    request_fingerprint = models.CharField(max_length=64, help_text="SHA-256 of the request body")
+    response_status = models.PositiveSmallIntegerField()
+    response_content_type = models.CharField(max_length=100)
+    response_body = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = 'Idempotency Record'
+        verbose_name_plural = 'Idempotency Records'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user_id', 'route_name', 'idempotency_key'],
+                name='idempotency_record_unique_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.route_name} {self.idempotency_key} ({self.response_status})"
@@ -0,0 +1,26 @@
+from django.db import models
+
+
+class SlowRequestSample(models.Model):
+    """
+    A request that exceeded SLOW_REQUEST_THRESHOLD, with its slowest queries
+    and their EXPLAIN plans (core/metrics.py). At most one per view every
+    SLOW_REQUEST_SAMPLE_INTERVAL seconds.
+    """
+    view_name = models.CharField(max_length=255, db_index=True, help_text="URL name of the view")
+    path = models.CharField(max_length=500)
+    method = models.CharField(max_length=10)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    query_count = models.PositiveIntegerField()
+    db_time_ms = models.FloatField()
+    queries = models.JSONField(default=list, help_text="Slowest queries: position, duration_ms, sql, plan")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Slow Request Sample'
+        verbose_name_plural = 'Slow Request Samples'
+
+    def __str__(self):
+        return f"{self.method} {self.view_name} {self.duration_ms:.0f}ms"
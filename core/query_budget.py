@@ -0,0 +1,216 @@
+"""
+Query budgets and N+1 detection for API views (development and tests).
+
+Every query run inside a tracked block is counted and reduced to its shape
+(literals and parameters replaced, IN lists collapsed), so the N queries of
+an N+1 - `obj.memberships.filter(user=...)` once per serialized row - show up
+as one shape repeated N times. Two checks are applied to each tracked
+request:
+
+- budget: the view's declared maximum number of queries, from the
+  @query_budget decorator (or a `query_budget` attribute on an APIView),
+  else QUERY_BUDGETS[url name], else QUERY_BUDGET_DEFAULT.
+- repeats: no single shape may run QUERY_BUDGET_REPEAT_THRESHOLD or more
+  times, whatever the budget.
+
+QueryBudgetMiddleware applies them when QUERY_BUDGET_ENABLED (defaults to
+DEBUG): violations are logged with the line of project code that issued the
+repeated query and, with QUERY_BUDGET_RAISE, raised as QueryBudgetExceeded.
+core.testing.QueryBudgetTestRunner turns both on for the test suite, so a
+test that exercises an endpoint fails when it goes over budget.
+"""
+import contextvars
+import logging
+import os
+import re
+import traceback
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_tracker = contextvars.ContextVar('query_budget_tracker', default=None)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|%\(\w+\)s|\?')
+_IN_LIST = re.compile(r'\bIN \((?:\?, )*\?\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+# Execute wrappers whose frames sit between the caller and the query
+_WRAPPER_FILES = tuple(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), name) for name in ('query_budget.py', 'metrics.py')
+)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A tracked block ran more queries than its budget, or an N+1 pattern."""
+
+
+def query_budget(max_queries):
+    """
+    Declare the maximum number of queries a view may run per request, either
+    an int or a dict of HTTP method -> int. Works on function views and on
+    APIView / View classes:
+
+        @query_budget(6)
+        class CommunityGroupListCreateAPIView(APIView): ...
+
+        @query_budget({'GET': 4, 'POST': 8})
+        @api_view(['GET', 'POST'])
+        def payment_links(request): ...
+    """
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def enabled():
+    return getattr(settings, 'QUERY_BUDGET_ENABLED', settings.DEBUG)
+
+
+def repeat_threshold():
+    return getattr(settings, 'QUERY_BUDGET_REPEAT_THRESHOLD', 5)
+
+
+def query_shape(sql):
+    """`sql` with literals and parameters replaced, so N+1 queries compare equal."""
+    shape = _STRING_LITERAL.sub('?', sql)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _PLACEHOLDER.sub('?', shape)
+    shape = _WHITESPACE.sub(' ', shape).strip()
+    return _IN_LIST.sub('IN (...)', shape)
+
+
+def _origin():
+    """'file:line in function' of the innermost project frame issuing a query."""
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()[:-3]):
+        filename = frame.filename
+        if filename.startswith(base_dir) and 'site-packages' not in filename and filename not in _WRAPPER_FILES:
+            return f"{os.path.relpath(filename, base_dir)}:{frame.lineno} in {frame.name}"
+    return 'unknown'
+
+
+class QueryTracker:
+    """
+    Queries run while the tracker is active, grouped by shape. Queries are
+    also recorded by the enclosing tracker, so assert_max_queries() around a
+    test client call counts the queries the middleware tracks for the request.
+    """
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.count = 0
+        # shape -> [count, first SQL seen, origin of the first query]
+        self.shapes = {}
+
+    def record(self, sql):
+        if self.parent is not None:
+            self.parent.record(sql)
+        self.count += 1
+        shape = query_shape(sql)
+        entry = self.shapes.get(shape)
+        if entry is None:
+            self.shapes[shape] = [1, sql, _origin()]
+        else:
+            entry[0] += 1
+
+    def repeated(self, threshold):
+        """[(count, shape, origin)] for shapes run at least `threshold` times."""
+        return sorted(
+            ((count, shape, origin) for shape, (count, _, origin) in self.shapes.items() if count >= threshold),
+            reverse=True,
+        )
+
+    def violations(self, budget=None, threshold=None):
+        """Human-readable budget and N+1 violations; empty if within budget."""
+        threshold = repeat_threshold() if threshold is None else threshold
+        problems = []
+        if budget is not None and self.count > budget:
+            problems.append(f"{self.count} queries, budget is {budget}")
+        for count, shape, origin in self.repeated(threshold):
+            problems.append(f"possible N+1: {count}x from {origin}: {shape[:300]}")
+        return problems
+
+
+def track_query(execute, sql, params, many, context):
+    """Database execute wrapper, installed on every connection by core.apps."""
+    tracker = _tracker.get()
+    if tracker is not None:
+        tracker.record(sql)
+    return execute(sql, params, many, context)
+
+
+def install_query_tracking(sender, connection, **kwargs):
+    """connection_created receiver."""
+    if track_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(track_query)
+
+
+@contextmanager
+def tracking():
+    """Track the queries run inside the block. Yields the QueryTracker."""
+    # Connections opened before core.apps connected the receiver (a test
+    # database, say) get the wrapper here
+    for connection in connections.all(initialized_only=True):
+        install_query_tracking(None, connection)
+    tracker = QueryTracker(parent=_tracker.get())
+    token = _tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _tracker.reset(token)
+
+
+@contextmanager
+def assert_max_queries(max_queries=None, threshold=None):
+    """
+    Fail with QueryBudgetExceeded if the block runs more than `max_queries`
+    queries or repeats one query shape `threshold` times. For serializers
+    and services that aren't reached through a view:
+
+        with assert_max_queries(3):
+            CommunityGroupListSerializer(groups, many=True, context=context).data
+    """
+    with tracking() as tracker:
+        yield tracker
+    problems = tracker.violations(max_queries, threshold)
+    if problems:
+        raise QueryBudgetExceeded('; '.join(problems))
+
+
+def budget_for(request):
+    """The query budget for the view that handled `request`, or None."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    func = match.func
+    view_class = getattr(func, 'cls', None) or getattr(func, 'view_class', None)
+    budget = getattr(func, 'query_budget', None)
+    if budget is None and view_class is not None:
+        budget = getattr(view_class, 'query_budget', None)
+    if budget is None:
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(match.view_name)
+    if isinstance(budget, dict):
+        budget = budget.get(request.method)
+    if budget is None:
+        budget = getattr(settings, 'QUERY_BUDGET_DEFAULT', None)
+    return budget
+
+
+def check_request(tracker, request, response):
+    """Log (and with QUERY_BUDGET_RAISE, raise) a tracked request's violations."""
+    response['X-Query-Count'] = str(tracker.count)
+    problems = tracker.violations(budget_for(request))
+    if not problems:
+        return
+    match = getattr(request, 'resolver_match', None)
+    view = match.view_name if match else request.path
+    message = f"Query budget exceeded for {request.method} {view}: " + '; '.join(problems)
+    if getattr(settings, 'QUERY_BUDGET_RAISE', False):
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
@@ -0,0 +1,40 @@
+"""
+Celery tasks for the core app.
+"""
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='core.tasks.purge_expired_idempotency_records')
+def purge_expired_idempotency_records():
+    """Delete persisted idempotent responses past IDEMPOTENCY_RECORD_TTL."""
+    from core.idempotency import purge_expired_records
+
+    deleted = purge_expired_records()
+    logger.info(f"Purged {deleted} expired idempotency records")
+    return deleted
+
+
+@shared_task(name='core.tasks.record_slow_request')
+def record_slow_request(sample):
+    """
+    Store a slow request sampled by core.metrics, with EXPLAIN plans for its
+    slowest SELECTs, and drop samples past SLOW_REQUEST_RETENTION_DAYS.
+    """
+    from datetime import timedelta
+
+    from django.conf import settings
+    from django.utils import timezone
+
+    from core.metrics import explain
+    from core.models import SlowRequestSample
+
+    for query in sample['queries']:
+        query['plan'] = explain(query['sql'])
+    SlowRequestSample.objects.create(**sample)
+
+    cutoff = timezone.now() - timedelta(days=getattr(settings, 'SLOW_REQUEST_RETENTION_DAYS', 7))
+    SlowRequestSample.objects.filter(created_at__lt=cutoff).delete()
+    logger.info(f"Recorded slow request sample for {sample['view_name']} ({sample['duration_ms']}ms)")
@@ -0,0 +1,57 @@
+"""
+Test helpers for query budgets (core/query_budget.py).
+
+QueryBudgetTestRunner is the project's TEST_RUNNER: it enables
+QueryBudgetMiddleware with QUERY_BUDGET_RAISE for the whole run, so any test
+that calls an endpoint through the test client fails when the view goes over
+its budget or repeats a query shape (an N+1). QueryBudgetMixin adds
+assertions for code tested without a request. requires_redis skips tests
+of Redis-backed state when no Redis server is reachable.
+"""
+from functools import lru_cache
+from unittest import skipUnless
+
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+from core.query_budget import assert_max_queries
+
+
+class QueryBudgetTestRunner(DiscoverRunner):
+    """DiscoverRunner that fails tests exceeding a view's query budget."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._query_budget_settings = override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_RAISE=True)
+        self._query_budget_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._query_budget_settings.disable()
+        super().teardown_test_environment(**kwargs)
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin:
+
+        with self.assertQueryBudget(3):
+            CommunityGroupListSerializer(groups, many=True, context=context).data
+    """
+
+    def assertQueryBudget(self, max_queries=None, threshold=None):
+        return assert_max_queries(max_queries, threshold)
+
+
+@lru_cache(maxsize=None)
+def redis_available():
+    try:
+        from django_redis import get_redis_connection
+
+        return bool(get_redis_connection("default").ping())
+    except Exception:
+        return False
+
+
+def requires_redis(test):
+    """Skip a test (or TestCase) unless the default cache is a reachable Redis."""
+    return skipUnless(redis_available(), 'Redis is not available')(test)
@@ -1,3 +1,299 @@
-from django.test import TestCase
+import json
+import logging
+import uuid
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.testing import ApplicationCommunicator
+from channels.db import database_sync_to_async
+from django.db import OperationalError, connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from account.models import UserModel
+from core import consumers
+from core.helpers.base64_s3 import kyc_photo_url, upload_kyc_photo
+from core.helpers.realtime import send_user_event
+from core.logging_handler import DatabaseLogHandler
+from core.metrics import Recorder, _numbered_placeholders, cache_key_prefix
+from core.models import ServerLog
+from core.query_budget import QueryBudgetExceeded, assert_max_queries, tracking
+from savings.models import SavingsGoalModel
+from wallet.models import Wallet
+
+
+class CacheKeyPrefixTests(SimpleTestCase):
+    def test_strips_identifiers(self):
+        cases = {
+            'dashboard_42': 'dashboard',
+            f'bvn_verification_{uuid.uuid4()}': 'bvn_verification',
+            f'nin_verification_{uuid.uuid4().hex}': 'nin_verification',
+            'auth_user:42:3': 'auth_user',
+            'notif:unread:42': 'notif:unread',
+            f'txlimit:{uuid.uuid4()}:d:20261019': 'txlimit',
+            'idempotency:7:v2-goal-fund:client-key': 'idempotency',
+        }
+        for key, prefix in cases.items():
+            with self.subTest(key=key):
+                self.assertEqual(cache_key_prefix(key), prefix)
+
+    def test_keeps_fixed_keys(self):
+        for key in ('psb9_auth_token', 'support_dashboard:metrics', 'circuit:psb9:open_until'):
+            with self.subTest(key=key):
+                self.assertEqual(cache_key_prefix(key), key)
+
+    def test_per_user_keys_share_one_label(self):
+        recorder = Recorder()
+        for user_id in range(50):
+            recorder.record_cache(f'dashboard_{user_id}', 1, 0)
+            recorder.record_cache(f'bvn_verification_{uuid.uuid4()}', 0, 1)
+
+        self.assertEqual(recorder.cache_counts, {'dashboard': [50, 0], 'bvn_verification': [0, 50]})
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(email='idempotency@example.com', password='pass1234')
+        self.wallet = Wallet.objects.create(user=self.user, balance=Decimal('10000.00'), account_number='1000000001')
+        self.first = SavingsGoalModel.objects.create(user=self.user, name='First', target_amount=5000)
+        self.second = SavingsGoalModel.objects.create(user=self.user, name='Second', target_amount=5000)
+        self.auth = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def _fund(self, goal, key, amount=100):
+        return self.client.post(
+            f'/api/v2/savings/goals/{goal.id}/fund',
+            json.dumps({'amount': amount}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=self.auth,
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def _balances(self):
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.wallet.refresh_from_db()
+        return self.first.amount, self.second.amount, self.wallet.balance
+
+    def test_retry_replays_without_funding_twice(self):
+        first = self._fund(self.first, 'fund-1')
+        retry = self._fund(self.first, 'fund-1')
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.content, first.content)
+        self.assertEqual(self._balances(), (Decimal('100.00'), Decimal('0.00'), Decimal('9900.00')))
+
+    def test_key_reused_with_a_different_body_is_rejected(self):
+        self._fund(self.first, 'fund-1')
+        response = self._fund(self.first, 'fund-1', amount=200)
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(self._balances(), (Decimal('100.00'), Decimal('0.00'), Decimal('9900.00')))
+
+    def test_key_reused_for_another_goal_is_rejected(self):
+        self._fund(self.first, 'fund-1')
+        response = self._fund(self.second, 'fund-1')
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(self._balances(), (Decimal('100.00'), Decimal('0.00'), Decimal('9900.00')))
+
+    def test_distinct_keys_both_run(self):
+        self._fund(self.first, 'fund-1')
+        self._fund(self.first, 'fund-2')
+
+        self.assertEqual(self._balances(), (Decimal('200.00'), Decimal('0.00'), Decimal('9800.00')))
+
+
+class HealthCheckTests(TestCase):
+    def test_db_check(self):
+        response = self.client.get('/health/db/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['database'], 'ok')
+
+    def test_db_failure_does_not_leak_connection_details(self):
+        error = OperationalError('connection to server at "db.internal" (10.0.0.5), port 5432 failed: user "gidi"')
+        with mock.patch.object(connection, 'cursor', side_effect=error), self.assertLogs('gidinest_backend.urls'):
+            response = self.client.get('/health/db/')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {'status': 'error', 'database': 'unavailable'})
+
+    def test_reports_pool_stats_when_pooling(self):
+        pool = mock.Mock(**{'get_stats.return_value': {'pool_size': 4, 'pool_available': 3}})
+        with mock.patch.object(connection, 'pool', pool, create=True):
+            response = self.client.get('/health/db/')
+
+        self.assertEqual(response.json()['pool'], {'pool_size': 4, 'pool_available': 3})
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}, SLOW_REQUEST_THRESHOLD=0,
+)
+class SlowRequestSampleTests(TestCase):
+    def test_sampled_queries_carry_no_parameter_values(self):
+        user = UserModel.objects.create_user(email='slow-sample@example.com', password='pass1234')
+
+        with mock.patch('core.tasks.record_slow_request.delay') as record:
+            self.client.get('/api/v1/account/profile', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+        statements = [query['sql'] for query in record.call_args.args[0]['queries']]
+        self.assertTrue(any('%s' in sql for sql in statements), statements)
+        for sql in statements:
+            self.assertNotIn(str(user.id).replace('-', ''), sql.replace('-', ''))
+
+    def test_placeholders_are_numbered_for_explain(self):
+        self.assertEqual(
+            _numbered_placeholders("SELECT 1 WHERE a = %s AND b LIKE '%%x' AND c IN (%s, %s)"),
+            ("SELECT 1 WHERE a = $1 AND b LIKE '%x' AND c IN ($2, $3)", 3),
+        )
+
+
+class QueryBudgetTests(TestCase):
+    def test_enclosing_budget_counts_nested_tracking(self):
+        # assert_max_queries() around a test client call sees the queries the
+        # middleware tracks for the request
+        with self.assertRaises(QueryBudgetExceeded):
+            with assert_max_queries(1), tracking():
+                UserModel.objects.count()
+                UserModel.objects.exists()
+
+    def test_repeated_shape_is_reported(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'possible N+1: 5x'):
+            with assert_max_queries(threshold=5):
+                for i in range(5):
+                    UserModel.objects.filter(email=f'user{i}@example.com').exists()
+
+
+@mock.patch('core.helpers.base64_s3.config', return_value='kyc-bucket')
+@mock.patch('core.helpers.base64_s3.boto3')
+class KYCPhotoTests(SimpleTestCase):
+    # A 1x1 PNG, as Prembly returns photos: bare base64
+    PHOTO = 'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII='
+
+    def test_upload_stores_a_private_reference(self, boto3, config):
+        reference = upload_kyc_photo(self.PHOTO)
+
+        self.assertRegex(reference, r'^s3://kyc-bucket/kyc/[\w-]+\.png$')
+        _, bucket, key = boto3.client.return_value.upload_fileobj.call_args.args
+        self.assertEqual(f's3://{bucket}/{key}', reference)
+        self.assertEqual(
+            boto3.client.return_value.upload_fileobj.call_args.kwargs, {'ExtraArgs': {'ServerSideEncryption': 'AES256'}},
+        )
+
+    def test_failed_upload_keeps_the_payload(self, boto3, config):
+        boto3.client.return_value.upload_fileobj.side_effect = RuntimeError('S3 down')
+
+        with self.assertLogs('core.helpers.base64_s3'):
+            self.assertEqual(upload_kyc_photo(self.PHOTO), self.PHOTO)
+
+    def test_only_references_are_presigned(self, boto3, config):
+        boto3.client.return_value.generate_presigned_url.return_value = 'https://signed.example.com/a.png'
+
+        self.assertEqual(kyc_photo_url('s3://kyc-bucket/kyc/a.png'), 'https://signed.example.com/a.png')
+        self.assertEqual(kyc_photo_url('https://cdn.example.com/avatar.png'), 'https://cdn.example.com/avatar.png')
+        self.assertIsNone(kyc_photo_url(None))
+
+
+class DatabaseLogHandlerTests(TransactionTestCase):
+    def setUp(self):
+        self.logger = logging.getLogger('core.tests.database_log')
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        handler = DatabaseLogHandler()
+        self.logger.addHandler(handler)
+        self.addCleanup(self.logger.removeHandler, handler)
+
+    def test_logging_inside_atomic_keeps_the_transaction(self):
+        # (SQLite ignores close() on the in-memory test database, so watch for it)
+        with mock.patch.object(connection, 'close', wraps=connection.close) as close, transaction.atomic():
+            UserModel.objects.create_user(email='before-log@example.com', password='pass1234')
+            self.logger.info('Deposit processed successfully')
+            UserModel.objects.create_user(email='after-log@example.com', password='pass1234')
+
+        close.assert_not_called()
+
+        self.assertEqual(
+            set(UserModel.objects.values_list('email', flat=True)), {'before-log@example.com', 'after-log@example.com'},
+        )
+        self.assertTrue(ServerLog.objects.filter(message='Deposit processed successfully').exists())
+
+
+@override_settings(
+    REALTIME_EVENTS=True,
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+)
+class UserEventsConsumerTests(TransactionTestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(email='events@example.com', password='pass1234')
+        self.token = AccessToken.for_user(self.user)
+
+    def _communicator(self, query='', headers=()):
+        # channels.testing imports daphne, which isn't a dependency; drive the ASGI app directly
+        scope = {
+            'type': 'websocket', 'path': '/ws/v2/events/', 'query_string': query.encode(),
+            'headers': list(headers), 'subprotocols': [],
+        }
+        return ApplicationCommunicator(consumers.UserEventsConsumer.as_asgi(), scope)
+
+    async def _handshake(self, communicator):
+        await communicator.send_input({'type': 'websocket.connect'})
+        return await communicator.receive_output()
+
+    async def _receive_json(self, communicator):
+        message = await communicator.receive_output()
+        self.assertEqual(message['type'], 'websocket.send')
+        return json.loads(message['text'])
+
+    async def _connect(self, communicator):
+        self.assertEqual((await self._handshake(communicator))['type'], 'websocket.accept')
+        self.assertEqual(await self._receive_json(communicator), {'event': 'connected', 'data': {}})
+
+    async def _disconnect(self, communicator):
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait()
+
+    async def test_rejects_connections_without_a_valid_token(self):
+        for communicator in (self._communicator(), self._communicator('token=not-a-jwt')):
+            self.assertEqual(await self._handshake(communicator), {'type': 'websocket.close', 'code': 4401})
+
+    async def test_rejects_inactive_users(self):
+        await UserModel.objects.filter(pk=self.user.pk).aupdate(is_active=False)
+
+        message = await self._handshake(self._communicator(f'token={self.token}'))
+
+        self.assertEqual(message, {'type': 'websocket.close', 'code': 4401})
+
+    async def test_header_token_receives_the_users_events(self):
+        communicator = self._communicator(headers=[(b'authorization', f'Bearer {self.token}'.encode())])
+        await self._connect(communicator)
+
+        await database_sync_to_async(send_user_event)(self.user.pk, 'wallet.transaction', {'balance': Decimal('50.00')})
+        await database_sync_to_async(send_user_event)(uuid.uuid4(), 'wallet.transaction', {'balance': '1.00'})
+
+        self.assertEqual(
+            await self._receive_json(communicator),
+            {'event': 'wallet.transaction', 'data': {'balance': '50.00'}},
+        )
+        self.assertTrue(await communicator.receive_nothing())
+        await self._disconnect(communicator)
+
+    async def test_answers_pings(self):
+        communicator = self._communicator(f'token={self.token}')
+        await self._connect(communicator)
+
+        await communicator.send_input({'type': 'websocket.receive', 'text': json.dumps({'type': 'ping'})})
+
+        self.assertEqual(await self._receive_json(communicator), {'event': 'pong', 'data': {}})
+        await self._disconnect(communicator)
+
+    async def test_closes_once_the_token_expires(self):
+        communicator = self._communicator(f'token={self.token}')
+        await self._connect(communicator)
+
+        with mock.patch.object(consumers.time, 'time', return_value=self.token['exp'] + 1):
+            await database_sync_to_async(send_user_event)(self.user.pk, 'notification.created', {'title': 'Hi'})
+            self.assertEqual(await communicator.receive_output(), {'type': 'websocket.close', 'code': 4401})
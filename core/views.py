@@ -0,0 +1,20 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+from core import metrics
+
+
+def prometheus_metrics(request):
+    """
+    Prometheus scrape endpoint. Requires `Authorization: Bearer <METRICS_TOKEN>`;
+    returns 404 when METRICS_TOKEN is not configured.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        raise Http404
+    header = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(header.encode(), f'Bearer {token}'.encode()):
+        return HttpResponse(status=401)
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
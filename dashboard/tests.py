@@ -0,0 +1,42 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from account.models import UserModel
+from core.testing import QueryBudgetMixin
+from savings.models import SavingsGoalModel, SavingsGoalTransaction
+from wallet.models import Wallet, WalletTransaction
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class DashboardQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserModel.objects.create_user(
+            email='dashboard@example.com', password='pass1234', first_name='Ada', last_name='Obi',
+        )
+        wallet = Wallet.objects.create(user=self.user, balance=Decimal('5000.00'), account_number='1000000006')
+        SavingsGoalModel.objects.filter(user=self.user).delete()
+        for i in range(6):
+            goal = SavingsGoalModel.objects.create(
+                user=self.user, name=f'Goal {i}', target_amount=1000, amount=Decimal('250.00'),
+            )
+            SavingsGoalTransaction.objects.create(
+                goal=goal, transaction_type='contribution', amount=Decimal('250.00'), goal_current_amount=Decimal('250.00'),
+            )
+            WalletTransaction.objects.create(
+                wallet=wallet, transaction_type='credit', amount=Decimal('1000.00'), external_reference=f'DEP-{i}',
+            )
+        self.auth = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def test_dashboard(self):
+        with self.assertQueryBudget(8):
+            response = self.client.get('/api/v2/dashboard/', HTTP_AUTHORIZATION=self.auth)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['data']
+        self.assertEqual(data['quick_stats']['active_goals'], 6)
+        self.assertEqual(len(data['savings_goals']), 6)
+        self.assertEqual(len(data['recent_transactions']), 5)
@@ -6,6 +6,7 @@ This module sets up Celery for async task processing and periodic tasks.
 import os
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import task_postrun, task_prerun
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gidinest_backend.settings')
@@ -32,9 +33,9 @@ app.conf.beat_schedule = {
         # crontab(minute=0, hour=2)      # Daily at 2 AM
         # crontab(minute=0, hour='*/12') # Every 12 hours
     },
-    'unlock-matured-savings-goals-daily': {
+    'unlock-matured-savings-goals-hourly': {
         'task': 'savings.tasks.unlock_matured_goals',
-        'schedule': crontab(minute=0, hour=0),  # Run daily at midnight UTC
+        'schedule': crontab(minute=5),  # Run every hour at :05
     },
     'calculate-savings-interest-daily': {
         'task': 'savings.tasks.calculate_interest_for_goals',
@@ -44,12 +45,53 @@ app.conf.beat_schedule = {
         'task': 'account.tasks.nudge_users_without_wallet',
         'schedule': crontab(minute=0),  # Run every hour at :00
     },
+    'reconcile-transaction-limit-counters-nightly': {
+        'task': 'wallet.tasks.reconcile_limit_counters',
+        'schedule': crontab(minute=15, hour=1),  # Run daily at 1:15 AM UTC
+    },
+    'refresh-support-metrics-every-minute': {
+        'task': 'account.tasks.refresh_support_metrics',
+        'schedule': crontab(),  # Every minute
+    },
+    'sync-provider-transaction-history-every-30-minutes': {
+        'task': 'wallet.tasks.sync_stale_provider_histories',
+        'schedule': crontab(minute='*/30'),
+    },
+    'reconcile-unread-notification-counters-every-15-minutes': {
+        'task': 'notification.tasks.reconcile_unread_counters',
+        'schedule': crontab(minute='*/15'),
+    },
+    'purge-expired-idempotency-records-daily': {
+        'task': 'core.tasks.purge_expired_idempotency_records',
+        'schedule': crontab(minute=45, hour=1),  # Run daily at 1:45 AM UTC
+    },
 }
 
 # Optional: Configure timezone for scheduled tasks
 app.conf.timezone = 'UTC'
 
 
+# Task durations for the /metrics endpoint (core/metrics.py)
+_task_recorders = {}
+
+
+@task_prerun.connect
+def start_task_metrics(task_id=None, **kwargs):
+    from core import metrics
+    _task_recorders[task_id] = metrics.start()
+
+
+@task_postrun.connect
+def finish_task_metrics(task_id=None, task=None, state=None, **kwargs):
+    from core import metrics
+    started = _task_recorders.pop(task_id, None)
+    if started is None:
+        return
+    recorder, token = started
+    metrics.stop(token)
+    metrics.finish_task(recorder, task.name, state)
+
+
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
     """Debug task to test Celery setup"""
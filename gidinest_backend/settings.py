@@ -14,6 +14,8 @@ from datetime import timedelta
 from pathlib import Path
 import os
 
+from kombu import Queue
+
 from gidinest_backend.secrets_loader import secrets
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -56,8 +58,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',  # first, so timings cover the whole stack
+    'core.middleware.QueryBudgetMiddleware',  # dev/test only, see QUERY_BUDGET_ENABLED
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.AsyncWhiteNoiseMiddleware',  # WhiteNoise, async capable for ASGI
     'django.contrib.sessions.middleware.SessionMiddleware',
      'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -86,6 +90,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'gidinest_backend.wsgi.application'
+ASGI_APPLICATION = 'gidinest_backend.asgi.application'
 
 
 # Database
@@ -106,12 +111,44 @@ DATABASES = {
         "USER": secrets["DB_USER"],
         "PASSWORD": secrets["DB_PASSWORD"],
         "HOST": secrets["DB_HOST"],
-        "PORT": "5432",
+        "PORT": secrets.get("DB_PORT", "5432"),
+        # Reuse connections across requests/tasks instead of a new SSL handshake each time
+        "CONN_MAX_AGE": int(secrets.get("DB_CONN_MAX_AGE", "60")),
+        # Verify a reused connection is still alive before handing it out
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {},
     }
 }
 
 if not DEBUG:
-    DATABASES["default"]["OPTIONS"] = {"sslmode": "require"}
+    DATABASES["default"]["OPTIONS"]["sslmode"] = "require"
+
+# Connection management (DB_POOL_MODE):
+#   persistent  one reused connection per thread, kept for CONN_MAX_AGE (default;
+#               under the asgi gunicorn profile, one connection per request)
+#   pool        psycopg 3 connection pool per process. Size it to the process's
+#               concurrency: gunicorn threads per web process, 1-2 per Celery child.
+#   pgbouncer   DB_HOST/DB_PORT point at PgBouncer in transaction pooling mode
+DB_POOL_MODE = secrets.get("DB_POOL_MODE", "persistent")
+
+if DB_POOL_MODE == "pool":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0  # the pool owns connection lifetime
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(secrets.get("DB_POOL_MIN_SIZE", "2")),
+        # gunicorn.conf.py threads per process, plus headroom for background threads
+        "max_size": int(secrets.get("DB_POOL_MAX_SIZE", str(int(os.environ.get("GUNICORN_THREADS", "8")) + 2))),
+        "timeout": int(secrets.get("DB_POOL_TIMEOUT", "10")),
+        "max_idle": 300,
+        "max_lifetime": 1800,
+    }
+elif DB_POOL_MODE == "pgbouncer":
+    # Transaction pooling can't keep a server-side cursor across statements
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+elif os.environ.get("GUNICORN_PROFILE") == "asgi":
+    # Under ASGI each request's sync code may run on a different thread, so
+    # persistent per-thread connections pile up instead of being reused
+    # (Django's ASGI deployment notes). Use DB_POOL_MODE=pool for reuse.
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
 
 
 # Password validation
@@ -223,7 +260,7 @@ CORS_PREFLIGHT_MAX_AGE = 86400  # Cache preflight requests for 24 hours
 REST_FRAMEWORK = {
 
     'DEFAULT_AUTHENTICATION_CLASSES': (
-         'rest_framework_simplejwt.authentication.JWTAuthentication',
+         'account.authentication.GidiJWTAuthentication',
     ),
 
     'DEFAULT_PERMISSION_CLASSES': (
@@ -267,6 +304,124 @@ SIMPLE_JWT = {
     'JTI_CLAIM': 'jti',
 }
 
+# Seconds an authenticated user stays cached (invalidated on save/delete)
+AUTH_USER_CACHE_TTL = 60
+
+# Idempotency-Key handling for financial POSTs (core/idempotency.py).
+# Stored responses are replayed for IDEMPOTENCY_TTL seconds (routes registered
+# with persist=True also keep a database copy for IDEMPOTENCY_RECORD_TTL). A
+# request's reservation lease outlives the gunicorn timeout; a duplicate waits
+# up to IDEMPOTENCY_WAIT_SECONDS for the original before getting a 409.
+IDEMPOTENCY_TTL = 3600
+IDEMPOTENCY_RECORD_TTL = 24 * 60 * 60
+IDEMPOTENCY_LEASE_SECONDS = 120
+IDEMPOTENCY_WAIT_SECONDS = 5
+
+# Performance instrumentation (core/metrics.py). /metrics serves Prometheus
+# text format to scrapers presenting METRICS_TOKEN as a bearer token (disabled
+# when unset). Requests slower than SLOW_REQUEST_THRESHOLD seconds are sampled
+# with their slowest queries' EXPLAIN plans, at most once per view per
+# SLOW_REQUEST_SAMPLE_INTERVAL seconds.
+METRICS_TOKEN = secrets.get("METRICS_TOKEN", "")
+SLOW_REQUEST_THRESHOLD = float(secrets.get("SLOW_REQUEST_THRESHOLD", "1.0"))
+SLOW_REQUEST_SAMPLE_INTERVAL = 300
+SLOW_REQUEST_QUERY_SLOTS = 5
+SLOW_REQUEST_RETENTION_DAYS = 7
+
+# Query budgets and N+1 detection (core/query_budget.py), on in development
+# and under core.testing.QueryBudgetTestRunner. Views declare their budget
+# with @query_budget(n); QUERY_BUDGETS sets one by URL name without touching
+# the view, and QUERY_BUDGET_DEFAULT covers the rest. Any query shape repeated
+# QUERY_BUDGET_REPEAT_THRESHOLD times in one request is reported as an N+1.
+# With QUERY_BUDGET_RAISE violations raise instead of logging a warning.
+QUERY_BUDGET_ENABLED = secrets.get("QUERY_BUDGET_ENABLED", str(DEBUG)).lower() in ("true", "1", "yes")
+QUERY_BUDGET_RAISE = False
+QUERY_BUDGET_DEFAULT = 30
+QUERY_BUDGET_REPEAT_THRESHOLD = 5
+QUERY_BUDGETS = {}
+TEST_RUNNER = 'core.testing.QueryBudgetTestRunner'
+
+# Local provider simulator (providers/simulator/, run_provider_simulator).
+# When set, every provider call is sent to the simulator instead of the real
+# provider. Development and load testing only: ignored unless DEBUG is on.
+PROVIDER_SIMULATOR_URL = secrets.get("PROVIDER_SIMULATOR_URL", "")
+
+# Provider balance shadow (wallet/balance_shadow.py): refresh the stored 9PSB
+# balance after this many seconds, and alert when it differs from the ledger
+# by more than the threshold (NGN)
+PROVIDER_BALANCE_TTL = 300
+BALANCE_DRIFT_THRESHOLD = '1.00'
+
+# Local mirror of 9PSB transaction history (wallet/provider_history.py):
+# re-sync a wallet's mirror after this many seconds, re-fetch this much
+# history before the watermark, backfill this many days on first sync, and
+# sweep at most this many wallets per periodic run
+PROVIDER_HISTORY_SYNC_INTERVAL = 600
+PROVIDER_HISTORY_SYNC_OVERLAP = 24 * 60 * 60
+PROVIDER_HISTORY_BACKFILL_DAYS = 365
+PROVIDER_HISTORY_SYNC_BATCH = 500
+
+# Bulk wallet provisioning from the user admin (account/services/wallet_provisioning.py):
+# users per task chunk, concurrent provider calls and users started per second.
+# Calls go through the providers' bulk bulkheads (PROVIDER_RESILIENCE); more
+# threads than bulk_max_concurrent would only fail the extra calls.
+WALLET_PROVISIONING_CHUNK_SIZE = 100
+WALLET_PROVISIONING_CONCURRENCY = 2
+WALLET_PROVISIONING_RATE = 5
+
+# Nightly savings interest accrual (savings/interest.py): goals per batch,
+# each batch being one ledger bulk_create and one UPDATE in a transaction
+SAVINGS_INTEREST_BATCH_SIZE = 5000
+
+# Hourly unlock of matured savings goals (savings/maturity.py): goals flipped
+# per UPDATE ... RETURNING statement. Only goals that matured within the
+# notify window get a "goal unlocked" notification; older ones (e.g. the
+# backlog on the first run) are unlocked silently.
+SAVINGS_UNLOCK_BATCH_SIZE = 5000
+SAVINGS_UNLOCK_NOTIFY_WINDOW = 24 * 60 * 60
+
+# Support dashboard metrics snapshot (account/services/support_metrics.py),
+# refreshed every minute by beat; expires after this many seconds if beat stops
+SUPPORT_METRICS_TTL = 300
+
+# Redis unread notification counters (notification/counters.py). Counters
+# expire after a day of inactivity; broadcast counts are cached briefly since
+# broadcast visibility changes with time. Every 15 minutes beat rebuilds the
+# counters of users whose notifications changed within the reconcile window.
+NOTIFICATION_UNREAD_TTL = 24 * 60 * 60
+NOTIFICATION_BROADCAST_COUNT_TTL = 60
+NOTIFICATION_UNREAD_RECONCILE_WINDOW = 60 * 60
+
+# Serve provider-bound endpoints (bank lists, name enquiry, KYC verify, 9PSB
+# balance/history) with native async views. Enable only under an ASGI server.
+ASYNC_PROVIDER_VIEWS = secrets.get("ASYNC_PROVIDER_VIEWS", "False").lower() in ("true", "1", "yes")
+
+# Per-user real-time event stream (core/consumers.py, /ws/v2/events/): wallet
+# transactions, withdrawal status, new notifications and goal milestones are
+# published to the user's channel group. Needs the ASGI profile to serve the
+# socket; with it off, publishing is skipped entirely.
+REALTIME_EVENTS = secrets.get("REALTIME_EVENTS", "False").lower() in ("true", "1", "yes")
+
+# Circuit breaker / bulkhead policy for outbound provider calls
+# (providers/helpers/resilience.py). Per-provider keys override 'default'.
+# Limits are cluster-wide. max_concurrent is for user-facing calls;
+# bulk_max_concurrent caps calls made inside bulk_calls() (lifecycle
+# campaigns, bulk wallet provisioning) in a separate bulkhead.
+PROVIDER_RESILIENCE = {
+    'default': {
+        'failure_threshold': 5,
+        'failure_window': 60,
+        'recovery_timeout': 30,
+        'max_concurrent': 4,
+        'bulk_max_concurrent': 2,
+        'connect_timeout': 5,
+    },
+    'psb9': {'max_concurrent': 6},
+    # OTP and verification mail from every web worker; campaigns send at
+    # LifecycleCampaign.rate_per_second from max_workers threads
+    'zeptomail': {'max_concurrent': 8, 'bulk_max_concurrent': 4},
+}
+
 
 # drf-spectacular OpenAPI settings
 SPECTACULAR_SETTINGS = {
@@ -456,6 +611,29 @@ CELERY_TASK_SOFT_TIME_LIMIT = 25 * 60  # Soft limit at 25 minutes
 CELERY_WORKER_PREFETCH_MULTIPLIER = 1
 CELERY_WORKER_MAX_TASKS_PER_CHILD = 1000
 
+# Queues: keep slow batch jobs from delaying user-facing work. Workers started
+# without -Q consume all of them; supervisord.conf runs one worker per group.
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_QUEUES = (
+    Queue('default'),
+    Queue('webhooks'),
+    Queue('notifications'),
+    Queue('reconciliation'),
+    # The default queue before it was renamed 'default'. Still consumed so
+    # tasks queued by the previous release run; drop it once it stays empty.
+    Queue('celery'),
+)
+CELERY_TASK_ROUTES = {
+    '*.tasks.*webhook*': {'queue': 'webhooks'},
+    'account.tasks.nudge_users_without_wallet': {'queue': 'notifications'},
+    'account.tasks.sync_embedly_verifications_task': {'queue': 'reconciliation'},
+    'account.tasks.sync_users_by_emails_task': {'queue': 'reconciliation'},
+    'wallet.tasks.reconcile_limit_counters': {'queue': 'reconciliation'},
+    'wallet.tasks.sync_stale_provider_histories': {'queue': 'reconciliation'},
+    'savings.tasks.notify_goals_unlocked': {'queue': 'notifications'},
+    'savings.tasks.*': {'queue': 'reconciliation'},
+}
+
 # Beat scheduler settings (for periodic tasks)
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
 
@@ -465,12 +643,24 @@ CACHES = {
         'BACKEND': 'django_redis.cache.RedisCache',
         'LOCATION': secrets.get("REDIS_URL", "redis://localhost:6379/1"),
         'OPTIONS': {
-            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            # DefaultClient that counts hits/misses for the /metrics endpoint
+            'CLIENT_CLASS': 'core.metrics.InstrumentedRedisClient',
         },
         'TIMEOUT': 300,
     }
 }
 
+# Channel layer for the real-time event stream. Pub/sub fan-out only: events
+# are not buffered for users who aren't connected (clients refetch on reconnect).
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels_redis.pubsub.RedisPubSubChannelLayer',
+        'CONFIG': {
+            'hosts': [secrets.get("CHANNEL_REDIS_URL", secrets.get("REDIS_URL", "redis://localhost:6379/1"))],
+        },
+    }
+}
+
 # Django Ratelimit Configuration
 RATELIMIT_USE_CACHE = 'default'
 
@@ -14,18 +14,42 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import logging
+
 from django.contrib import admin
+from django.db import connection
 from django.http import JsonResponse
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 from account.admin_views import support_dashboard
+from core.views import prometheus_metrics
 from gifting.views import PaystackWebhookAPIView
 
 
+logger = logging.getLogger(__name__)
+
+
 def health(request):
     return JsonResponse({"status": "ok"})
 
 
+def health_db(request):
+    """Readiness check: round-trip to Postgres, plus pool stats when pooling is enabled."""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    except Exception as e:
+        # The driver's message names the host, port, database and user
+        logger.error(f"Database health check failed: {e}")
+        return JsonResponse({"status": "error", "database": "unavailable"}, status=503)
+
+    data = {"status": "ok", "database": "ok"}
+    pool = getattr(connection, "pool", None)
+    if pool is not None:
+        data["pool"] = pool.get_stats()
+    return JsonResponse(data)
+
+
 admin.site.site_header = "Gidinest Internal Admin"
 admin.site.site_title = "Gidinest Admin Portal"
 admin.site.index_title = "Welcome to Gidinest Admin"
@@ -33,6 +57,8 @@ admin.site.index_title = "Welcome to Gidinest Admin"
 
 urlpatterns = [
     path('health/', health),
+    path('health/db/', health_db),
+    path('metrics', prometheus_metrics, name='metrics'),
     path('internal-admin/', admin.site.urls),
     path('internal-admin/support-dashboard/', support_dashboard, name='support_dashboard'),
 
@@ -0,0 +1,52 @@
+"""
+Gunicorn runtime profile for GidiNest backend.
+
+Loaded automatically by `gunicorn` from the working directory. Most API
+requests spend their time waiting on a bank or KYC provider, not on CPU, so
+the default profile runs a few processes with many threads each instead of
+a couple of sync workers.
+
+Profiles (GUNICORN_PROFILE):
+    gthread (default)  WSGI, WEB_CONCURRENCY processes x GUNICORN_THREADS threads
+    asgi               uvicorn workers serving gidinest_backend.asgi; pair with
+                       ASYNC_PROVIDER_VIEWS=true so provider calls are awaited,
+                       and REALTIME_EVENTS=true to serve the /ws/v2/events/ stream
+    sync               the previous behaviour, for comparison in load tests
+
+Pick the numbers with `python manage.py loadtest` against a staging instance;
+workers x threads should stay below the DB pool/connection budget.
+"""
+import multiprocessing
+import os
+
+profile = os.environ.get("GUNICORN_PROFILE", "gthread")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+
+# One process per core is enough when threads absorb the I/O wait
+workers = int(os.environ.get("WEB_CONCURRENCY", max(2, multiprocessing.cpu_count())))
+
+# The app is chosen here rather than on the command line so the profile can switch it
+if profile == "asgi":
+    wsgi_app = "gidinest_backend.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+elif profile == "sync":
+    wsgi_app = "gidinest_backend.wsgi:application"
+    worker_class = "sync"
+else:
+    wsgi_app = "gidinest_backend.wsgi:application"
+    worker_class = "gthread"
+    threads = int(os.environ.get("GUNICORN_THREADS", 8))
+
+# Provider calls time out after at most 60s; leave headroom before killing a worker
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 90))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers periodically to contain slow memory growth
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = 200
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
@@ -3,7 +3,8 @@ from django.utils.html import format_html
 from django.utils import timezone
 from django import forms
 from django.contrib import messages
-from .models import Notification
+from .counters import invalidate_unread
+from .models import BroadcastNotification, Notification
 
 
 class NotificationAdminForm(forms.ModelForm):
@@ -11,7 +12,8 @@ class NotificationAdminForm(forms.ModelForm):
     send_to_all = forms.BooleanField(
         required=False,
         initial=False,
-        help_text="✅ Check this to send notification to ALL active users (user field will be ignored)"
+        help_text="✅ Check this to send notification to ALL active users (user field will be ignored). "
+                  "For targeted announcements use Broadcast Notifications."
     )
 
     class Meta:
@@ -98,38 +100,20 @@ class NotificationAdmin(admin.ModelAdmin):
         send_to_all = form.cleaned_data.get('send_to_all', False)
 
         if send_to_all and not change:  # Only for new notifications
-            # Import here to avoid circular dependency
-            from account.models import UserModel
-
-            # Get all active users
-            users = UserModel.objects.filter(is_active=True)
-            total_users = users.count()
-
-            if total_users == 0:
-                self.message_user(request, '❌ No active users found!', level=messages.ERROR)
-                return
-
-            # Create notification for each user
-            notifications = []
-            for user in users:
-                notifications.append(
-                    Notification(
-                        user=user,
-                        title=obj.title,
-                        message=obj.message,
-                        notification_type=obj.notification_type,
-                        data=obj.data or {},
-                        action_url=obj.action_url
-                    )
-                )
-
-            # Bulk create for efficiency
-            Notification.objects.bulk_create(notifications)
+            # Stored once and merged into every user's notifications at read time
+            broadcast = BroadcastNotification.objects.create(
+                title=obj.title,
+                message=obj.message,
+                notification_type=obj.notification_type,
+                data=obj.data or {},
+                action_url=obj.action_url,
+                created_by=request.user,
+            )
 
             # Show success message
             self.message_user(
                 request,
-                f"✅ Successfully broadcast notification to {total_users} users!"
+                f"✅ Broadcast \"{broadcast.title}\" published to all active users!"
             )
         else:
             # Normal save for individual notification
@@ -158,56 +142,90 @@ class NotificationAdmin(admin.ModelAdmin):
 
     def mark_as_read(self, request, queryset):
         """Mark selected notifications as read"""
-        updated = queryset.filter(is_read=False).update(
+        queryset = queryset.filter(is_read=False)
+        user_ids = set(queryset.values_list('user_id', flat=True))
+        updated = queryset.update(
             is_read=True,
             read_at=timezone.now()
         )
+        invalidate_unread(user_ids)
         self.message_user(request, f'{updated} notification(s) marked as read.')
     mark_as_read.short_description = 'Mark selected as read'
 
     def mark_as_unread(self, request, queryset):
         """Mark selected notifications as unread"""
-        updated = queryset.filter(is_read=True).update(
+        queryset = queryset.filter(is_read=True)
+        user_ids = set(queryset.values_list('user_id', flat=True))
+        updated = queryset.update(
             is_read=False,
             read_at=None
         )
+        invalidate_unread(user_ids)
         self.message_user(request, f'{updated} notification(s) marked as unread.')
     mark_as_unread.short_description = 'Mark selected as unread'
 
     def send_general_notification(self, request, queryset):
-        """Send a general notification to all users (creates individual notifications)"""
-        from account.models import UserModel
-        
+        """Send a general notification to all users (as a single broadcast)"""
         # Get notification details from first selected notification
         if queryset.count() != 1:
             self.message_user(request, 'Please select exactly one notification to use as template.', level=messages.ERROR)
             return
-        
+
         template_notification = queryset.first()
-        
-        # Get all active users
-        users = UserModel.objects.filter(is_active=True)
-        count = users.count()
-        
-        if count == 0:
-            self.message_user(request, 'No active users found.', level=messages.ERROR)
-            return
-        
-        # Create notifications for all users
-        notifications = []
-        for user in users:
-            notifications.append(
-                Notification(
-                    user=user,
-                    title=template_notification.title,
-                    message=template_notification.message,
-                    notification_type=template_notification.notification_type,
-                    action_url=template_notification.action_url,
-                    data=template_notification.data or {}
-                )
-            )
-        
-        # Bulk create
-        Notification.objects.bulk_create(notifications)
-        self.message_user(request, f'General notification sent to {count} user(s).')
+
+        BroadcastNotification.objects.create(
+            title=template_notification.title,
+            message=template_notification.message,
+            notification_type=template_notification.notification_type,
+            action_url=template_notification.action_url,
+            data=template_notification.data or {},
+            created_by=request.user,
+        )
+        self.message_user(request, 'General notification broadcast to all active users.')
     send_general_notification.short_description = 'Send as general notification to all users'
+
+
+@admin.register(BroadcastNotification)
+class BroadcastNotificationAdmin(admin.ModelAdmin):
+    list_display = ('title', 'segment', 'segment_value', 'is_active', 'published_at', 'expires_at', 'read_count')
+    list_filter = ('segment', 'is_active', 'notification_type', 'published_at')
+    search_fields = ('title', 'message')
+    readonly_fields = ('created_by', 'created_at', 'updated_at', 'read_count')
+    ordering = ('-published_at',)
+    date_hierarchy = 'published_at'
+
+    fieldsets = (
+        ('📝 Notification Content', {
+            'fields': ('title', 'message', 'notification_type', 'action_url')
+        }),
+        ('🎯 Audience', {
+            'fields': ('segment', 'segment_value'),
+            'description': 'Who sees this broadcast. Users who sign up after it is published do not see it.'
+        }),
+        ('🕐 Visibility', {
+            'fields': ('is_active', 'published_at', 'expires_at')
+        }),
+        ('🔧 Metadata', {
+            'fields': ('data',),
+            'classes': ('collapse',),
+        }),
+        ('📊 Stats', {
+            'fields': ('read_count', 'created_by', 'created_at', 'updated_at'),
+            'classes': ('collapse',)
+        }),
+    )
+
+    def get_queryset(self, request):
+        from django.db.models import Count, Q
+        return super().get_queryset(request).annotate(
+            reads=Count('receipts', filter=Q(receipts__read_at__isnull=False))
+        )
+
+    def read_count(self, obj):
+        return obj.reads
+    read_count.short_description = 'Reads'
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
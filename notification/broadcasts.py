@@ -0,0 +1,166 @@
+# notification/broadcasts.py
+"""
+Fan-out-on-read for broadcast notifications.
+
+An announcement is one BroadcastNotification row instead of one
+Notification row per user. The notification endpoints merge the broadcasts
+visible to the requesting user into their list and unread count at read
+time; a BroadcastReceipt is only written when the user reads or deletes one.
+"""
+import uuid
+
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
+
+from core.helpers.cursor import before_cursor_q, decode_cursor, encode_cursor
+
+from .counters import invalidate_broadcast_unread
+from .models import BroadcastNotification, BroadcastReceipt, Notification
+
+# Columns shared by both sides of the merged feed; `read` is an annotation on
+# both sides so the column order matches in the UNION
+FEED_FIELDS = ('id', 'title', 'message', 'notification_type', 'created_at', 'read')
+
+
+def _segment_q(user):
+    segments = Q(segment='all')
+    segments |= Q(segment='verified') if user.is_verified else Q(segment='unverified')
+    segments |= Q(segment='with_wallet') if user.has_virtual_wallet else Q(segment='without_wallet')
+    if user.account_tier:
+        segments |= Q(segment='tier', segment_value=user.account_tier)
+    return segments
+
+
+def visible_broadcasts(user, now=None):
+    """Live broadcasts targeted at the user that they haven't deleted."""
+    now = now or timezone.now()
+    return (
+        BroadcastNotification.objects
+        .filter(is_active=True, published_at__lte=now, published_at__gte=user.created_at)
+        .filter(Q(expires_at__isnull=True) | Q(expires_at__gt=now))
+        .filter(_segment_q(user))
+        .exclude(Exists(
+            BroadcastReceipt.objects.filter(broadcast=OuterRef('pk'), user=user, dismissed_at__isnull=False)
+        ))
+    )
+
+
+def _read_receipt(user):
+    return BroadcastReceipt.objects.filter(broadcast=OuterRef('pk'), user=user, read_at__isnull=False)
+
+
+def notification_feed(user, is_read=None, cursor=None):
+    """
+    The user's notifications and visible broadcasts as one queryset of
+    dicts (FEED_FIELDS), newest first. `cursor` (see core.helpers.cursor)
+    restricts both sides to rows after the previous page, so paging needs
+    neither an OFFSET nor a COUNT.
+
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    direct = Notification.objects.filter(user=user).annotate(read=F('is_read'))
+    broadcasts = visible_broadcasts(user).annotate(read=Exists(_read_receipt(user)))
+    if is_read is not None:
+        direct = direct.filter(is_read=is_read)
+        broadcasts = broadcasts.filter(read=is_read)
+    if cursor:
+        cursor_at, cursor_pk = decode_cursor(cursor)
+        cursor_pk = uuid.UUID(cursor_pk)
+        direct = direct.filter(before_cursor_q('created_at', cursor_at, cursor_pk))
+        broadcasts = broadcasts.filter(before_cursor_q('published_at', cursor_at, cursor_pk))
+
+    return (
+        direct.order_by().values(*FEED_FIELDS)
+        .union(
+            broadcasts.order_by().values('id', 'title', 'message', 'notification_type', 'published_at', 'read'),
+            all=True,
+        )
+        .order_by('-created_at', '-id')
+    )
+
+
+def feed_page(user, is_read=None, cursor=None, limit=20):
+    """
+    Returns:
+        tuple: (list of feed rows, next cursor or None)
+
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    rows = list(notification_feed(user, is_read=is_read, cursor=cursor)[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(last['created_at'], last['id'])
+
+
+def feed_row_to_notification(row, user):
+    """Unsaved Notification for a feed row, for the notification serializers."""
+    return Notification(
+        id=row['id'],
+        user=user,
+        title=row['title'],
+        message=row['message'],
+        notification_type=row['notification_type'],
+        is_read=row['read'],
+        created_at=row['created_at'],
+    )
+
+
+def unread_broadcast_count(user):
+    return visible_broadcasts(user).exclude(Exists(_read_receipt(user))).count()
+
+
+def get_visible_broadcast(user, broadcast_id):
+    """
+    Returns:
+        tuple: (BroadcastNotification or None, BroadcastReceipt or None)
+    """
+    broadcast = visible_broadcasts(user).filter(id=broadcast_id).first()
+    if broadcast is None:
+        return None, None
+    return broadcast, BroadcastReceipt.objects.filter(broadcast=broadcast, user=user).first()
+
+
+def mark_broadcast_read(user, broadcast, receipt=None):
+    """Record that the user read a broadcast. Returns the receipt."""
+    if receipt is None:
+        receipt, _ = BroadcastReceipt.objects.get_or_create(broadcast=broadcast, user=user)
+    if receipt.read_at is None:
+        receipt.read_at = timezone.now()
+        receipt.save(update_fields=['read_at'])
+    return receipt
+
+
+def dismiss_broadcast(user, broadcast):
+    """Hide a broadcast from the user's notifications (their 'delete')."""
+    now = timezone.now()
+    receipt, _ = BroadcastReceipt.objects.get_or_create(broadcast=broadcast, user=user)
+    receipt.dismissed_at = now
+    receipt.read_at = receipt.read_at or now
+    receipt.save(update_fields=['dismissed_at', 'read_at'])
+
+
+def mark_all_broadcasts_read(user):
+    """
+    Mark every visible, unread broadcast as read for the user.
+
+    Returns:
+        int: number of broadcasts marked read
+    """
+    now = timezone.now()
+    unread_ids = list(
+        visible_broadcasts(user).exclude(Exists(_read_receipt(user))).values_list('id', flat=True)
+    )
+    if not unread_ids:
+        return 0
+    BroadcastReceipt.objects.bulk_create(
+        [BroadcastReceipt(broadcast_id=broadcast_id, user=user) for broadcast_id in unread_ids],
+        ignore_conflicts=True,
+    )
+    BroadcastReceipt.objects.filter(
+        user=user, broadcast_id__in=unread_ids, read_at__isnull=True
+    ).update(read_at=now)
+    invalidate_broadcast_unread(user.id)
+    return len(unread_ids)
@@ -0,0 +1,197 @@
+# notification/counters.py
+"""
+Per-user unread notification counters backed by Redis.
+
+The badge endpoint is polled constantly by the mobile apps, so the unread
+count is kept in Redis instead of being COUNTed on every call:
+
+- notif:unread:{user}      unread Notification rows. Seeded from the database
+                           on a miss, then adjusted as notifications are
+                           created, read and deleted (notification/signals.py,
+                           Notification.mark_as_read, mark-all).
+- notif:unread_bc:{user}   unread broadcasts, stored as "{generation}:{count}".
+                           Broadcast visibility also changes with time and
+                           with admin edits, so this is a short-lived cache
+                           rather than a counter; publishing or editing a
+                           broadcast bumps notif:bc_gen, which invalidates
+                           every user's entry at once.
+
+Adjustments only apply to counters that exist, so a missing counter is
+always recomputed rather than guessed. reconcile_unread_counters rebuilds the
+counters of recently active users from the database to correct drift (e.g.
+a notification created while a counter was being seeded). If Redis is
+unavailable the count falls back to the database.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = 'notif:bc_gen'
+
+# KEYS: counter
+# ARGV: delta
+# Adjusts an existing counter; a counter that would go negative has drifted
+# and is dropped so the next read recomputes it
+_ADJUST_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return nil
+end
+local value = redis.call('INCRBY', KEYS[1], ARGV[1])
+if value < 0 then
+    redis.call('DEL', KEYS[1])
+    return nil
+end
+return value
+"""
+
+
+def _unread_key(user_id):
+    return f"notif:unread:{user_id}"
+
+
+def _broadcast_key(user_id):
+    return f"notif:unread_bc:{user_id}"
+
+
+def _unread_ttl():
+    return getattr(settings, 'NOTIFICATION_UNREAD_TTL', 24 * 60 * 60)
+
+
+def _broadcast_ttl():
+    return getattr(settings, 'NOTIFICATION_BROADCAST_COUNT_TTL', 60)
+
+
+def _redis():
+    from django_redis import get_redis_connection
+    return get_redis_connection("default")
+
+
+def _count_direct(user):
+    from .models import Notification
+    return Notification.objects.filter(user=user, is_read=False).count()
+
+
+def _count_broadcasts(user):
+    from .broadcasts import unread_broadcast_count
+    return unread_broadcast_count(user)
+
+
+def unread_count(user):
+    """
+    Unread notifications plus unread broadcasts for the user. A single
+    MGET when both counters are warm.
+    """
+    try:
+        conn = _redis()
+        direct, broadcast, generation = conn.mget(
+            _unread_key(user.id), _broadcast_key(user.id), GENERATION_KEY
+        )
+    except Exception as e:
+        logger.warning(f"Unread counters unavailable for user {user.id}: {e}")
+        return _count_direct(user) + _count_broadcasts(user)
+
+    generation = int(generation or 0)
+
+    if direct is None:
+        direct = _count_direct(user)
+        try:
+            # nx: don't overwrite an adjustment that landed while counting
+            conn.set(_unread_key(user.id), direct, ex=_unread_ttl(), nx=True)
+        except Exception as e:
+            logger.warning(f"Failed to seed unread counter for user {user.id}: {e}")
+
+    broadcast_count = None
+    if broadcast is not None:
+        cached_generation, _, cached_count = broadcast.decode().partition(':')
+        if cached_generation == str(generation):
+            broadcast_count = int(cached_count)
+    if broadcast_count is None:
+        broadcast_count = _count_broadcasts(user)
+        try:
+            conn.set(_broadcast_key(user.id), f"{generation}:{broadcast_count}", ex=_broadcast_ttl())
+        except Exception as e:
+            logger.warning(f"Failed to cache broadcast unread count for user {user.id}: {e}")
+
+    return int(direct) + broadcast_count
+
+
+def _on_commit(func):
+    def run():
+        try:
+            func()
+        except Exception as e:
+            logger.warning(f"Failed to update unread counters: {e}")
+    transaction.on_commit(run)
+
+
+def adjust_unread(user_ids, delta):
+    """Add `delta` to the users' counters once the current transaction commits."""
+    keys = [_unread_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+
+    def apply():
+        pipe = _redis().pipeline(transaction=False)
+        for key in keys:
+            pipe.eval(_ADJUST_SCRIPT, 1, key, delta)
+        pipe.execute()
+    _on_commit(apply)
+
+
+def reset_unread(user_id):
+    """Set the user's counter to zero after marking everything read."""
+    _on_commit(lambda: _redis().set(_unread_key(user_id), 0, ex=_unread_ttl()))
+
+
+def invalidate_unread(user_ids):
+    """Drop the users' counters after a bulk change that can't be tracked row by row."""
+    keys = [_unread_key(user_id) for user_id in user_ids]
+    if keys:
+        _on_commit(lambda: _redis().delete(*keys))
+
+
+def invalidate_broadcast_unread(user_id):
+    """Drop the user's broadcast count after they read or delete a broadcast."""
+    _on_commit(lambda: _redis().delete(_broadcast_key(user_id)))
+
+
+def bump_broadcast_generation():
+    """Invalidate every user's broadcast count after a broadcast changes."""
+    _on_commit(lambda: _redis().incr(GENERATION_KEY))
+
+
+def reconcile_unread_counters(since=None):
+    """
+    Rebuild the counters of users who received or read a notification since
+    `since` (default: NOTIFICATION_UNREAD_RECONCILE_WINDOW seconds ago) with
+    one grouped COUNT. Everyone else's counter expires on its own.
+    """
+    from .models import Notification
+
+    now = timezone.now()
+    window = getattr(settings, 'NOTIFICATION_UNREAD_RECONCILE_WINDOW', 60 * 60)
+    since = since or now - timedelta(seconds=window)
+
+    user_ids = set(
+        Notification.objects.filter(Q(created_at__gte=since) | Q(read_at__gte=since))
+        .values_list('user_id', flat=True).distinct()
+    )
+    counts = dict(
+        Notification.objects.filter(user_id__in=user_ids, is_read=False)
+        .values('user_id').annotate(unread=Count('id')).values_list('user_id', 'unread')
+    )
+
+    pipe = _redis().pipeline(transaction=False)
+    ttl = _unread_ttl()
+    for user_id in user_ids:
+        pipe.set(_unread_key(user_id), counts.get(user_id, 0), ex=ttl)
+    pipe.execute()
+
+    logger.info(f"Reconciled unread notification counters for {len(user_ids)} users")
+    return {'users': len(user_ids), 'timestamp': now.isoformat()}
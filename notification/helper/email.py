@@ -3,6 +3,8 @@ import logging
 from django.template.loader import render_to_string
 from django.conf import settings
 
+from providers.helpers.resilience import provider_request
+
 logger = logging.getLogger(__name__)
 
 class MailClient:
@@ -44,8 +46,8 @@ class MailClient:
             }
 
             # Send email via ZeptoMail API
-            response = requests.post(
-                self.API_URL,
+            response = provider_request(
+                'zeptomail', 'POST', self.API_URL,
                 json=payload,
                 headers=self.headers,
                 timeout=10  # Add timeout to prevent hanging
@@ -5,6 +5,7 @@ Helper functions for creating and sending notifications
 import logging
 from typing import Dict, Optional
 from django.conf import settings
+from core.helpers.realtime import publish_user_event
 from notification.models import Notification
 
 logger = logging.getLogger(__name__)
@@ -69,6 +70,28 @@ def create_notification(
     return notification
 
 
+def create_notifications(users, fields_for):
+    """
+    Bulk counterpart of create_notification for campaigns: one INSERT for all
+    users, with the same unread-counter and event-stream side effects. No push.
+
+    Args:
+        users: User objects (only id and the fields fields_for reads are needed)
+        fields_for: user -> dict of title, message, notification_type and
+            optionally data and action_url
+
+    Returns:
+        list of Notification objects
+    """
+    from notification.signals import notifications_created
+
+    notifications = Notification.objects.bulk_create([
+        Notification(user_id=user.id, **{'data': {}, **fields_for(user)}) for user in users
+    ])
+    notifications_created(notifications)
+    return notifications
+
+
 # Wallet Notification Helpers
 def notify_wallet_deposit(user, amount, reference=None):
     """Notify user about wallet deposit"""
@@ -167,6 +190,11 @@ def notify_goal_withdrawn(user, goal_name, amount, goal_id):
 
 def notify_goal_milestone(user, goal_name, goal_id, percentage):
     """Notify user about goal milestone (25%, 50%, 75%, 100%)"""
+    publish_user_event(user.id, 'goal.milestone', {
+        'goal_id': str(goal_id),
+        'goal_name': goal_name,
+        'percentage': percentage,
+    })
     return create_notification(
         user=user,
         title=f"Milestone Reached: {goal_name}",
@@ -265,14 +293,22 @@ def notify_security_alert(user, alert_message):
 
 
 # Onboarding Nudge Helpers
+def wallet_setup_nudge(user):
+    """Fields of the wallet setup nudge for a user"""
+    first_name = user.first_name or "there"
+    return {
+        'title': "Complete Your Wallet Setup",
+        'message': f"Hey {first_name}, you're almost there! Complete your verification to unlock your wallet and start building your nest.",
+        'notification_type': 'wallet_setup_nudge',
+        'action_url': '/kyc',
+    }
+
+
 def notify_wallet_setup_nudge(user):
     """Nudge user who signed up but hasn't created a wallet yet"""
-    first_name = user.first_name or "there"
-    return create_notification(
-        user=user,
-        title="Complete Your Wallet Setup",
-        message=f"Hey {first_name}, you're almost there! Complete your verification to unlock your wallet and start building your nest.",
-        notification_type='wallet_setup_nudge',
-        action_url='/kyc',
-        send_push=False,
-    )
+    return create_notification(user=user, **wallet_setup_nudge(user), send_push=False)
+
+
+def notify_wallet_setup_nudge_bulk(users):
+    """Nudge a batch of users (lifecycle campaign) with one INSERT"""
+    return create_notifications(users, wallet_setup_nudge)
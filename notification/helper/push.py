@@ -21,9 +21,10 @@ except (ImportError, Exception):
     FIREBASE_AVAILABLE = False
 
 
-def send_push_notification_to_user(user: UserModel, title: str, message: str):
+def send_push_notification_to_user(user: UserModel, title: str, message: str, data: dict = None):
     """
-    Sends a push notification to all active devices of a given user.
+    Sends a push notification to all active devices of a given user, with
+    `data` (string values) as the message's data payload.
     """
     if not FIREBASE_AVAILABLE:
         return  # Silently skip if Firebase is not configured
@@ -39,6 +40,7 @@ def send_push_notification_to_user(user: UserModel, title: str, message: str):
                     title=title,
                     body=message,
                 ),
+                data=data,
                 token=device.fcm_token,
                 android=messaging.AndroidConfig(priority="high"),
                 apns=messaging.APNSConfig(
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.4 on 2026-10-19 05:38
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0004_alter_notification_notification_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BroadcastNotification',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('message', models.TextField()),
+                ('notification_type', models.CharField(choices=[('wallet_deposit', 'Wallet Deposit'), ('wallet_withdrawal_requested', 'Withdrawal Requested'), ('wallet_withdrawal_approved', 'Withdrawal Approved'), ('wallet_withdrawal_failed', 'Withdrawal Failed'), ('goal_created', 'Goal Created'), ('goal_funded', 'Goal Funded'), ('goal_withdrawn', 'Goal Withdrawn'), ('goal_milestone', 'Goal Milestone'), ('goal_completed', 'Goal Completed'), ('goal_unlocked', 'Goal Unlocked'), ('post_liked', 'Post Liked'), ('post_commented', 'Post Commented'), ('comment_replied', 'Comment Replied'), ('challenge_joined', 'Challenge Joined'), ('challenge_completed', 'Challenge Completed'), ('group_joined', 'Group Joined'), ('gift_received', 'Gift Received'), ('gift_milestone', 'Gift Milestone'), ('fund_target_reached', 'Fund Target Reached'), ('verification_completed', 'Verification Completed'), ('account_upgraded', 'Account Upgraded'), ('security_alert', 'Security Alert'), ('system_announcement', 'System Announcement'), ('wallet_setup_nudge', 'Wallet Setup Nudge')], default='system_announcement', max_length=50)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('action_url', models.CharField(blank=True, max_length=500, null=True)),
+                ('segment', models.CharField(choices=[('all', 'All active users'), ('verified', 'Verified users'), ('unverified', 'Unverified users'), ('with_wallet', 'Users with a wallet'), ('without_wallet', 'Users without a wallet'), ('tier', 'Users in an account tier')], default='all', max_length=20)),
+                ('segment_value', models.CharField(blank=True, default='', help_text="Account tier for the 'tier' segment (e.g. Tier 2)", max_length=200)),
+                ('is_active', models.BooleanField(default=True)),
+                ('published_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='broadcast_notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-published_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BroadcastReceipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('dismissed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('broadcast', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receipts', to='notification.broadcastnotification')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='broadcast_receipts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'broadcast'], name='notificatio_user_id_c9139b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('broadcast', 'user'), name='unique_broadcast_receipt_per_user')],
+            },
+        ),
+    ]
@@ -5,6 +5,7 @@ In-app notification system for user notifications
 import uuid
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 class Notification(models.Model):
@@ -88,6 +89,126 @@ class Notification(models.Model):
         """Mark notification as read"""
         if not self.is_read:
             from django.utils import timezone
+            from notification.counters import adjust_unread
+            now = timezone.now()
+            # Conditional update so concurrent reads only decrement the unread counter once
+            marked = Notification.objects.filter(pk=self.pk, is_read=False).update(
+                is_read=True, read_at=now, updated_at=now
+            )
             self.is_read = True
-            self.read_at = timezone.now()
-            self.save(update_fields=['is_read', 'read_at'])
+            self.read_at = now
+            if marked:
+                adjust_unread([self.user_id], -1)
+
+
+class BroadcastNotification(models.Model):
+    """
+    An announcement shown to every user in a segment, stored once.
+
+    Broadcasts are merged into each user's notification list and unread
+    count at read time (see notification/broadcasts.py); per-user read and
+    dismiss state lives in BroadcastReceipt, created only when a user acts.
+    Users who join after a broadcast is published don't see it.
+    """
+
+    SEGMENT_CHOICES = [
+        ('all', 'All active users'),
+        ('verified', 'Verified users'),
+        ('unverified', 'Unverified users'),
+        ('with_wallet', 'Users with a wallet'),
+        ('without_wallet', 'Users without a wallet'),
+        ('tier', 'Users in an account tier'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    # Notification content
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    notification_type = models.CharField(
+        max_length=50,
+        choices=Notification.NOTIFICATION_TYPES,
+        default='system_announcement'
+    )
+    data = models.JSONField(default=dict, blank=True)
+    action_url = models.CharField(max_length=500, blank=True, null=True)
+
+    # Targeting
+    segment = models.CharField(max_length=20, choices=SEGMENT_CHOICES, default='all')
+    segment_value = models.CharField(
+        max_length=200,
+        blank=True,
+        default='',
+        help_text="Account tier for the 'tier' segment (e.g. Tier 2)"
+    )
+
+    # Visibility window
+    is_active = models.BooleanField(default=True)
+    published_at = models.DateTimeField(default=timezone.now, db_index=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='broadcast_notifications'
+    )
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-published_at']
+
+    def __str__(self):
+        return f"[{self.get_segment_display()}] {self.title}"
+
+    def as_notification(self, user, receipt=None):
+        """
+        Unsaved Notification carrying this broadcast for `user`, so the
+        notification serializers can render it.
+        """
+        read_at = receipt.read_at if receipt else None
+        return Notification(
+            id=self.id,
+            user=user,
+            title=self.title,
+            message=self.message,
+            notification_type=self.notification_type,
+            is_read=read_at is not None,
+            read_at=read_at,
+            data=self.data,
+            action_url=self.action_url,
+            created_at=self.published_at,
+            updated_at=self.updated_at,
+        )
+
+
+class BroadcastReceipt(models.Model):
+    """
+    A user's read/dismiss state for a broadcast notification.
+    """
+
+    broadcast = models.ForeignKey(BroadcastNotification, on_delete=models.CASCADE, related_name='receipts')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='broadcast_receipts'
+    )
+    read_at = models.DateTimeField(null=True, blank=True)
+    dismissed_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['broadcast', 'user'], name='unique_broadcast_receipt_per_user'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'broadcast']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.broadcast_id}"
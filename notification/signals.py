@@ -0,0 +1,62 @@
+# notification/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.helpers.realtime import publish_user_event
+
+from .counters import (
+    adjust_unread,
+    bump_broadcast_generation,
+    invalidate_broadcast_unread,
+    invalidate_unread,
+)
+from .models import BroadcastNotification, BroadcastReceipt, Notification
+
+
+def notifications_created(notifications):
+    """
+    Count new unread notifications and push them to their users' event
+    streams. Called for single saves below and by create_notifications()
+    after a bulk_create, which sends no post_save.
+    """
+    adjust_unread([notification.user_id for notification in notifications if not notification.is_read], 1)
+    for notification in notifications:
+        publish_user_event(notification.user_id, 'notification.created', {
+            'id': notification.pk,
+            'title': notification.title,
+            'message': notification.message,
+            'notification_type': notification.notification_type,
+            'action_url': notification.action_url,
+            'data': notification.data,
+            'created_at': notification.created_at,
+        })
+
+
+@receiver(post_save, sender=Notification)
+def track_unread_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Count new unread notifications and push them to the user's event stream.
+    A full save of an existing row (admin edits) may have flipped is_read, so
+    that user's counter is recomputed; mark_as_read adjusts the counter itself.
+    """
+    if created:
+        notifications_created([instance])
+    elif update_fields is None:
+        invalidate_unread([instance.user_id])
+
+
+@receiver(post_delete, sender=Notification)
+def track_unread_on_delete(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust_unread([instance.user_id], -1)
+
+
+@receiver(post_save, sender=BroadcastNotification)
+@receiver(post_delete, sender=BroadcastNotification)
+def invalidate_broadcast_counts(sender, instance, **kwargs):
+    bump_broadcast_generation()
+
+
+@receiver(post_save, sender=BroadcastReceipt)
+def invalidate_user_broadcast_count(sender, instance, **kwargs):
+    invalidate_broadcast_unread(instance.user_id)
@@ -0,0 +1,15 @@
+"""
+Celery tasks for notification app.
+"""
+from celery import shared_task
+
+
+@shared_task(name='notification.tasks.reconcile_unread_counters')
+def reconcile_unread_counters():
+    """
+    Rebuild the Redis unread counters of recently active users from the
+    database. Corrects drift from writes that raced a counter being seeded.
+    """
+    from notification.counters import reconcile_unread_counters as reconcile
+
+    return reconcile()
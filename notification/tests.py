@@ -1,3 +1,156 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from account.models import UserModel
+from core.testing import requires_redis
+from notification import counters
+from notification.broadcasts import visible_broadcasts
+from notification.models import BroadcastNotification, BroadcastReceipt, Notification
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class BroadcastFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserModel.objects.create_user(email='feed@example.com', password='pass1234')
+        self.auth = f'Bearer {AccessToken.for_user(self.user)}'
+        now = timezone.now()
+        self.direct = Notification.objects.create(
+            user=self.user, title='Deposit', message='You received N500', notification_type='wallet_deposit',
+        )
+        Notification.objects.filter(pk=self.direct.pk).update(created_at=now - timedelta(minutes=2))
+        self.broadcast = BroadcastNotification.objects.create(
+            title='New feature', message='Savings goals now pay interest',
+        )
+
+    def _feed(self, **params):
+        response = self.client.get('/api/v2/notifications/', params, HTTP_AUTHORIZATION=self.auth)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['data']
+
+    def test_broadcast_is_merged_into_the_feed_without_per_user_rows(self):
+        data = self._feed()
+
+        self.assertEqual(
+            [(n['id'], n['is_read']) for n in data['notifications']],
+            [(str(self.broadcast.id), False), (str(self.direct.id), False)],
+        )
+        self.assertEqual(data['unread_count'], 2)
+        self.assertEqual(Notification.objects.filter(user=self.user).count(), 1)
+
+    def test_segments_and_join_date_limit_visibility(self):
+        BroadcastNotification.objects.create(title='KYC done', message='Thanks', segment='verified')
+        BroadcastNotification.objects.create(
+            title='Before you joined', message='Old news', published_at=self.user.created_at - timedelta(days=1),
+        )
+
+        self.assertEqual(list(visible_broadcasts(self.user)), [self.broadcast])
+
+    def test_reading_a_broadcast_writes_one_receipt(self):
+        url = f'/api/v2/notifications/{self.broadcast.id}/read'
+        self.client.put(url, HTTP_AUTHORIZATION=self.auth)
+        response = self.client.put(url, HTTP_AUTHORIZATION=self.auth)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['data']['is_read'])
+        self.assertEqual(BroadcastReceipt.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(self._feed(is_read='false')['notifications'][0]['id'], str(self.direct.id))
+        self.assertEqual(self._feed()['unread_count'], 1)
+
+    def test_deleting_a_broadcast_hides_it(self):
+        response = self.client.delete(f'/api/v2/notifications/{self.broadcast.id}', HTTP_AUTHORIZATION=self.auth)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([n['id'] for n in self._feed()['notifications']], [str(self.direct.id)])
+        self.assertTrue(BroadcastNotification.objects.filter(pk=self.broadcast.pk).exists())
+
+    def test_mark_all_read_covers_broadcasts(self):
+        response = self.client.put('/api/v2/notifications/read-all', HTTP_AUTHORIZATION=self.auth)
+
+        self.assertEqual(response.json()['data']['marked_read_count'], 2)
+        self.assertEqual(self._feed()['unread_count'], 0)
+
+    def test_cursor_pages_across_notifications_and_broadcasts(self):
+        first = self._feed(page_size=1)
+        second = self._feed(page_size=1, cursor=first['pagination']['next_cursor'])
+
+        self.assertEqual(first['notifications'][0]['id'], str(self.broadcast.id))
+        self.assertEqual(second['notifications'][0]['id'], str(self.direct.id))
+        self.assertFalse(second['pagination']['has_next'])
+
+
+@requires_redis
+class UnreadCounterTests(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(email='badge@example.com', password='pass1234')
+        self.key = counters._unread_key(self.user.id)
+        keys = [self.key, counters._broadcast_key(self.user.id)]
+        counters._redis().delete(*keys)
+        self.addCleanup(counters._redis().delete, *keys)
+
+    def _notify(self, title='Deposit'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Notification.objects.create(
+                user=self.user, title=title, message='You received N500', notification_type='wallet_deposit',
+            )
+
+    def _stored(self):
+        value = counters._redis().get(self.key)
+        return None if value is None else int(value)
+
+    def test_counter_is_seeded_then_adjusted(self):
+        first = self._notify()
+        self.assertIsNone(self._stored())
+
+        self.assertEqual(counters.unread_count(self.user), 1)
+        self._notify('Second deposit')
+        self.assertEqual(self._stored(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.mark_as_read()
+            # A second read of the same notification doesn't count twice
+            Notification.objects.get(pk=first.pk).mark_as_read()
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.filter(is_read=False).get().delete()
+
+        self.assertEqual(self._stored(), 0)
+        self.assertEqual(counters.unread_count(self.user), 0)
+
+    def test_counter_that_drifts_negative_is_recomputed(self):
+        self._notify()
+        counters._redis().set(self.key, 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            counters.adjust_unread([self.user.id], -1)
+
+        self.assertIsNone(self._stored())
+        self.assertEqual(counters.unread_count(self.user), 1)
+
+    def test_publishing_a_broadcast_refreshes_cached_broadcast_counts(self):
+        self.assertEqual(counters.unread_count(self.user), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BroadcastNotification.objects.create(title='New feature', message='Savings goals now pay interest')
+
+        self.assertEqual(counters.unread_count(self.user), 1)
+
+    def test_reconcile_rebuilds_recent_counters(self):
+        self._notify()
+        counters.unread_count(self.user)
+        counters._redis().set(self.key, 5)
+
+        result = counters.reconcile_unread_counters()
+
+        self.assertEqual(result['users'], 1)
+        self.assertEqual(self._stored(), 1)
+
+    def test_falls_back_to_the_database_without_redis(self):
+        self._notify()
+
+        with mock.patch.object(counters, '_redis', side_effect=ConnectionError('redis down')):
+            self.assertEqual(counters.unread_count(self.user), 1)
@@ -5,12 +5,20 @@ V2 Mobile - Notification System Views
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from django.core.paginator import Paginator
 from django.utils import timezone
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
 from core.helpers.response import success_response, error_response
+from .broadcasts import (
+    dismiss_broadcast,
+    feed_page,
+    feed_row_to_notification,
+    get_visible_broadcast,
+    mark_all_broadcasts_read,
+    mark_broadcast_read,
+)
+from .counters import reset_unread, unread_count
 from .models import Notification
 from .serializers import NotificationSerializer, NotificationListSerializer
 
@@ -20,20 +28,20 @@ class NotificationListAPIView(APIView):
     V2 Mobile - List Notifications
 
     GET: List all notifications for the authenticated user
-    Supports pagination and filtering by read/unread status
+    Supports cursor pagination and filtering by read/unread status
     """
     permission_classes = [IsAuthenticated]
 
     @extend_schema(
         tags=['V2 - Notifications'],
         summary='List Notifications',
-        description='Get paginated list of user notifications with optional filtering',
+        description='Get a cursor-paginated list of user notifications, newest first, with optional filtering',
         parameters=[
             OpenApiParameter(
-                name='page',
-                type=OpenApiTypes.INT,
+                name='cursor',
+                type=OpenApiTypes.STR,
                 location=OpenApiParameter.QUERY,
-                description='Page number (default: 1)',
+                description='Cursor from the previous page (pagination.next_cursor)',
                 required=False,
             ),
             OpenApiParameter(
@@ -58,40 +66,41 @@ class NotificationListAPIView(APIView):
         List all notifications for the authenticated user
         """
         # Get query parameters
-        page = int(request.query_params.get('page', 1))
         page_size = min(int(request.query_params.get('page_size', 20)), 100)
         is_read_filter = request.query_params.get('is_read')
 
-        # Base queryset
-        notifications = Notification.objects.filter(user=request.user)
-
-        # Apply filters
+        # The user's own notifications merged with the broadcasts targeted at
+        # them (see notification/broadcasts.py), keyset-paginated: no COUNT
+        is_read = None
         if is_read_filter is not None:
             is_read = is_read_filter.lower() in ['true', '1', 'yes']
-            notifications = notifications.filter(is_read=is_read)
-
-        # Get counts
-        total_count = notifications.count()
-        unread_count = Notification.objects.filter(user=request.user, is_read=False).count()
-
-        # Paginate
-        paginator = Paginator(notifications, page_size)
-        page_obj = paginator.get_page(page)
+        try:
+            rows, next_cursor = feed_page(
+                request.user,
+                is_read=is_read,
+                cursor=request.query_params.get('cursor'),
+                limit=page_size,
+            )
+        except ValueError:
+            return error_response(
+                message="Invalid cursor",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
 
         # Serialize
-        serializer = NotificationListSerializer(page_obj.object_list, many=True)
+        serializer = NotificationListSerializer(
+            [feed_row_to_notification(row, request.user) for row in rows],
+            many=True
+        )
 
         response_data = {
             'notifications': serializer.data,
             'pagination': {
-                'current_page': page,
-                'total_pages': paginator.num_pages,
                 'page_size': page_size,
-                'total_count': total_count,
-                'has_next': page_obj.has_next(),
-                'has_previous': page_obj.has_previous(),
+                'next_cursor': next_cursor,
+                'has_next': next_cursor is not None,
             },
-            'unread_count': unread_count,
+            'unread_count': unread_count(request.user),
         }
 
         return success_response(
@@ -131,10 +140,14 @@ class NotificationDetailAPIView(APIView):
         """
         notification = self.get_object(notification_id, request.user)
         if not notification:
-            return error_response(
-                message="Notification not found",
-                status_code=status.HTTP_404_NOT_FOUND
-            )
+            broadcast, receipt = get_visible_broadcast(request.user, notification_id)
+            if not broadcast:
+                return error_response(
+                    message="Notification not found",
+                    status_code=status.HTTP_404_NOT_FOUND
+                )
+            receipt = mark_broadcast_read(request.user, broadcast, receipt)
+            notification = broadcast.as_notification(request.user, receipt)
 
         # Mark as read if not already
         if not notification.is_read:
@@ -161,9 +174,15 @@ class NotificationDetailAPIView(APIView):
         """
         notification = self.get_object(notification_id, request.user)
         if not notification:
-            return error_response(
-                message="Notification not found",
-                status_code=status.HTTP_404_NOT_FOUND
+            broadcast, _ = get_visible_broadcast(request.user, notification_id)
+            if not broadcast:
+                return error_response(
+                    message="Notification not found",
+                    status_code=status.HTTP_404_NOT_FOUND
+                )
+            dismiss_broadcast(request.user, broadcast)
+            return success_response(
+                message="Notification deleted successfully"
             )
 
         notification.delete()
@@ -196,9 +215,17 @@ class MarkNotificationReadAPIView(APIView):
         try:
             notification = Notification.objects.get(id=notification_id, user=request.user)
         except Notification.DoesNotExist:
-            return error_response(
-                message="Notification not found",
-                status_code=status.HTTP_404_NOT_FOUND
+            broadcast, receipt = get_visible_broadcast(request.user, notification_id)
+            if not broadcast:
+                return error_response(
+                    message="Notification not found",
+                    status_code=status.HTTP_404_NOT_FOUND
+                )
+            receipt = mark_broadcast_read(request.user, broadcast, receipt)
+            serializer = NotificationSerializer(broadcast.as_notification(request.user, receipt))
+            return success_response(
+                data=serializer.data,
+                message="Notification marked as read"
             )
 
         # Mark as read
@@ -229,18 +256,13 @@ class MarkAllNotificationsReadAPIView(APIView):
         """
         Mark all notifications as read
         """
-        # Get all unread notifications
-        unread_notifications = Notification.objects.filter(
+        now = timezone.now()
+        count = Notification.objects.filter(
             user=request.user,
             is_read=False
-        )
-
-        # Count before updating
-        count = unread_notifications.count()
-
-        # Mark all as read
-        now = timezone.now()
-        unread_notifications.update(is_read=True, read_at=now)
+        ).update(is_read=True, read_at=now)
+        reset_unread(request.user.id)
+        count += mark_all_broadcasts_read(request.user)
 
         return success_response(
             data={'marked_read_count': count},
@@ -266,12 +288,7 @@ class UnreadNotificationCountAPIView(APIView):
         """
         Get unread notification count
         """
-        unread_count = Notification.objects.filter(
-            user=request.user,
-            is_read=False
-        ).count()
-
         return success_response(
-            data={'unread_count': unread_count},
+            data={'unread_count': unread_count(request.user)},
             message="Unread count retrieved successfully"
         )
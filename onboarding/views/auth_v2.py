@@ -7,7 +7,7 @@ from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from account.authentication import GidiJWTAuthentication
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView
 from django.contrib.auth import authenticate
@@ -221,7 +221,7 @@ class LogoutView(APIView):
     V2 Mobile Logout
     Invalidates refresh token and session
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [GidiJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
@@ -268,7 +268,7 @@ class PasscodeSetupView(APIView):
     V2 Mobile Passcode Setup
     Set 6-digit passcode for quick login
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [GidiJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
@@ -295,7 +295,7 @@ class PasscodeVerifyView(APIView):
     V2 Mobile Passcode Verify
     Verify 6-digit passcode
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [GidiJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
@@ -319,7 +319,7 @@ class PasscodeChangeView(APIView):
     V2 Mobile Passcode Change
     Change existing passcode (applies 24-hour restriction)
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [GidiJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def put(self, request, *args, **kwargs):
@@ -365,7 +365,7 @@ class PINSetupView(APIView):
     V2 Mobile PIN Setup
     Set transaction PIN (4-6 digits)
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [GidiJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
@@ -392,7 +392,7 @@ class PINVerifyView(APIView):
     V2 Mobile PIN Verify
     Verify transaction PIN
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [GidiJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
@@ -416,7 +416,7 @@ class PINChangeView(APIView):
     V2 Mobile PIN Change
     Change existing transaction PIN (applies 24-hour restriction)
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [GidiJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def put(self, request, *args, **kwargs):
@@ -462,7 +462,7 @@ class PINStatusView(APIView):
     V2 Mobile PIN Status
     Check if transaction PIN is set
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [GidiJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
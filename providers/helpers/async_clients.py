@@ -0,0 +1,266 @@
+"""
+Async (httpx) provider clients for I/O-bound endpoints served under ASGI.
+
+These mirror the read-only / enquiry methods of the sync clients (same
+arguments, same return dicts) so async views can share response handling with
+their sync counterparts. Configuration, token management and circuit breaking
+are reused from the sync layer; only the HTTP transport is async.
+
+A single httpx.AsyncClient (connection pool) is kept per event loop, so a
+uvicorn worker holds many concurrent provider calls on a handful of sockets.
+"""
+import asyncio
+import logging
+import time
+import weakref
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from providers.helpers.embedly import EmbedlyClient
+from providers.helpers.psb9 import PSB9Client
+from providers.helpers.resilience import ProviderGuard, ProviderUnavailable, observe_call, simulated_url
+
+logger = logging.getLogger(__name__)
+
+# Errors the async clients turn into {"status": "error"} / {"success": False}
+PROVIDER_ERRORS = (httpx.HTTPError, ProviderUnavailable)
+
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """Shared AsyncClient for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50),
+        )
+        _clients[loop] = client
+    return client
+
+
+async def async_provider_request(provider, method, url, timeout=30, **kwargs):
+    """
+    Async counterpart of resilience.provider_request(), sharing the same
+    Redis-backed circuit breaker and bulkhead.
+
+    Raises:
+        ProviderUnavailable: if the circuit is open or the bulkhead is full
+        httpx.HTTPError: on transport errors
+    """
+    url = simulated_url(provider, url)
+    guard = ProviderGuard(provider)
+    timeout = httpx.Timeout(timeout, connect=min(guard.policy['connect_timeout'], timeout))
+
+    try:
+        is_probe = await sync_to_async(guard.acquire, thread_sensitive=False)()
+    except ProviderUnavailable:
+        raise
+    except Exception as e:
+        logger.warning(f"Provider guard unavailable for {provider}, calling unguarded: {e}")
+        is_probe = None
+
+    failed = True
+    outcome = 'exception'
+    started = time.perf_counter()
+    try:
+        response = await get_async_client().request(method, url, timeout=timeout, **kwargs)
+        failed = response.status_code >= 500
+        outcome = 'error' if failed else 'ok'
+        return response
+    finally:
+        # Recorded on the request's recorder, which is flushed after the response
+        observe_call(provider, started, outcome)
+        if is_probe is not None:
+            try:
+                await sync_to_async(guard.release, thread_sensitive=False)(is_probe, failed)
+            except Exception as e:
+                logger.warning(f"Failed to record {provider} call outcome: {e}")
+
+
+class AsyncPSB9Client(PSB9Client):
+    """Async 9PSB client for balance, history, bank list and name enquiry."""
+
+    async def _apost(self, url, payload, timeout=30):
+        """POST with a bearer token, re-authenticating once on 401. Returns parsed JSON."""
+        headers = self._get_headers(authenticated=False)
+        token = await sync_to_async(self.token_manager.get_token, thread_sensitive=False)()
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+
+        response = await async_provider_request('psb9', 'POST', url, json=payload, headers=headers, timeout=timeout)
+
+        if response.status_code == 401 and token:
+            logger.warning(f"9PSB rejected bearer token for {url}, re-authenticating")
+            new_token = await sync_to_async(self.token_manager.invalidate, thread_sensitive=False)(token)
+            if new_token and new_token != token:
+                headers['Authorization'] = f'Bearer {new_token}'
+                response = await async_provider_request(
+                    'psb9', 'POST', url, json=payload, headers=headers, timeout=timeout,
+                )
+
+        response.raise_for_status()
+        return response.json()
+
+    async def get_wallet_balance(self, account_number):
+        url = f"{self.base_url}/waas/api/v1/wallet_enquiry"
+        try:
+            data = await self._apost(url, {"accountNumber": account_number})
+            if data.get('status') == 'success':
+                return {"status": "success", "data": data.get('data')}
+            logger.error(f"9PSB balance enquiry failed: {data}")
+            return {"status": "error", "message": data.get('message', 'Unknown error')}
+        except PROVIDER_ERRORS as e:
+            logger.error(f"9PSB balance enquiry failed: {e}")
+            return {"status": "error", "message": f"Network error: {str(e)}"}
+        except ValueError as e:
+            logger.error(f"9PSB balance response invalid JSON: {e}")
+            return {"status": "error", "message": "Invalid response from 9PSB"}
+
+    async def get_wallet_transactions(self, account_number, start_date=None, end_date=None):
+        url = f"{self.base_url}/waas/api/v1/wallet_transactions"
+        payload = {"accountNumber": account_number}
+        if start_date:
+            payload["startDate"] = start_date
+        if end_date:
+            payload["endDate"] = end_date
+
+        try:
+            data = await self._apost(url, payload)
+            if data.get('status', '').upper() == 'SUCCESS':
+                return {"status": "success", "data": data.get('data', [])}
+            return {"status": "error", "message": data.get('message', 'Failed to get transactions')}
+        except (*PROVIDER_ERRORS, ValueError) as e:
+            logger.error(f"9PSB transaction history failed: {e}")
+            return {"status": "error", "message": f"Network error: {str(e)}"}
+
+    async def get_banks(self):
+        url = f"{self.base_url}/waas/api/v1/get_banks"
+        try:
+            data = await self._apost(url, {})
+            if data.get('status', '').upper() == 'SUCCESS':
+                return {"status": "success", "data": data.get('data', [])}
+            return {"status": "error", "message": data.get('message', 'Failed to get banks')}
+        except (*PROVIDER_ERRORS, ValueError) as e:
+            logger.error(f"9PSB get banks failed: {e}")
+            return {"status": "error", "message": f"Network error: {str(e)}"}
+
+    async def other_banks_enquiry(self, account_number, bank_code):
+        url = f"{self.base_url}/waas/api/v1/other_banks_enquiry"
+        payload = {"accountNumber": account_number, "bankCode": bank_code}
+        try:
+            data = await self._apost(url, payload)
+            if data.get('status', '').upper() == 'SUCCESS':
+                return {"status": "success", "data": data.get('data', {})}
+            return {"status": "error", "message": data.get('message', 'Account enquiry failed')}
+        except (*PROVIDER_ERRORS, ValueError) as e:
+            logger.error(f"9PSB account enquiry failed: {e}")
+            return {"status": "error", "message": f"Network error: {str(e)}"}
+
+
+class AsyncEmbedlyClient(EmbedlyClient):
+    """Async Embedly client for the payout bank list and name enquiry."""
+
+    async def _amake_request(self, method, endpoint, data=None):
+        if endpoint.startswith("Payout/"):
+            url = f"{self.payout_base_url}/{endpoint}"
+        else:
+            url = f"{self.base_url}/{endpoint}"
+
+        log_to_db = sync_to_async(self._log_to_db)
+
+        try:
+            response = await async_provider_request('embedly', method, url, headers=self.headers, json=data)
+        except PROVIDER_ERRORS as req_err:
+            await log_to_db(endpoint, method, data, None, None, str(req_err))
+            return {"success": False, "message": f"Network error: {req_err}"}
+
+        try:
+            result = response.json()
+        except ValueError as json_err:
+            error_detail = {"raw_response": response.text, "json_error": str(json_err)}
+            await log_to_db(endpoint, method, data, error_detail, response.status_code, str(json_err))
+            return {"success": False, "message": "Invalid response from provider", "code": str(response.status_code)}
+
+        if response.is_error:
+            await log_to_db(endpoint, method, data, result, response.status_code, f"HTTP {response.status_code}")
+            message = None
+            if isinstance(result, dict):
+                message = result.get('message') or result.get('error')
+            return {
+                "success": False,
+                "message": message or f"HTTP {response.status_code} error from provider",
+                "code": "-904" if response.status_code == 400 else str(response.status_code),
+                "data": result,
+            }
+
+        await log_to_db(endpoint, method, data, result, response.status_code)
+        return {"success": True, "data": result['data']}
+
+    async def get_banks(self):
+        return await self._amake_request("GET", "Payout/banks")
+
+    async def resolve_bank_account(self, account_number, bank_code):
+        payload = {"accountNumber": account_number, "bankCode": bank_code}
+        return await self._amake_request("POST", "Payout/name-enquiry", data=payload)
+
+
+async def _prembly_verify(label, url, data):
+    api_key = settings.PREMBLY_API_KEY
+    app_id = getattr(settings, 'PREMBLY_APP_ID', None)
+
+    if not api_key:
+        logger.error("PREMBLY_API_KEY not configured")
+        return {"status": "error", "message": "Prembly API Key is missing or not configured."}
+
+    headers = {
+        'accept': 'application/json',
+        'content-type': 'application/json',
+        'x-api-key': api_key,
+    }
+    if app_id:
+        headers['app-id'] = app_id
+
+    try:
+        response = await async_provider_request('prembly', 'POST', url, headers=headers, json=data, timeout=60)
+        response.raise_for_status()
+        response_data = response.json()
+    except httpx.HTTPStatusError as http_err:
+        logger.error(f"Prembly {label} HTTP error: {http_err} - Status: {http_err.response.status_code}")
+        return {"status": "error", "message": f"{label} verification service error. Please try again."}
+    except httpx.TimeoutException:
+        logger.error(f"Prembly {label} request timed out")
+        return {"status": "error", "message": "Verification service request timed out."}
+    except PROVIDER_ERRORS:
+        logger.error(f"Prembly {label} connection error")
+        return {"status": "error", "message": "Network error: Could not connect to verification service."}
+    except ValueError as json_err:
+        logger.error(f"Prembly {label} JSON decode error: {json_err}")
+        return {"status": "error", "message": "Failed to parse verification response."}
+
+    if response_data.get('status') == False or response_data.get('verification', {}).get('status') == 'FAILED':
+        error_detail = response_data.get('detail', 'Verification failed')
+        logger.warning(f"Prembly {label} verification failed: {error_detail}")
+        return {"status": "error", "message": error_detail, "details": response_data}
+
+    return {"status": "success", "data": response_data}
+
+
+async def averify_bvn(bvn):
+    """Async providers.helpers.prembly.verify_bvn()."""
+    return await _prembly_verify('BVN', "https://api.prembly.com/verification/bvn", {'number': bvn})
+
+
+async def averify_nin(nin, first_name=None, last_name=None, dob=None):
+    """Async providers.helpers.prembly.verify_nin()."""
+    data = {'number_nin': nin}
+    if first_name:
+        data['firstname'] = first_name
+    if last_name:
+        data['lastname'] = last_name
+    if dob:
+        data['dob'] = dob
+    return await _prembly_verify('NIN', "https://api.prembly.com/verification/vnin", data)
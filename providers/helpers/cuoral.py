@@ -2,6 +2,8 @@ import requests
 import json
 from django.conf import settings
 
+from providers.helpers.resilience import provider_request
+
 
 class CuoralAPI:
     """
@@ -77,7 +79,7 @@ class CuoralAPI:
         }
 
         try:
-            response = requests.post(url, headers=self.headers, data=json.dumps(payload), timeout=30)
+            response = provider_request('cuoral', 'POST', url, headers=self.headers, data=json.dumps(payload), timeout=30)
             response.raise_for_status()
 
             return {
@@ -5,6 +5,7 @@ from django.conf import settings
 
 from core.helpers.messaging import BVN_VALIDATION_FAILED
 from providers.models import ProviderRequestLog
+from providers.helpers.resilience import provider_request
 
 
 class EmbedlyClient:
@@ -79,8 +80,8 @@ class EmbedlyClient:
         response = None
 
         try:
-            response = requests.request(
-                method, url, headers=self.headers, data=payload, params=params, timeout=30
+            response = provider_request(
+                'embedly', method, url, headers=self.headers, data=payload, params=params, timeout=30
             )
             response.raise_for_status()
 
@@ -16,6 +16,8 @@ import requests
 from decimal import Decimal
 from django.conf import settings
 
+from providers.helpers.resilience import provider_request
+
 logger = logging.getLogger(__name__)
 
 PAYSTACK_BASE_URL = "https://api.paystack.co"
@@ -66,7 +68,8 @@ class PaystackAPI:
             payload["reference"] = reference
 
         try:
-            resp = requests.post(
+            resp = provider_request(
+                'paystack', 'POST',
                 f"{PAYSTACK_BASE_URL}/transaction/initialize",
                 json=payload,
                 headers=self.headers,
@@ -93,7 +96,8 @@ class PaystackAPI:
             None on failure
         """
         try:
-            resp = requests.get(
+            resp = provider_request(
+                'paystack', 'GET',
                 f"{PAYSTACK_BASE_URL}/transaction/verify/{reference}",
                 headers=self.headers,
                 timeout=30,
@@ -130,7 +134,8 @@ class PaystackAPI:
         }
 
         try:
-            resp = requests.post(
+            resp = provider_request(
+                'paystack', 'POST',
                 f"{PAYSTACK_BASE_URL}/transferrecipient",
                 json=payload,
                 headers=self.headers,
@@ -174,7 +179,8 @@ class PaystackAPI:
             payload["reference"] = reference
 
         try:
-            resp = requests.post(
+            resp = provider_request(
+                'paystack', 'POST',
                 f"{PAYSTACK_BASE_URL}/transfer",
                 json=payload,
                 headers=self.headers,
@@ -201,7 +207,8 @@ class PaystackAPI:
             None on failure
         """
         try:
-            resp = requests.get(
+            resp = provider_request(
+                'paystack', 'GET',
                 f"{PAYSTACK_BASE_URL}/bank/resolve",
                 params={"account_number": account_number, "bank_code": bank_code},
                 headers=self.headers,
@@ -226,7 +233,8 @@ class PaystackAPI:
             list of dicts: [{name, code, ...}, ...]
         """
         try:
-            resp = requests.get(
+            resp = provider_request(
+                'paystack', 'GET',
                 f"{PAYSTACK_BASE_URL}/bank",
                 params={"country": "nigeria"},
                 headers=self.headers,
@@ -3,6 +3,8 @@ import json
 import logging
 from django.conf import settings
 
+from providers.helpers.resilience import provider_request
+
 logger = logging.getLogger(__name__)
 
 
@@ -45,7 +47,7 @@ def verify_bvn(bvn: str):
     }
 
     try:
-        response = requests.post(API_URL, headers=headers, json=data, timeout=60)
+        response = provider_request('prembly', 'POST', API_URL, headers=headers, json=data, timeout=60)
         response.raise_for_status()
 
         response_data = response.json()
@@ -124,7 +126,7 @@ def verify_nin(nin: str, first_name: str = None, last_name: str = None, dob: str
         data['dob'] = dob
 
     try:
-        response = requests.post(API_URL, headers=headers, json=data, timeout=60)
+        response = provider_request('prembly', 'POST', API_URL, headers=headers, json=data, timeout=60)
         response.raise_for_status()
 
         response_data = response.json()
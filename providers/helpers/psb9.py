@@ -10,6 +10,9 @@ from django.conf import settings
 from django.core.cache import cache
 from datetime import datetime, timedelta
 
+from providers.helpers.token_manager import TokenManager
+from providers.helpers.resilience import provider_request
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,8 +37,14 @@ class PSB9Client:
         self.base_url = getattr(settings, 'PSB9_BASE_URL', 'https://102.216.128.75:9090')
         self.merchant_id = getattr(settings, 'PSB9_MERCHANT_ID', None)
 
-        # Cache key for storing auth token
-        self.token_cache_key = 'psb9_auth_token'
+        # Tokens last 1 hour; treat them as valid for 50 minutes and renew
+        # in the background during the last 10
+        self.token_manager = TokenManager(
+            name='psb9',
+            fetch_token=self.authenticate,
+            ttl=50 * 60,
+            refresh_ahead=10 * 60,
+        )
         self.token = None
 
         if not self.username or not self.password or not self.client_id or not self.client_secret:
@@ -65,25 +74,39 @@ class PSB9Client:
 
     def _get_auth_token(self):
         """
-        Get authentication token (from cache or by authenticating).
-        Token is cached for 50 minutes (9PSB tokens last 1 hour).
+        Get authentication token via the shared token manager.
+        Concurrent callers share a single authenticate() call, and tokens are
+        renewed in the background before they expire.
 
         Returns:
             str: Bearer token or None if authentication fails
         """
-        # Check cache first
-        cached_token = cache.get(self.token_cache_key)
-        if cached_token:
-            return cached_token
+        return self.token_manager.get_token()
+
+    def _post(self, url, headers=None, **kwargs):
+        """
+        POST to 9PSB, re-authenticating once if the bearer token is rejected.
+
+        Returns:
+            requests.Response
+        """
+        response = provider_request('psb9', 'POST', url, headers=headers, **kwargs)
+
+        authorization = (headers or {}).get('Authorization', '')
+        if response.status_code != 401 or not authorization.startswith('Bearer '):
+            return response
 
-        # Authenticate and cache token
-        token = self.authenticate()
-        if token:
-            # Cache for 50 minutes (tokens last 1 hour, refresh before expiry)
-            cache.set(self.token_cache_key, token, timeout=50*60)
-            return token
+        rejected = authorization[len('Bearer '):]
+        logger.warning(f"9PSB rejected bearer token for {url}, re-authenticating")
+        token = self.token_manager.invalidate(rejected)
+        if not token or token == rejected:
+            return response
 
-        return None
+        headers = {**headers, 'Authorization': f'Bearer {token}'}
+        for f in (kwargs.get('files') or {}).values():
+            if hasattr(f, 'seek'):
+                f.seek(0)
+        return provider_request('psb9', 'POST', url, headers=headers, **kwargs)
 
     def authenticate(self):
         """
@@ -109,7 +132,7 @@ class PSB9Client:
 
         try:
             logger.info("Authenticating with 9PSB WAAS API")
-            response = requests.post(url, json=payload, timeout=30)
+            response = provider_request('psb9', 'POST', url, json=payload, timeout=30)
             response.raise_for_status()
 
             data = response.json()
@@ -178,7 +201,7 @@ class PSB9Client:
 
         try:
             logger.info(f"Opening 9PSB wallet for {customer_data.get('email')}")
-            response = requests.post(url, json=payload, headers=headers, timeout=60)
+            response = self._post(url, json=payload, headers=headers, timeout=60)
             response.raise_for_status()
 
             data = response.json()
@@ -252,7 +275,7 @@ class PSB9Client:
         }
 
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = self._post(url, json=payload, headers=headers, timeout=30)
             response.raise_for_status()
 
             data = response.json()
@@ -301,7 +324,7 @@ class PSB9Client:
             payload["endDate"] = end_date
 
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = self._post(url, json=payload, headers=headers, timeout=30)
             response.raise_for_status()
 
             data = response.json()
@@ -350,7 +373,7 @@ class PSB9Client:
 
         try:
             logger.info(f"Initiating 9PSB transfer: {from_account} -> {to_account}, amount: {amount}")
-            response = requests.post(url, json=payload, headers=headers, timeout=60)
+            response = self._post(url, json=payload, headers=headers, timeout=60)
             response.raise_for_status()
 
             data = response.json()
@@ -409,7 +432,7 @@ class PSB9Client:
         }
 
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = self._post(url, json=payload, headers=headers, timeout=30)
             response.raise_for_status()
 
             data = response.json()
@@ -456,7 +479,7 @@ class PSB9Client:
 
         try:
             logger.info(f"Upgrading 9PSB account {account_number} to Tier {tier}")
-            response = requests.post(url, json=payload, headers=headers, timeout=60)
+            response = self._post(url, json=payload, headers=headers, timeout=60)
             response.raise_for_status()
 
             data = response.json()
@@ -495,7 +518,7 @@ class PSB9Client:
         }
 
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = self._post(url, json=payload, headers=headers, timeout=30)
             response.raise_for_status()
 
             data = response.json()
@@ -528,7 +551,7 @@ class PSB9Client:
         }
 
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=60)
+            response = self._post(url, json=payload, headers=headers, timeout=60)
             response.raise_for_status()
             data = response.json()
 
@@ -556,7 +579,7 @@ class PSB9Client:
         }
 
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=60)
+            response = self._post(url, json=payload, headers=headers, timeout=60)
             response.raise_for_status()
             data = response.json()
 
@@ -577,7 +600,7 @@ class PSB9Client:
         headers = self._get_headers(authenticated=True)
 
         try:
-            response = requests.post(url, json={}, headers=headers, timeout=30)
+            response = self._post(url, json={}, headers=headers, timeout=30)
             response.raise_for_status()
             data = response.json()
 
@@ -603,7 +626,7 @@ class PSB9Client:
         }
 
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = self._post(url, json=payload, headers=headers, timeout=30)
             response.raise_for_status()
             data = response.json()
 
@@ -633,7 +656,7 @@ class PSB9Client:
         }
 
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=60)
+            response = self._post(url, json=payload, headers=headers, timeout=60)
             response.raise_for_status()
             data = response.json()
 
@@ -663,7 +686,7 @@ class PSB9Client:
             payload["endDate"] = end_date
 
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = self._post(url, json=payload, headers=headers, timeout=30)
             response.raise_for_status()
             data = response.json()
 
@@ -688,7 +711,7 @@ class PSB9Client:
         }
 
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = self._post(url, json=payload, headers=headers, timeout=30)
             response.raise_for_status()
             data = response.json()
 
@@ -713,7 +736,7 @@ class PSB9Client:
         }
 
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = self._post(url, json=payload, headers=headers, timeout=30)
             response.raise_for_status()
             data = response.json()
 
@@ -739,7 +762,7 @@ class PSB9Client:
         }
 
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = self._post(url, json=payload, headers=headers, timeout=30)
             response.raise_for_status()
             data = response.json()
 
@@ -765,7 +788,7 @@ class PSB9Client:
         }
 
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = self._post(url, json=payload, headers=headers, timeout=30)
             response.raise_for_status()
             data = response.json()
 
@@ -793,7 +816,7 @@ class PSB9Client:
             payload["accountNumber"] = account_number
 
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = self._post(url, json=payload, headers=headers, timeout=30)
             response.raise_for_status()
             data = response.json()
 
@@ -819,7 +842,7 @@ class PSB9Client:
         }
 
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = self._post(url, json=payload, headers=headers, timeout=30)
             response.raise_for_status()
             data = response.json()
 
@@ -863,7 +886,7 @@ class PSB9Client:
 
         try:
             logger.info(f"Upgrading 9PSB account with file: {account_number} to Tier {tier}")
-            response = requests.post(url, data=data, files=files, headers=headers, timeout=60)
+            response = self._post(url, data=data, files=files, headers=headers, timeout=60)
             response.raise_for_status()
 
             response_data = response.json()
@@ -0,0 +1,294 @@
+"""
+Circuit breakers and concurrency bulkheads for outbound provider calls.
+
+Every call to an external provider (9PSB, Embedly, Prembly, Paystack, Cuoral,
+ZeptoMail) goes through provider_request(), which shares state across all web
+and Celery workers via Redis:
+
+- Bulkhead: caps in-flight calls per provider, so one slow provider cannot
+  tie up every worker while the others stay healthy. Each call holds a slot
+  that lapses after `inflight_ttl` seconds if its worker dies mid-call.
+  Calls made inside bulk_calls() (campaigns, bulk provisioning) go through a
+  separate bulkhead of `bulk_max_concurrent` slots, so batch jobs cannot take
+  the slots user-facing calls need.
+- Circuit breaker: after `failure_threshold` failures (network errors or 5xx)
+  inside `failure_window` seconds the circuit opens and calls fail immediately
+  for `recovery_timeout` seconds. A single probe call is then let through
+  (half-open); success closes the circuit, failure re-opens it.
+
+Fast-fails raise ProviderUnavailable, a requests ConnectionError subclass, so
+the existing `except requests.exceptions.*` handlers in each client turn it
+into their usual error response. If Redis is unreachable calls pass through.
+"""
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLICY = {
+    'failure_threshold': 5,
+    'failure_window': 60,
+    'recovery_timeout': 30,
+    'max_concurrent': 4,
+    'bulk_max_concurrent': 2,
+    'connect_timeout': 5,
+    'inflight_ttl': 90,
+}
+
+# Admit a call into the bulkhead. In-flight calls are tokens in a sorted set
+# scored by their deadline (Redis time + inflight_ttl); tokens of calls whose
+# worker died without releasing are dropped once their deadline passes, so a
+# killed worker cannot hold a slot for longer than inflight_ttl.
+# KEYS[1] = in-flight set; ARGV = token, max_concurrent, inflight_ttl
+_ACQUIRE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local ttl = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now + ttl, ARGV[1])
+redis.call('EXPIRE', KEYS[1], math.ceil(ttl) + 1)
+return 1
+"""
+
+# Set inside bulk_calls()
+_bulk = ContextVar('provider_bulk_calls', default=False)
+
+
+class ProviderUnavailable(requests.exceptions.ConnectionError):
+    """Raised instead of calling a provider whose circuit is open or bulkhead is full."""
+
+    def __init__(self, provider, reason):
+        super().__init__(f"{provider} unavailable: {reason}")
+        self.provider = provider
+        self.reason = reason
+
+
+def _redis():
+    from django_redis import get_redis_connection
+    return get_redis_connection("default")
+
+
+def get_policy(provider):
+    overrides = getattr(settings, 'PROVIDER_RESILIENCE', {})
+    return {**DEFAULT_POLICY, **overrides.get('default', {}), **overrides.get(provider, {})}
+
+
+@contextmanager
+def bulk_calls():
+    """
+    Admit provider_request() calls made inside the block through each
+    provider's bulk bulkhead. Context variables don't carry over to pool
+    threads, so a job that fans out to threads enters this in each worker.
+    """
+    token = _bulk.set(True)
+    try:
+        yield
+    finally:
+        _bulk.reset(token)
+
+
+class ProviderGuard:
+    """
+    Redis-backed circuit breaker and bulkhead for a single provider. Bulk
+    guards share the circuit but hold slots in the separate bulk bulkhead.
+    """
+
+    def __init__(self, provider, bulk=False):
+        self.provider = provider
+        self.policy = get_policy(provider)
+        self.bulk = bulk
+        prefix = f'circuit:{provider}'
+        self.failures_key = f'{prefix}:failures'
+        self.open_key = f'{prefix}:open_until'
+        self.probe_key = f'{prefix}:probe'
+        self.interactive_inflight_key = f'{prefix}:inflight_calls'
+        self.bulk_inflight_key = f'{prefix}:bulk_inflight_calls'
+        self.inflight_key = self.bulk_inflight_key if bulk else self.interactive_inflight_key
+        self.max_concurrent = self.policy['bulk_max_concurrent' if bulk else 'max_concurrent']
+        self.metrics_key = f'{prefix}:metrics'
+        # This call's bulkhead slot, set by acquire()
+        self.token = None
+
+    def acquire(self):
+        """
+        Admit a call or raise ProviderUnavailable.
+
+        Returns:
+            bool: True if this call is the half-open probe
+        """
+        r = _redis()
+        is_probe = False
+
+        open_until = r.get(self.open_key)
+        if open_until is not None:
+            if float(open_until) > time.time():
+                self._count('rejected_open')
+                raise ProviderUnavailable(self.provider, 'circuit open')
+            if not r.set(self.probe_key, 1, nx=True, ex=self.policy['inflight_ttl']):
+                self._count('rejected_open')
+                raise ProviderUnavailable(self.provider, 'circuit half-open, probe in progress')
+            is_probe = True
+            self._transition('half_open')
+
+        token = uuid.uuid4().hex
+        admitted = r.eval(
+            _ACQUIRE_SCRIPT, 1, self.inflight_key, token, self.max_concurrent, self.policy['inflight_ttl'],
+        )
+        if not admitted:
+            if is_probe:
+                r.delete(self.probe_key)
+            self._count('rejected_bulk_bulkhead' if self.bulk else 'rejected_bulkhead')
+            raise ProviderUnavailable(self.provider, 'too many concurrent requests')
+
+        self.token = token
+        return is_probe
+
+    def release(self, is_probe, failed):
+        r = _redis()
+        if self.token is not None:
+            r.zrem(self.inflight_key, self.token)
+            self.token = None
+
+        if is_probe:
+            r.delete(self.probe_key)
+            if failed:
+                self._open(r)
+                self._transition('reopened')
+            else:
+                r.delete(self.open_key, self.failures_key)
+                self._transition('closed')
+            return
+
+        if not failed:
+            return
+
+        pipe = r.pipeline()
+        pipe.incr(self.failures_key)
+        pipe.expire(self.failures_key, self.policy['failure_window'])
+        failures, _ = pipe.execute()
+        if failures >= self.policy['failure_threshold'] and self._open(r, only_if_closed=True):
+            self._transition('opened', failures=failures)
+
+    def _open(self, r, only_if_closed=False):
+        open_until = time.time() + self.policy['recovery_timeout']
+        # Keep the marker well past recovery so it survives until a probe resolves it
+        return r.set(self.open_key, open_until, nx=only_if_closed, ex=self.policy['recovery_timeout'] * 20)
+
+    def _transition(self, state, **extra):
+        self._count(f'transition_{state}')
+        details = ' '.join(f'{k}={v}' for k, v in extra.items())
+        log = logger.info if state in ('closed', 'half_open') else logger.warning
+        log(f"Provider circuit {self.provider} {state} {details}".rstrip())
+
+    def _count(self, metric):
+        try:
+            _redis().hincrby(self.metrics_key, metric, 1)
+        except Exception:
+            pass
+
+    def snapshot(self):
+        """Current state and counters, for dashboards and metrics export."""
+        r = _redis()
+        now = time.time()
+        open_until, inflight, bulk_inflight, failures, metrics = (
+            r.get(self.open_key), r.zcount(self.interactive_inflight_key, now, '+inf'),
+            r.zcount(self.bulk_inflight_key, now, '+inf'), r.get(self.failures_key), r.hgetall(self.metrics_key),
+        )
+        if open_until is None:
+            state = 'closed'
+        elif float(open_until) > time.time():
+            state = 'open'
+        else:
+            state = 'half_open'
+        return {
+            'provider': self.provider,
+            'state': state,
+            'inflight': int(inflight or 0),
+            'bulk_inflight': int(bulk_inflight or 0),
+            'recent_failures': int(failures or 0),
+            'metrics': {k.decode(): int(v) for k, v in metrics.items()},
+        }
+
+
+def _with_connect_timeout(timeout, connect_timeout):
+    """Split a scalar timeout so unreachable hosts fail fast while slow reads keep their budget."""
+    if isinstance(timeout, (int, float)):
+        return (min(connect_timeout, timeout), timeout)
+    return timeout
+
+
+def observe_call(provider, started, outcome):
+    """Record a provider call's latency for the /metrics endpoint (core/metrics.py)."""
+    from core.metrics import PROVIDER_BUCKETS, observe
+
+    try:
+        observe('provider_request_duration_seconds', {'provider': provider, 'outcome': outcome},
+                time.perf_counter() - started, PROVIDER_BUCKETS)
+    except Exception:
+        pass
+
+
+def simulated_url(provider, url):
+    """
+    `url` redirected to the local provider simulator when
+    PROVIDER_SIMULATOR_URL is set (providers/simulator/), else unchanged.
+    The setting is ignored unless DEBUG is on, so a stray environment
+    variable can't divert production money movement to a fake provider.
+    """
+    simulator = getattr(settings, 'PROVIDER_SIMULATOR_URL', '')
+    if not simulator or not settings.DEBUG:
+        return url
+    parts = urlsplit(url)
+    query = f'?{parts.query}' if parts.query else ''
+    return f"{simulator.rstrip('/')}/{provider}{parts.path}{query}"
+
+
+def provider_request(provider, method, url, **kwargs):
+    """
+    Drop-in replacement for requests.request() guarded by the provider's
+    circuit breaker and bulkhead (the bulk bulkhead inside bulk_calls()).
+
+    Raises:
+        ProviderUnavailable: if the circuit is open or the bulkhead is full
+        requests.exceptions.RequestException: as requests.request() would
+    """
+    url = simulated_url(provider, url)
+    guard = ProviderGuard(provider, bulk=_bulk.get())
+    kwargs['timeout'] = _with_connect_timeout(kwargs.get('timeout'), guard.policy['connect_timeout'])
+
+    try:
+        is_probe = guard.acquire()
+    except ProviderUnavailable:
+        raise
+    except Exception as e:
+        logger.warning(f"Provider guard unavailable for {provider}, calling unguarded: {e}")
+        return requests.request(method, url, **kwargs)
+
+    failed = True
+    outcome = 'exception'
+    started = time.perf_counter()
+    try:
+        response = requests.request(method, url, **kwargs)
+        failed = response.status_code >= 500
+        outcome = 'error' if failed else 'ok'
+        return response
+    finally:
+        observe_call(provider, started, outcome)
+        try:
+            guard.release(is_probe, failed)
+        except Exception as e:
+            logger.warning(f"Failed to record {provider} call outcome: {e}")
+
+
+def provider_states(providers=('psb9', 'embedly', 'prembly', 'paystack', 'cuoral', 'zeptomail')):
+    return [ProviderGuard(p).snapshot() for p in providers]
@@ -0,0 +1,175 @@
+"""
+Single-flight bearer token manager for provider APIs.
+
+Tokens are held in three tiers:
+- a process-local copy, so most calls never leave the worker;
+- a shared Redis copy, so workers reuse each other's tokens;
+- the provider's auth endpoint, hit by exactly one caller at a time
+  (guarded by a Redis lock) when the shared copy is missing or rejected.
+
+Once a token is within `refresh_ahead` seconds of its cache expiry, the first
+caller to notice renews it on a background thread while everyone keeps using
+the still-valid token, so expiry never adds an auth round trip to user calls.
+"""
+import logging
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+_local_tokens = {}
+_local_lock = threading.Lock()
+
+
+class TokenManager:
+    """
+    Args:
+        name: Cache namespace, e.g. 'psb9'
+        fetch_token: Callable returning a fresh token string, or None on failure
+        ttl: Seconds a token is considered valid after it was issued
+        refresh_ahead: Seconds before expiry at which background renewal starts
+        lock_timeout: Upper bound on how long a refresh may hold the lock
+    """
+
+    def __init__(self, name, fetch_token, ttl, refresh_ahead=600, lock_timeout=45):
+        self.name = name
+        self.fetch_token = fetch_token
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.lock_timeout = lock_timeout
+        self.cache_key = f'{name}_auth_token'
+        self.lock_key = f'{name}_auth_token_lock'
+
+    def get_token(self):
+        """Return a valid token, refreshing only when no usable token exists anywhere."""
+        entry = self._get_local()
+        if entry is None or self._due(entry):
+            # Another process may already have renewed the shared copy
+            entry = self._get_shared() or entry
+        if entry:
+            if self._due(entry):
+                self._refresh_in_background()
+            return entry[0]
+        return self._refresh()
+
+    def invalidate(self, rejected_token):
+        """
+        Force re-authentication after the provider rejected `rejected_token` (HTTP 401).
+        Returns the replacement token. If another caller already replaced the
+        token, that replacement is returned without a new auth call.
+        """
+        with _local_lock:
+            local = _local_tokens.get(self.name)
+            if local and local[0] == rejected_token:
+                _local_tokens.pop(self.name, None)
+
+        shared = self._get_shared()
+        if shared and shared[0] != rejected_token:
+            return shared[0]
+
+        cache.delete(self.cache_key)
+        return self._refresh()
+
+    def _due(self, entry):
+        """Whether a (token, expires_at) entry is inside the refresh-ahead window."""
+        return entry[1] - time.time() <= self.refresh_ahead
+
+    def _get_local(self):
+        with _local_lock:
+            entry = _local_tokens.get(self.name)
+        if entry and entry[1] > time.time():
+            return entry
+        return None
+
+    def _get_shared(self):
+        try:
+            entry = cache.get(self.cache_key)
+        except Exception as e:
+            logger.warning(f"{self.name} token cache read failed: {e}")
+            return None
+        if not isinstance(entry, dict) or entry.get('expires_at', 0) <= time.time():
+            return None
+        result = (entry['token'], entry['expires_at'])
+        with _local_lock:
+            _local_tokens[self.name] = result
+        return result
+
+    def _store(self, token):
+        expires_at = time.time() + self.ttl
+        try:
+            cache.set(self.cache_key, {'token': token, 'expires_at': expires_at}, timeout=self.ttl)
+        except Exception as e:
+            logger.warning(f"{self.name} token cache write failed: {e}")
+        with _local_lock:
+            _local_tokens[self.name] = (token, expires_at)
+
+    def _acquire_lock(self):
+        owner = uuid.uuid4().hex
+        try:
+            return owner if cache.add(self.lock_key, owner, timeout=self.lock_timeout) else None
+        except Exception:
+            # Without Redis there is nothing to coordinate with
+            return owner
+
+    def _release_lock(self, owner):
+        try:
+            if cache.get(self.lock_key) == owner:
+                cache.delete(self.lock_key)
+        except Exception:
+            pass
+
+    def _fetch_and_store(self):
+        token = self.fetch_token()
+        if token:
+            self._store(token)
+        return token
+
+    def _refresh(self):
+        owner = self._acquire_lock()
+        if owner:
+            try:
+                # Another worker may have stored a token between our miss and the lock
+                entry = self._get_shared()
+                if entry and not self._due(entry):
+                    return entry[0]
+                return self._fetch_and_store()
+            finally:
+                self._release_lock(owner)
+
+        # Someone else is refreshing: wait for their token instead of stampeding
+        deadline = time.time() + self.lock_timeout
+        while time.time() < deadline:
+            time.sleep(0.1)
+            entry = self._get_shared()
+            if entry:
+                return entry[0]
+            try:
+                if cache.get(self.lock_key) is None:
+                    break
+            except Exception:
+                break
+
+        logger.warning(f"{self.name} token refresh by another worker did not complete; authenticating directly")
+        return self._fetch_and_store()
+
+    def _refresh_in_background(self):
+        owner = self._acquire_lock()
+        if not owner:
+            return
+
+        def run():
+            try:
+                # The previous lock holder may have just renewed it
+                entry = self._get_shared()
+                if entry and not self._due(entry):
+                    return
+                self._fetch_and_store()
+            except Exception:
+                logger.exception(f"{self.name} background token refresh failed")
+            finally:
+                self._release_lock(owner)
+
+        threading.Thread(target=run, name=f'{self.name}-token-refresh', daemon=True).start()
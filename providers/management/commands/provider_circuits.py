@@ -0,0 +1,40 @@
+"""
+Show or reset provider circuit breaker state.
+
+Usage:
+    python manage.py provider_circuits
+    python manage.py provider_circuits --reset psb9
+"""
+from django.core.management.base import BaseCommand
+
+from providers.helpers.resilience import ProviderGuard, _redis, provider_states
+
+
+class Command(BaseCommand):
+    help = 'Show circuit breaker / bulkhead state for each external provider'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            metavar='PROVIDER',
+            help='Close the circuit and clear counters for a provider',
+        )
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            guard = ProviderGuard(options['reset'])
+            _redis().delete(
+                guard.open_key, guard.probe_key, guard.failures_key,
+                guard.interactive_inflight_key, guard.bulk_inflight_key,
+            )
+            self.stdout.write(self.style.SUCCESS(f"Reset circuit for {options['reset']}"))
+
+        for state in provider_states():
+            style = self.style.SUCCESS if state['state'] == 'closed' else self.style.ERROR
+            self.stdout.write(style(
+                f"{state['provider']:<10} {state['state']:<10} "
+                f"inflight={state['inflight']} bulk_inflight={state['bulk_inflight']} "
+                f"recent_failures={state['recent_failures']}"
+            ))
+            for metric, value in sorted(state['metrics'].items()):
+                self.stdout.write(f"    {metric}={value}")
@@ -0,0 +1,128 @@
+"""
+Run the local provider simulator (providers/simulator/).
+
+Point a DEBUG backend at it with PROVIDER_SIMULATOR_URL=http://127.0.0.1:8090 and
+every 9PSB, Embedly, Paystack, Prembly, Cuoral and ZeptoMail call is answered
+locally. Latency, error and timeout rates can be set here or changed while it
+runs (POST /_simulator/config). With --deposit-rate the simulator also sends
+a steady stream of signed deposit webhooks to the backend, e.g. for the
+accounts of the benchmark dataset (seed_benchmark_data).
+
+Usage:
+    python manage.py run_provider_simulator
+    python manage.py run_provider_simulator --latency 300 --error-rate 0.05 --provider-latency psb9=800
+    python manage.py run_provider_simulator --deposit-rate 20 --deposit-bench-users 10000
+"""
+import random
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from providers.simulator import webhooks
+from providers.simulator.server import SimulatorConfig, make_server
+
+
+class Command(BaseCommand):
+    help = 'Serve simulated provider APIs and emit provider webhooks for local testing and load tests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Interface to bind (default: 127.0.0.1)')
+        parser.add_argument('--port', type=int, default=8090, help='Port to listen on (default: 8090)')
+        parser.add_argument('--latency', type=float, default=80, help='Response latency in ms (default: 80)')
+        parser.add_argument('--jitter', type=float, default=40, help='Latency jitter in ms (default: 40)')
+        parser.add_argument(
+            '--provider-latency',
+            action='append',
+            default=[],
+            metavar='PROVIDER=MS',
+            help='Latency override for one provider (repeatable)',
+        )
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of calls answered with a 500')
+        parser.add_argument('--timeout-rate', type=float, default=0.0, help='Fraction of calls that never answer')
+        parser.add_argument(
+            '--webhook-target', default='http://127.0.0.1:8000', help='Backend base URL webhooks are sent to',
+        )
+        parser.add_argument('--webhook-delay', type=float, default=1.0, help='Seconds before a webhook is sent')
+        parser.add_argument('--deposit-rate', type=float, default=0, help='Deposit webhooks per second (default: 0)')
+        parser.add_argument(
+            '--deposit-provider', choices=sorted(webhooks.DEPOSITS), default='psb9', help='Deposit webhook flavour',
+        )
+        parser.add_argument(
+            '--deposit-account', action='append', default=[], help='Account number to deposit into (repeatable)',
+        )
+        parser.add_argument(
+            '--deposit-bench-users', type=int, default=0, help='Deposit into the first N benchmark users\' accounts',
+        )
+
+    def handle(self, *args, **options):
+        config = SimulatorConfig(
+            latency_ms=options['latency'],
+            jitter_ms=options['jitter'],
+            provider_latency_ms=self._provider_latency(options['provider_latency']),
+            error_rate=options['error_rate'],
+            timeout_rate=options['timeout_rate'],
+            webhook_target=options['webhook_target'],
+            webhook_delay=options['webhook_delay'],
+        )
+        server = make_server(options['host'], options['port'], config)
+        address = f"http://{options['host']}:{options['port']}"
+        self.stdout.write(self.style.SUCCESS(
+            f"Provider simulator on {address} (latency {config.latency_ms:g}±{config.jitter_ms:g}ms, "
+            f"errors {config.error_rate:.0%}, timeouts {config.timeout_rate:.0%}); "
+            f"webhooks to {config.webhook_target}"
+        ))
+        self.stdout.write(f"Set PROVIDER_SIMULATOR_URL={address} on the backend")
+
+        if options['deposit_rate'] > 0:
+            accounts = self._deposit_accounts(options)
+            threading.Thread(
+                target=self._emit_deposits,
+                args=(server.simulator, options['deposit_provider'], accounts, options['deposit_rate']),
+                daemon=True,
+            ).start()
+            self.stdout.write(
+                f"Emitting {options['deposit_rate']:g} {options['deposit_provider']} deposits/s "
+                f"across {len(accounts)} accounts"
+            )
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            for provider, counts in sorted(server.simulator.snapshot().items()):
+                self.stdout.write(f"{provider:<10} " + ' '.join(f'{k}={v}' for k, v in sorted(counts.items())))
+
+    def _provider_latency(self, values):
+        latency = {}
+        for value in values:
+            provider, _, ms = value.partition('=')
+            try:
+                latency[provider] = float(ms)
+            except ValueError:
+                raise CommandError(f'--provider-latency expects PROVIDER=MS, got {value!r}')
+        return latency
+
+    def _deposit_accounts(self, options):
+        accounts = list(options['deposit_account'])
+        if options['deposit_bench_users']:
+            from core.benchmarks import dataset
+
+            account_for = (
+                dataset.psb9_account_number_for if options['deposit_provider'] == 'psb9'
+                else dataset.account_number_for
+            )
+            accounts += [account_for(index) for index in range(options['deposit_bench_users'])]
+        if not accounts:
+            raise CommandError('--deposit-rate needs --deposit-account or --deposit-bench-users')
+        return accounts
+
+    def _emit_deposits(self, simulator, provider, accounts, rate):
+        interval = 1 / rate
+        next_at = time.monotonic()
+        while True:
+            simulator.deposit(provider, random.choice(accounts), random.randint(1, 500) * 100)
+            next_at += interval
+            time.sleep(max(0.0, next_at - time.monotonic()))
@@ -0,0 +1,20 @@
+"""
+Local simulator for the external providers (9PSB, Embedly, Paystack,
+Prembly, Cuoral, ZeptoMail).
+
+With PROVIDER_SIMULATOR_URL set and DEBUG on, provider_request() and
+async_provider_request() send every provider call to the simulator
+(<simulator>/<provider><original path>) instead of the provider's host. The
+simulator answers with the response shapes the clients in providers/helpers
+parse, after a configurable latency, and can inject errors and timeouts at
+a configurable rate. It also plays the provider's side of the webhooks:
+signed deposit notifications (9PSB transfer.credit, Embedly nip), and
+Paystack charge.success / transfer.success after a transaction or transfer
+is initiated.
+
+- responses.py  per-provider endpoint responses
+- webhooks.py   signed webhook requests, shared with core/benchmarks
+- server.py     the HTTP server, its runtime config and control endpoints
+
+Run it with `python manage.py run_provider_simulator`.
+"""
@@ -0,0 +1,308 @@
+"""
+Simulated provider endpoints.
+
+Each provider has a table of (method, path regex, handler). A handler gets
+the parsed JSON body (or {}), the query dict and the regex match, and returns
+(status, body) - plus, optionally, a list of webhooks to emit. Bodies follow
+the shapes the clients in providers/helpers parse; anything not listed gets
+the provider's generic success envelope.
+"""
+import hashlib
+import re
+import uuid
+
+from django.utils import timezone
+
+from providers.simulator import webhooks
+
+BANKS = [
+    {'bankCode': '044', 'bankName': 'Access Bank', 'code': '044', 'name': 'Access Bank'},
+    {'bankCode': '058', 'bankName': 'GTBank', 'code': '058', 'name': 'Guaranty Trust Bank'},
+    {'bankCode': '057', 'bankName': 'Zenith Bank', 'code': '057', 'name': 'Zenith Bank'},
+    {'bankCode': '120001', 'bankName': '9PSB', 'code': '120001', 'name': '9 Payment Service Bank'},
+]
+
+
+def _reference():
+    return f'SIM{uuid.uuid4().hex[:16].upper()}'
+
+
+def _account_number(seed):
+    """A stable 10-digit account number for a customer."""
+    return str(int(hashlib.sha256(str(seed).encode()).hexdigest(), 16))[:10].rjust(10, '0')
+
+
+# ==========================================
+# 9PSB
+# ==========================================
+
+def _psb9_ok(data=None, message='successful'):
+    return 200, {'status': 'success', 'responseCode': '00', 'message': message, 'data': data or {}}
+
+
+def psb9_authenticate(body, query, match):
+    return 200, {'message': 'successful', 'accessToken': f'sim-{uuid.uuid4().hex}', 'expiresIn': 3600}
+
+
+def psb9_open_wallet(body, query, match):
+    return 200, {
+        'status': 'SUCCESS',
+        'message': 'successful',
+        'data': {
+            'accountNumber': _account_number(body.get('bvn') or body.get('phoneNo') or uuid.uuid4()),
+            'fullName': f"{body.get('lastName', '')} {body.get('otherNames', '')}".strip(),
+            'customerID': f'SIMCUST{uuid.uuid4().hex[:10].upper()}',
+            'orderRef': body.get('transactionTrackingRef'),
+        },
+    }
+
+
+def psb9_balance(body, query, match):
+    return _psb9_ok({
+        'accountNumber': body.get('accountNumber'),
+        'availableBalance': '0.00',
+        'ledgerBalance': '0.00',
+        'currency': 'NGN',
+    })
+
+
+def psb9_history(body, query, match):
+    return _psb9_ok([])
+
+
+def psb9_name_enquiry(body, query, match):
+    return _psb9_ok({
+        'accountNumber': body.get('accountNumber') or body.get('customer', {}).get('accountNumber'),
+        'accountName': 'SIMULATED ACCOUNT',
+        'bankCode': body.get('bankCode'),
+        'bankName': 'Simulated Bank',
+    })
+
+
+def psb9_transfer(body, query, match):
+    return _psb9_ok({
+        'reference': body.get('reference') or body.get('transactionTrackingRef') or _reference(),
+        'sessionId': _reference(),
+        'status': 'SUCCESSFUL',
+    }, message='Transfer successful')
+
+
+def psb9_banks(body, query, match):
+    return _psb9_ok(BANKS)
+
+
+# ==========================================
+# Embedly
+# ==========================================
+
+def _embedly_ok(data=None):
+    return 200, {'success': True, 'code': '00', 'message': 'Successful', 'data': data if data is not None else {}}
+
+
+def embedly_customer(body, query, match):
+    return _embedly_ok({**body, 'id': str(uuid.uuid4())})
+
+
+def embedly_wallet(body, query, match):
+    return _embedly_ok({
+        'id': str(uuid.uuid4()),
+        'customerId': body.get('customerId'),
+        'availableBalance': 0,
+        'virtualAccount': {
+            'accountNumber': _account_number(body.get('customerId') or uuid.uuid4()),
+            'bankName': 'Simulated Bank',
+            'bankCode': '000',
+        },
+    })
+
+
+def embedly_wallet_info(body, query, match):
+    return _embedly_ok({
+        'id': str(uuid.uuid4()),
+        'availableBalance': 0,
+        'ledgerBalance': 0,
+        'virtualAccount': {'accountNumber': match.group('account'), 'bankName': 'Simulated Bank', 'bankCode': '000'},
+    })
+
+
+def embedly_name_enquiry(body, query, match):
+    return _embedly_ok({
+        'accountNumber': body.get('accountNumber'),
+        'accountName': 'SIMULATED ACCOUNT',
+        'bankCode': body.get('bankCode'),
+    })
+
+
+def embedly_transfer(body, query, match):
+    return _embedly_ok({'transactionRef': body.get('customerTransactionReference') or _reference(), 'status': 'Pending'})
+
+
+def embedly_transfer_status(body, query, match):
+    return _embedly_ok({'transactionRef': match.group('reference'), 'status': 'Success'})
+
+
+def embedly_banks(body, query, match):
+    return _embedly_ok(BANKS)
+
+
+def embedly_history(body, query, match):
+    return _embedly_ok({'walletHistories': []})
+
+
+# ==========================================
+# Paystack
+# ==========================================
+
+def _paystack_ok(data, message='Successful'):
+    return 200, {'status': True, 'message': message, 'data': data}
+
+
+def paystack_initialize(body, query, match):
+    reference = body.get('reference') or _reference()
+    response = _paystack_ok({
+        'authorization_url': f'https://checkout.paystack.com/{reference}',
+        'access_code': uuid.uuid4().hex[:15],
+        'reference': reference,
+    })
+    # The payer completes checkout a moment later
+    return (*response, [webhooks.paystack_event('charge.success', {
+        'reference': reference,
+        'amount': body.get('amount'),
+        'status': 'success',
+        'paid_at': timezone.now().isoformat(),
+        'customer': {'email': body.get('email')},
+    })])
+
+
+def paystack_verify(body, query, match):
+    return _paystack_ok({'reference': match.group('reference'), 'status': 'success', 'amount': 0})
+
+
+def paystack_recipient(body, query, match):
+    return _paystack_ok({'recipient_code': f'RCP_{uuid.uuid4().hex[:12]}', 'active': True, **body})
+
+
+def paystack_transfer(body, query, match):
+    reference = body.get('reference') or _reference()
+    response = _paystack_ok({
+        'reference': reference,
+        'transfer_code': f'TRF_{uuid.uuid4().hex[:12]}',
+        'status': 'pending',
+        'amount': body.get('amount'),
+    })
+    return (*response, [webhooks.paystack_event('transfer.success', {
+        'reference': reference,
+        'amount': body.get('amount'),
+        'status': 'success',
+    })])
+
+
+def paystack_resolve(body, query, match):
+    return _paystack_ok({'account_number': query.get('account_number'), 'account_name': 'SIMULATED ACCOUNT'})
+
+
+def paystack_banks(body, query, match):
+    return _paystack_ok(BANKS)
+
+
+# ==========================================
+# Prembly, Cuoral, ZeptoMail
+# ==========================================
+
+def prembly_verify(body, query, match):
+    identity = {
+        'firstName': body.get('firstname') or 'SIMULATED',
+        'lastName': body.get('lastname') or 'USER',
+        'middleName': '',
+        'phoneNumber': '08000000000',
+        'dateOfBirth': body.get('dob') or '1990-01-01',
+        'gender': 'Female',
+    }
+    return 200, {
+        'status': True,
+        'response_code': '00',
+        'detail': 'Verification successful',
+        'verification': {'status': 'VERIFIED', 'reference': str(uuid.uuid4())},
+        'data': identity,
+        'nin_data': identity,
+    }
+
+
+def cuoral_sms(body, query, match):
+    return 200, {'status': 'success', 'message': 'Message queued', 'data': {'id': str(uuid.uuid4())}}
+
+
+def zeptomail_send(body, query, match):
+    return 201, {'data': [{'code': 'EM_104', 'message': 'Email request received'}], 'message': 'OK',
+                 'request_id': uuid.uuid4().hex}
+
+
+ROUTES = {
+    'psb9': [
+        ('POST', r'/bank9ja/api/v2/k1/authenticate$', psb9_authenticate),
+        ('POST', r'/waas/api/v1/open_wallet$', psb9_open_wallet),
+        ('POST', r'/waas/api/v1/wallet_enquiry$', psb9_balance),
+        ('POST', r'/waas/api/v1/wallet(/|_)transactions$', psb9_history),
+        ('POST', r'/waas/api/v1/(verify_account|other_banks_enquiry)$', psb9_name_enquiry),
+        ('POST', r'/waas/api/v1/(wallet/transfer|wallet_other_banks|debit/transfer|credit/transfer)$', psb9_transfer),
+        ('POST', r'/waas/api/v1/get_banks$', psb9_banks),
+    ],
+    'embedly': [
+        ('POST', r'/customers/add$', embedly_customer),
+        ('POST', r'/wallets/add$', embedly_wallet),
+        ('GET', r'/wallets/get/wallet/account/(?P<account>[^/]+)$', embedly_wallet_info),
+        ('POST', r'/Payout/name-enquiry$', embedly_name_enquiry),
+        ('POST', r'/Payout/inter-bank-transfer$', embedly_transfer),
+        ('GET', r'/Payout/status/(?P<reference>[^/]+)$', embedly_transfer_status),
+        ('GET', r'/Payout/banks$', embedly_banks),
+        (None, r'/[Ww]allets/history$', embedly_history),
+    ],
+    'paystack': [
+        ('POST', r'/transaction/initialize$', paystack_initialize),
+        ('GET', r'/transaction/verify/(?P<reference>[^/]+)$', paystack_verify),
+        ('POST', r'/transferrecipient$', paystack_recipient),
+        ('POST', r'/transfer$', paystack_transfer),
+        ('GET', r'/bank/resolve$', paystack_resolve),
+        ('GET', r'/bank$', paystack_banks),
+    ],
+    'prembly': [
+        ('POST', r'/verification/.+$', prembly_verify),
+    ],
+    'cuoral': [
+        ('POST', r'.*$', cuoral_sms),
+    ],
+    'zeptomail': [
+        ('POST', r'/email$', zeptomail_send),
+    ],
+}
+
+DEFAULTS = {
+    'psb9': lambda: _psb9_ok(),
+    'embedly': lambda: _embedly_ok(),
+    'paystack': lambda: _paystack_ok({}),
+}
+
+_COMPILED = {
+    provider: [(method, re.compile(pattern), handler) for method, pattern, handler in routes]
+    for provider, routes in ROUTES.items()
+}
+
+
+def respond(provider, method, path, body, query):
+    """
+    (status, body, webhooks) for a simulated call; webhooks is a list of
+    (path, body, headers) to deliver to the backend afterwards.
+    """
+    if provider not in _COMPILED:
+        return 404, {'status': 'error', 'message': f'Unknown provider {provider}'}, []
+    for route_method, pattern, handler in _COMPILED[provider]:
+        if route_method not in (None, method):
+            continue
+        match = pattern.search(path)
+        if match:
+            status, response_body, *emitted = handler(body, query, match)
+            return status, response_body, emitted[0] if emitted else []
+    default = DEFAULTS.get(provider)
+    if default is None:
+        return 200, {'status': 'success'}, []
+    return (*default(), [])
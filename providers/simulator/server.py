@@ -0,0 +1,194 @@
+"""
+The provider simulator's HTTP server.
+
+Requests to /<provider>/<path> are answered from responses.py after the
+configured latency. A fraction of calls (error_rate) get a 500 and another
+(timeout_rate) hang past every client timeout, so retry, circuit-breaker and
+reconciliation paths can be exercised. Webhooks a response implies are
+delivered to webhook_target after webhook_delay seconds.
+
+Control endpoints (JSON):
+    GET  /_simulator/stats      calls, errors and webhooks per provider
+    GET  /_simulator/config     current configuration
+    POST /_simulator/config     update it at runtime, e.g. {"error_rate": 0.2}
+    POST /_simulator/deposit    emit a deposit webhook:
+                                {"provider": "psb9", "account_number": "...", "amount": 5000}
+"""
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+from providers.simulator import responses, webhooks
+
+logger = logging.getLogger(__name__)
+
+# Longer than any provider client's read timeout
+TIMEOUT_SECONDS = 120
+
+
+@dataclass
+class SimulatorConfig:
+    latency_ms: float = 80
+    jitter_ms: float = 40
+    # provider -> latency_ms, overriding latency_ms
+    provider_latency_ms: dict = field(default_factory=dict)
+    error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    webhook_target: str = 'http://127.0.0.1:8000'
+    webhook_delay: float = 1.0
+
+    def update(self, values):
+        for name, value in values.items():
+            if not hasattr(self, name):
+                raise ValueError(f'Unknown setting {name}')
+            current = getattr(self, name)
+            setattr(self, name, value if isinstance(current, (dict, str)) else float(value))
+
+    def latency_for(self, provider):
+        base = self.provider_latency_ms.get(provider, self.latency_ms)
+        return max(0.0, base + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+
+
+class Simulator:
+    """Shared state: configuration, counters and webhook delivery."""
+
+    def __init__(self, config):
+        self.config = config
+        self.lock = threading.Lock()
+        self.stats = defaultdict(lambda: defaultdict(int))
+        self.session = requests.Session()
+
+    def count(self, provider, outcome):
+        with self.lock:
+            self.stats[provider][outcome] += 1
+
+    def emit(self, provider, path, body, headers, delay=None):
+        """Deliver a webhook to the backend in the background."""
+        def deliver():
+            url = self.config.webhook_target.rstrip('/') + path
+            try:
+                response = self.session.post(
+                    url, data=body, headers={**headers, 'Content-Type': 'application/json'}, timeout=30,
+                )
+                self.count(provider, f'webhook_{response.status_code}')
+                logger.info(f"Delivered {provider} webhook to {url}: {response.status_code}")
+            except requests.RequestException as e:
+                self.count(provider, 'webhook_failed')
+                logger.warning(f"Failed to deliver {provider} webhook to {url}: {e}")
+
+        timer = threading.Timer(self.config.webhook_delay if delay is None else delay, deliver)
+        timer.daemon = True
+        timer.start()
+
+    def deposit(self, provider, account_number, amount, reference=None, delay=0):
+        """Emit a signed deposit webhook. Returns its reference."""
+        reference = reference or f'SIMDEP{uuid.uuid4().hex[:16].upper()}'
+        path, body, headers = webhooks.DEPOSITS[provider](account_number, amount, reference)
+        self.emit(provider, path, body, headers, delay=delay)
+        return reference
+
+    def snapshot(self):
+        with self.lock:
+            return {provider: dict(counts) for provider, counts in self.stats.items()}
+
+
+class SimulatorHandler(BaseHTTPRequestHandler):
+    server_version = 'ProviderSimulator/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    @property
+    def simulator(self):
+        return self.server.simulator
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        try:
+            return json.loads(raw) if raw else {}
+        except ValueError:
+            return {}
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self, method):
+        url = urlsplit(self.path)
+        body = self._body()
+        if url.path.startswith('/_simulator/'):
+            return self._control(method, url.path, body)
+
+        provider, _, path = url.path.lstrip('/').partition('/')
+        config = self.simulator.config
+        time.sleep(config.latency_for(provider))
+
+        roll = random.random()
+        if roll < config.timeout_rate:
+            self.simulator.count(provider, 'timeout')
+            time.sleep(TIMEOUT_SECONDS)
+            self.close_connection = True
+            return
+        if roll < config.timeout_rate + config.error_rate:
+            self.simulator.count(provider, 'error')
+            return self._send(500, {'status': 'error', 'success': False, 'message': 'Simulated provider error'})
+
+        status, response_body, emitted = responses.respond(
+            provider, method, '/' + path, body, dict(parse_qsl(url.query)),
+        )
+        self.simulator.count(provider, 'ok' if status < 400 else f'http_{status}')
+        for webhook_path, webhook_body, headers in emitted:
+            self.simulator.emit(provider, webhook_path, webhook_body, headers)
+        self._send(status, response_body)
+
+    def _control(self, method, path, body):
+        if path == '/_simulator/stats':
+            return self._send(200, self.simulator.snapshot())
+        if path == '/_simulator/config':
+            if method == 'POST':
+                try:
+                    self.simulator.config.update(body)
+                except (TypeError, ValueError) as e:
+                    return self._send(400, {'message': str(e)})
+            return self._send(200, asdict(self.simulator.config))
+        if path == '/_simulator/deposit' and method == 'POST':
+            provider = body.get('provider', 'psb9')
+            if provider not in webhooks.DEPOSITS or not body.get('account_number'):
+                return self._send(400, {'message': f'provider must be one of {sorted(webhooks.DEPOSITS)} '
+                                                   f'and account_number is required'})
+            reference = self.simulator.deposit(
+                provider, body['account_number'], body.get('amount', 5000), body.get('reference'),
+            )
+            return self._send(202, {'reference': reference})
+        return self._send(404, {'message': f'Unknown control endpoint {path}'})
+
+
+def make_server(host, port, config):
+    server = ThreadingHTTPServer((host, port), SimulatorHandler)
+    server.daemon_threads = True
+    server.simulator = Simulator(config)
+    return server
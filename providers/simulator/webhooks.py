@@ -0,0 +1,74 @@
+"""
+Signed provider webhooks, as the providers send them.
+
+Each builder returns (path, body, headers) for a POST to this backend,
+signed with the secret the matching webhook view verifies against.
+"""
+import hashlib
+import hmac
+import json
+
+from django.conf import settings
+from django.utils import timezone
+
+PSB9_WEBHOOK_PATH = '/api/v1/wallet/9psb/webhook'
+EMBEDLY_WEBHOOK_PATH = '/api/v1/wallet/embedly/webhook/secure'
+PAYSTACK_WEBHOOK_PATH = '/api/webhooks/paystack/'
+
+
+def _sign(secret, body, algorithm):
+    return hmac.new((secret or '').encode(), body, algorithm).hexdigest()
+
+
+def psb9_deposit(account_number, amount, reference, sender_name='Simulated Sender', narration='Simulated deposit'):
+    """9PSB transfer.credit notification (PSB9WebhookView)."""
+    body = json.dumps({
+        'event': 'transfer.credit',
+        'data': {
+            'reference': reference,
+            'accountNumber': account_number,
+            'accountName': 'Simulated Account',
+            'amount': amount,
+            'narration': narration,
+            'senderName': sender_name,
+            'senderAccount': '0000000000',
+            'senderBank': 'Simulated Bank',
+            'transactionDate': timezone.now().isoformat(),
+            'sessionId': reference,
+        },
+    }).encode()
+    return PSB9_WEBHOOK_PATH, body, {
+        'X-9PSB-Signature': _sign(getattr(settings, 'PSB9_CLIENT_SECRET', ''), body, hashlib.sha256),
+    }
+
+
+def embedly_deposit(account_number, amount, reference, sender_name='Simulated Sender', narration='Simulated deposit'):
+    """Embedly NIP credit notification (EmbedlyWebhookView)."""
+    body = json.dumps({
+        'event': 'nip',
+        'data': {
+            'accountNumber': account_number,
+            'reference': reference,
+            'amount': amount,
+            'senderName': sender_name,
+            'senderBank': 'Simulated Bank',
+            'narration': narration,
+        },
+    }).encode()
+    return EMBEDLY_WEBHOOK_PATH, body, {
+        'X-Auth-Signature': _sign(settings.EMBEDLY_API_KEY_PRODUCTION, body, hashlib.sha512),
+    }
+
+
+def paystack_event(event, data):
+    """Paystack event notification (PaystackWebhookAPIView)."""
+    body = json.dumps({'event': event, 'data': data}).encode()
+    return PAYSTACK_WEBHOOK_PATH, body, {
+        'X-Paystack-Signature': _sign(settings.PAYSTACK_SECRET_KEY, body, hashlib.sha512),
+    }
+
+
+DEPOSITS = {
+    'psb9': psb9_deposit,
+    'embedly': embedly_deposit,
+}
@@ -1,3 +1,245 @@
-from django.test import TestCase
+import time
+from unittest import mock
 
-# Create your tests here.
+import httpx
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core.testing import requires_redis
+from providers.helpers import async_clients, token_manager
+from providers.helpers.resilience import (
+    ProviderGuard, ProviderUnavailable, _redis, bulk_calls, provider_request, simulated_url,
+)
+from providers.helpers.token_manager import TokenManager
+
+PROVIDER = 'test-bulkhead'
+
+
+@requires_redis
+@override_settings(PROVIDER_RESILIENCE={PROVIDER: {'max_concurrent': 2, 'bulk_max_concurrent': 1, 'inflight_ttl': 1}})
+class ProviderBulkheadTests(SimpleTestCase):
+    def setUp(self):
+        guard = ProviderGuard(PROVIDER)
+        self.keys = [
+            guard.open_key, guard.probe_key, guard.failures_key, guard.inflight_key, guard.bulk_inflight_key,
+            guard.metrics_key,
+        ]
+        _redis().delete(*self.keys)
+        self.addCleanup(_redis().delete, *self.keys)
+
+    def test_caps_concurrent_calls(self):
+        first, second = ProviderGuard(PROVIDER), ProviderGuard(PROVIDER)
+        first.acquire()
+        second.acquire()
+
+        with self.assertRaises(ProviderUnavailable):
+            ProviderGuard(PROVIDER).acquire()
+        self.assertEqual(ProviderGuard(PROVIDER).snapshot()['inflight'], 2)
+
+        first.release(is_probe=False, failed=False)
+        ProviderGuard(PROVIDER).acquire()
+
+    def test_rejected_call_takes_no_slot(self):
+        ProviderGuard(PROVIDER).acquire()
+        ProviderGuard(PROVIDER).acquire()
+        for _ in range(3):
+            with self.assertRaises(ProviderUnavailable):
+                ProviderGuard(PROVIDER).acquire()
+
+        self.assertEqual(_redis().zcard(ProviderGuard(PROVIDER).inflight_key), 2)
+
+    def test_slot_of_a_call_never_released_lapses(self):
+        # Two calls whose workers died without releasing
+        ProviderGuard(PROVIDER).acquire()
+        ProviderGuard(PROVIDER).acquire()
+        with self.assertRaises(ProviderUnavailable):
+            ProviderGuard(PROVIDER).acquire()
+
+        time.sleep(1.1)
+        ProviderGuard(PROVIDER).acquire()
+        self.assertEqual(ProviderGuard(PROVIDER).snapshot()['inflight'], 1)
+
+    def test_release_is_idempotent(self):
+        guard = ProviderGuard(PROVIDER)
+        guard.acquire()
+        guard.release(is_probe=False, failed=False)
+        guard.release(is_probe=False, failed=False)
+
+        self.assertEqual(ProviderGuard(PROVIDER).snapshot()['inflight'], 0)
+
+    def test_bulk_calls_have_their_own_bulkhead(self):
+        ProviderGuard(PROVIDER, bulk=True).acquire()
+        with self.assertRaises(ProviderUnavailable):
+            ProviderGuard(PROVIDER, bulk=True).acquire()
+
+        # User-facing calls still get all their slots
+        ProviderGuard(PROVIDER).acquire()
+        ProviderGuard(PROVIDER).acquire()
+        snapshot = ProviderGuard(PROVIDER).snapshot()
+        self.assertEqual((snapshot['inflight'], snapshot['bulk_inflight']), (2, 1))
+
+    def test_provider_request_inside_bulk_calls_uses_the_bulk_bulkhead(self):
+        ProviderGuard(PROVIDER, bulk=True).acquire()
+
+        with mock.patch('providers.helpers.resilience.requests.request') as request:
+            request.return_value.status_code = 200
+            with bulk_calls(), self.assertRaises(ProviderUnavailable):
+                provider_request(PROVIDER, 'GET', 'https://provider.example.com/ping')
+            provider_request(PROVIDER, 'GET', 'https://provider.example.com/ping')
+
+        request.assert_called_once()
+
+
+class AsyncProviderClientTests(TestCase):
+    def setUp(self):
+        self.requests = []
+        self.responses = []
+        guard = mock.patch.object(async_clients, 'ProviderGuard')
+        guard.start().return_value.policy = {'connect_timeout': 5}
+        self.addCleanup(guard.stop)
+        client = mock.patch.object(async_clients, 'get_async_client', side_effect=self._client)
+        client.start()
+        self.addCleanup(client.stop)
+
+    def _client(self):
+        return httpx.AsyncClient(transport=httpx.MockTransport(self._handle))
+
+    def _handle(self, request):
+        self.requests.append(request)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async def test_psb9_get_banks(self):
+        self.responses.append(httpx.Response(200, json={'status': 'SUCCESS', 'data': [{'bankCode': '058'}]}))
+
+        with mock.patch.object(token_manager.TokenManager, 'get_token', return_value='token-1'):
+            result = await async_clients.AsyncPSB9Client().get_banks()
+
+        self.assertEqual(result, {'status': 'success', 'data': [{'bankCode': '058'}]})
+        self.assertEqual(self.requests[0].headers['Authorization'], 'Bearer token-1')
+
+    async def test_psb9_reauthenticates_once_on_401(self):
+        self.responses += [
+            httpx.Response(401, json={}),
+            httpx.Response(200, json={'status': 'success', 'data': {'availableBalance': '10.00'}}),
+        ]
+
+        with mock.patch.object(token_manager.TokenManager, 'get_token', return_value='token-1'), \
+                mock.patch.object(token_manager.TokenManager, 'invalidate', return_value='token-2') as invalidate:
+            result = await async_clients.AsyncPSB9Client().get_wallet_balance('2000000001')
+
+        self.assertEqual(result['status'], 'success')
+        invalidate.assert_called_once_with('token-1')
+        self.assertEqual([r.headers['Authorization'] for r in self.requests], ['Bearer token-1', 'Bearer token-2'])
+
+    async def test_psb9_transport_error_is_an_error_result(self):
+        self.responses.append(httpx.ConnectError('connection refused'))
+
+        with mock.patch.object(token_manager.TokenManager, 'get_token', return_value='token-1'):
+            result = await async_clients.AsyncPSB9Client().other_banks_enquiry('0123456789', '058')
+
+        self.assertEqual(result['status'], 'error')
+        self.assertIn('connection refused', result['message'])
+
+    async def test_open_circuit_is_an_error_result(self):
+        async_clients.ProviderGuard.return_value.acquire.side_effect = ProviderUnavailable('embedly', 'circuit open')
+
+        result = await async_clients.AsyncEmbedlyClient().get_banks()
+
+        self.assertFalse(result['success'])
+        self.assertEqual(self.requests, [])
+
+    async def test_embedly_resolve_bank_account(self):
+        self.responses.append(httpx.Response(200, json={'data': {'accountName': 'ADA SAVER'}}))
+
+        result = await async_clients.AsyncEmbedlyClient().resolve_bank_account('0123456789', '058')
+
+        self.assertEqual(result, {'success': True, 'data': {'accountName': 'ADA SAVER'}})
+        self.assertEqual(str(self.requests[0].url), 'https://payout-prod.embedly.ng/api/Payout/name-enquiry')
+        async_clients.ProviderGuard.return_value.release.assert_called_once()
+
+
+class _InlineThread:
+    """Runs a background refresh on the calling thread."""
+
+    def __init__(self, target, **kwargs):
+        self.target = target
+
+    def start(self):
+        self.target()
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TokenManagerTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(token_manager._local_tokens.clear)
+        token_manager._local_tokens.clear()
+        self.fetches = 0
+        self.manager = TokenManager('test-provider', self._fetch, ttl=3600, refresh_ahead=600)
+        patcher = mock.patch.object(token_manager.threading, 'Thread', _InlineThread)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _fetch(self):
+        self.fetches += 1
+        return f'token-{self.fetches}'
+
+    def _expire_local_copy_soon(self):
+        token, _ = token_manager._local_tokens[self.manager.name]
+        token_manager._local_tokens[self.manager.name] = (token, time.time() + 60)
+
+    def test_fetches_once_and_reuses(self):
+        self.assertEqual(self.manager.get_token(), 'token-1')
+        self.assertEqual(self.manager.get_token(), 'token-1')
+        self.assertEqual(self.fetches, 1)
+
+    def test_refreshes_ahead_of_expiry(self):
+        self.manager.get_token()
+        self._expire_local_copy_soon()
+        cache.set(self.manager.cache_key, {'token': 'token-1', 'expires_at': time.time() + 60})
+
+        self.assertEqual(self.manager.get_token(), 'token-1')
+        self.assertEqual(self.fetches, 2)
+        self.assertEqual(self.manager.get_token(), 'token-2')
+
+    def test_stale_local_copy_uses_token_renewed_by_another_process(self):
+        self.manager.get_token()
+        # Another process renewed the shared token; this one still holds the old copy
+        cache.set(self.manager.cache_key, {'token': 'renewed', 'expires_at': time.time() + 3600})
+        self._expire_local_copy_soon()
+
+        self.assertEqual(self.manager.get_token(), 'renewed')
+        self.assertEqual(self.fetches, 1)
+
+    def test_background_refresh_skips_token_renewed_while_waiting_for_lock(self):
+        self.manager.get_token()
+        self._expire_local_copy_soon()
+        cache.set(self.manager.cache_key, {'token': 'token-1', 'expires_at': time.time() + 60})
+
+        real_acquire = self.manager._acquire_lock
+
+        def acquire_after_other_holder():
+            # The previous holder renews the shared token just before releasing the lock
+            cache.set(self.manager.cache_key, {'token': 'renewed', 'expires_at': time.time() + 3600})
+            return real_acquire()
+
+        with mock.patch.object(self.manager, '_acquire_lock', acquire_after_other_holder):
+            self.manager.get_token()
+
+        self.assertEqual(self.fetches, 1)
+        self.assertEqual(self.manager.get_token(), 'renewed')
+
+
+class SimulatedUrlTests(SimpleTestCase):
+    url = 'https://api.9psb.com.ng/waas/api/v1/wallet/enquiry?x=1'
+
+    @override_settings(DEBUG=True, PROVIDER_SIMULATOR_URL='http://127.0.0.1:8090/')
+    def test_redirects_to_the_simulator_in_debug(self):
+        self.assertEqual(simulated_url('9psb', self.url), 'http://127.0.0.1:8090/9psb/waas/api/v1/wallet/enquiry?x=1')
+
+    @override_settings(DEBUG=False, PROVIDER_SIMULATOR_URL='http://127.0.0.1:8090')
+    def test_ignored_without_debug(self):
+        self.assertEqual(simulated_url('9psb', self.url), self.url)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import SavingsGoalModel, SavingsGoalTransaction
+from .models import SavingsGoalModel, SavingsGoalTransaction, SavingsInterestAccrual
 
 
 @admin.register(SavingsGoalModel)
@@ -44,3 +44,20 @@ class SavingsGoalTransactionAdmin(admin.ModelAdmin):
     def user_email(self, obj):
         return obj.goal.user.email
     user_email.short_description = 'User Email'
+
+
+@admin.register(SavingsInterestAccrual)
+class SavingsInterestAccrualAdmin(admin.ModelAdmin):
+    list_display = (
+        'goal',
+        'accrual_date',
+        'principal',
+        'interest_rate',
+        'amount',
+        'created_at',
+    )
+    list_filter = ('accrual_date',)
+    search_fields = ('goal__name', 'goal__user__email')
+    raw_id_fields = ('goal',)
+    list_select_related = ('goal__user',)
+    readonly_fields = ('run_id', 'created_at')
@@ -0,0 +1,119 @@
+# savings/interest.py
+"""
+Daily interest accrual for savings goals.
+
+Each night the day that just ended is accrued for every active goal with a
+positive balance and rate, in batches of SAVINGS_INTEREST_BATCH_SIZE goals
+walked in primary-key order. A batch is one transaction:
+
+- the day's interest (amount * rate / 100 / 365, rounded to the kobo) is
+  written to the SavingsInterestAccrual ledger with a single bulk_create
+  tagged with the run's run_id, and
+- a single UPDATE adds to accrued_interest the ledger rows carrying that
+  run_id, i.e. only the rows this run wrote.
+
+Goals that already have a ledger row for the day are skipped, and rows that a
+concurrent run inserted first are dropped by the (goal, accrual_date) unique
+constraint (ignore_conflicts) and credited by that run, so running a day twice
+never accrues it twice and a collision costs only the colliding goals.
+"""
+import logging
+import uuid
+from datetime import datetime, time, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from savings.models import SavingsGoalModel, SavingsInterestAccrual
+
+logger = logging.getLogger(__name__)
+
+DAYS_IN_YEAR = Decimal('365')
+KOBO = Decimal('0.01')
+
+
+def _batch_size():
+    return getattr(settings, 'SAVINGS_INTEREST_BATCH_SIZE', 5000)
+
+
+def daily_interest(principal, interest_rate):
+    """One day's interest on principal at an annual rate given in percent."""
+    return (principal * interest_rate / Decimal('100') / DAYS_IN_YEAR).quantize(KOBO, rounding=ROUND_HALF_UP)
+
+
+def accruable_goals(accrual_date):
+    """Goals that earn interest for accrual_date and haven't been accrued for it yet."""
+    end_of_day = timezone.make_aware(datetime.combine(accrual_date + timedelta(days=1), time.min))
+    return SavingsGoalModel.objects.filter(
+        status='active',
+        amount__gt=0,
+        interest_rate__gt=0,
+        created_at__lt=end_of_day,
+    ).exclude(
+        Exists(SavingsInterestAccrual.objects.filter(goal=OuterRef('pk'), accrual_date=accrual_date)),
+    )
+
+
+def _accrue_batch(run_id, accrual_date, goals):
+    """Ledger and credit one batch of (id, amount, interest_rate). Returns (goals credited, total interest)."""
+    accruals = []
+    for goal_id, principal, interest_rate in goals:
+        amount = daily_interest(principal, interest_rate)
+        if amount > 0:
+            accruals.append(SavingsInterestAccrual(
+                goal_id=goal_id,
+                accrual_date=accrual_date,
+                principal=principal,
+                interest_rate=interest_rate,
+                amount=amount,
+                run_id=run_id,
+            ))
+    if not accruals:
+        return 0, Decimal('0')
+
+    written = SavingsInterestAccrual.objects.filter(
+        run_id=run_id, accrual_date=accrual_date, goal_id__in=[accrual.goal_id for accrual in accruals],
+    )
+    with transaction.atomic():
+        SavingsInterestAccrual.objects.bulk_create(accruals, ignore_conflicts=True)
+        SavingsGoalModel.objects.filter(Exists(written.filter(goal=OuterRef('pk')))).update(
+            accrued_interest=F('accrued_interest') + Subquery(written.filter(goal=OuterRef('pk')).values('amount')[:1]),
+            updated_at=timezone.now(),
+        )
+        summary = written.aggregate(goals=Count('id'), interest=Sum('amount'))
+    return summary['goals'], (summary['interest'] or Decimal('0')).quantize(KOBO)
+
+
+def accrue_interest(accrual_date=None, batch_size=None):
+    """
+    Accrue one day's interest on all eligible goals (default: yesterday).
+    Safe to re-run for the same day. Returns a summary dict.
+    """
+    accrual_date = accrual_date or timezone.localdate() - timedelta(days=1)
+    batch_size = batch_size or _batch_size()
+    pending = accruable_goals(accrual_date).order_by('id')
+    run_id = uuid.uuid4()
+
+    credited = batches = 0
+    total = Decimal('0')
+    last_id = 0
+    while True:
+        goals = list(pending.filter(id__gt=last_id).values_list('id', 'amount', 'interest_rate')[:batch_size])
+        if not goals:
+            break
+        last_id = goals[-1][0]
+        batches += 1
+        count, interest = _accrue_batch(run_id, accrual_date, goals)
+        credited += count
+        total += interest
+
+    logger.info(f"Accrued {total} interest for {accrual_date} on {credited} goals in {batches} batches (run {run_id})")
+    return {
+        'accrual_date': accrual_date.isoformat(),
+        'goals': credited,
+        'interest': str(total),
+        'batches': batches,
+    }
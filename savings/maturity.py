@@ -0,0 +1,115 @@
+# savings/maturity.py
+"""
+Unlocking matured savings goals.
+
+A locked goal stays is_locked=True until its maturity_date passes; the
+unlock job then flips it with a set-based UPDATE ... RETURNING, a batch of
+SAVINGS_UNLOCK_BATCH_SIZE goals per statement, and enqueues the
+"goal unlocked" notifications for the returned goals in chunks. Goals that
+matured more than SAVINGS_UNLOCK_NOTIFY_WINDOW seconds before the run are
+unlocked without a notification, so a backlog (such as every goal that
+matured before this job existed) doesn't send months-late pushes. The
+partial index on maturity_date WHERE is_locked keeps each run to the goals
+that are actually due.
+
+The job runs hourly; a withdrawal that lands between maturity and the next
+run unlocks its goal on the spot with unlock_goal_if_matured.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from savings.models import SavingsGoalModel
+
+logger = logging.getLogger(__name__)
+
+# Goals per notify_goals_unlocked task
+NOTIFY_CHUNK_SIZE = 500
+
+
+def _batch_size():
+    return getattr(settings, 'SAVINGS_UNLOCK_BATCH_SIZE', 5000)
+
+
+def _notify_after(now):
+    """Goals that matured before this are unlocked silently."""
+    return now - timedelta(seconds=getattr(settings, 'SAVINGS_UNLOCK_NOTIFY_WINDOW', 24 * 60 * 60))
+
+
+def _unlock_batch(now, batch_size, notify_after):
+    """
+    Unlock up to batch_size matured goals. Returns (goal id, notify) pairs,
+    notify being whether the goal matured after notify_after.
+    """
+    table = connection.ops.quote_name(SavingsGoalModel._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET is_locked = %s, updated_at = %s "
+            f"WHERE id IN (SELECT id FROM {table} WHERE is_locked = %s AND maturity_date <= %s "
+            f"ORDER BY maturity_date LIMIT %s) "
+            f"AND is_locked = %s "
+            f"RETURNING id, maturity_date >= %s",
+            [False, now, True, now, batch_size, True, notify_after],
+        )
+        return [(goal_id, bool(notify)) for goal_id, notify in cursor.fetchall()]
+
+
+def _enqueue_notifications(goal_ids):
+    from savings.tasks import notify_goals_unlocked
+
+    for start in range(0, len(goal_ids), NOTIFY_CHUNK_SIZE):
+        notify_goals_unlocked.delay(goal_ids[start:start + NOTIFY_CHUNK_SIZE])
+
+
+def unlock_matured_goals(now=None, batch_size=None):
+    """Unlock every locked goal whose maturity date has passed. Returns a summary dict."""
+    now = now or timezone.now()
+    batch_size = batch_size or _batch_size()
+
+    notify_after = _notify_after(now)
+    unlocked = notified = batches = 0
+    while True:
+        with transaction.atomic():
+            goals = _unlock_batch(now, batch_size, notify_after)
+            goal_ids = [goal_id for goal_id, notify in goals if notify]
+            if goal_ids:
+                transaction.on_commit(lambda goal_ids=goal_ids: _enqueue_notifications(goal_ids))
+        if not goals:
+            break
+        unlocked += len(goals)
+        notified += len(goal_ids)
+        batches += 1
+        if len(goals) < batch_size:
+            break
+
+    logger.info(f"Unlocked {unlocked} matured savings goals in {batches} batches ({notified} notified)")
+    return {
+        'unlocked': unlocked,
+        'notified': notified,
+        'batches': batches,
+        'timestamp': now.isoformat(),
+    }
+
+
+def unlock_goal_if_matured(goal):
+    """
+    Unlock a single locked goal whose maturity date has passed (or that has
+    none) before the job gets to it. Updates goal in place; returns True if
+    it is now unlocked.
+    """
+    if not goal.is_locked:
+        return True
+    now = timezone.now()
+    if goal.maturity_date is not None and goal.maturity_date > now:
+        return False
+
+    with transaction.atomic():
+        # Only the caller that flips the row sends the notification
+        unlocked = SavingsGoalModel.objects.filter(id=goal.id, is_locked=True).update(is_locked=False, updated_at=now)
+        if unlocked and goal.maturity_date is not None and goal.maturity_date >= _notify_after(now):
+            transaction.on_commit(lambda: _enqueue_notifications([goal.id]))
+    goal.is_locked = False
+    return True
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.4 on 2026-10-19 06:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('savings', '0006_savingsgoalmodel_early_withdrawal_penalty_percent_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavingsInterestAccrual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('accrual_date', models.DateField(help_text='The day the interest was earned for.')),
+                ('principal', models.DecimalField(decimal_places=2, help_text='Goal balance the interest was calculated on.', max_digits=15)),
+                ('interest_rate', models.DecimalField(decimal_places=2, help_text='Annual interest rate (percent) applied.', max_digits=15)),
+                ('amount', models.DecimalField(decimal_places=2, help_text='Interest accrued for the day.', max_digits=15)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('goal', models.ForeignKey(help_text='The savings goal the interest was accrued on.', on_delete=django.db.models.deletion.CASCADE, related_name='interest_accruals', to='savings.savingsgoalmodel')),
+            ],
+            options={
+                'verbose_name': 'Savings Interest Accrual',
+                'verbose_name_plural': 'Savings Interest Accruals',
+                'ordering': ['-accrual_date', '-id'],
+                'constraints': [models.UniqueConstraint(fields=('goal', 'accrual_date'), name='unique_interest_accrual_per_goal_day')],
+            },
+        ),
+    ]
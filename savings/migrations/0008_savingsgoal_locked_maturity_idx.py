@@ -0,0 +1,22 @@
+# Generated by Django 5.1.4 on 2026-10-19 06:03
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the index without locking the savings goals table for writes
+    atomic = False
+
+    dependencies = [
+        ('savings', '0007_savingsinterestaccrual'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='savingsgoalmodel',
+            index=models.Index(condition=models.Q(('is_locked', True)), fields=['maturity_date'], name='savings_goal_locked_mat_idx'),
+        ),
+    ]
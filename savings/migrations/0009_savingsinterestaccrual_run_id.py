@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-19 06:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('savings', '0008_savingsgoal_locked_maturity_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='savingsinterestaccrual',
+            name='run_id',
+            field=models.UUIDField(blank=True, help_text='Accrual run that wrote this row.', null=True),
+        ),
+    ]
@@ -81,6 +81,14 @@ class SavingsGoalModel(models.Model):
         verbose_name = "Savings Goal"
         verbose_name_plural = "Savings Goals"
         ordering = ['-created_at'] # Order by newest first
+        indexes = [
+            # Unlock job: WHERE is_locked AND maturity_date <= now
+            models.Index(
+                fields=['maturity_date'],
+                condition=models.Q(is_locked=True),
+                name='savings_goal_locked_mat_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.email}'s {self.name} ({self.status})"
@@ -175,3 +183,53 @@ class SavingsGoalTransaction(models.Model):
     def __str__(self):
         return (f"Goal '{self.goal.name}' - {self.get_transaction_type_display()} of "
                 f"{self.amount} on {self.timestamp.strftime('%Y-%m-%d %H:%M')}")
+
+
+class SavingsInterestAccrual(models.Model):
+    """
+    One day's interest on a savings goal, written by the nightly accrual
+    (savings/interest.py). At most one row per goal and day, which is what
+    makes re-running a day a no-op; run_id tells an accrual run which rows it
+    wrote itself and so has to credit.
+    """
+    goal = models.ForeignKey(
+        SavingsGoalModel,
+        on_delete=models.CASCADE,
+        related_name='interest_accruals',
+        help_text="The savings goal the interest was accrued on."
+    )
+    accrual_date = models.DateField(
+        help_text="The day the interest was earned for."
+    )
+    principal = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        help_text="Goal balance the interest was calculated on."
+    )
+    interest_rate = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        help_text="Annual interest rate (percent) applied."
+    )
+    amount = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        help_text="Interest accrued for the day."
+    )
+    run_id = models.UUIDField(
+        null=True,
+        blank=True,
+        help_text="Accrual run that wrote this row."
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Savings Interest Accrual"
+        verbose_name_plural = "Savings Interest Accruals"
+        ordering = ['-accrual_date', '-id']
+        constraints = [
+            models.UniqueConstraint(fields=['goal', 'accrual_date'], name='unique_interest_accrual_per_goal_day'),
+        ]
+
+    def __str__(self):
+        return f"Interest of {self.amount} on goal '{self.goal_id}' for {self.accrual_date}"
@@ -10,17 +10,20 @@ logger = logging.getLogger(__name__)
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_default_savings_goal(sender, instance, created, **kwargs):
     """
-    Signal receiver to create a default savings goal for a new user.
+    Signal receiver to create the default savings goals for a new user
+    in a single INSERT (a freshly created user has no goals yet).
     """
     if created:
-        templates = settings.SAVINGS_TEMPLATES
-        for template in templates:
-            if not SavingsGoalModel.objects.filter(user=instance, name=template).exists():
-                SavingsGoalModel.objects.create(
-                    user=instance,
-                    name=template,
-                    target_amount=100000.00, 
-                    amount=0.00,   
-                    status='active'
-                )
-                logger.info(f"Created default savings goal for new user: {instance.email}")
\ No newline at end of file
+        goals = [
+            SavingsGoalModel(
+                user=instance,
+                name=template,
+                target_amount=100000.00,
+                amount=0.00,
+                status='active'
+            )
+            for template in settings.SAVINGS_TEMPLATES
+        ]
+        if goals:
+            SavingsGoalModel.objects.bulk_create(goals)
+            logger.info(f"Created {len(goals)} default savings goals for new user: {instance.email}")
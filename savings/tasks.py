@@ -1,10 +1,9 @@
 # savings/tasks.py
 """
 Celery tasks for the savings app.
-Handles periodic tasks like unlocking matured savings goals.
+Handles periodic tasks like unlocking matured savings goals and accruing interest.
 """
 from celery import shared_task
-from django.utils import timezone
 from .models import SavingsGoalModel
 import logging
 
@@ -15,51 +14,33 @@ logger = logging.getLogger(__name__)
 def unlock_matured_goals():
     """
     Periodic task to unlock savings goals that have reached their maturity date.
-    Runs daily to check for goals that should be unlocked.
+    Flips them in bulk and enqueues their notifications, see savings/maturity.py.
     """
-    now = timezone.now()
+    from savings.maturity import unlock_matured_goals as unlock
 
-    # Find all locked goals where maturity date has passed
-    matured_goals = SavingsGoalModel.objects.filter(
-        is_locked=True,
-        maturity_date__lte=now
-    )
+    return unlock()
 
-    unlocked_count = 0
-    for goal in matured_goals:
-        # Double-check with the model method
-        if not goal.is_currently_locked():
-            logger.info(f"Unlocking matured goal: {goal.name} (ID: {goal.id}) for user {goal.user.email}")
-            # Goal has matured, we can optionally change status or just leave is_locked as True
-            # but the is_currently_locked() method will return False
-            # Optionally, you could update the goal here if needed
-            unlocked_count += 1
 
-    logger.info(f"Checked {matured_goals.count()} goals. {unlocked_count} goals have matured and are now unlocked.")
-    return {
-        'checked': matured_goals.count(),
-        'unlocked': unlocked_count,
-        'timestamp': now.isoformat()
-    }
+@shared_task(name='savings.tasks.notify_goals_unlocked')
+def notify_goals_unlocked(goal_ids):
+    """Send the "goal unlocked" notification for a chunk of newly unlocked goals."""
+    from notification.helper.notifications import notify_goal_unlocked
+
+    for goal in SavingsGoalModel.objects.filter(id__in=goal_ids).select_related('user'):
+        try:
+            notify_goal_unlocked(user=goal.user, goal_name=goal.name, goal_id=goal.id)
+        except Exception as e:
+            logger.error(f"Failed to notify user {goal.user_id} of unlocked goal {goal.id}: {e}")
 
 
 @shared_task(name='savings.tasks.calculate_interest_for_goals')
-def calculate_interest_for_goals():
+def calculate_interest_for_goals(accrual_date=None):
     """
-    Periodic task to calculate and apply interest to active savings goals.
-    This is a placeholder for future interest calculation logic.
+    Nightly task to accrue a day's interest on active savings goals
+    (default: yesterday; pass an ISO date to backfill a missed day).
+    Set-based and idempotent per day, see savings/interest.py.
     """
-    active_goals = SavingsGoalModel.objects.filter(status='active')
-
-    for goal in active_goals:
-        # Placeholder: implement your interest calculation logic here
-        # For example, daily compound interest, monthly interest, etc.
-        # goal.accrued_interest += calculated_interest
-        # goal.save(update_fields=['accrued_interest', 'updated_at'])
-        pass
+    from django.utils.dateparse import parse_date
+    from savings.interest import accrue_interest
 
-    logger.info(f"Interest calculation task ran for {active_goals.count()} active goals")
-    return {
-        'processed': active_goals.count(),
-        'timestamp': timezone.now().isoformat()
-    }
+    return accrue_interest(parse_date(accrual_date) if accrual_date else None)
@@ -1,3 +1,183 @@
-from django.test import TestCase
+import json
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from account.models import UserModel
+from core.testing import QueryBudgetMixin
+from gidinest_backend.celery import app as celery_app
+from savings import interest, maturity
+from savings.models import SavingsGoalModel, SavingsGoalTransaction, SavingsInterestAccrual
+from wallet.models import Wallet
+
+
+class GoalMaturityTests(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(email='maturity@example.com', password='pass1234')
+        self.now = timezone.now()
+        notify = mock.patch('savings.tasks.notify_goals_unlocked.delay')
+        self.notify = notify.start()
+        self.addCleanup(notify.stop)
+
+    def _goal(self, name, maturity_date, is_locked=True):
+        return SavingsGoalModel.objects.create(
+            user=self.user, name=name, target_amount=1000, is_locked=is_locked, maturity_date=maturity_date,
+        )
+
+    def _notified_ids(self):
+        return [goal_id for call in self.notify.call_args_list for goal_id in call.args[0]]
+
+    def test_unlocks_matured_goals_and_notifies_recent_ones(self):
+        recent = self._goal('Recent', self.now - timedelta(hours=2))
+        backlog = self._goal('Backlog', self.now - timedelta(days=90))
+        future = self._goal('Future', self.now + timedelta(days=3))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = maturity.unlock_matured_goals(now=self.now)
+
+        self.assertEqual(result['unlocked'], 2)
+        self.assertEqual(result['notified'], 1)
+        self.assertEqual(
+            set(SavingsGoalModel.objects.filter(is_locked=False, id__in=[recent.id, backlog.id, future.id])
+                .values_list('id', flat=True)),
+            {recent.id, backlog.id},
+        )
+        self.assertEqual(self._notified_ids(), [recent.id])
+
+    def test_rerun_is_a_no_op(self):
+        self._goal('Recent', self.now - timedelta(hours=2))
+        with self.captureOnCommitCallbacks(execute=True):
+            maturity.unlock_matured_goals(now=self.now)
+            result = maturity.unlock_matured_goals(now=self.now)
+
+        self.assertEqual(result['unlocked'], 0)
+        self.assertEqual(self.notify.call_count, 1)
+
+    def test_unlocks_in_batches(self):
+        for i in range(5):
+            self._goal(f'Goal {i}', self.now - timedelta(minutes=i + 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = maturity.unlock_matured_goals(now=self.now, batch_size=2)
+
+        self.assertEqual(result['unlocked'], 5)
+        self.assertEqual(result['batches'], 3)
+        self.assertEqual(len(self._notified_ids()), 5)
+
+    def test_unlock_goal_if_matured(self):
+        matured = self._goal('Matured', self.now - timedelta(minutes=5))
+        future = self._goal('Future', self.now + timedelta(days=1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(maturity.unlock_goal_if_matured(matured))
+            self.assertFalse(maturity.unlock_goal_if_matured(future))
+            # A second caller doesn't notify again
+            self.assertTrue(maturity.unlock_goal_if_matured(SavingsGoalModel.objects.get(id=matured.id)))
+
+        matured.refresh_from_db()
+        self.assertFalse(matured.is_locked)
+        self.assertEqual(self._notified_ids(), [matured.id])
+
+    def test_unlock_notifications_go_to_the_notifications_queue(self):
+        route = celery_app.amqp.router.route({}, 'savings.tasks.notify_goals_unlocked')
+        self.assertEqual(route['queue'].name, 'notifications')
+
+
+class InterestAccrualTests(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(email='interest@example.com', password='pass1234')
+        self.yesterday = timezone.localdate() - timedelta(days=1)
+        # 3650 at 10% a year is exactly 1.00 a day
+        self.goals = [
+            SavingsGoalModel.objects.create(
+                user=self.user, name=f'Goal {i}', target_amount=10000, amount=Decimal('3650.00'),
+                interest_rate=Decimal('10.00'),
+            )
+            for i in range(3)
+        ]
+        SavingsGoalModel.objects.filter(user=self.user).update(created_at=timezone.now() - timedelta(days=10))
+
+    def _accrued(self):
+        return list(SavingsGoalModel.objects.filter(id__in=[g.id for g in self.goals])
+                    .order_by('id').values_list('accrued_interest', flat=True))
+
+    def test_accrues_yesterday_once(self):
+        result = interest.accrue_interest(batch_size=2)
+
+        self.assertEqual(result['goals'], 3)
+        self.assertEqual(result['interest'], '3.00')
+        self.assertEqual(result['batches'], 2)
+        self.assertEqual(self._accrued(), [Decimal('1.00')] * 3)
+
+        rerun = interest.accrue_interest(batch_size=2)
+
+        self.assertEqual(rerun['goals'], 0)
+        self.assertEqual(self._accrued(), [Decimal('1.00')] * 3)
+        self.assertEqual(SavingsInterestAccrual.objects.filter(accrual_date=self.yesterday).count(), 3)
+
+    def test_backfills_a_missed_day(self):
+        missed = self.yesterday - timedelta(days=1)
+        SavingsGoalModel.objects.filter(id=self.goals[2].id).update(created_at=timezone.now() - timedelta(days=1))
+
+        interest.accrue_interest(self.yesterday)
+        result = interest.accrue_interest(missed)
+
+        # The goal created yesterday earns nothing for the missed day
+        self.assertEqual(result['goals'], 2)
+        self.assertEqual(self._accrued(), [Decimal('2.00'), Decimal('2.00'), Decimal('1.00')])
+        self.assertEqual(SavingsInterestAccrual.objects.filter(accrual_date=missed).count(), 2)
+
+    def test_rows_written_by_another_run_are_left_to_it(self):
+        # A concurrent run ledgered the middle goal after this run read its batch
+        SavingsInterestAccrual.objects.create(
+            goal=self.goals[1], accrual_date=self.yesterday, principal=Decimal('3650.00'),
+            interest_rate=Decimal('10.00'), amount=Decimal('1.00'), run_id=uuid.uuid4(),
+        )
+        batch = [(g.id, g.amount, g.interest_rate) for g in self.goals]
+
+        count, total = interest._accrue_batch(uuid.uuid4(), self.yesterday, batch)
+
+        self.assertEqual((count, total), (2, Decimal('2.00')))
+        self.assertEqual(self._accrued(), [Decimal('1.00'), Decimal('0.00'), Decimal('1.00')])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class GoalFundTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserModel.objects.create_user(email='fund@example.com', password='pass1234')
+        self.wallet = Wallet.objects.create(user=self.user, balance=Decimal('1000.00'), account_number='1000000008')
+        self.goal = SavingsGoalModel.objects.create(user=self.user, name='Rent', target_amount=5000)
+        self.auth = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def _fund(self, amount):
+        return self.client.post(
+            f'/api/v2/savings/goals/{self.goal.id}/fund',
+            json.dumps({'amount': amount}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=self.auth,
+        )
+
+    def test_fund_goal(self):
+        with self.assertQueryBudget(14):
+            response = self._fund(300)
+
+        self.assertEqual(response.status_code, 200)
+        self.goal.refresh_from_db()
+        self.wallet.refresh_from_db()
+        self.assertEqual((self.goal.amount, self.wallet.balance), (Decimal('300.00'), Decimal('700.00')))
+        self.assertEqual(SavingsGoalTransaction.objects.filter(goal=self.goal, transaction_type='contribution').count(), 1)
+
+    def test_insufficient_balance_moves_nothing(self):
+        response = self._fund(1500)
+
+        self.assertEqual(response.status_code, 400)
+        self.goal.refresh_from_db()
+        self.wallet.refresh_from_db()
+        self.assertEqual((self.goal.amount, self.wallet.balance), (Decimal('0.00'), Decimal('1000.00')))
@@ -12,6 +12,7 @@ from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from core.helpers.response import success_response, validation_error_response, error_response
 from .models import SavingsGoalModel, SavingsGoalTransaction
+from .maturity import unlock_goal_if_matured
 from .serializers import SavingsGoalSerializer, SavingsGoalTransactionSerializer
 from .utils import (
     calculate_goal_amount,
@@ -715,8 +716,8 @@ class GoalWithdrawAPIView(APIView):
                 status_code=status.HTTP_404_NOT_FOUND
             )
 
-        # Check if goal is locked
-        if goal.is_currently_locked():
+        # Check if goal is locked (the unlock job may not have reached it yet)
+        if not unlock_goal_if_matured(goal):
             return error_response(
                 message=f"This goal is locked until {goal.maturity_date.strftime('%B %d, %Y')}",
                 status_code=status.HTTP_400_BAD_REQUEST
@@ -733,7 +734,7 @@ class GoalWithdrawAPIView(APIView):
         penalty_amount = Decimal('0')
         if goal.early_withdrawal_penalty_percent and goal.maturity_date:
             from django.utils import timezone
-            if timezone.now().date() < goal.maturity_date:
+            if timezone.now() < goal.maturity_date:
                 penalty_amount = amount_decimal * (goal.early_withdrawal_penalty_percent / Decimal('100'))
 
         # Perform withdrawal
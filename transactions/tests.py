@@ -0,0 +1,40 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from account.models import UserModel
+from core.testing import QueryBudgetMixin
+from savings.models import SavingsGoalModel, SavingsGoalTransaction
+from wallet.models import Wallet, WalletTransaction
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TransactionListQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserModel.objects.create_user(email='transactions@example.com', password='pass1234')
+        wallet = Wallet.objects.create(user=self.user, balance=Decimal('5000.00'), account_number='1000000007')
+        SavingsGoalModel.objects.filter(user=self.user).delete()
+        for i in range(6):
+            goal = SavingsGoalModel.objects.create(user=self.user, name=f'Goal {i}', target_amount=1000)
+            SavingsGoalTransaction.objects.create(
+                goal=goal, transaction_type='contribution', amount=Decimal('100.00'), goal_current_amount=Decimal('100.00'),
+            )
+            WalletTransaction.objects.create(
+                wallet=wallet, transaction_type='debit', amount=Decimal('100.00'), external_reference=f'TRF-{i}',
+            )
+        self.auth = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def test_transaction_list(self):
+        with self.assertQueryBudget(4):
+            response = self.client.get('/api/v2/transactions/', HTTP_AUTHORIZATION=self.auth)
+
+        self.assertEqual(response.status_code, 200)
+        transactions = response.json()['data']['transactions']
+        self.assertEqual(len(transactions), 12)
+        self.assertEqual(
+            sorted(t['metadata']['goal_name'] for t in transactions if t['source'] == 'savings_goal'),
+            [f'Goal {i}' for i in range(6)],
+        )
@@ -92,7 +92,7 @@ class TransactionListView(APIView):
         # Get savings goal transactions
         goal_txns = SavingsGoalTransaction.objects.filter(
             goal__user=user
-        )
+        ).select_related('goal')
 
         # Apply filters
         if txn_type and txn_type in ['contribution', 'withdrawal']:
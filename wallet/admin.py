@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Wallet, WalletTransaction, WithdrawalRequest, PaymentLink, PaymentLinkContribution, FeeConfiguration, PlatformWallet
+from .models import Wallet, WalletTransaction, WithdrawalRequest, PaymentLink, PaymentLinkContribution, FeeConfiguration, PlatformWallet, ProviderTransaction
 
 
 @admin.register(Wallet)
@@ -67,6 +67,27 @@ class WalletTransactionAdmin(admin.ModelAdmin):
     wallet_account_number.short_description = 'Wallet Account Number'
 
 
+@admin.register(ProviderTransaction)
+class ProviderTransactionAdmin(admin.ModelAdmin):
+    list_display = (
+        'wallet_account_number',
+        'provider',
+        'provider_reference',
+        'transaction_type',
+        'amount',
+        'narration',
+        'transaction_date',
+    )
+    search_fields = ('wallet__psb9_account_number', 'provider_reference', 'narration')
+    list_filter = ('provider', 'transaction_type', 'transaction_date')
+    readonly_fields = ('created_at', 'updated_at', 'raw')
+    raw_id_fields = ('wallet',)
+
+    def wallet_account_number(self, obj):
+        return obj.wallet.psb9_account_number
+    wallet_account_number.short_description = 'Wallet Account Number'
+
+
 @admin.register(PaymentLink)
 class PaymentLinkAdmin(admin.ModelAdmin):
     list_display = (
@@ -0,0 +1,137 @@
+# wallet/balance_shadow.py
+"""
+Provider balance shadowing with drift detection.
+
+The local ledger (Wallet.balance, changed only through Wallet.deposit /
+withdraw under a row lock) is the balance we serve. The provider's view of the
+same account is stored alongside it in provider_balance / provider_balance_at
+(with the raw enquiry payload in provider_balance_data) and refreshed in the background once it is older than PROVIDER_BALANCE_TTL.
+
+Refreshes only ever write the shadow columns, so they can't clobber a
+concurrent deposit or withdrawal. When the two balances disagree by more than
+BALANCE_DRIFT_THRESHOLD an error is logged (and stored in ServerLog) once
+per distinct drift, for reconciliation.
+"""
+from datetime import timedelta
+from decimal import Decimal
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def _ttl():
+    return getattr(settings, 'PROVIDER_BALANCE_TTL', 300)
+
+
+def _drift_threshold():
+    return Decimal(str(getattr(settings, 'BALANCE_DRIFT_THRESHOLD', '1.00')))
+
+
+def is_stale(wallet, now=None):
+    if wallet.provider_balance_at is None:
+        return True
+    now = now or timezone.now()
+    return now - wallet.provider_balance_at > timedelta(seconds=_ttl())
+
+
+def psb9_enquiry_data(wallet):
+    """
+    The last raw 9PSB wallet enquiry payload, served as psb9_data for clients
+    that predate the shadow balance. Empty until the first refresh completes.
+    """
+    return wallet.provider_balance_data or {}
+
+
+def provider_balance_data(wallet):
+    """Shadowed provider balance for API responses, or None if never fetched."""
+    if wallet.provider_balance_at is None:
+        return None
+    return {
+        "availableBalance": str(wallet.provider_balance),
+        "lastUpdated": wallet.provider_balance_at.isoformat(),
+        "stale": is_stale(wallet),
+    }
+
+
+def schedule_refresh(wallet):
+    """
+    Enqueue a provider balance refresh if the shadow is stale. At most one
+    refresh per wallet is queued per TTL window.
+
+    Returns:
+        bool: True if a refresh was enqueued
+    """
+    if not wallet.psb9_account_number or not is_stale(wallet):
+        return False
+
+    try:
+        if not cache.add(f'provider_balance_refresh:{wallet.pk}', 1, timeout=_ttl()):
+            return False
+    except Exception as e:
+        logger.warning(f"Balance refresh lock unavailable for wallet {wallet.pk}: {e}")
+
+    from wallet.tasks import refresh_provider_balance
+    try:
+        refresh_provider_balance.delay(wallet.pk)
+    except Exception as e:
+        logger.warning(f"Failed to enqueue provider balance refresh for wallet {wallet.pk}: {e}")
+        return False
+    return True
+
+
+def refresh_provider_balance(wallet_id):
+    """
+    Fetch the 9PSB balance for a wallet, store it in the shadow columns and
+    check it against the ledger.
+
+    Returns:
+        dict: provider balance, ledger balance and drift, or an error
+    """
+    from providers.helpers.psb9 import PSB9Client
+    from wallet.models import Wallet
+
+    wallet = Wallet.objects.filter(pk=wallet_id).only('id', 'balance', 'psb9_account_number').first()
+    if wallet is None or not wallet.psb9_account_number:
+        return {'status': 'skipped'}
+
+    result = PSB9Client().get_wallet_balance(wallet.psb9_account_number)
+    if result.get('status') != 'success':
+        logger.warning(f"Provider balance refresh failed for wallet {wallet_id}: {result.get('message')}")
+        return {'status': 'error', 'message': result.get('message')}
+
+    balance_data = result.get('data') or {}
+    provider_balance = Decimal(str(balance_data.get('availableBalance', '0')))
+    now = timezone.now()
+    Wallet.objects.filter(pk=wallet_id).update(
+        provider_balance=provider_balance, provider_balance_at=now, provider_balance_data=balance_data,
+    )
+
+    # Re-read the ledger after the provider call so an in-flight deposit isn't reported as drift
+    ledger_balance = Wallet.objects.filter(pk=wallet_id).values_list('balance', flat=True).first()
+    drift = provider_balance - ledger_balance
+    if abs(drift) > _drift_threshold():
+        _alert_drift(wallet_id, wallet.psb9_account_number, ledger_balance, provider_balance, drift)
+
+    return {
+        'status': 'success',
+        'provider_balance': str(provider_balance),
+        'ledger_balance': str(ledger_balance),
+        'drift': str(drift),
+    }
+
+
+def _alert_drift(wallet_id, account_number, ledger_balance, provider_balance, drift):
+    # Alert once per distinct drift value rather than on every refresh
+    try:
+        if not cache.add(f'balance_drift_alert:{wallet_id}:{drift}', 1, timeout=24 * 60 * 60):
+            return
+    except Exception:
+        pass
+    logger.error(
+        f"Balance drift on wallet {wallet_id} (9PSB {account_number}): "
+        f"ledger={ledger_balance} provider={provider_balance} drift={drift}"
+    )
@@ -0,0 +1,265 @@
+# wallet/limits.py
+"""
+Transaction limit enforcement backed by Redis bucketed counters.
+
+Outbound spend (withdrawals and bank transfers) is tracked per user in a
+calendar-day and a calendar-month bucket, in kobo. A limit check is a single
+Lua script that verifies both buckets and charges them atomically, so its cost
+is O(1) regardless of how much history the user has.
+
+Callers charge *before* debiting the wallet and release the charge if the
+debit or provider call fails. Counters are reconciled from the ledger nightly
+(reconcile_limit_counters), which also corrects for asynchronous failures.
+If Redis is unavailable the check falls back to summing the ledger.
+"""
+from dataclasses import dataclass
+from decimal import Decimal
+import logging
+
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DAY_TTL = 2 * 24 * 60 * 60
+MONTH_TTL = 32 * 24 * 60 * 60
+
+# KEYS: day bucket, month bucket
+# ARGV: amount, daily limit, monthly limit, day ttl, month ttl
+# Returns {0, day_total, month_total} on success, {1|2, day_total, month_total} on rejection
+_CHARGE_SCRIPT = """
+local day = tonumber(redis.call('GET', KEYS[1]) or '0')
+local month = tonumber(redis.call('GET', KEYS[2]) or '0')
+local amount = tonumber(ARGV[1])
+if day + amount > tonumber(ARGV[2]) then
+    return {1, day, month}
+end
+if month + amount > tonumber(ARGV[3]) then
+    return {2, day, month}
+end
+day = redis.call('INCRBY', KEYS[1], amount)
+month = redis.call('INCRBY', KEYS[2], amount)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('EXPIRE', KEYS[2], ARGV[5])
+return {0, day, month}
+"""
+
+# KEYS: day bucket, month bucket
+# ARGV: expected day, expected month, day total, month total, day ttl, month ttl
+# Sets both buckets only if neither changed since the expected values were
+# read ('' for a missing key); returns 1 if set, 0 if a charge got in first
+_RECONCILE_SCRIPT = """
+if (redis.call('GET', KEYS[1]) or '') ~= ARGV[1] or (redis.call('GET', KEYS[2]) or '') ~= ARGV[2] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[3], 'EX', ARGV[5])
+redis.call('SET', KEYS[2], ARGV[4], 'EX', ARGV[6])
+return 1
+"""
+
+
+class TransactionLimitExceeded(Exception):
+    """Raised when a debit would exceed the user's per-transaction, daily or monthly limit."""
+
+    def __init__(self, message, limit_type):
+        super().__init__(message)
+        self.message = message
+        self.limit_type = limit_type
+
+
+@dataclass
+class LimitCharge:
+    """A charge against a user's limit buckets; pass to release_limits() to undo it."""
+    user_id: str
+    amount_kobo: int
+    day_key: str
+    month_key: str
+    counted: bool = True
+
+
+def to_kobo(amount) -> int:
+    return int((Decimal(str(amount)) * 100).to_integral_value())
+
+
+def _format_naira(kobo: int) -> str:
+    return f"₦{Decimal(kobo) / 100:,.2f}"
+
+
+def _bucket_keys(user_id, now=None):
+    now = now or timezone.now()
+    return (
+        f"txlimit:{user_id}:d:{now:%Y%m%d}",
+        f"txlimit:{user_id}:m:{now:%Y%m}",
+    )
+
+
+def _redis():
+    from django_redis import get_redis_connection
+    return get_redis_connection("default")
+
+
+def _ledger_spend_queries(since):
+    """Outbound spend since `since`: withdrawal requests and 9PSB bank transfers."""
+    from wallet.models import WalletTransaction, WithdrawalRequest
+
+    withdrawals = WithdrawalRequest.objects.filter(created_at__gte=since).exclude(status='failed')
+    transfers = WalletTransaction.objects.filter(
+        transaction_type='debit',
+        reference__startswith='TRF_',
+        created_at__gte=since,
+    ).exclude(status='failed')
+    return withdrawals, transfers
+
+
+def ledger_spend_kobo(user, since) -> int:
+    """Sum a single user's outbound spend from the ledger (fallback path)."""
+    withdrawals, transfers = _ledger_spend_queries(since)
+    total = (
+        (withdrawals.filter(user=user).aggregate(total=Sum('amount'))['total'] or Decimal('0'))
+        + (transfers.filter(wallet__user=user).aggregate(total=Sum('amount'))['total'] or Decimal('0'))
+    )
+    return to_kobo(total)
+
+
+def charge_limits(user, amount) -> LimitCharge:
+    """
+    Check `amount` against the user's effective limits and charge it to the
+    day/month buckets in one atomic step.
+
+    Raises:
+        TransactionLimitExceeded: if any limit would be exceeded
+    """
+    amount_kobo = to_kobo(amount)
+    per_txn_limit = user.get_effective_per_transaction_limit()
+    daily_limit = user.get_effective_daily_limit()
+    monthly_limit = user.monthly_limit
+
+    if amount_kobo > per_txn_limit:
+        raise TransactionLimitExceeded(
+            f"Amount exceeds your per-transaction limit of {_format_naira(per_txn_limit)}",
+            'per_transaction',
+        )
+
+    now = timezone.now()
+    day_key, month_key = _bucket_keys(user.id, now)
+
+    try:
+        result, day_total, month_total = _redis().eval(
+            _CHARGE_SCRIPT, 2, day_key, month_key,
+            amount_kobo, daily_limit, monthly_limit, DAY_TTL, MONTH_TTL,
+        )
+    except Exception as e:
+        logger.warning(f"Limit counters unavailable, falling back to ledger for user {user.id}: {e}")
+        return _charge_from_ledger(user, amount_kobo, daily_limit, monthly_limit, now, day_key, month_key)
+
+    if result == 1:
+        remaining = max(daily_limit - int(day_total), 0)
+        raise TransactionLimitExceeded(
+            f"Amount exceeds your daily limit. Remaining today: {_format_naira(remaining)}",
+            'daily',
+        )
+    if result == 2:
+        remaining = max(monthly_limit - int(month_total), 0)
+        raise TransactionLimitExceeded(
+            f"Amount exceeds your monthly limit. Remaining this month: {_format_naira(remaining)}",
+            'monthly',
+        )
+
+    return LimitCharge(user_id=str(user.id), amount_kobo=amount_kobo, day_key=day_key, month_key=month_key)
+
+
+def _charge_from_ledger(user, amount_kobo, daily_limit, monthly_limit, now, day_key, month_key):
+    day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    month_start = day_start.replace(day=1)
+
+    month_spend = ledger_spend_kobo(user, month_start)
+    day_spend = ledger_spend_kobo(user, day_start) if month_spend else 0
+
+    if day_spend + amount_kobo > daily_limit:
+        raise TransactionLimitExceeded(
+            f"Amount exceeds your daily limit. Remaining today: {_format_naira(max(daily_limit - day_spend, 0))}",
+            'daily',
+        )
+    if month_spend + amount_kobo > monthly_limit:
+        raise TransactionLimitExceeded(
+            f"Amount exceeds your monthly limit. Remaining this month: {_format_naira(max(monthly_limit - month_spend, 0))}",
+            'monthly',
+        )
+
+    return LimitCharge(
+        user_id=str(user.id), amount_kobo=amount_kobo,
+        day_key=day_key, month_key=month_key, counted=False,
+    )
+
+
+def release_limits(charge: LimitCharge):
+    """Undo a charge after the debit it guarded failed or was refunded."""
+    if charge is None or not charge.counted:
+        return
+    try:
+        pipe = _redis().pipeline()
+        pipe.decrby(charge.day_key, charge.amount_kobo)
+        pipe.decrby(charge.month_key, charge.amount_kobo)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to release limit charge for user {charge.user_id}: {e}")
+
+
+def reconcile_limit_counters(now=None) -> dict:
+    """
+    Rebuild today's and this month's counters from the ledger for every user
+    with outbound spend this month. Counters of users with no spend expire on
+    their own.
+
+    Counters are read before the ledger is summed and only overwritten if they
+    haven't changed since, so a charge made while reconciling is never lost;
+    that user's counters are left as they are until the next run.
+    """
+    now = now or timezone.now()
+    day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    month_start = day_start.replace(day=1)
+
+    withdrawals, transfers = _ledger_spend_queries(month_start)
+    day_filter = Q(created_at__gte=day_start)
+
+    user_ids = set(withdrawals.values_list('user_id', flat=True).distinct())
+    user_ids.update(transfers.values_list('wallet__user_id', flat=True).distinct())
+    redis = _redis()
+    keys = {user_id: _bucket_keys(user_id, now) for user_id in user_ids}
+    pipe = redis.pipeline(transaction=False)
+    for day_key, month_key in keys.values():
+        pipe.mget(day_key, month_key)
+    expected = dict(zip(keys, pipe.execute()))
+
+    totals = {}
+    for user_id, month_total, day_total in withdrawals.values('user_id').annotate(
+        month_total=Sum('amount'), day_total=Sum('amount', filter=day_filter),
+    ).values_list('user_id', 'month_total', 'day_total'):
+        totals[user_id] = [to_kobo(month_total or 0), to_kobo(day_total or 0)]
+
+    for user_id, month_total, day_total in transfers.values('wallet__user_id').annotate(
+        month_total=Sum('amount'), day_total=Sum('amount', filter=day_filter),
+    ).values_list('wallet__user_id', 'month_total', 'day_total'):
+        entry = totals.setdefault(user_id, [0, 0])
+        entry[0] += to_kobo(month_total or 0)
+        entry[1] += to_kobo(day_total or 0)
+
+    # Users whose first spend landed after the counters were read were charged
+    # against fresh counters already
+    totals = {user_id: entry for user_id, entry in totals.items() if user_id in expected}
+
+    pipe = redis.pipeline(transaction=False)
+    for user_id, (month_kobo, day_kobo) in totals.items():
+        day_key, month_key = keys[user_id]
+        expected_day, expected_month = expected[user_id]
+        pipe.eval(
+            _RECONCILE_SCRIPT, 2, day_key, month_key,
+            expected_day or '', expected_month or '', day_kobo, month_kobo, DAY_TTL, MONTH_TTL,
+        )
+    reconciled = sum(pipe.execute())
+
+    logger.info(
+        f"Reconciled transaction limit counters for {reconciled} users, "
+        f"skipped {len(totals) - reconciled} charged while reconciling"
+    )
+    return {'users': reconciled, 'skipped': len(totals) - reconciled, 'timestamp': now.isoformat()}
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-19 05:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0012_feeconfiguration_disbursement_fee_rate_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wallet',
+            name='provider_balance',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Last balance reported by the wallet provider.', max_digits=15, null=True),
+        ),
+        migrations.AddField(
+            model_name='wallet',
+            name='provider_balance_at',
+            field=models.DateTimeField(blank=True, help_text='When provider_balance was last fetched.', null=True),
+        ),
+    ]
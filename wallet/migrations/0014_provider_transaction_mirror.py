@@ -0,0 +1,43 @@
+# Generated by Django 5.1.4 on 2026-10-19 05:32
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0013_wallet_provider_balance_shadow'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wallet',
+            name='provider_history_synced_at',
+            field=models.DateTimeField(blank=True, help_text='When the provider transaction history was last synced.', null=True),
+        ),
+        migrations.CreateModel(
+            name='ProviderTransaction',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('provider', models.CharField(default='psb9', help_text='Provider the transaction was mirrored from', max_length=20)),
+                ('provider_reference', models.CharField(help_text='Transaction reference at the provider', max_length=255)),
+                ('transaction_type', models.CharField(choices=[('credit', 'credit'), ('debit', 'debit')], help_text='Type of transaction', max_length=20)),
+                ('amount', models.DecimalField(decimal_places=2, help_text='Transaction amount', max_digits=15)),
+                ('narration', models.CharField(blank=True, default='', help_text='Narration reported by the provider', max_length=255)),
+                ('transaction_date', models.DateTimeField(help_text='When the transaction happened at the provider')),
+                ('raw', models.JSONField(default=dict, help_text='Transaction record as returned by the provider')),
+                ('wallet', models.ForeignKey(help_text='The wallet this provider transaction belongs to.', on_delete=django.db.models.deletion.CASCADE, related_name='provider_transactions', to='wallet.wallet')),
+            ],
+            options={
+                'verbose_name': 'Provider Transaction',
+                'verbose_name_plural': 'Provider Transactions',
+                'ordering': ['-transaction_date', '-id'],
+                'indexes': [models.Index(fields=['wallet', '-transaction_date', '-id'], name='provider_txn_wallet_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('provider', 'provider_reference'), name='unique_provider_transaction_reference')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-19 06:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0014_provider_transaction_mirror'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wallet',
+            name='provider_balance_data',
+            field=models.JSONField(blank=True, help_text='Raw 9PSB wallet enquiry payload behind provider_balance.', null=True),
+        ),
+    ]
@@ -87,6 +87,33 @@ class Wallet(models.Model):
         help_text="9PSB wallet ID (for V2 wallets)"
     )
 
+    # Last balance reported by the provider. Kept separate from `balance` (the
+    # ledger) and refreshed asynchronously; see wallet/balance_shadow.py
+    provider_balance = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text="Last balance reported by the wallet provider."
+    )
+    provider_balance_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When provider_balance was last fetched."
+    )
+    provider_balance_data = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Raw 9PSB wallet enquiry payload behind provider_balance."
+    )
+    # Watermark for the local mirror of the provider's transaction history;
+    # see wallet/provider_history.py
+    provider_history_synced_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the provider transaction history was last synced."
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -287,6 +314,76 @@ class WalletTransaction(BaseModel):
                 f"{self.amount} on {self.created_at.strftime('%Y-%m-%d %H:%M')}")
 
 
+class ProviderTransaction(BaseModel):
+    """
+    Local mirror of a wallet's transaction history at the provider (9PSB).
+    Filled by the deposit webhook and the incremental history sync; the
+    history endpoints page through this table instead of calling the provider.
+    """
+    TRANSACTION_TYPES = [
+        ('credit', 'credit'),
+        ('debit', 'debit'),
+    ]
+
+    wallet = models.ForeignKey(
+        Wallet,
+        on_delete=models.CASCADE,
+        related_name='provider_transactions',
+        help_text="The wallet this provider transaction belongs to."
+    )
+    provider = models.CharField(
+        max_length=20,
+        default='psb9',
+        help_text="Provider the transaction was mirrored from"
+    )
+    provider_reference = models.CharField(
+        max_length=255,
+        help_text="Transaction reference at the provider"
+    )
+    transaction_type = models.CharField(
+        max_length=20,
+        choices=TRANSACTION_TYPES,
+        help_text="Type of transaction"
+    )
+    amount = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        help_text="Transaction amount"
+    )
+    narration = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+        help_text="Narration reported by the provider"
+    )
+    transaction_date = models.DateTimeField(
+        help_text="When the transaction happened at the provider"
+    )
+    raw = models.JSONField(
+        default=dict,
+        help_text="Transaction record as returned by the provider"
+    )
+
+    class Meta:
+        verbose_name = "Provider Transaction"
+        verbose_name_plural = "Provider Transactions"
+        ordering = ['-transaction_date', '-id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['provider', 'provider_reference'],
+                name='unique_provider_transaction_reference',
+            ),
+        ]
+        indexes = [
+            # Keyset pagination: WHERE wallet_id = ? AND (transaction_date, id) < (?, ?)
+            models.Index(fields=['wallet', '-transaction_date', '-id'], name='provider_txn_wallet_date_idx'),
+        ]
+
+    def __str__(self):
+        return (f"{self.provider} transaction '{self.provider_reference}' - {self.transaction_type} of "
+                f"{self.amount} on {self.transaction_date.strftime('%Y-%m-%d %H:%M')}")
+
+
 class PaymentLink(BaseModel):
     """
     Payment link for receiving contributions to wallet, savings goals, or events.
@@ -440,6 +537,8 @@ class PaymentLink(BaseModel):
 
     def get_total_raised(self):
         """Calculate total amount raised through this link"""
+        if hasattr(self, 'completed_total'):
+            return self.completed_total
         from django.db.models import Sum, Q
         total = self.contributions.filter(
             status='completed'
@@ -450,6 +549,8 @@ class PaymentLink(BaseModel):
 
     def get_contributor_count(self):
         """Get count of unique contributors"""
+        if hasattr(self, 'completed_count'):
+            return self.completed_count
         return self.contributions.filter(status='completed').count()
 
     def is_target_reached(self):
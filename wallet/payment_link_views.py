@@ -3,6 +3,8 @@ import uuid
 from decimal import Decimal, InvalidOperation
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Count, Q, Sum, Value
+from django.db.models.functions import Coalesce
 from django.core.exceptions import ObjectDoesNotExist
 from rest_framework import status
 from rest_framework.views import APIView
@@ -277,7 +279,17 @@ class ListUserPaymentLinksAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
-        payment_links = PaymentLink.objects.filter(user=request.user).select_related('savings_goal').order_by('-created_at')
+        completed = Q(contributions__status='completed')
+        payment_links = (
+            PaymentLink.objects.filter(user=request.user)
+            .select_related('savings_goal', 'user__wallet')
+            .annotate(
+                # Read by get_total_raised() / get_contributor_count() instead of a query per link
+                completed_total=Coalesce(Sum('contributions__amount', filter=completed), Value(Decimal('0'))),
+                completed_count=Count('contributions', filter=completed),
+            )
+            .order_by('-created_at')
+        )
         serializer = PaymentLinkSerializer(payment_links, many=True)
         return success_response(data=serializer.data)
 
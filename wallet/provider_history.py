@@ -0,0 +1,371 @@
+# wallet/provider_history.py
+"""
+Local mirror of 9PSB transaction history.
+
+The history endpoints used to proxy every request to 9PSB. They now page
+through ProviderTransaction rows instead, so scrolling doesn't depend on the
+provider's latency or availability. The mirror is kept current by:
+
+- the deposit webhook, which mirrors each credit as it is processed, and
+- an incremental sync (Celery) that pulls the provider's history from the
+  wallet's watermark (Wallet.provider_history_synced_at) onwards, enqueued
+  when a stale wallet's history is viewed and by a periodic sweep.
+
+Rows are keyed on the provider reference, so overlapping syncs and webhook
+replays are no-ops.
+"""
+import hashlib
+import json
+import logging
+from datetime import datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from core.helpers.cursor import before_cursor_q, decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+PROVIDER = 'psb9'
+PAGE_SIZE = 50
+MAX_PAGES = 200
+
+# Date formats seen in 9PSB history records besides ISO 8601
+_DATE_FORMATS = ('%d/%m/%Y %H:%M:%S', '%d-%m-%Y %H:%M:%S', '%d/%m/%Y', '%Y-%m-%d %H:%M:%S.%f')
+
+
+def _sync_interval():
+    return getattr(settings, 'PROVIDER_HISTORY_SYNC_INTERVAL', 600)
+
+
+def _sync_overlap():
+    return getattr(settings, 'PROVIDER_HISTORY_SYNC_OVERLAP', 24 * 60 * 60)
+
+
+def _backfill_days():
+    return getattr(settings, 'PROVIDER_HISTORY_BACKFILL_DAYS', 365)
+
+
+# ==========================================
+# Normalising provider records
+# ==========================================
+
+def _first(raw, *keys):
+    for key in keys:
+        value = raw.get(key)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    value = str(value).strip()
+    parsed = parse_datetime(value)
+    if parsed is None:
+        for fmt in _DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(value, fmt)
+                break
+            except ValueError:
+                continue
+    if parsed is None:
+        day = parse_date(value)
+        if day is not None:
+            parsed = datetime.combine(day, time.min)
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _normalise(raw):
+    """
+    Map a 9PSB history record onto ProviderTransaction fields.
+
+    Returns:
+        dict or None: None when the record has no usable amount
+    """
+    try:
+        amount = Decimal(str(_first(raw, 'amount', 'transactionAmount', 'tranAmount')))
+    except (InvalidOperation, TypeError):
+        return None
+
+    direction = str(_first(raw, 'transactionType', 'type', 'drCr', 'debitCredit', 'tranType') or '').upper()
+    if direction.startswith('D'):
+        transaction_type = 'debit'
+    elif direction.startswith('C'):
+        transaction_type = 'credit'
+    else:
+        transaction_type = 'debit' if amount < 0 else 'credit'
+
+    reference = _first(raw, 'reference', 'transactionReference', 'transactionId', 'uniqueIdentifier', 'sessionId')
+    if not reference:
+        # No provider reference: fall back to a content hash so re-syncs still dedupe
+        reference = hashlib.sha256(json.dumps(raw, sort_keys=True, default=str).encode()).hexdigest()
+
+    transaction_date = _parse_date(_first(raw, 'transactionDate', 'transactionDateTime', 'date', 'createdAt'))
+    if transaction_date is None:
+        logger.warning(f"9PSB history record {reference} has no parseable date; using sync time")
+        transaction_date = timezone.now()
+
+    return {
+        'provider_reference': str(reference)[:255],
+        'transaction_type': transaction_type,
+        'amount': abs(amount),
+        'narration': str(_first(raw, 'narration', 'description', 'remarks') or '')[:255],
+        'transaction_date': transaction_date,
+        'raw': raw,
+    }
+
+
+def _extract_records(data):
+    """9PSB returns either a bare list or a page object wrapping one."""
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        for key in ('transactions', 'content', 'items', 'data'):
+            if isinstance(data.get(key), list):
+                return data[key]
+    return []
+
+
+def mirror_records(wallet, records):
+    """
+    Store provider history records for a wallet, skipping ones already mirrored.
+
+    Returns:
+        int: number of records received (ignore_conflicts hides which were new)
+    """
+    from wallet.models import ProviderTransaction
+
+    rows = []
+    for raw in records:
+        if not isinstance(raw, dict):
+            continue
+        fields = _normalise(raw)
+        if fields is None:
+            logger.warning(f"Skipping 9PSB history record without amount for wallet {wallet.pk}: {raw}")
+            continue
+        rows.append(ProviderTransaction(wallet=wallet, provider=PROVIDER, **fields))
+
+    ProviderTransaction.objects.bulk_create(rows, ignore_conflicts=True)
+    return len(rows)
+
+
+def mirror_webhook_credit(wallet, data):
+    """Mirror a credit delivered by the 9PSB deposit webhook. Never raises."""
+    try:
+        record = dict(data)
+        record.setdefault('transactionType', 'CREDIT')
+        mirror_records(wallet, [record])
+    except Exception as e:
+        logger.warning(f"Failed to mirror 9PSB webhook credit {data.get('reference')}: {e}")
+
+
+# ==========================================
+# Incremental sync
+# ==========================================
+
+def is_stale(wallet, now=None):
+    if wallet.provider_history_synced_at is None:
+        return True
+    now = now or timezone.now()
+    return now - wallet.provider_history_synced_at > timedelta(seconds=_sync_interval())
+
+
+def schedule_sync(wallet):
+    """
+    Enqueue a history sync if the wallet's mirror is stale. At most one sync
+    per wallet is queued per sync interval.
+
+    Returns:
+        bool: True if a sync was enqueued
+    """
+    if not wallet.psb9_account_number or not is_stale(wallet):
+        return False
+
+    try:
+        if not cache.add(f'provider_history_sync:{wallet.pk}', 1, timeout=_sync_interval()):
+            return False
+    except Exception as e:
+        logger.warning(f"History sync lock unavailable for wallet {wallet.pk}: {e}")
+
+    from wallet.tasks import sync_provider_history
+    try:
+        sync_provider_history.delay(wallet.pk)
+    except Exception as e:
+        logger.warning(f"Failed to enqueue provider history sync for wallet {wallet.pk}: {e}")
+        return False
+    return True
+
+
+def sync_wallet_history(wallet_id):
+    """
+    Pull 9PSB history for a wallet from its watermark to today into the mirror.
+
+    The window starts PROVIDER_HISTORY_SYNC_OVERLAP before the last sync so
+    late-posted transactions are picked up; the first sync backfills
+    PROVIDER_HISTORY_BACKFILL_DAYS. The watermark only moves when every page
+    was fetched; a sync cut off at MAX_PAGES returns 'partial' and the next
+    one covers the same window again.
+
+    Returns:
+        dict: sync status, records received and pages fetched
+    """
+    from providers.helpers.psb9 import PSB9Client
+    from wallet.models import Wallet
+
+    wallet = Wallet.objects.filter(pk=wallet_id).only(
+        'id', 'psb9_account_number', 'provider_history_synced_at'
+    ).first()
+    if wallet is None or not wallet.psb9_account_number:
+        return {'status': 'skipped'}
+
+    started = timezone.now()
+    if wallet.provider_history_synced_at:
+        since = wallet.provider_history_synced_at - timedelta(seconds=_sync_overlap())
+    else:
+        since = started - timedelta(days=_backfill_days())
+    start_date = timezone.localdate(since).isoformat()
+    end_date = timezone.localdate(started).isoformat()
+
+    client = PSB9Client()
+    received = 0
+    page = 1
+    while page <= MAX_PAGES:
+        result = client.get_transaction_history(
+            account_number=wallet.psb9_account_number,
+            start_date=start_date,
+            end_date=end_date,
+            page=page,
+            limit=PAGE_SIZE,
+        )
+        if result.get('status') != 'success':
+            logger.warning(
+                f"9PSB history sync failed for wallet {wallet_id} on page {page}: {result.get('message')}"
+            )
+            return {'status': 'error', 'message': result.get('message'), 'received': received}
+
+        records = _extract_records(result.get('data'))
+        received += mirror_records(wallet, records)
+        if len(records) < PAGE_SIZE:
+            break
+        page += 1
+    else:
+        # Records past the last page would be skipped for good if the watermark moved
+        logger.warning(
+            f"9PSB history sync for wallet {wallet_id} stopped at {MAX_PAGES} pages; watermark not moved"
+        )
+        return {'status': 'partial', 'received': received, 'pages': MAX_PAGES}
+
+    Wallet.objects.filter(pk=wallet_id).update(provider_history_synced_at=started)
+    return {'status': 'success', 'received': received, 'pages': page}
+
+
+def stale_wallet_ids(limit):
+    """psb9 wallets whose mirror is oldest (never-synced first), for the periodic sweep."""
+    from django.db.models import F
+    from wallet.models import Wallet
+
+    cutoff = timezone.now() - timedelta(seconds=_sync_interval())
+    return list(
+        Wallet.objects.filter(psb9_account_number__isnull=False)
+        .exclude(psb9_account_number='')
+        .exclude(provider_history_synced_at__gte=cutoff)
+        .order_by(F('provider_history_synced_at').asc(nulls_first=True))
+        .values_list('id', flat=True)[:limit]
+    )
+
+
+# ==========================================
+# Reading the mirror
+# ==========================================
+
+def _day_bound(value, name):
+    day = parse_date(value) if value else None
+    if value and day is None:
+        raise ValueError(f"{name} must be in YYYY-MM-DD format")
+    return day
+
+
+def history_page(wallet, start_date=None, end_date=None, cursor=None, limit=20):
+    """
+    One page of a wallet's mirrored history, newest first.
+
+    Date filters and the keyset condition run in SQL against the
+    (wallet, -transaction_date, -id) index, so deep pages cost the same as the first.
+
+    Returns:
+        tuple: (list of ProviderTransaction, next cursor or None)
+
+    Raises:
+        ValueError: on a malformed date or cursor
+    """
+    from wallet.models import ProviderTransaction
+
+    start_day = _day_bound(start_date, 'start_date')
+    end_day = _day_bound(end_date, 'end_date')
+
+    qs = ProviderTransaction.objects.filter(wallet=wallet).order_by('-transaction_date', '-id')
+    if start_day:
+        qs = qs.filter(transaction_date__gte=timezone.make_aware(datetime.combine(start_day, time.min)))
+    if end_day:
+        qs = qs.filter(
+            transaction_date__lt=timezone.make_aware(datetime.combine(end_day + timedelta(days=1), time.min))
+        )
+    if cursor:
+        cursor_date, cursor_pk = decode_cursor(cursor)
+        qs = qs.filter(before_cursor_q('transaction_date', cursor_date, cursor_pk))
+
+    rows = list(qs.only(
+        'id', 'provider_reference', 'transaction_type', 'amount', 'narration', 'transaction_date'
+    )[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(last.transaction_date, last.pk)
+
+
+def serialize_transaction(txn):
+    return {
+        "reference": txn.provider_reference,
+        "type": txn.transaction_type,
+        "amount": str(txn.amount),
+        "narration": txn.narration,
+        "transaction_date": txn.transaction_date.isoformat(),
+    }
+
+
+def history_response_data(wallet, params):
+    """
+    Response body for the history endpoints from query params
+    (start_date, end_date, cursor, limit).
+
+    Raises:
+        ValueError: on malformed params
+    """
+    try:
+        limit = min(max(int(params.get('limit', 20)), 1), 100)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be a number")
+
+    rows, next_cursor = history_page(
+        wallet,
+        start_date=params.get('start_date'),
+        end_date=params.get('end_date'),
+        cursor=params.get('cursor'),
+        limit=limit,
+    )
+    return {
+        "transactions": [serialize_transaction(txn) for txn in rows],
+        "pagination": {
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "has_next": next_cursor is not None,
+        },
+        "synced_at": wallet.provider_history_synced_at.isoformat() if wallet.provider_history_synced_at else None,
+    }
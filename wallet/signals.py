@@ -1,4 +1,60 @@
 # wallet/signals.py
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from core.helpers.realtime import publish_user_event, realtime_enabled, send_user_event
+from .models import Wallet, WalletTransaction, WithdrawalRequest
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=WalletTransaction)
+def publish_wallet_transaction(sender, instance, created, **kwargs):
+    """
+    Push new wallet transactions (webhook credits, transfers, withdrawals) to
+    the owner's event stream. The balance is read after commit so it includes
+    the update that accompanied the transaction.
+    """
+    if not created or not realtime_enabled():
+        return
+
+    wallet_id = instance.wallet_id
+    data = {
+        'id': instance.pk,
+        'transaction_type': instance.transaction_type,
+        'amount': instance.amount,
+        'description': instance.description,
+        'reference': instance.reference,
+        'status': instance.status,
+    }
+
+    def publish():
+        try:
+            wallet = Wallet.objects.filter(pk=wallet_id).values('user_id', 'balance').first()
+        except Exception as e:
+            logger.warning(f"Failed to load wallet {wallet_id} for transaction event: {e}")
+            return
+        if wallet is not None:
+            send_user_event(wallet['user_id'], 'wallet.transaction', {**data, 'balance': wallet['balance']})
+
+    transaction.on_commit(publish)
+
+
+@receiver(post_save, sender=WithdrawalRequest)
+def publish_withdrawal_update(sender, instance, **kwargs):
+    """Push withdrawal status transitions so clients stop polling the status endpoint."""
+    publish_user_event(instance.user_id, 'withdrawal.updated', {
+        'id': instance.pk,
+        'status': instance.status,
+        'amount': instance.amount,
+        'transaction_ref': instance.transaction_ref,
+        'updated_at': instance.updated_at,
+    })
+
+
 # from django.db.models.signals import post_save
 # from django.dispatch import receiver
 # from django.conf import settings
@@ -19,4 +75,4 @@
 #         # e.g., if signals were not yet configured or an old user.
 #         # In such a case, you might want to create it here too.
 #         Wallet.objects.create(user=instance)
-#         print(f"Wallet created (on save) for {instance.email}")
\ No newline at end of file
+#         print(f"Wallet created (on save) for {instance.email}")
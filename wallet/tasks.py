@@ -0,0 +1,58 @@
+# wallet/tasks.py
+"""
+Celery tasks for the wallet app.
+"""
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='wallet.tasks.reconcile_limit_counters')
+def reconcile_limit_counters():
+    """
+    Nightly task to rebuild the Redis transaction-limit counters from the ledger.
+    Corrects drift from refunds and asynchronously failed withdrawals.
+    """
+    from wallet.limits import reconcile_limit_counters as reconcile
+
+    return reconcile()
+
+
+@shared_task(name='wallet.tasks.refresh_provider_balance')
+def refresh_provider_balance(wallet_id):
+    """
+    Refresh a wallet's shadowed provider balance and check it for drift
+    against the ledger. Enqueued by the balance endpoints when the shadow is stale.
+    """
+    from wallet.balance_shadow import refresh_provider_balance as refresh
+
+    return refresh(wallet_id)
+
+
+@shared_task(name='wallet.tasks.sync_provider_history')
+def sync_provider_history(wallet_id):
+    """
+    Incrementally sync a wallet's 9PSB transaction history into the local mirror.
+    Enqueued by the history endpoints when the mirror is stale and by the periodic sweep.
+    """
+    from wallet.provider_history import sync_wallet_history
+
+    return sync_wallet_history(wallet_id)
+
+
+@shared_task(name='wallet.tasks.sync_stale_provider_histories')
+def sync_stale_provider_histories():
+    """
+    Periodic sweep: enqueue history syncs for the psb9 wallets whose mirror
+    is oldest, PROVIDER_HISTORY_SYNC_BATCH per run.
+    """
+    from django.conf import settings
+    from wallet.provider_history import stale_wallet_ids
+
+    wallet_ids = stale_wallet_ids(getattr(settings, 'PROVIDER_HISTORY_SYNC_BATCH', 500))
+    for wallet_id in wallet_ids:
+        sync_provider_history.delay(wallet_id)
+
+    logger.info(f"Enqueued provider history sync for {len(wallet_ids)} wallets")
+    return {'enqueued': len(wallet_ids)}
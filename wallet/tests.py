@@ -1,3 +1,411 @@
-from django.test import TestCase
+import json
+import threading
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from account.models import UserModel
+from core.testing import QueryBudgetMixin, requires_redis
+from savings.models import SavingsGoalModel
+from wallet import balance_shadow, limits, provider_history, views_async
+from wallet.models import PaymentLink, PaymentLinkContribution, ProviderTransaction, Wallet, WithdrawalRequest
+
+
+class ProviderHistorySyncTests(TestCase):
+    def setUp(self):
+        user = UserModel.objects.create_user(email='history@example.com', password='pass1234')
+        self.synced_at = timezone.now() - timedelta(days=1)
+        self.wallet = Wallet.objects.create(
+            user=user, account_number='1000000002', psb9_account_number='2000000002',
+            provider_history_synced_at=self.synced_at,
+        )
+
+    def _page(self, page, size):
+        return {'status': 'success', 'data': [
+            {'reference': f'REF-{page}-{n}', 'amount': '100.00', 'transactionType': 'C',
+             'transactionDate': timezone.now().isoformat()}
+            for n in range(size)
+        ]}
+
+    def _sync(self, pages):
+        def history(account_number, start_date, end_date, page, limit):
+            return self._page(page, limit if page < pages else limit - 1)
+
+        with mock.patch('providers.helpers.psb9.PSB9Client.get_transaction_history', side_effect=history), \
+                mock.patch.object(provider_history, 'PAGE_SIZE', 3), \
+                mock.patch.object(provider_history, 'MAX_PAGES', 2):
+            return provider_history.sync_wallet_history(self.wallet.pk)
+
+    def test_complete_sync_moves_watermark(self):
+        result = self._sync(pages=2)
+
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(ProviderTransaction.objects.filter(wallet=self.wallet).count(), 5)
+        self.wallet.refresh_from_db()
+        self.assertGreater(self.wallet.provider_history_synced_at, self.synced_at)
+
+    def test_truncated_sync_keeps_watermark(self):
+        result = self._sync(pages=5)
+
+        self.assertEqual(result['status'], 'partial')
+        self.assertEqual(ProviderTransaction.objects.filter(wallet=self.wallet).count(), 6)
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.provider_history_synced_at, self.synced_at)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ProviderHistoryReadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = UserModel.objects.create_user(email='history-read@example.com', password='pass1234')
+        self.wallet = Wallet.objects.create(
+            user=user, account_number='1000000006', psb9_account_number='2000000006',
+            provider_history_synced_at=timezone.now(),
+        )
+        self.auth = f'Bearer {AccessToken.for_user(user)}'
+        start = timezone.now() - timedelta(days=5)
+        provider_history.mirror_records(self.wallet, [
+            {'reference': f'REF-{n}', 'amount': '100.00', 'transactionType': 'C',
+             'transactionDate': (start + timedelta(days=n)).isoformat()}
+            for n in range(5)
+        ])
+
+    def _history(self, **params):
+        return self.client.get('/api/v2/wallet/9psb/transactions', params, HTTP_AUTHORIZATION=self.auth)
+
+    def test_mirroring_a_record_twice_keeps_one_row(self):
+        provider_history.mirror_webhook_credit(self.wallet, {'reference': 'REF-0', 'amount': '100.00'})
+
+        self.assertEqual(ProviderTransaction.objects.filter(wallet=self.wallet).count(), 5)
+
+    def test_cursor_pages_newest_first_without_a_provider_call(self):
+        with mock.patch('providers.helpers.psb9.PSB9Client.get_transaction_history') as provider:
+            first = self._history(limit=3).json()['data']
+            second = self._history(limit=3, cursor=first['pagination']['next_cursor']).json()['data']
+
+        provider.assert_not_called()
+        self.assertEqual([t['reference'] for t in first['transactions']], ['REF-4', 'REF-3', 'REF-2'])
+        self.assertEqual([t['reference'] for t in second['transactions']], ['REF-1', 'REF-0'])
+        self.assertFalse(second['pagination']['has_next'])
+
+    def test_malformed_params_are_rejected(self):
+        self.assertEqual(self._history(cursor='not-a-cursor').status_code, 422)
+        self.assertEqual(self._history(start_date='05/01/2026').status_code, 422)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class WalletEnquiryTests(TestCase):
+    payload = {'availableBalance': '1200.00', 'ledgerBalance': '1250.00', 'accountNumber': '2000000003'}
+
+    def setUp(self):
+        cache.clear()
+        user = UserModel.objects.create_user(email='enquiry@example.com', password='pass1234')
+        self.wallet = Wallet.objects.create(
+            user=user, account_number='1000000003', psb9_account_number='2000000003', balance='1200.00',
+        )
+        self.auth = f'Bearer {AccessToken.for_user(user)}'
+
+    def _enquiry(self):
+        with mock.patch('wallet.tasks.refresh_provider_balance.delay') as delay:
+            response = self.client.get('/api/v2/wallet/9psb/enquiry', HTTP_AUTHORIZATION=self.auth)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['data'], delay
+
+    def test_before_first_refresh(self):
+        data, delay = self._enquiry()
+
+        self.assertEqual(data['balance'], '1200.00')
+        self.assertEqual(data['psb9_data'], {})
+        self.assertIsNone(data['provider_balance'])
+        delay.assert_called_once_with(self.wallet.pk)
+
+    def test_psb9_data_keeps_the_raw_enquiry_payload(self):
+        with mock.patch('providers.helpers.psb9.PSB9Client.get_wallet_balance',
+                        return_value={'status': 'success', 'data': self.payload}):
+            balance_shadow.refresh_provider_balance(self.wallet.pk)
+
+        data, delay = self._enquiry()
+
+        self.assertEqual(data['psb9_data'], self.payload)
+        self.assertEqual(data['provider_balance']['availableBalance'], '1200.00')
+        self.assertFalse(data['provider_balance']['stale'])
+        delay.assert_not_called()
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    BALANCE_DRIFT_THRESHOLD='1.00',
+)
+class BalanceShadowTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = UserModel.objects.create_user(email='shadow@example.com', password='pass1234')
+        self.wallet = Wallet.objects.create(
+            user=user, account_number='1000000005', psb9_account_number='2000000005', balance='500.00',
+        )
+
+    def _refresh(self, available):
+        with mock.patch('providers.helpers.psb9.PSB9Client.get_wallet_balance',
+                        return_value={'status': 'success', 'data': {'availableBalance': available}}):
+            return balance_shadow.refresh_provider_balance(self.wallet.pk)
+
+    def test_refresh_writes_only_the_shadow_columns(self):
+        result = self._refresh('499.50')
+
+        self.assertEqual(result['drift'], '-0.50')
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('500.00'))
+        self.assertEqual(self.wallet.provider_balance, Decimal('499.50'))
+        self.assertFalse(balance_shadow.is_stale(self.wallet))
+
+    def test_drift_is_alerted_once(self):
+        with self.assertLogs('wallet.balance_shadow', 'ERROR') as logs:
+            self._refresh('450.00')
+            self._refresh('450.00')
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn('drift=-50.00', logs.output[0])
+
+    def test_one_refresh_is_queued_per_ttl(self):
+        with mock.patch('wallet.tasks.refresh_provider_balance.delay') as delay:
+            self.assertTrue(balance_shadow.schedule_refresh(self.wallet))
+            self.assertFalse(balance_shadow.schedule_refresh(self.wallet))
+
+        delay.assert_called_once_with(self.wallet.pk)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class AsyncWalletViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserModel.objects.create_user(email='async-wallet@example.com', password='pass1234')
+        self.wallet = Wallet.objects.create(
+            user=self.user, account_number='1000000004', psb9_account_number='2000000004', balance='300.00',
+        )
+        self.auth = f'Bearer {AccessToken.for_user(self.user)}'
+        self.factory = AsyncRequestFactory()
+
+    async def test_requires_a_bearer_token(self):
+        response = await views_async.wallet_enquiry(self.factory.get('/api/v2/wallet/9psb/enquiry'))
+
+        self.assertEqual(response.status_code, 401)
+
+    async def test_wallet_enquiry_serves_the_ledger_balance(self):
+        request = self.factory.get('/api/v2/wallet/9psb/enquiry', headers={'Authorization': self.auth})
+        with mock.patch('wallet.tasks.refresh_provider_balance.delay') as delay:
+            response = await views_async.wallet_enquiry(request)
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)['data']
+        self.assertEqual((data['account_number'], data['balance']), ('1000000004', '300.00'))
+        delay.assert_called_once_with(self.wallet.pk)
+
+    async def test_name_enquiry_awaits_the_provider(self):
+        request = self.factory.post(
+            '/api/v1/wallet/resolve-bank-account', data={'account_number': '0123456789', 'bank_code': '058'},
+            content_type='application/json', headers={'Authorization': self.auth},
+        )
+        resolve = mock.AsyncMock(return_value={'success': True, 'data': {'accountName': 'ADA SAVER'}})
+        with mock.patch('providers.helpers.async_clients.AsyncEmbedlyClient.resolve_bank_account', resolve):
+            response = await views_async.embedly_resolve_bank_account(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['data']['account_name'], 'ADA SAVER')
+        resolve.assert_awaited_once_with('0123456789', '058')
+
+    async def test_name_enquiry_validates_before_calling_the_provider(self):
+        request = self.factory.post(
+            '/api/v1/wallet/resolve-bank-account', data={'account_number': '123', 'bank_code': '058'},
+            content_type='application/json', headers={'Authorization': self.auth},
+        )
+        with mock.patch('providers.helpers.async_clients.AsyncEmbedlyClient.resolve_bank_account') as resolve:
+            response = await views_async.embedly_resolve_bank_account(request)
+
+        self.assertEqual(response.status_code, 400)
+        resolve.assert_not_called()
+
+
+class TransactionLimitTests(TestCase):
+    def setUp(self):
+        # Defaults: ₦50,000 per transaction, ₦100,000 a day, ₦1,000,000 a month
+        self.user = UserModel.objects.create_user(email='limits@example.com', password='pass1234')
+
+    def _spent(self, amount, **kwargs):
+        return WithdrawalRequest.objects.create(
+            user=self.user, amount=Decimal(amount), bank_name='Bank', account_number='0123456789', **kwargs,
+        )
+
+    def test_per_transaction_limit(self):
+        with self.assertRaises(limits.TransactionLimitExceeded) as raised:
+            limits.charge_limits(self.user, '50000.01')
+
+        self.assertEqual(raised.exception.limit_type, 'per_transaction')
+
+    def test_restricted_user_gets_the_restricted_limit(self):
+        self.user.apply_24hr_restriction()
+
+        with self.assertRaises(limits.TransactionLimitExceeded) as raised:
+            limits.charge_limits(self.user, '10000.01')
+
+        self.assertEqual(raised.exception.limit_type, 'per_transaction')
+
+    def test_ledger_fallback_counts_todays_spend(self):
+        self._spent('45000')
+        self._spent('45000')
+        self._spent('45000', status='failed')
+
+        with mock.patch.object(limits, '_redis', side_effect=ConnectionError), self.assertLogs('wallet.limits'):
+            charge = limits.charge_limits(self.user, '10000')
+            with self.assertRaises(limits.TransactionLimitExceeded) as raised:
+                limits.charge_limits(self.user, '10000.01')
+
+        self.assertFalse(charge.counted)
+        self.assertEqual(raised.exception.limit_type, 'daily')
+
+
+@requires_redis
+class TransactionLimitCounterTests(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(email='limit-counters@example.com', password='pass1234')
+        keys = limits._bucket_keys(self.user.id)
+        limits._redis().delete(*keys)
+        self.addCleanup(limits._redis().delete, *keys)
+
+    def test_charges_up_to_the_daily_limit_and_releases(self):
+        first = limits.charge_limits(self.user, '50000')
+        limits.charge_limits(self.user, '50000')
+        with self.assertRaises(limits.TransactionLimitExceeded) as raised:
+            limits.charge_limits(self.user, '0.01')
+        self.assertEqual(raised.exception.limit_type, 'daily')
+
+        limits.release_limits(first)
+
+        self.assertTrue(limits.charge_limits(self.user, '50000').counted)
+
+    def test_reconcile_rebuilds_counters_from_the_ledger(self):
+        limits.charge_limits(self.user, '50000')
+        WithdrawalRequest.objects.create(
+            user=self.user, amount=Decimal('30000'), bank_name='Bank', account_number='0123456789',
+        )
+
+        limits.reconcile_limit_counters()
+
+        day_key, month_key = limits._bucket_keys(self.user.id)
+        self.assertEqual(int(limits._redis().get(day_key)), 3000000)
+        self.assertEqual(int(limits._redis().get(month_key)), 3000000)
+
+    def test_reconcile_keeps_a_charge_made_while_reconciling(self):
+        WithdrawalRequest.objects.create(
+            user=self.user, amount=Decimal('30000'), bank_name='Bank', account_number='0123456789',
+        )
+        to_kobo = limits.to_kobo
+
+        def charge_mid_reconcile(amount):
+            # Runs while the ledger is summed, after the counters were read
+            if not charging.is_set():
+                charging.set()
+                limits.charge_limits(self.user, '10000')
+            return to_kobo(amount)
+
+        charging = threading.Event()
+        with mock.patch.object(limits, 'to_kobo', side_effect=charge_mid_reconcile):
+            result = limits.reconcile_limit_counters()
+
+        self.assertEqual((result['users'], result['skipped']), (0, 1))
+        day_key, _ = limits._bucket_keys(self.user.id)
+        self.assertEqual(int(limits._redis().get(day_key)), 1000000)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class WithdrawalRequestTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserModel.objects.create_user(
+            email='withdraw@example.com', password='pass1234', first_name='Ada', last_name='Obi',
+        )
+        self.user.set_transaction_pin('1234')
+        self.wallet = Wallet.objects.create(
+            user=self.user, balance=Decimal('200000.00'), account_number='1000000004', account_name='ADA OBI',
+        )
+        self.auth = f'Bearer {AccessToken.for_user(self.user)}'
+        embedly = mock.patch('wallet.views.EmbedlyClient')
+        self.embedly = embedly.start().return_value
+        self.embedly.initiate_bank_transfer.return_value = {'success': True, 'data': {'transactionRef': 'EMB-1'}}
+        self.addCleanup(embedly.stop)
+        # Redis is unavailable here; limits fall back to the ledger
+        redis = mock.patch.object(limits, '_redis', side_effect=ConnectionError)
+        redis.start()
+        self.addCleanup(redis.stop)
+
+    def _withdraw(self, amount):
+        return self.client.post(
+            '/api/v1/wallet/withdraw/request',
+            json.dumps({
+                'bank_name': 'GTBank', 'bank_code': '058', 'account_number': '0123456789',
+                'account_name': 'Ada Obi', 'amount': amount, 'transaction_pin': '1234',
+            }),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=self.auth,
+        )
+
+    def test_withdrawal(self):
+        # Includes creating the fee configuration and platform wallet on first use
+        with self.assertQueryBudget(25):
+            response = self._withdraw('20000')
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('180000.00'))
+        self.assertEqual(WithdrawalRequest.objects.get(user=self.user).status, 'processing')
+
+    def test_over_the_daily_limit_is_rejected_before_debiting(self):
+        WithdrawalRequest.objects.create(
+            user=self.user, amount=Decimal('95000'), bank_name='Bank', account_number='0123456789',
+        )
+
+        response = self._withdraw('10000')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['limit_type'], 'daily')
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('200000.00'))
+        self.embedly.initiate_bank_transfer.assert_not_called()
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class PaymentLinkListTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserModel.objects.create_user(email='links@example.com', password='pass1234')
+        Wallet.objects.create(user=self.user, account_number='1000000005', bank='9PSB', account_name='LINKS')
+        self.auth = f'Bearer {AccessToken.for_user(self.user)}'
+        for i in range(6):
+            goal = SavingsGoalModel.objects.create(user=self.user, name=f'Goal {i}', target_amount=1000)
+            link = PaymentLink.objects.create(
+                user=self.user, link_type='savings_goal', savings_goal=goal, target_amount=Decimal('500'),
+            )
+            for amount, contribution_status in (('300', 'completed'), ('250', 'completed'), ('999', 'pending')):
+                PaymentLinkContribution.objects.create(
+                    payment_link=link, amount=Decimal(amount), status=contribution_status,
+                    external_reference=f'REF-{uuid.uuid4()}',
+                )
+        self.client.get('/api/v2/wallet/payment-links/my-links', HTTP_AUTHORIZATION=self.auth)
+
+    def test_my_links(self):
+        with self.assertQueryBudget(2):
+            response = self.client.get('/api/v2/wallet/payment-links/my-links', HTTP_AUTHORIZATION=self.auth)
+
+        self.assertEqual(response.status_code, 200)
+        links = response.json()['data']
+        self.assertEqual(len(links), 6)
+        self.assertEqual(
+            {(Decimal(link['total_raised']), link['contributor_count'], link['target_reached']) for link in links},
+            {(Decimal('550'), 2, True)},
+        )
+        self.assertEqual(links[0]['bank_details']['account_number'], '1000000005')
@@ -1,5 +1,8 @@
 # wallet/urls.py
+from django.conf import settings
 from django.urls import path
+
+from . import views_async
 from .views import (
     WalletBalanceAPIView,
     InitiateWithdrawalAPIView,
@@ -15,6 +18,9 @@ from .views import (
 )
 from .views_v2 import PSB9WebhookView
 
+# Provider-bound reads run as native async views when served under ASGI
+ASYNC_VIEWS = settings.ASYNC_PROVIDER_VIEWS
+
 urlpatterns = [
     path('balance', WalletBalanceAPIView.as_view(), name='wallet_balance'),
 
@@ -24,9 +30,9 @@ urlpatterns = [
 
     path('withdraw/status/<int:withdrawal_id>', CheckWithdrawalStatusAPIView.as_view(), name='check_withdrawal_status'),
 
-    path('banks', GetBanksAPIView.as_view(), name='get-banks'),
+    path('banks', views_async.embedly_banks if ASYNC_VIEWS else GetBanksAPIView.as_view(), name='get-banks'),
 
-    path('resolve-bank-account', ResolveBankAccountAPIView.as_view(), name='resolve-bank-account'),
+    path('resolve-bank-account', views_async.embedly_resolve_bank_account if ASYNC_VIEWS else ResolveBankAccountAPIView.as_view(), name='resolve-bank-account'),
 
     path('transaction-pin/set', SetTransactionPinAPIView.as_view(), name='set_transaction_pin'),
 
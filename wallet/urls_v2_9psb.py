@@ -3,7 +3,10 @@
 9PSB Wallet Operations URLs
 All 17 test case endpoints for production launch
 """
+from django.conf import settings
 from django.urls import path
+
+from . import views_async
 from .views_v2_9psb import (
     WalletEnquiryAPIView,
     DebitWalletAPIView,
@@ -24,12 +27,15 @@ from .views_v2_9psb import (
     FeePreviewAPIView,
 )
 
+# Provider-bound reads run as native async views when served under ASGI
+ASYNC_VIEWS = settings.ASYNC_PROVIDER_VIEWS
+
 urlpatterns = [
     # Test Case 1: Wallet Opening
     path('open', WalletOpeningAPIView.as_view(), name='wallet-opening'),
 
     # Test Case 3: Wallet Enquiry (Get Balance)
-    path('enquiry', WalletEnquiryAPIView.as_view(), name='wallet-enquiry'),
+    path('enquiry', views_async.wallet_enquiry if ASYNC_VIEWS else WalletEnquiryAPIView.as_view(), name='wallet-enquiry'),
 
     # Test Case 4: Debit Wallet
     path('debit', DebitWalletAPIView.as_view(), name='wallet-debit'),
@@ -38,16 +44,16 @@ urlpatterns = [
     path('credit', CreditWalletAPIView.as_view(), name='wallet-credit'),
 
     # Test Case 14: Get Banks
-    path('banks', GetBanksAPIView.as_view(), name='get-banks'),
+    path('banks', views_async.psb9_banks if ASYNC_VIEWS else GetBanksAPIView.as_view(), name='get-banks'),
 
     # Test Case 6: Other Banks Account Enquiry
-    path('banks/enquiry', OtherBanksAccountEnquiryAPIView.as_view(), name='other-banks-enquiry'),
+    path('banks/enquiry', views_async.psb9_other_banks_enquiry if ASYNC_VIEWS else OtherBanksAccountEnquiryAPIView.as_view(), name='other-banks-enquiry'),
 
     # Test Case 7: Other Banks Transfer
     path('transfer/banks', OtherBanksTransferAPIView.as_view(), name='other-banks-transfer'),
 
     # Test Case 8: Transaction History
-    path('transactions', WalletTransactionHistoryAPIView.as_view(), name='transaction-history'),
+    path('transactions', views_async.psb9_transaction_history if ASYNC_VIEWS else WalletTransactionHistoryAPIView.as_view(), name='transaction-history'),
 
     # Test Case 11: Transaction Requery
     path('transactions/requery', WalletTransactionRequeryAPIView.as_view(), name='transaction-requery'),
@@ -29,6 +29,7 @@ from wallet.serializers import WalletBalanceSerializer, WalletTransactionSeriali
 
 from .models import Wallet, WithdrawalRequest, FeeConfiguration
 from .fee_utils import calculate_transfer_fees, calculate_deposit_fees, calculate_payment_link_fees, settle_fees_to_platform
+from .limits import TransactionLimitExceeded, charge_limits, release_limits
 
 from rest_framework import serializers
 
@@ -68,10 +69,8 @@ class WalletBalanceAPIView(APIView):
 
         serializer = WalletBalanceSerializer(wallet)
 
-        # Refresh user to get latest transaction_pin_set status
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        user = User.objects.get(id=request.user.id)
+        # request.user is current: the auth cache is invalidated whenever the user row is saved
+        user = request.user
 
         data = {
             'wallet':serializer.data,
@@ -158,10 +157,8 @@ class InitiateWithdrawalAPIView(APIView):
                 "detail": "You don't have a wallet yet. Please verify your BVN or NIN to activate your wallet."
             }, status=status.HTTP_404_NOT_FOUND)
         
-        # Refresh user from database to get latest transaction_pin_set status
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        user = User.objects.get(id=request.user.id)
+        # request.user is current: the auth cache is invalidated whenever the user row is saved
+        user = request.user
         
         # Check if transaction PIN is set
         if not user.transaction_pin_set:
@@ -231,6 +228,16 @@ class InitiateWithdrawalAPIView(APIView):
                 "detail": "You don't have a wallet yet. Please verify your BVN or NIN to activate your wallet."
             }, status=status.HTTP_404_NOT_FOUND)
 
+        # Enforce per-transaction, daily and monthly limits
+        try:
+            limit_charge = charge_limits(user, withdrawal_amount)
+        except TransactionLimitExceeded as e:
+            return Response({
+                "status": False,
+                "detail": e.message,
+                "limit_type": e.limit_type
+            }, status=status.HTTP_400_BAD_REQUEST)
+
         # Calculate fees
         config = FeeConfiguration.get_active()
         fees = calculate_transfer_fees(withdrawal_amount, config=config)
@@ -239,6 +246,8 @@ class InitiateWithdrawalAPIView(APIView):
         try:
             wallet.withdraw(withdrawal_amount)
         except Exception:
+            release_limits(limit_charge)
+
             # Provide diagnostic info
             try:
                 # Refresh current balance from DB
@@ -347,6 +356,7 @@ class InitiateWithdrawalAPIView(APIView):
 
                 # Refund balance
                 wallet.deposit(withdrawal_amount)
+                release_limits(limit_charge)
 
                 import logging
                 logger = logging.getLogger(__name__)
@@ -368,6 +378,7 @@ class InitiateWithdrawalAPIView(APIView):
 
             # Refund balance
             wallet.deposit(withdrawal_amount)
+            release_limits(limit_charge)
 
             import logging
             logger = logging.getLogger(__name__)
@@ -556,10 +567,8 @@ class TransactionPinStatusAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
-        # Refresh from database to get latest status
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        user = User.objects.get(id=request.user.id)
+        # request.user is current: the auth cache is invalidated whenever the user row is saved
+        user = request.user
         
         return Response({
             "status": True,
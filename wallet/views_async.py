@@ -0,0 +1,203 @@
+# wallet/views_async.py
+"""
+Async (ASGI) versions of the provider-bound wallet endpoints.
+
+Same URLs, request and response contracts as the DRF views in views.py and
+views_v2_9psb.py; enabled with settings.ASYNC_PROVIDER_VIEWS when the app is
+served by uvicorn workers, so a worker is not held while a provider responds.
+"""
+import logging
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework import status
+
+from core.helpers.async_views import async_api_view, json_body
+from core.helpers.response import success_response, validation_error_response, error_response
+from providers.helpers.async_clients import AsyncEmbedlyClient, AsyncPSB9Client
+from .balance_shadow import provider_balance_data, psb9_enquiry_data, schedule_refresh
+from .models import Wallet
+from .provider_history import history_response_data, schedule_sync
+
+logger = logging.getLogger(__name__)
+
+
+async def _get_psb9_wallet(user):
+    return await Wallet.objects.filter(user=user).only(
+        'id', 'account_number', 'account_name', 'bank', 'balance', 'currency', 'psb9_account_number',
+        'provider_balance', 'provider_balance_at', 'provider_balance_data', 'provider_history_synced_at',
+    ).afirst()
+
+
+# ==========================================
+# 9PSB (api/v2/wallet/9psb/)
+# ==========================================
+
+@async_api_view(['GET'])
+async def wallet_enquiry(request):
+    """Get wallet balance (same response as WalletEnquiryAPIView)"""
+    try:
+        wallet = await _get_psb9_wallet(request.user)
+        if wallet is None:
+            return error_response(message="Wallet not found", status_code=status.HTTP_404_NOT_FOUND)
+        if not wallet.psb9_account_number:
+            return error_response(message="No wallet account found", status_code=status.HTTP_404_NOT_FOUND)
+
+        # Serve the ledger balance; the provider's balance is shadowed and
+        # refreshed in the background (see wallet/balance_shadow.py)
+        await sync_to_async(schedule_refresh)(wallet)
+
+        return success_response(
+            message="Wallet details retrieved successfully",
+            data={
+                "account_number": wallet.account_number,
+                "account_name": wallet.account_name,
+                "bank": wallet.bank,
+                "balance": str(wallet.balance),
+                "currency": wallet.currency,
+                "psb9_data": psb9_enquiry_data(wallet),
+                "provider_balance": provider_balance_data(wallet),
+            }
+        )
+    except Exception as e:
+        logger.error(f"Wallet enquiry error: {str(e)}", exc_info=True)
+        return error_response(
+            message="Failed to retrieve wallet details",
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@async_api_view(['GET'])
+async def psb9_banks(request):
+    """Get list of banks"""
+    try:
+        result = await AsyncPSB9Client().get_banks()
+        if result.get("status") == "success":
+            return success_response(message="Banks retrieved successfully", data=result.get("data", []))
+        return error_response(
+            message=result.get("message", "Failed to retrieve banks"),
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+    except Exception as e:
+        logger.error(f"Get banks error: {str(e)}", exc_info=True)
+        return error_response(message="Failed to retrieve banks", status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@async_api_view(['POST'])
+async def psb9_other_banks_enquiry(request):
+    """Verify account name"""
+    data = json_body(request)
+    account_number = data.get('account_number')
+    bank_code = data.get('bank_code')
+
+    if not account_number or not bank_code:
+        return validation_error_response({
+            "account_number": ["Account number is required"] if not account_number else [],
+            "bank_code": ["Bank code is required"] if not bank_code else []
+        })
+
+    try:
+        result = await AsyncPSB9Client().other_banks_enquiry(account_number=account_number, bank_code=bank_code)
+        if result.get("status") == "success":
+            return success_response(message="Account verified successfully", data=result.get("data", {}))
+        return error_response(
+            message=result.get("message", "Account verification failed"),
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+    except Exception as e:
+        logger.error(f"Account enquiry error: {str(e)}", exc_info=True)
+        return error_response(message="Failed to verify account", status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@async_api_view(['GET'])
+async def psb9_transaction_history(request):
+    """Get transaction history"""
+    try:
+        wallet = await _get_psb9_wallet(request.user)
+        if wallet is None:
+            return error_response(message="Wallet not found", status_code=status.HTTP_404_NOT_FOUND)
+        if not wallet.psb9_account_number:
+            return error_response(message="No wallet account found", status_code=status.HTTP_404_NOT_FOUND)
+
+        # Served from the local mirror; a stale mirror is synced in the background
+        await sync_to_async(schedule_sync)(wallet)
+        try:
+            data = await sync_to_async(history_response_data)(wallet, request.GET)
+        except ValueError as e:
+            return validation_error_response({"detail": [str(e)]})
+        return success_response(message="Transaction history retrieved successfully", data=data)
+    except Exception as e:
+        logger.error(f"Transaction history error: {str(e)}", exc_info=True)
+        return error_response(
+            message="Failed to retrieve transaction history",
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+# ==========================================
+# Embedly (api/v1/wallet/)
+# ==========================================
+
+@async_api_view(['GET'])
+async def embedly_banks(request):
+    """Get list of banks from Embedly."""
+    try:
+        result = await AsyncEmbedlyClient().get_banks()
+        if not result.get("success"):
+            return error_response(result.get("message", "Unable to fetch banks list"))
+        return success_response({"banks": result.get("data", [])})
+    except Exception as e:
+        logger.error(f"Exception fetching banks list: {str(e)}", exc_info=True)
+        return error_response("An error occurred while fetching banks list. Please try again.")
+
+
+@async_api_view(['POST'])
+async def embedly_resolve_bank_account(request):
+    """Resolve a bank account name via Embedly's Payout/name-enquiry endpoint."""
+    data = json_body(request)
+    account_number = data.get('account_number')
+    bank_code = data.get('bank_code')
+
+    if not account_number or not bank_code:
+        return JsonResponse({
+            "status": False,
+            "detail": "Both account_number and bank_code are required."
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    if not str(account_number).isdigit() or len(str(account_number)) != 10:
+        return JsonResponse({
+            "status": False,
+            "detail": "Account number must be exactly 10 digits."
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        result = await AsyncEmbedlyClient().resolve_bank_account(account_number, bank_code)
+
+        if not result.get("success"):
+            error_msg = result.get("message", "Unable to validate account details")
+            logger.error(
+                f"Embedly account validation failed for user {request.user.email}: "
+                f"{error_msg} (Account: {account_number}, Bank Code: {bank_code})"
+            )
+            return JsonResponse({"status": False, "detail": error_msg}, status=status.HTTP_400_BAD_REQUEST)
+
+        account_data = result.get("data", {})
+        return JsonResponse({
+            "status": True,
+            "detail": "Account resolved successfully.",
+            "data": {
+                "account_number": account_data.get("accountNumber", account_number),
+                "account_name": account_data.get("accountName", ""),
+                "bank_code": account_data.get("bankCode", bank_code)
+            }
+        }, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        logger.error(
+            f"Exception during account validation for user {request.user.email}: {str(e)}",
+            exc_info=True
+        )
+        return JsonResponse({
+            "status": False,
+            "detail": "An error occurred while validating the account. Please try again."
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -15,6 +15,8 @@ from drf_spectacular.types import OpenApiTypes
 from core.helpers.response import success_response, validation_error_response, error_response
 from .models import Wallet, WalletTransaction, WithdrawalRequest, FeeConfiguration
 from .fee_utils import calculate_transfer_fees, calculate_deposit_fees, calculate_payment_link_fees, settle_fees_to_platform
+from .limits import TransactionLimitExceeded, charge_limits, release_limits
+from .provider_history import mirror_webhook_credit
 from .serializers import WalletBalanceSerializer, WalletTransactionSerializer
 from savings.models import SavingsGoalModel
 from savings.serializers import SavingsGoalSerializer
@@ -108,10 +110,8 @@ class WalletDetailAPIView(APIView):
         goals = SavingsGoalModel.objects.filter(user=request.user)
         goals_serializer = SavingsGoalSerializer(goals, many=True)
 
-        # Refresh user to get latest transaction_pin_set status
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        user = User.objects.get(id=request.user.id)
+        # request.user is current: the auth cache is invalidated whenever the user row is saved
+        user = request.user
 
         response_data = {
             'wallet': wallet_serializer.data,
@@ -341,11 +341,21 @@ class WalletWithdrawAPIView(APIView):
                 status_code=status.HTTP_400_BAD_REQUEST
             )
 
+        # Enforce per-transaction, daily and monthly limits
+        try:
+            limit_charge = charge_limits(request.user, amount_decimal)
+        except TransactionLimitExceeded as e:
+            return error_response(
+                message=e.message,
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
         # Calculate fees
         config = FeeConfiguration.get_active()
         fees = calculate_transfer_fees(amount_decimal, config=config)
 
         # Create withdrawal request
+        debited = False
         try:
             with transaction.atomic():
                 withdrawal_request = WithdrawalRequest.objects.create(
@@ -378,6 +388,8 @@ class WalletWithdrawAPIView(APIView):
                     status='pending'
                 )
 
+            debited = True
+
             # Settle fees to platform wallet (outside atomic block)
             settle_fees_to_platform(fees)
 
@@ -409,6 +421,8 @@ class WalletWithdrawAPIView(APIView):
             )
 
         except Exception as e:
+            if not debited:
+                release_limits(limit_charge)
             import logging
             logging.getLogger(__name__).error(f"Withdrawal error: {str(e)}", exc_info=True)
             return error_response(
@@ -604,6 +618,9 @@ class PSB9WebhookView(APIView):
                 # Settle fees to platform wallet
                 settle_fees_to_platform(fees)
 
+                # Mirror into the local 9PSB history once the deposit commits
+                transaction.on_commit(lambda: mirror_webhook_credit(wallet, data))
+
                 logger.info(
                     f"9PSB webhook: Deposit processed successfully. "
                     f"User: {wallet.user.email}, Amount: {amount_decimal}, Reference: {reference}"
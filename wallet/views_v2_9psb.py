@@ -16,6 +16,9 @@ from django.utils import timezone
 from core.helpers.response import success_response, validation_error_response, error_response
 from .models import Wallet, WalletTransaction, FeeConfiguration
 from .fee_utils import calculate_transfer_fees, calculate_deposit_fees, calculate_payment_link_fees, settle_fees_to_platform
+from .balance_shadow import provider_balance_data, psb9_enquiry_data, schedule_refresh
+from .provider_history import history_response_data, schedule_sync
+from .limits import TransactionLimitExceeded, charge_limits, release_limits
 from providers.helpers.psb9 import PSB9Client
 
 logger = logging.getLogger(__name__)
@@ -24,12 +27,16 @@ logger = logging.getLogger(__name__)
 class WalletEnquiryAPIView(APIView):
     """
     Test Case 3: Wallet Enquiry
-    Get wallet balance and details from 9PSB
+    Get wallet balance and details (ledger balance, with the last 9PSB balance)
+
+    balance is the ledger balance. psb9_data is the raw payload of the last
+    background 9PSB enquiry ({} until the first refresh lands) and
+    provider_balance summarises it as {availableBalance, lastUpdated, stale}.
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        """Get wallet balance from 9PSB"""
+        """Get wallet balance"""
         user = request.user
 
         try:
@@ -40,34 +47,22 @@ class WalletEnquiryAPIView(APIView):
                     status_code=status.HTTP_404_NOT_FOUND
                 )
 
-            # Get balance from 9PSB
-            psb9_client = PSB9Client()
-            result = psb9_client.get_wallet_balance(wallet.psb9_account_number)
-
-            if result.get("status") == "success":
-                balance_data = result.get("data", {})
-
-                # Update local wallet balance
-                wallet_balance = Decimal(balance_data.get("availableBalance", "0"))
-                wallet.balance = wallet_balance
-                wallet.save()
+            # Serve the ledger balance; the provider's balance is shadowed and
+            # refreshed in the background (see wallet/balance_shadow.py)
+            schedule_refresh(wallet)
 
-                return success_response(
-                    message="Wallet details retrieved successfully",
-                    data={
-                        "account_number": wallet.account_number,
-                        "account_name": wallet.account_name,
-                        "bank": wallet.bank,
-                        "balance": str(wallet.balance),
-                        "currency": wallet.currency,
-                        "psb9_data": balance_data
-                    }
-                )
-            else:
-                return error_response(
-                    message=result.get("message", "Failed to retrieve wallet balance"),
-                    status_code=status.HTTP_400_BAD_REQUEST
-                )
+            return success_response(
+                message="Wallet details retrieved successfully",
+                data={
+                    "account_number": wallet.account_number,
+                    "account_name": wallet.account_name,
+                    "bank": wallet.bank,
+                    "balance": str(wallet.balance),
+                    "currency": wallet.currency,
+                    "psb9_data": psb9_enquiry_data(wallet),
+                    "provider_balance": provider_balance_data(wallet),
+                }
+            )
 
         except Wallet.DoesNotExist:
             return error_response(
@@ -419,16 +414,29 @@ class OtherBanksTransferAPIView(APIView):
             # Generate unique transaction ID
             transaction_id = f"TRF_{user.id}_{uuid.uuid4().hex[:12].upper()}"
 
+            # Enforce per-transaction, daily and monthly limits
+            try:
+                limit_charge = charge_limits(user, amount_decimal)
+            except TransactionLimitExceeded as e:
+                return error_response(
+                    message=e.message,
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
+
             # Transfer via 9PSB (recipient gets net amount after fees)
             psb9_client = PSB9Client()
-            result = psb9_client.other_banks_transfer(
-                sender_account_number=wallet.psb9_account_number,
-                receiver_account_number=account_number,
-                bank_code=bank_code,
-                amount=str(fees.net_amount),
-                transaction_id=transaction_id,
-                narration=narration
-            )
+            try:
+                result = psb9_client.other_banks_transfer(
+                    sender_account_number=wallet.psb9_account_number,
+                    receiver_account_number=account_number,
+                    bank_code=bank_code,
+                    amount=str(fees.net_amount),
+                    transaction_id=transaction_id,
+                    narration=narration
+                )
+            except Exception:
+                release_limits(limit_charge)
+                raise
 
             if result.get("status") == "success":
                 try:
@@ -483,6 +491,7 @@ class OtherBanksTransferAPIView(APIView):
                         data={"transaction_id": transaction_id}
                     )
             else:
+                release_limits(limit_charge)
                 return error_response(
                     message=result.get("message", "Transfer failed"),
                     status_code=status.HTTP_400_BAD_REQUEST
@@ -504,15 +513,18 @@ class OtherBanksTransferAPIView(APIView):
 class WalletTransactionHistoryAPIView(APIView):
     """
     Test Case 8: Wallet Transaction History
-    Get transaction history from 9PSB
+    Served from the local mirror of 9PSB history (see wallet/provider_history.py)
+
+    Query Params:
+    - start_date / end_date: Date range (YYYY-MM-DD)
+    - cursor: next_cursor from the previous page
+    - limit: Items per page (default: 20, max: 100)
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         """Get transaction history"""
         user = request.user
-        start_date = request.query_params.get('start_date')
-        end_date = request.query_params.get('end_date')
 
         try:
             wallet = user.wallet
@@ -522,23 +534,17 @@ class WalletTransactionHistoryAPIView(APIView):
                     status_code=status.HTTP_404_NOT_FOUND
                 )
 
-            psb9_client = PSB9Client()
-            result = psb9_client.get_wallet_transactions(
-                account_number=wallet.psb9_account_number,
-                start_date=start_date,
-                end_date=end_date
-            )
+            schedule_sync(wallet)
 
-            if result.get("status") == "success":
-                return success_response(
-                    message="Transaction history retrieved successfully",
-                    data=result.get("data", [])
-                )
-            else:
-                return error_response(
-                    message=result.get("message", "Failed to retrieve transactions"),
-                    status_code=status.HTTP_400_BAD_REQUEST
-                )
+            try:
+                data = history_response_data(wallet, request.query_params)
+            except ValueError as e:
+                return validation_error_response({"detail": [str(e)]})
+
+            return success_response(
+                message="Transaction history retrieved successfully",
+                data=data
+            )
 
         except Wallet.DoesNotExist:
             return error_response(